@@ -6,12 +6,14 @@ from envoy.admin.api.billing import router as billing_router
 from envoy.admin.api.certificate import router as certificate_router
 from envoy.admin.api.config import router as config_router
 from envoy.admin.api.doe import router as doe_router
+from envoy.admin.api.export import router as export_router
 from envoy.admin.api.health import router as health_router
 from envoy.admin.api.log import router as log_router
 from envoy.admin.api.pricing import router as price_router
 from envoy.admin.api.site import router as site_router
 from envoy.admin.api.site_control import router as site_control_router
 from envoy.admin.api.site_reading import router as site_reading_router
+from envoy.admin.api.subscription import router as subscription_router
 
 routers = [
     site_control_router,
@@ -25,6 +27,8 @@ routers = [
     aggregator_router,
     site_reading_router,
     certificate_router,
+    export_router,
+    subscription_router,
 ]
 
 unsecured_routers = [health_router]
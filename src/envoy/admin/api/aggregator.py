@@ -9,6 +9,7 @@ from envoy_schema.admin.schema.certificate import CertificateAssignmentRequest,
 from fastapi_async_sqlalchemy import db
 
 from envoy.admin import manager
+from envoy.admin.schema.certificate import AggregatorCertificateProvisionUri, CertificateProvisionResponse
 from envoy.server import exception
 from envoy.server.api import error_handler, request
 
@@ -136,6 +137,38 @@ async def assign_certificates_to_aggregator(
         raise error_handler.LoggedHttpException(logger, err, http.HTTPStatus.BAD_REQUEST, f"{err}") from err
 
 
+@router.post(
+    AggregatorCertificateProvisionUri,
+    status_code=http.HTTPStatus.CREATED,
+    response_model=CertificateProvisionResponse,
+)
+async def provision_certificates_for_aggregator(
+    aggregator_id: int, request: fastapi.Request
+) -> CertificateProvisionResponse:
+    """Endpoint for the bulk provisioning (create and/or assign) of certificates to an aggregator. Has the same
+    semantics as POST to AggregatorCertificateListUri but the body is NDJSON (one CertificateAssignmentRequest per
+    line) and is streamed (chunked transfer encoding is supported) so it can scale to very large numbers of
+    certificates. The request is all or nothing.
+
+    Path Params:
+        aggregator_id: ID of the aggregator that the certificates will be assigned
+
+    Body:
+        NDJSON
+
+    Returns:
+        CertificateProvisionResponse
+    """
+    try:
+        return await manager.CertificateManager.provision_certificates_for_aggregator(
+            session=db.session, aggregator_id=aggregator_id, chunks=request.stream()
+        )
+    except exception.NotFoundError as err:
+        raise error_handler.LoggedHttpException(logger, err, http.HTTPStatus.NOT_FOUND, f"{err}") from err
+    except (exception.BadRequestError, sqlalchemy.exc.IntegrityError) as err:
+        raise error_handler.LoggedHttpException(logger, err, http.HTTPStatus.BAD_REQUEST, f"{err}") from err
+
+
 @router.delete(
     uri.AggregatorCertificateUri,
     status_code=http.HTTPStatus.NO_CONTENT,
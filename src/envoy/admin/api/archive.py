@@ -14,15 +14,20 @@ from envoy_schema.admin.schema.uri import (
     ArchiveForPeriodTariffGeneratedRate,
 )
 from fastapi import APIRouter, Path, Query
+from fastapi.responses import StreamingResponse
 from fastapi_async_sqlalchemy import db
 
-from envoy.admin.manager.archive import ArchiveListManager
+from envoy.admin.crud.archive import ArchiveExportEntity
+from envoy.admin.manager.archive import ArchiveExportManager, ArchiveListManager
+from envoy.admin.schema.ingest import NDJSON_CONTENT_TYPE
 from envoy.server.api.request import extract_limit_from_paging_param, extract_start_from_paging_param
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+ARCHIVE_EXPORT_URI = "/archive/{period_start}/{period_end}/{entity}/export"
+
 
 @router.get(ArchiveForPeriodSites, status_code=HTTPStatus.OK, response_model=ArchivePageResponse[ArchiveSiteResponse])
 async def get_archived_sites_for_period(
@@ -31,6 +36,7 @@ async def get_archived_sites_for_period(
     period_start: datetime = Path(),
     period_end: datetime = Path(),
     only_deletes: bool = Query(True),
+    after_archive_id: int | None = Query(None),
 ) -> ArchivePageResponse[ArchiveSiteResponse]:
     """Endpoint for a paginated list of archived Site Objects, ordered by archive_id that were created within a
     period of time. An archive is a moment in time snapshot of a record that was created before it was deleted/updated.
@@ -42,6 +48,8 @@ async def get_archived_sites_for_period(
     Query Param:
         only_deletes: False will return all change/delete archives, True will just return deletes. Default True
         start: start index value (for pagination). Default 0.
+        after_archive_id: If set - only archive_id values greater than this are returned (keyset pagination). Pass
+                          the last archive_id of the previous page to page through large archives. Default None
         limit: maximum number of objects to return. Default 100. Max 500.
 
     Note - The period range will filter records based on archive_time if only_deletes=False or deleted_time otherwise
@@ -56,6 +64,7 @@ async def get_archived_sites_for_period(
         period_start=period_start,
         period_end=period_end,
         only_deletes=only_deletes,
+        after_archive_id=after_archive_id,
     )
 
 
@@ -70,6 +79,7 @@ async def get_archived_does_for_period(
     period_start: datetime = Path(),
     period_end: datetime = Path(),
     only_deletes: bool = Query(True),
+    after_archive_id: int | None = Query(None),
 ) -> ArchivePageResponse[ArchiveDynamicOperatingEnvelopeResponse]:
     """Endpoint for a paginated list of archived DOE Objects, ordered by archive_id that were created within a
     period of time. An archive is a moment in time snapshot of a record that was created before it was deleted/updated.
@@ -81,6 +91,8 @@ async def get_archived_does_for_period(
     Query Param:
         only_deletes: False will return all change/delete archives, True will just return deletes. Default True
         start: start index value (for pagination). Default 0.
+        after_archive_id: If set - only archive_id values greater than this are returned (keyset pagination). Pass
+                          the last archive_id of the previous page to page through large archives. Default None
         limit: maximum number of objects to return. Default 100. Max 500.
 
     Note - The period range will filter records based on archive_time if only_deletes=False or deleted_time otherwise
@@ -95,6 +107,7 @@ async def get_archived_does_for_period(
         period_start=period_start,
         period_end=period_end,
         only_deletes=only_deletes,
+        after_archive_id=after_archive_id,
     )
 
 
@@ -109,6 +122,7 @@ async def get_archived_rates_for_period(
     period_start: datetime = Path(),
     period_end: datetime = Path(),
     only_deletes: bool = Query(True),
+    after_archive_id: int | None = Query(None),
 ) -> ArchivePageResponse[ArchiveTariffGeneratedRateResponse]:
     """Endpoint for a paginated list of archived DOE Objects, ordered by archive_id that were created within a
     period of time. An archive is a moment in time snapshot of a record that was created before it was deleted/updated.
@@ -120,6 +134,8 @@ async def get_archived_rates_for_period(
     Query Param:
         only_deletes: False will return all change/delete archives, True will just return deletes. Default True
         start: start index value (for pagination). Default 0.
+        after_archive_id: If set - only archive_id values greater than this are returned (keyset pagination). Pass
+                          the last archive_id of the previous page to page through large archives. Default None
         limit: maximum number of objects to return. Default 100. Max 500.
 
     Note - The period range will filter records based on archive_time if only_deletes=False or deleted_time otherwise
@@ -134,4 +150,37 @@ async def get_archived_rates_for_period(
         period_start=period_start,
         period_end=period_end,
         only_deletes=only_deletes,
+        after_archive_id=after_archive_id,
+    )
+
+
+@router.get(ARCHIVE_EXPORT_URI, status_code=HTTPStatus.OK)
+async def get_archive_export(
+    period_start: datetime = Path(),
+    period_end: datetime = Path(),
+    entity: ArchiveExportEntity = Path(),
+    only_deletes: bool = Query(True),
+) -> StreamingResponse:
+    """Endpoint for a streamed export of EVERY archived record of a particular type that was created within a period
+    of time. This is intended for audit pulls over long periods of history - records are streamed in archive_id order
+    (fetched in short keyset paginated batches) so there is no pagination or total count.
+
+    Path Param:
+        period_start: The (inclusive) start datetime to request data for (include timezone)
+        period_end: The (exclusive) end datetime to request data for (include timezone)
+        entity: The type of archive to export (site, dynamic_operating_envelope or tariff_generated_rate)
+
+    Query Param:
+        only_deletes: False will return all change/delete archives, True will just return deletes. Default True
+
+    Note - The period range will filter records based on archive_time if only_deletes=False or deleted_time otherwise
+
+    Returns:
+        StreamingResponse - NDJSON with one ArchiveSiteResponse / ArchiveDynamicOperatingEnvelopeResponse /
+        ArchiveTariffGeneratedRateResponse per line
+    """
+    logger.info(f"Starting {entity} archive export ({period_start} to {period_end}, only_deletes: {only_deletes})")
+    return StreamingResponse(
+        ArchiveExportManager.stream_archive_ndjson(entity, period_start, period_end, only_deletes),
+        media_type=NDJSON_CONTENT_TYPE,
     )
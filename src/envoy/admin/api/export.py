@@ -0,0 +1,41 @@
+import logging
+from datetime import datetime
+from http import HTTPStatus
+
+from fastapi import APIRouter, Path, Query
+from fastapi.responses import StreamingResponse
+
+from envoy.admin.crud.export import ExportEntity
+from envoy.admin.manager.export import ExportManager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+EXPORT_URI = "/export/{entity}"
+
+
+@router.get(EXPORT_URI, status_code=HTTPStatus.OK)
+async def get_export(
+    entity: ExportEntity = Path(),
+    changed_after: datetime | None = Query(None),
+) -> StreamingResponse:
+    """Endpoint for a bulk CSV export of every record of a particular entity type (across all aggregators). This is
+    intended for bulk/nightly synchronisation - the records are streamed directly from the database so there is no
+    pagination.
+
+    Path Param:
+        entity: The type of entity to export (eg site, site_der_rating, dynamic_operating_envelope)
+
+    Query Param:
+        changed_after: If specified - only records with changed_time >= changed_after will be included. Default None
+
+    Returns:
+        StreamingResponse - text/csv with a header row. Columns match the underlying database table.
+    """
+    logger.info(f"Starting {entity} export (changed_after: {changed_after})")
+    return StreamingResponse(
+        ExportManager.stream_entity_csv(entity, changed_after),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{entity.value}.csv"'},
+    )
@@ -0,0 +1,91 @@
+import logging
+from http import HTTPStatus
+
+from fastapi import APIRouter, Request
+from fastapi_async_sqlalchemy import db
+
+from envoy.admin.manager.ingest import IngestJobManager
+from envoy.admin.schema.ingest import (
+    IngestJobListUri,
+    IngestJobRequest,
+    IngestJobResponse,
+    IngestJobRowsUri,
+    IngestJobSubmitUri,
+    IngestJobUri,
+)
+from envoy.server.api.error_handler import LoggedHttpException
+from envoy.server.exception import BadRequestError, ConflictError, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post(IngestJobListUri, status_code=HTTPStatus.CREATED, response_model=IngestJobResponse)
+async def create_ingest_job(ingest_job: IngestJobRequest) -> IngestJobResponse:
+    """Creates a new (empty) ingest job for the asynchronous bulk ingest of tariff generated rates / site controls.
+    Rows are then uploaded via IngestJobRowsUri and the job submitted via IngestJobSubmitUri.
+
+    Body:
+        IngestJobRequest
+
+    Returns:
+        IngestJobResponse
+    """
+    try:
+        return await IngestJobManager.create_job(db.session, ingest_job)
+    except BadRequestError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.BAD_REQUEST, exc.message) from exc
+
+
+@router.get(IngestJobUri, status_code=HTTPStatus.OK, response_model=IngestJobResponse)
+async def get_ingest_job(ingest_job_id: int) -> IngestJobResponse:
+    """Fetches the current status/progress of an ingest job.
+
+    Returns:
+        IngestJobResponse
+    """
+    try:
+        return await IngestJobManager.fetch_job(db.session, ingest_job_id)
+    except NotFoundError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.NOT_FOUND, exc.message) from exc
+
+
+@router.post(IngestJobRowsUri, status_code=HTTPStatus.OK, response_model=IngestJobResponse)
+async def upload_ingest_job_rows(ingest_job_id: int, request: Request) -> IngestJobResponse:
+    """Stages rows against an ingest job that is still receiving. The body is NDJSON (one request object per line -
+    TariffGeneratedRateRequest, DynamicOperatingEnvelopeRequest or SiteControlRequest depending on the job type) and
+    is streamed (chunked transfer encoding is supported). Large uploads can be split across multiple requests.
+
+    Each upload is all or nothing - if any line is invalid, none of the rows in this upload will be staged.
+
+    Body:
+        NDJSON
+
+    Returns:
+        IngestJobResponse
+    """
+    try:
+        return await IngestJobManager.stage_rows(db.session, ingest_job_id, request.stream())
+    except BadRequestError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.BAD_REQUEST, exc.message) from exc
+    except NotFoundError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.NOT_FOUND, exc.message) from exc
+    except ConflictError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.CONFLICT, str(exc)) from exc
+
+
+@router.post(IngestJobSubmitUri, status_code=HTTPStatus.ACCEPTED, response_model=IngestJobResponse)
+async def submit_ingest_job(ingest_job_id: int) -> IngestJobResponse:
+    """Marks the upload of an ingest job as complete. The staged rows will then be applied in the background (in
+    chunks) - poll IngestJobUri for progress.
+
+    Returns:
+        IngestJobResponse
+    """
+    try:
+        return await IngestJobManager.submit_job(db.session, ingest_job_id)
+    except NotFoundError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.NOT_FOUND, exc.message) from exc
+    except ConflictError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.CONFLICT, str(exc)) from exc
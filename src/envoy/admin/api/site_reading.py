@@ -9,6 +9,7 @@ from fastapi_async_sqlalchemy import db
 
 from envoy.admin.manager.site_reading import AdminSiteReadingManager
 from envoy.server.api.request import extract_limit_from_paging_param, extract_start_from_paging_param
+from envoy.server.model.site_reading import SiteReadingRollupResolution
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ async def get_site_readings(
     period_end: datetime,
     start: list[int] = Query([0]),
     limit: list[int] = Query([500]),  # Max 500
+    resolution: SiteReadingRollupResolution | None = Query(None),  # If set - serve bucket averages from the rollups
 ) -> CSIPAusSiteReadingPageResponse:
     return await AdminSiteReadingManager.get_site_readings_for_site_and_time(
         session=db.session,
@@ -32,4 +34,5 @@ async def get_site_readings(
         end_time=period_end,
         start=extract_start_from_paging_param(start),
         limit=extract_limit_from_paging_param(limit),
+        resolution=resolution,
     )
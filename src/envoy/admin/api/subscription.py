@@ -0,0 +1,40 @@
+import logging
+from http import HTTPStatus
+
+from fastapi import APIRouter
+from fastapi_async_sqlalchemy import db
+
+from envoy.admin.manager.subscription import SubscriptionManager
+from envoy.admin.schema.subscription import (
+    AggregatorSubscriptionListUri,
+    SubscriptionBulkResponse,
+    SubscriptionRequest,
+)
+from envoy.server.api.error_handler import LoggedHttpException
+from envoy.server.exception import BadRequestError, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.put(AggregatorSubscriptionListUri, status_code=HTTPStatus.OK, response_model=SubscriptionBulkResponse)
+async def upsert_aggregator_subscriptions(
+    aggregator_id: int, subscriptions: list[SubscriptionRequest]
+) -> SubscriptionBulkResponse:
+    """Bulk creates (or renews) subscriptions on behalf of an aggregator. A subscription matching an existing
+    subscription's aggregator/resource/site will renew it (keeping the subscription_id) rather than create a new one.
+    The whole batch is applied in a single transaction - if any subscription is invalid, nothing is written.
+
+    Body:
+        list of SubscriptionRequest objects.
+
+    Returns:
+        SubscriptionBulkResponse - the subscription_id for each request (in the same order)
+    """
+    try:
+        return await SubscriptionManager.upsert_subscriptions_for_aggregator(db.session, aggregator_id, subscriptions)
+    except BadRequestError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.BAD_REQUEST, exc.message) from exc
+    except NotFoundError as exc:
+        raise LoggedHttpException(logger, exc, HTTPStatus.NOT_FOUND, exc.message) from exc
@@ -1,3 +1,3 @@
 """Module houses all admin CRUD operations"""
 
-from . import aggregator, archive, billing, certificate, doe, log, pricing, site  # noqa: F401
+from . import aggregator, archive, billing, certificate, doe, ingest, log, pricing, site, subscription  # noqa: F401
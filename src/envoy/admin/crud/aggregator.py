@@ -1,10 +1,12 @@
 from collections.abc import Iterable, Sequence
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from envoy.server.model.aggregator import NULL_AGGREGATOR_ID, Aggregator, AggregatorCertificateAssignment
+from envoy.server.model.base import Certificate
 
 
 async def count_all_aggregators(session: AsyncSession) -> int:
@@ -68,6 +70,44 @@ async def assign_many_certificates(session: AsyncSession, aggregator_id: int, ce
     await session.execute(stmt)
 
 
+async def assign_certificates_by_id_or_lfdi(
+    session: AsyncSession, aggregator_id: int, certificate_ids: Sequence[int], lfdis: Sequence[str]
+) -> Sequence[int]:
+    """Assigns every existing certificate matching one of certificate_ids OR lfdis to an aggregator in a single
+    (INSERT ... SELECT) statement. Certificates that don't exist are ignored. Certificates that are already assigned to
+    the aggregator are left untouched (i.e. this is safe to repeat).
+
+    Args:
+        session: Database session
+        aggregator_id: ID of aggregator to have certificates assigned
+        certificate_ids: IDs of certificates to be assigned
+        lfdis: LFDIs of certificates to be assigned
+
+    Returns:
+        The certificate IDs of the newly created assignments
+    """
+    if not certificate_ids and not lfdis:
+        return []
+
+    stmt = (
+        postgresql.insert(AggregatorCertificateAssignment)
+        .from_select(
+            ["aggregator_id", "certificate_id"],
+            sa.select(sa.literal(aggregator_id), Certificate.certificate_id).where(
+                sa.or_(
+                    Certificate.certificate_id
+                    == sa.any_(sa.literal(list(certificate_ids), type_=postgresql.ARRAY(sa.INTEGER))),
+                    Certificate.lfdi == sa.any_(sa.literal(list(lfdis), type_=postgresql.ARRAY(sa.VARCHAR))),
+                )
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["certificate_id", "aggregator_id"])
+        .returning(AggregatorCertificateAssignment.certificate_id)
+    )
+    resp = await session.execute(stmt)
+    return resp.scalars().all()
+
+
 async def unassign_many_certificates(session: AsyncSession, aggregator_id: int, certificate_ids: Iterable[int]) -> None:
     """Unassign certificates from an aggregator.
 
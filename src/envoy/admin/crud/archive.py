@@ -1,92 +1,149 @@
 from collections.abc import Sequence
 from datetime import datetime
+from enum import StrEnum
+from typing import TypeVar
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from envoy.server.model.archive.base import ArchiveBase
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.archive.site import ArchiveSite
 from envoy.server.model.archive.tariff import ArchiveTariffGeneratedRate
 
+TArchive = TypeVar("TArchive", bound=ArchiveBase)
+TSelect = TypeVar("TSelect", bound=Select)
 
-async def count_archive_sites_for_period(
-    session: AsyncSession, period_start: datetime, period_end: datetime, only_deletes: bool
-) -> int:
-    """Similar to select_archive_sites_for_period - Counts the total number of sites matched by query parameters
 
-    period_start: INCLUSIVE start time to filter archive records by
-    period_end: EXCLUSIVE start time to filter archive records by
-    only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
-                  will be considered, otherwise filtering will operate on archive_time and will include everything"""
+class ArchiveExportEntity(StrEnum):
+    """The archive entities that can be exported (streamed). Values match the underlying (non archive) table name - the
+    same names used by the bulk export (see envoy.admin.crud.export.ExportEntity)"""
+
+    SITE = "site"
+    DYNAMIC_OPERATING_ENVELOPE = "dynamic_operating_envelope"
+    TARIFF_GENERATED_RATE = "tariff_generated_rate"
+
 
-    stmt = select(func.count()).select_from(ArchiveSite)
+ARCHIVE_EXPORT_MODELS: dict[ArchiveExportEntity, type[ArchiveBase]] = {
+    ArchiveExportEntity.SITE: ArchiveSite,
+    ArchiveExportEntity.DYNAMIC_OPERATING_ENVELOPE: ArchiveDynamicOperatingEnvelope,
+    ArchiveExportEntity.TARIFF_GENERATED_RATE: ArchiveTariffGeneratedRate,
+}
 
+
+def _filter_archive_period(
+    stmt: TSelect, archive_type: type[ArchiveBase], period_start: datetime, period_end: datetime, only_deletes: bool
+) -> TSelect:
+    """Applies the period filter (on deleted_time if only_deletes otherwise archive_time) to stmt. Both columns are
+    indexed so the period can be resolved without scanning the entire archive table"""
     if only_deletes:
-        stmt = stmt.where(ArchiveSite.deleted_time >= period_start).where(ArchiveSite.deleted_time < period_end)
+        return stmt.where(archive_type.deleted_time >= period_start).where(archive_type.deleted_time < period_end)
     else:
-        stmt = stmt.where(ArchiveSite.archive_time >= period_start).where(ArchiveSite.archive_time < period_end)
+        return stmt.where(archive_type.archive_time >= period_start).where(archive_type.archive_time < period_end)
+
 
+async def count_archive_for_period(
+    session: AsyncSession,
+    archive_type: type[ArchiveBase],
+    period_start: datetime,
+    period_end: datetime,
+    only_deletes: bool,
+) -> int:
+    """Counts the total number of archive_type records matched by query parameters (see select_archive_for_period)"""
+    stmt = _filter_archive_period(
+        select(func.count()).select_from(archive_type), archive_type, period_start, period_end, only_deletes
+    )
     resp = await session.execute(stmt)
     return resp.scalar_one()
 
 
-async def select_archive_sites_for_period(
-    session: AsyncSession, start: int, limit: int, period_start: datetime, period_end: datetime, only_deletes: bool
-) -> Sequence[ArchiveSite]:
-    """Admin selecting of archive sites - no filtering on aggregator is made. Returns ordered by archive_id
+async def select_archive_for_period(
+    session: AsyncSession,
+    archive_type: type[TArchive],
+    start: int,
+    limit: int,
+    period_start: datetime,
+    period_end: datetime,
+    only_deletes: bool,
+    after_archive_id: int | None = None,
+) -> Sequence[TArchive]:
+    """Admin selecting of archive_type records - no filtering on aggregator is made. Returns ordered by archive_id
 
     start: How many records to skip
     limit: The maximum number of records to return
     period_start: INCLUSIVE start time to filter archive records by
     period_end: EXCLUSIVE start time to filter archive records by
     only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
-                  will be considered, otherwise filtering will operate on archive_time and will include everything"""
+                  will be considered, otherwise filtering will operate on archive_time and will include everything
+    after_archive_id: If set - only records with an archive_id greater than this will be returned (keyset pagination).
+                      Unlike start, the cost of this doesn't grow with the number of records being skipped"""
 
-    stmt = (
-        select(ArchiveSite)
-        .offset(start)
-        .limit(limit)
-        .order_by(
-            ArchiveSite.archive_id.asc(),
-        )
-    )
-
-    if only_deletes:
-        stmt = stmt.where(ArchiveSite.deleted_time >= period_start).where(ArchiveSite.deleted_time < period_end)
-    else:
-        stmt = stmt.where(ArchiveSite.archive_time >= period_start).where(ArchiveSite.archive_time < period_end)
+    stmt = select(archive_type).offset(start).limit(limit).order_by(archive_type.archive_id.asc())
+    if after_archive_id is not None:
+        stmt = stmt.where(archive_type.archive_id > after_archive_id)
+    stmt = _filter_archive_period(stmt, archive_type, period_start, period_end, only_deletes)
 
     resp = await session.execute(stmt)
     return resp.scalars().all()
 
 
-async def count_archive_does_for_period(
+async def count_archive_sites_for_period(
     session: AsyncSession, period_start: datetime, period_end: datetime, only_deletes: bool
 ) -> int:
-    """Similar to select_archive_does_for_period - Counts the total number of does matched by query parameters
+    """Similar to select_archive_sites_for_period - Counts the total number of sites matched by query parameters
 
     period_start: INCLUSIVE start time to filter archive records by
     period_end: EXCLUSIVE start time to filter archive records by
     only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
                   will be considered, otherwise filtering will operate on archive_time and will include everything"""
+    return await count_archive_for_period(session, ArchiveSite, period_start, period_end, only_deletes)
 
-    stmt = select(func.count()).select_from(ArchiveDynamicOperatingEnvelope)
 
-    if only_deletes:
-        stmt = stmt.where(ArchiveDynamicOperatingEnvelope.deleted_time >= period_start).where(
-            ArchiveDynamicOperatingEnvelope.deleted_time < period_end
-        )
-    else:
-        stmt = stmt.where(ArchiveDynamicOperatingEnvelope.archive_time >= period_start).where(
-            ArchiveDynamicOperatingEnvelope.archive_time < period_end
-        )
+async def select_archive_sites_for_period(
+    session: AsyncSession,
+    start: int,
+    limit: int,
+    period_start: datetime,
+    period_end: datetime,
+    only_deletes: bool,
+    after_archive_id: int | None = None,
+) -> Sequence[ArchiveSite]:
+    """Admin selecting of archive sites - no filtering on aggregator is made. Returns ordered by archive_id
+
+    start: How many records to skip
+    limit: The maximum number of records to return
+    period_start: INCLUSIVE start time to filter archive records by
+    period_end: EXCLUSIVE start time to filter archive records by
+    only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
+                  will be considered, otherwise filtering will operate on archive_time and will include everything
+    after_archive_id: If set - only records with an archive_id greater than this will be returned"""
+    return await select_archive_for_period(
+        session, ArchiveSite, start, limit, period_start, period_end, only_deletes, after_archive_id
+    )
 
-    resp = await session.execute(stmt)
-    return resp.scalar_one()
+
+async def count_archive_does_for_period(
+    session: AsyncSession, period_start: datetime, period_end: datetime, only_deletes: bool
+) -> int:
+    """Similar to select_archive_does_for_period - Counts the total number of does matched by query parameters
+
+    period_start: INCLUSIVE start time to filter archive records by
+    period_end: EXCLUSIVE start time to filter archive records by
+    only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
+                  will be considered, otherwise filtering will operate on archive_time and will include everything"""
+    return await count_archive_for_period(
+        session, ArchiveDynamicOperatingEnvelope, period_start, period_end, only_deletes
+    )
 
 
 async def select_archive_does_for_period(
-    session: AsyncSession, start: int, limit: int, period_start: datetime, period_end: datetime, only_deletes: bool
+    session: AsyncSession,
+    start: int,
+    limit: int,
+    period_start: datetime,
+    period_end: datetime,
+    only_deletes: bool,
+    after_archive_id: int | None = None,
 ) -> Sequence[ArchiveDynamicOperatingEnvelope]:
     """Admin selecting of archive does - no filtering on aggregator is made. Returns ordered by archive_id
 
@@ -95,29 +152,12 @@ async def select_archive_does_for_period(
     period_start: INCLUSIVE start time to filter archive records by
     period_end: EXCLUSIVE start time to filter archive records by
     only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
-                  will be considered, otherwise filtering will operate on archive_time and will include everything"""
-
-    stmt = (
-        select(ArchiveDynamicOperatingEnvelope)
-        .offset(start)
-        .limit(limit)
-        .order_by(
-            ArchiveDynamicOperatingEnvelope.archive_id.asc(),
-        )
+                  will be considered, otherwise filtering will operate on archive_time and will include everything
+    after_archive_id: If set - only records with an archive_id greater than this will be returned"""
+    return await select_archive_for_period(
+        session, ArchiveDynamicOperatingEnvelope, start, limit, period_start, period_end, only_deletes, after_archive_id
     )
 
-    if only_deletes:
-        stmt = stmt.where(ArchiveDynamicOperatingEnvelope.deleted_time >= period_start).where(
-            ArchiveDynamicOperatingEnvelope.deleted_time < period_end
-        )
-    else:
-        stmt = stmt.where(ArchiveDynamicOperatingEnvelope.archive_time >= period_start).where(
-            ArchiveDynamicOperatingEnvelope.archive_time < period_end
-        )
-
-    resp = await session.execute(stmt)
-    return resp.scalars().all()
-
 
 async def count_archive_rates_for_period(
     session: AsyncSession, period_start: datetime, period_end: datetime, only_deletes: bool
@@ -128,24 +168,17 @@ async def count_archive_rates_for_period(
     period_end: EXCLUSIVE start time to filter archive records by
     only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
                   will be considered, otherwise filtering will operate on archive_time and will include everything"""
-
-    stmt = select(func.count()).select_from(ArchiveTariffGeneratedRate)
-
-    if only_deletes:
-        stmt = stmt.where(ArchiveTariffGeneratedRate.deleted_time >= period_start).where(
-            ArchiveTariffGeneratedRate.deleted_time < period_end
-        )
-    else:
-        stmt = stmt.where(ArchiveTariffGeneratedRate.archive_time >= period_start).where(
-            ArchiveTariffGeneratedRate.archive_time < period_end
-        )
-
-    resp = await session.execute(stmt)
-    return resp.scalar_one()
+    return await count_archive_for_period(session, ArchiveTariffGeneratedRate, period_start, period_end, only_deletes)
 
 
 async def select_archive_rates_for_period(
-    session: AsyncSession, start: int, limit: int, period_start: datetime, period_end: datetime, only_deletes: bool
+    session: AsyncSession,
+    start: int,
+    limit: int,
+    period_start: datetime,
+    period_end: datetime,
+    only_deletes: bool,
+    after_archive_id: int | None = None,
 ) -> Sequence[ArchiveTariffGeneratedRate]:
     """Admin selecting of archive rates - no filtering on aggregator is made. Returns ordered by archive_id
 
@@ -154,25 +187,8 @@ async def select_archive_rates_for_period(
     period_start: INCLUSIVE start time to filter archive records by
     period_end: EXCLUSIVE start time to filter archive records by
     only_deletes: If True - filtering will operate on the deleted_time and only records with a non None deleted_time
-                  will be considered, otherwise filtering will operate on archive_time and will include everything"""
-
-    stmt = (
-        select(ArchiveTariffGeneratedRate)
-        .offset(start)
-        .limit(limit)
-        .order_by(
-            ArchiveTariffGeneratedRate.archive_id.asc(),
-        )
+                  will be considered, otherwise filtering will operate on archive_time and will include everything
+    after_archive_id: If set - only records with an archive_id greater than this will be returned"""
+    return await select_archive_for_period(
+        session, ArchiveTariffGeneratedRate, start, limit, period_start, period_end, only_deletes, after_archive_id
     )
-
-    if only_deletes:
-        stmt = stmt.where(ArchiveTariffGeneratedRate.deleted_time >= period_start).where(
-            ArchiveTariffGeneratedRate.deleted_time < period_end
-        )
-    else:
-        stmt = stmt.where(ArchiveTariffGeneratedRate.archive_time >= period_start).where(
-            ArchiveTariffGeneratedRate.archive_time < period_end
-        )
-
-    resp = await session.execute(stmt)
-    return resp.scalars().all()
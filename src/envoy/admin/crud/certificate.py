@@ -1,5 +1,5 @@
-import itertools
 from collections.abc import Iterable, Sequence
+from datetime import datetime
 
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
@@ -71,26 +71,61 @@ async def count_all_certificates(session: AsyncSession) -> int:
     return resp.scalar_one()
 
 
-async def select_many_certificates_by_id_or_lfdi(
-    session: AsyncSession, certificates: list[base.Certificate]
-) -> Sequence[base.Certificate]:
-    """Selects all certificates available using either ID or LFDI.
+async def select_missing_certificate_ids(session: AsyncSession, certificate_ids: Sequence[int]) -> Sequence[int]:
+    """Returns the subset of certificate_ids that don't exist in the DB (sorted ascending).
+
+    The ids are sent as a single array parameter (and unnest-ed) so the cost of this query is one statement regardless
+    of how many ids are being checked.
 
     Args:
         session: Database session
-        certificates: All certificates being checked for existance in DB.
-            This may be a superset of those returned
+        certificate_ids: The certificate ids to check
 
     Returns:
-        A collection of Certificates
+        The certificate ids that don't exist
     """
-    certificate_ids = (c.certificate_id for c in certificates if c.certificate_id is not None)
-    lfdis = (c.lfdi for c in certificates if c.lfdi is not None)
-    stmt = sa.select(base.Certificate).where(
-        sa.or_(base.Certificate.certificate_id.in_(certificate_ids), base.Certificate.lfdi.in_(lfdis))
+    if not certificate_ids:
+        return []
+
+    requested = (
+        sa.func.unnest(sa.literal(list(certificate_ids), type_=postgresql.ARRAY(sa.INTEGER)))
+        .table_valued("certificate_id")
+        .render_derived()
+    )
+    stmt = (
+        sa.select(requested.c.certificate_id)
+        .where(~sa.exists().where(base.Certificate.certificate_id == requested.c.certificate_id))
+        .order_by(requested.c.certificate_id)
     )
     resp = await session.execute(stmt)
+    return resp.scalars().all()
+
+
+async def select_missing_certificate_lfdis(session: AsyncSession, lfdis: Sequence[str]) -> Sequence[str]:
+    """Returns the subset of lfdis that don't exist in the DB (sorted ascending). Like select_missing_certificate_ids
+    this is a single statement regardless of the number of lfdis.
+
+    Args:
+        session: Database session
+        lfdis: The certificate lfdis to check
 
+    Returns:
+        The certificate lfdis that don't exist
+    """
+    if not lfdis:
+        return []
+
+    requested = (
+        sa.func.unnest(sa.literal(list(lfdis), type_=postgresql.ARRAY(sa.VARCHAR)))
+        .table_valued("lfdi")
+        .render_derived()
+    )
+    stmt = (
+        sa.select(requested.c.lfdi)
+        .where(~sa.exists().where(base.Certificate.lfdi == requested.c.lfdi))
+        .order_by(requested.c.lfdi)
+    )
+    resp = await session.execute(stmt)
     return resp.scalars().all()
 
 
@@ -115,7 +150,7 @@ async def create_many_certificates_on_conflict_do_nothing(
     """Attempts to create certificates for all those provided.
 
     Fails quietly if conflict occurs i.e. duplicate LFDI present. Does not upsert.
-    The query is specific to PostgreSQL databases.
+    The query is specific to PostgreSQL databases (INSERT ... SELECT FROM unnest ... ON CONFLICT DO NOTHING).
 
     Args:
         session: Database session
@@ -124,18 +159,29 @@ async def create_many_certificates_on_conflict_do_nothing(
     Returns:
         All certificates that were created
     """
+    # Rather than rendering a VALUES row per certificate, the certificates are staged as one array per column and
+    # unnest-ed server side. The statement (and number of bind params) is therefore the same size regardless of count
+    lfdis: list[str] = []
+    expiries: list[datetime] = []
+    for cert in certificates:
+        lfdis.append(cert.lfdi)
+        expiries.append(cert.expiry)
+
     # Determine if an empty iterable was provided, if so return empty list
-    peeker, producer = itertools.tee(iter(certificates))
-    try:
-        next(peeker)
-    except StopIteration:
+    if not lfdis:
         return []
 
-    table = base.Certificate.__table__
-    create_cols = [c.name for c in table.c if c not in list(table.primary_key.columns) and not c.server_default]  # ty:ignore[unresolved-attribute]
+    staged = (
+        sa.func.unnest(
+            sa.literal(lfdis, type_=postgresql.ARRAY(sa.VARCHAR)),
+            sa.literal(expiries, type_=postgresql.ARRAY(sa.DateTime(timezone=True))),
+        )
+        .table_valued("lfdi", "expiry")
+        .render_derived()
+    )
     stmt = (
         postgresql.insert(base.Certificate)
-        .values([{k: getattr(cert, k) for k in create_cols} for cert in producer])
+        .from_select(["lfdi", "expiry"], sa.select(staged.c.lfdi, staged.c.expiry))
         .on_conflict_do_nothing(index_elements=["lfdi"])
         .returning(base.Certificate)
     )
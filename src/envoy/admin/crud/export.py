@@ -0,0 +1,99 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from enum import StrEnum
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.model.base import Base
+from envoy.server.model.doe import DynamicOperatingEnvelope
+from envoy.server.model.site import Site, SiteDERAvailability, SiteDERRating, SiteDERSetting, SiteDERStatus
+from envoy.server.model.tariff import TariffGeneratedRate
+
+# How many COPY chunks (each typically ~64KB) can be buffered between the database and the client before the database
+# read is paused. This is what keeps an export at constant memory regardless of the number of rows being exported
+DEFAULT_EXPORT_QUEUE_SIZE = 16
+
+
+class ExportEntity(StrEnum):
+    """The entities that can be bulk exported. Values match the underlying table name"""
+
+    SITE = "site"
+    SITE_DER_RATING = "site_der_rating"
+    SITE_DER_SETTING = "site_der_setting"
+    SITE_DER_AVAILABILITY = "site_der_availability"
+    SITE_DER_STATUS = "site_der_status"
+    DYNAMIC_OPERATING_ENVELOPE = "dynamic_operating_envelope"
+    TARIFF_GENERATED_RATE = "tariff_generated_rate"
+
+
+EXPORT_MODELS: dict[ExportEntity, type[Base]] = {
+    ExportEntity.SITE: Site,
+    ExportEntity.SITE_DER_RATING: SiteDERRating,
+    ExportEntity.SITE_DER_SETTING: SiteDERSetting,
+    ExportEntity.SITE_DER_AVAILABILITY: SiteDERAvailability,
+    ExportEntity.SITE_DER_STATUS: SiteDERStatus,
+    ExportEntity.DYNAMIC_OPERATING_ENVELOPE: DynamicOperatingEnvelope,
+    ExportEntity.TARIFF_GENERATED_RATE: TariffGeneratedRate,
+}
+
+
+def generate_export_query(entity: ExportEntity, changed_after: datetime | None) -> str:
+    """Generates the SELECT statement (in raw SQL) that will export every column of entity, ordered by primary key.
+    If changed_after is specified, the query will have a single $1 parameter that filters on changed_time >= $1"""
+    mapper = inspect(EXPORT_MODELS[entity])
+    columns = ", ".join(f'"{c.name}"' for c in mapper.columns)
+    order_by = ", ".join(f'"{c.name}"' for c in mapper.primary_key)
+
+    # NOTE: All identifiers here are sourced from the models - they are never sourced from a client
+    where = ' WHERE "changed_time" >= $1' if changed_after is not None and changed_after != datetime.min else ""
+    return f'SELECT {columns} FROM "{entity.value}"{where} ORDER BY {order_by}'  # noqa: S608  # nosec B608
+
+
+async def stream_export_csv(
+    session: AsyncSession,
+    entity: ExportEntity,
+    changed_after: datetime | None,
+    queue_size: int = DEFAULT_EXPORT_QUEUE_SIZE,
+) -> AsyncGenerator[bytes, None]:
+    """Streams every entity (optionally filtered to those with changed_time >= changed_after) as CSV (with a header
+    row) using a postgres COPY TO STDOUT. Rows are never materialised as ORM objects - the encoded CSV chunks are
+    passed through from the database as they arrive.
+
+    Timestamps will be encoded in UTC. This must be the only statement executing on session while iterating."""
+
+    query = generate_export_query(entity, changed_after)
+    args = [changed_after] if "$1" in query else []
+
+    await session.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    raw_conn = await (await session.connection()).get_raw_connection()
+    driver_conn = raw_conn.driver_connection
+    if driver_conn is None:
+        raise ValueError("Unable to access underlying database driver connection.")
+
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=queue_size)
+
+    async def enqueue_chunk(chunk: bytes | bytearray) -> None:
+        await queue.put(bytes(chunk))  # Blocks the COPY when the client isn't keeping up
+
+    async def copy_to_queue() -> None:
+        try:
+            await driver_conn.copy_from_query(query, *args, output=enqueue_chunk, format="csv", header=True)
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    copy_task = asyncio.create_task(copy_to_queue())
+    try:
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+        await copy_task  # Will raise any error encountered during the COPY
+    finally:
+        if not copy_task.done():
+            copy_task.cancel()
+            try:
+                await copy_task
+            except asyncio.CancelledError:
+                pass
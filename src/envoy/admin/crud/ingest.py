@@ -0,0 +1,138 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.model.ingest import IngestJob, IngestJobRow, IngestJobStatus
+
+
+async def select_ingest_job(session: AsyncSession, ingest_job_id: int, for_update: bool = False) -> IngestJob | None:
+    """Fetches the IngestJob with ingest_job_id (or None if it doesn't exist). If for_update is set, the row will be
+    locked until the current transaction completes"""
+    stmt = select(IngestJob).where(IngestJob.ingest_job_id == ingest_job_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
+async def insert_ingest_job_rows(
+    session: AsyncSession, ingest_job_id: int, first_row_number: int, rows: Sequence[tuple[int, str]]
+) -> None:
+    """Stages rows (site_id, payload) against ingest_job_id - numbering them sequentially from first_row_number"""
+    if not rows:
+        return
+
+    await session.execute(
+        insert(IngestJobRow),
+        [
+            {"ingest_job_id": ingest_job_id, "row_number": first_row_number + idx, "site_id": site_id, "payload": p}
+            for idx, (site_id, p) in enumerate(rows)
+        ],
+    )
+
+
+async def claim_next_ingest_job(session: AsyncSession, now: datetime, lease: timedelta) -> IngestJob | None:
+    """Claims (marks as APPLYING) the oldest IngestJob that is either PENDING or was APPLYING but hasn't made progress
+    within lease (the worker applying it has presumably died). Jobs locked by another worker are skipped.
+
+    The claimed job's claimed_time is set to now - it identifies this claim's lease (see record_ingest_job_chunk /
+    update_ingest_job_status).
+
+    Changes will NOT be committed by this function"""
+    stmt = (
+        select(IngestJob)
+        .where(
+            or_(
+                IngestJob.status == IngestJobStatus.PENDING,
+                (IngestJob.status == IngestJobStatus.APPLYING) & (IngestJob.changed_time < (now - lease)),
+            )
+        )
+        .order_by(IngestJob.ingest_job_id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = (await session.execute(stmt)).scalar_one_or_none()
+    if job is None:
+        return None
+
+    job.status = IngestJobStatus.APPLYING
+    job.changed_time = now
+    job.claimed_time = now
+    return job
+
+
+async def select_ingest_job_row_chunk(
+    session: AsyncSession, ingest_job_id: int, partition_count: int, partition: int, limit: int
+) -> Sequence[IngestJobRow]:
+    """Fetches (up to) limit of the earliest staged rows for ingest_job_id whose site_id falls into partition (of
+    partition_count). Every row for a given site will always belong to the same partition.
+
+    The rows are locked until the current transaction completes. Rows locked by another worker (eg a stale worker whose
+    job was reclaimed mid chunk) are skipped so the same staged row can never be applied twice"""
+    stmt = (
+        select(IngestJobRow)
+        .where((IngestJobRow.ingest_job_id == ingest_job_id) & ((IngestJobRow.site_id % partition_count) == partition))
+        .order_by(IngestJobRow.row_number)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (await session.execute(stmt)).scalars().all()
+
+
+async def count_ingest_job_rows(session: AsyncSession, ingest_job_id: int) -> int:
+    """Counts the (not yet applied) staged rows for ingest_job_id"""
+    stmt = select(func.count()).select_from(IngestJobRow).where(IngestJobRow.ingest_job_id == ingest_job_id)
+    return (await session.execute(stmt)).scalar_one()
+
+
+async def delete_ingest_job_rows(session: AsyncSession, ingest_job_id: int, row_numbers: Sequence[int] | None) -> None:
+    """Deletes the staged rows for ingest_job_id with the specified row_numbers (or ALL staged rows if None)"""
+    stmt = delete(IngestJobRow).where(IngestJobRow.ingest_job_id == ingest_job_id)
+    if row_numbers is not None:
+        stmt = stmt.where(IngestJobRow.row_number.in_(row_numbers))
+    await session.execute(stmt)
+
+
+async def record_ingest_job_chunk(
+    session: AsyncSession, ingest_job_id: int, claimed_time: datetime, row_count: int, now: datetime
+) -> bool:
+    """Records that a chunk of row_count rows has been applied to ingest_job_id (also acting as a lease heartbeat).
+    Nothing is recorded (and False is returned) if the job is no longer APPLYING under the lease claimed at
+    claimed_time (eg it was reclaimed by another worker) - the chunk should then be rolled back"""
+    resp = await session.execute(
+        update(IngestJob)
+        .where(
+            (IngestJob.ingest_job_id == ingest_job_id)
+            & (IngestJob.status == IngestJobStatus.APPLYING)
+            & (IngestJob.claimed_time == claimed_time)
+        )
+        .values(
+            applied_rows=IngestJob.applied_rows + row_count,
+            applied_chunks=IngestJob.applied_chunks + 1,
+            changed_time=now,
+        )
+    )
+    return resp.rowcount == 1  # ty:ignore[unresolved-attribute]
+
+
+async def update_ingest_job_status(
+    session: AsyncSession,
+    ingest_job_id: int,
+    claimed_time: datetime,
+    status: IngestJobStatus,
+    now: datetime,
+    error: str | None = None,
+) -> bool:
+    """Updates the status (and error) of ingest_job_id ONLY if it's still APPLYING under the lease claimed at
+    claimed_time. Returns False (without changing anything) if the lease has been lost"""
+    resp = await session.execute(
+        update(IngestJob)
+        .where(
+            (IngestJob.ingest_job_id == ingest_job_id)
+            & (IngestJob.status == IngestJobStatus.APPLYING)
+            & (IngestJob.claimed_time == claimed_time)
+        )
+        .values(status=status, changed_time=now, error=error)
+    )
+    return resp.rowcount == 1  # ty:ignore[unresolved-attribute]
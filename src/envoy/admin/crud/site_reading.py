@@ -6,7 +6,12 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from envoy.server.model.site_reading import SiteReading, SiteReadingType
+from envoy.server.model.site_reading import (
+    SiteReading,
+    SiteReadingRollup,
+    SiteReadingRollupResolution,
+    SiteReadingType,
+)
 
 
 async def count_site_readings_for_site_and_time(
@@ -80,3 +85,62 @@ async def select_site_readings_for_site_and_time(
 
     resp = await session.execute(stmt)
     return resp.scalars().all()
+
+
+async def count_site_reading_rollups_for_site_and_time(
+    session: AsyncSession,
+    site_type_ids: Sequence[int],
+    resolution: SiteReadingRollupResolution,
+    start_time: datetime,
+    end_time: datetime,
+) -> int:
+    """Count total site reading rollups (at resolution) for a sequence of site_type_ids whose bucket starts within a
+    time range."""
+
+    # Return 0 immediately if no site_type_ids provided
+    if not site_type_ids:
+        return 0
+
+    stmt = (
+        select(func.count())
+        .select_from(SiteReadingRollup)
+        .where(SiteReadingRollup.site_reading_type_id.in_(site_type_ids))
+        .where(SiteReadingRollup.resolution_seconds == resolution)
+        .where(SiteReadingRollup.bucket_start >= start_time)
+        .where(SiteReadingRollup.bucket_start < end_time)
+    )
+
+    resp = await session.execute(stmt)
+    return resp.scalar() or 0
+
+
+async def select_site_reading_rollups_for_site_and_time(
+    session: AsyncSession,
+    site_type_ids: Sequence[int],
+    resolution: SiteReadingRollupResolution,
+    start_time: datetime,
+    end_time: datetime,
+    start: int = 0,
+    limit: int = 500,
+) -> Sequence[SiteReadingRollup]:
+    """Admin function to retrieve pre-aggregated site reading rollups (at resolution) for a sequence of site_type_ids
+    whose bucket starts within a time range."""
+
+    # Return empty list immediately if no site_type_ids provided
+    if not site_type_ids:
+        return []
+
+    stmt = (
+        select(SiteReadingRollup)
+        .where(SiteReadingRollup.site_reading_type_id.in_(site_type_ids))
+        .where(SiteReadingRollup.resolution_seconds == resolution)
+        .where(SiteReadingRollup.bucket_start >= start_time)
+        .where(SiteReadingRollup.bucket_start < end_time)
+        .options(selectinload(SiteReadingRollup.site_reading_type))
+        .order_by(SiteReadingRollup.bucket_start.asc(), SiteReadingRollup.site_reading_type_id.asc())
+        .offset(start)
+        .limit(limit)
+    )
+
+    resp = await session.execute(stmt)
+    return resp.scalars().all()
@@ -0,0 +1,41 @@
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.model.doe import SiteControlGroup
+from envoy.server.model.site import Site
+from envoy.server.model.site_reading import SiteReadingType
+from envoy.server.model.tariff import Tariff
+
+
+async def select_aggregator_site_ids(session: AsyncSession, aggregator_id: int, site_ids: Iterable[int]) -> set[int]:
+    """Returns the subset of site_ids that exist AND belong to aggregator_id"""
+    stmt = select(Site.site_id).where((Site.aggregator_id == aggregator_id) & Site.site_id.in_(site_ids))
+    return set((await session.execute(stmt)).scalars().all())
+
+
+async def select_site_control_group_ids(session: AsyncSession, site_control_group_ids: Iterable[int]) -> set[int]:
+    """Returns the subset of site_control_group_ids that exist"""
+    stmt = select(SiteControlGroup.site_control_group_id).where(
+        SiteControlGroup.site_control_group_id.in_(site_control_group_ids)
+    )
+    return set((await session.execute(stmt)).scalars().all())
+
+
+async def select_tariff_ids(session: AsyncSession, tariff_ids: Iterable[int]) -> set[int]:
+    """Returns the subset of tariff_ids that exist"""
+    stmt = select(Tariff.tariff_id).where(Tariff.tariff_id.in_(tariff_ids))
+    return set((await session.execute(stmt)).scalars().all())
+
+
+async def select_aggregator_site_reading_type_group_ids(
+    session: AsyncSession, aggregator_id: int, group_ids: Iterable[int]
+) -> set[int]:
+    """Returns the subset of SiteReadingType group_ids (MirrorUsagePoint ids) that exist for aggregator_id"""
+    stmt = (
+        select(SiteReadingType.group_id)
+        .where((SiteReadingType.aggregator_id == aggregator_id) & SiteReadingType.group_id.in_(group_ids))
+        .distinct()
+    )
+    return set((await session.execute(stmt)).scalars().all())
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from envoy.admin import crud
+from envoy.admin.manager.ingest import IngestJobManager
+from envoy.server.manager.time import utc_now
+from envoy.server.model.ingest import IngestJob, IngestJobStatus
+
+logger = logging.getLogger(__name__)
+
+# An APPLYING job that hasn't applied a chunk for this long is assumed to belong to a dead worker and can be reclaimed
+INGEST_JOB_LEASE = timedelta(minutes=5)
+
+# The max length of an IngestJob.error
+MAX_ERROR_LENGTH = 1024
+
+
+class IngestJobLeaseLostError(Exception):
+    """Raised when a worker discovers that the job it's applying has been reclaimed by another worker"""
+
+
+class ChangedTimeAllocator:
+    """Hands out strictly increasing changed_time values. Every applied chunk needs a unique changed_time so that its
+    notification check only picks up the entities from that chunk (and each entity is notified exactly once)"""
+
+    _last: datetime | None
+
+    def __init__(self) -> None:
+        self._last = None
+
+    def next(self) -> datetime:
+        now = utc_now()
+        if self._last is not None and now <= self._last:
+            now = self._last + timedelta(microseconds=1)
+        self._last = now
+        return now
+
+
+async def apply_ingest_job_partition(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: IngestJob,
+    claimed_time: datetime,
+    chunk_size: int,
+    partition_count: int,
+    partition: int,
+    changed_times: ChangedTimeAllocator,
+    stop_event: asyncio.Event,
+) -> None:
+    """Applies every staged row for job that falls within partition - one chunk_size transaction at a time. Each
+    transaction applies the chunk, deletes the applied staged rows and records the progress (so a job can always be
+    resumed from where it left off). Stops early if stop_event is set.
+
+    Raises IngestJobLeaseLostError (rolling back the current chunk) if the lease claimed at claimed_time is lost"""
+    while not stop_event.is_set():
+        async with session_maker() as session:
+            rows = await crud.ingest.select_ingest_job_row_chunk(
+                session, job.ingest_job_id, partition_count, partition, chunk_size
+            )
+            if not rows:
+                return
+
+            changed_time = changed_times.next()
+            await IngestJobManager.apply_rows(session, job, rows, changed_time)
+            await crud.ingest.delete_ingest_job_rows(session, job.ingest_job_id, [r.row_number for r in rows])
+            if not await crud.ingest.record_ingest_job_chunk(
+                session, job.ingest_job_id, claimed_time, len(rows), changed_time
+            ):
+                raise IngestJobLeaseLostError(f"Ingest job {job.ingest_job_id} has been reclaimed by another worker")
+            await session.commit()
+
+
+async def apply_ingest_job(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: IngestJob,
+    chunk_size: int,
+    parallelism: int,
+    stop_event: asyncio.Event,
+) -> None:
+    """Applies the staged rows of a (claimed) job using parallelism concurrent transactions. Rows are partitioned by
+    site_id so that the rows for any one site are always applied in upload order (by a single partition).
+
+    On success the job is marked COMPLETE. If any chunk fails, the remaining partitions are stopped and the job is
+    marked FAILED (chunks that have already been applied will remain). If stop_event is set (shutdown) the job is
+    returned to PENDING so it can be resumed. The job is only ever updated while it's still under this worker's lease
+    - if the job has been reclaimed by another worker (eg this worker stalled), it's left to that worker"""
+    claimed_time = job.claimed_time
+    if claimed_time is None:
+        raise ValueError(f"Ingest job {job.ingest_job_id} hasn't been claimed")
+
+    job_stop_event = asyncio.Event()
+
+    async def watch_stop_event() -> None:
+        await stop_event.wait()
+        job_stop_event.set()
+
+    async def run_partition(partition: int) -> None:
+        try:
+            await apply_ingest_job_partition(
+                session_maker, job, claimed_time, chunk_size, parallelism, partition, changed_times, job_stop_event
+            )
+        except Exception:
+            job_stop_event.set()  # No point continuing with the other partitions
+            raise
+
+    changed_times = ChangedTimeAllocator()
+    watcher = asyncio.create_task(watch_stop_event())
+    try:
+        results = await asyncio.gather(*[run_partition(p) for p in range(parallelism)], return_exceptions=True)
+    finally:
+        watcher.cancel()
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if any(isinstance(e, IngestJobLeaseLostError) for e in errors):
+        logger.warning(f"Ingest job {job.ingest_job_id} was reclaimed by another worker - abandoning it")
+        return
+
+    async with session_maker() as session:
+        if errors:
+            logger.error(f"Ingest job {job.ingest_job_id} failed", exc_info=errors[0])
+            error = f"{type(errors[0]).__name__}: {errors[0]}"[:MAX_ERROR_LENGTH]
+            updated = await crud.ingest.update_ingest_job_status(
+                session, job.ingest_job_id, claimed_time, IngestJobStatus.FAILED, utc_now(), error
+            )
+            if updated:
+                await crud.ingest.delete_ingest_job_rows(session, job.ingest_job_id, None)
+        elif stop_event.is_set():
+            logger.info(f"Ingest job {job.ingest_job_id} interrupted by shutdown - it will be resumed")
+            updated = await crud.ingest.update_ingest_job_status(
+                session, job.ingest_job_id, claimed_time, IngestJobStatus.PENDING, utc_now()
+            )
+        elif await crud.ingest.count_ingest_job_rows(session, job.ingest_job_id):
+            # Some staged rows were skipped as they're locked by a stale worker (from before this job was reclaimed).
+            # Leave the job APPLYING - it will be reclaimed (and the rows applied) once the lease expires
+            logger.warning(f"Ingest job {job.ingest_job_id} has staged rows locked by another worker - will retry")
+            return
+        else:
+            logger.info(f"Ingest job {job.ingest_job_id} complete")
+            updated = await crud.ingest.update_ingest_job_status(
+                session, job.ingest_job_id, claimed_time, IngestJobStatus.COMPLETE, utc_now()
+            )
+
+        if not updated:
+            logger.warning(f"Ingest job {job.ingest_job_id} was reclaimed by another worker - leaving its status")
+        await session.commit()
+
+
+async def run_ingest_job_worker(
+    session_maker: async_sessionmaker[AsyncSession],
+    chunk_size: int,
+    parallelism: int,
+    poll_seconds: float,
+    stop_event: asyncio.Event,
+) -> None:
+    """Claims and applies submitted IngestJobs (one at a time) until stop_event is set. Polls every poll_seconds
+    while there is no work"""
+    logger.info(f"Ingest job worker started (chunk_size {chunk_size}, parallelism {parallelism})")
+    while not stop_event.is_set():
+        job: IngestJob | None = None
+        try:
+            async with session_maker() as session:
+                job = await crud.ingest.claim_next_ingest_job(session, utc_now(), INGEST_JOB_LEASE)
+                await session.commit()
+
+            if job is not None:
+                logger.info(f"Applying ingest job {job.ingest_job_id} ({job.staged_rows - job.applied_rows} rows)")
+                await apply_ingest_job(session_maker, job, chunk_size, parallelism, stop_event)
+                continue
+        except Exception as exc:
+            logger.error("Unexpected exception in the ingest job worker", exc_info=exc)
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=poll_seconds)
+        except TimeoutError:
+            pass
+    logger.info("Ingest job worker stopped")
+
+
+def enable_ingest_job_worker(
+    db_kwargs: dict[str, Any], chunk_size: int, parallelism: int, poll_seconds: float
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+    """Returns a FastAPI lifespan context manager that applies submitted IngestJobs in the background (see
+    run_ingest_job_worker).
+
+    db_kwargs - The db_middleware_kwargs (db_url + optional engine_args) used to build the worker's session maker."""
+    engine = create_async_engine(db_kwargs["db_url"], **db_kwargs.get("engine_args", {}))
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(
+            run_ingest_job_worker(session_maker, chunk_size, parallelism, poll_seconds, stop_event)
+        )
+        try:
+            yield
+        finally:
+            stop_event.set()
+            await task
+            await engine.dispose()
+
+    return context_manager
@@ -6,10 +6,20 @@ from fastapi_async_sqlalchemy import SQLAlchemyMiddleware
 
 from envoy.admin.api import routers, unsecured_routers
 from envoy.admin.api.depends import AdminAuthDepends
+from envoy.admin.api.ingest import router as ingest_router
+from envoy.admin.ingest_worker import enable_ingest_job_worker
 from envoy.admin.settings import AppSettings, settings
 from envoy.notification.handler import enable_notification_client
 from envoy.server.database import enable_dynamic_azure_ad_database_credentials
 from envoy.server.lifespan import generate_combined_lifespan_manager
+from envoy.server.maintenance import (
+    enable_archive_purge,
+    enable_partition_maintenance,
+    enable_site_reading_rollup_backfill,
+    parse_archive_retention_policies,
+    partition_retention_months,
+)
+from envoy.server.read_replica import ReadReplica, ReadReplicaRoutingMiddleware
 
 # Setup logs
 logging.basicConfig(style="{", level=logging.INFO)
@@ -31,6 +41,55 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
     if new_settings.enable_notifications:
         lifespan_managers.append(enable_notification_client())
 
+    # Keeps the partitioned tables stocked with upcoming monthly partitions (and optionally drops expired ones)
+    if new_settings.enable_partition_maintenance:
+        lifespan_managers.append(
+            enable_partition_maintenance(
+                new_settings.db_middleware_kwargs,
+                interval_seconds=new_settings.partition_maintenance_interval_seconds,
+                months_ahead=new_settings.partition_months_ahead,
+                retention_months=partition_retention_months(
+                    new_settings.site_reading_retention_months,
+                    new_settings.response_retention_months,
+                    new_settings.site_log_event_retention_months,
+                ),
+            )
+        )
+
+    # Populates the site reading rollups for any readings that were stored before the rollups existed
+    if new_settings.enable_site_reading_rollup_backfill:
+        lifespan_managers.append(
+            enable_site_reading_rollup_backfill(
+                new_settings.db_middleware_kwargs, batch_size=new_settings.site_reading_rollup_backfill_batch_size
+            )
+        )
+
+    # Removes archive snapshots that are no longer required (according to per table retention policies)
+    if new_settings.enable_archive_purge:
+        lifespan_managers.append(
+            enable_archive_purge(
+                new_settings.db_middleware_kwargs,
+                policies=parse_archive_retention_policies(
+                    new_settings.archive_retention_days, new_settings.archive_deleted_retention_days
+                ),
+                interval_seconds=new_settings.archive_purge_interval_seconds,
+                batch_size=new_settings.archive_purge_batch_size,
+                lock_timeout_ms=new_settings.archive_purge_lock_timeout_ms,
+                batch_pause_seconds=new_settings.archive_purge_batch_pause_seconds,
+            )
+        )
+
+    # Applies submitted (asynchronous) bulk ingest jobs in bounded chunks
+    if new_settings.enable_ingest_jobs:
+        lifespan_managers.append(
+            enable_ingest_job_worker(
+                new_settings.db_middleware_kwargs,
+                chunk_size=new_settings.ingest_job_chunk_size,
+                parallelism=new_settings.ingest_job_parallelism,
+                poll_seconds=new_settings.ingest_job_poll_seconds,
+            )
+        )
+
     if tenant_id and client_id and resource_id and update_frequency_seconds:
         logger.info(
             f"Enabling AzureAD Dynamic DB Credentials: rsc_id: '{resource_id}' freq_sec: {update_frequency_seconds}"
@@ -50,10 +109,29 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
         new_settings.read_only_user,
         new_settings.read_only_keys,
     )
+    # Optionally route GET/HEAD request reads to a read replica (writes always go to the primary)
+    db_middleware_kwargs = new_settings.db_middleware_kwargs
+    read_replica: ReadReplica | None = None
+    if new_settings.read_database_url:
+        logger.info(f"Enabling read replica routing (max staleness {new_settings.read_database_max_staleness_secs}s)")
+        read_replica = ReadReplica(
+            str(new_settings.read_database_url),
+            engine_args=db_middleware_kwargs.get("engine_args", None),
+            max_staleness_seconds=new_settings.read_database_max_staleness_secs,
+        )
+        db_middleware_kwargs = read_replica.routing_middleware_kwargs(db_middleware_kwargs)
+        lifespan_managers.append(read_replica.enable_lag_monitor(new_settings.read_database_lag_check_secs))
+
     new_app = FastAPI(**new_settings.fastapi_kwargs, lifespan=generate_combined_lifespan_manager(lifespan_managers))
-    new_app.add_middleware(SQLAlchemyMiddleware, **new_settings.db_middleware_kwargs)
+    new_app.add_middleware(SQLAlchemyMiddleware, **db_middleware_kwargs)
+    if read_replica:
+        new_app.add_middleware(
+            ReadReplicaRoutingMiddleware, status=read_replica.status, client_key_header="authorization"
+        )
     for router in routers:
         new_app.include_router(router, dependencies=[Depends(admin_auth)])
+    if new_settings.enable_ingest_jobs:
+        new_app.include_router(ingest_router, dependencies=[Depends(admin_auth)])
     for router in unsecured_routers:
         new_app.include_router(router)
 
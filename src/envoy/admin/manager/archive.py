@@ -1,4 +1,6 @@
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
+from typing import Any
 
 from envoy_schema.admin.schema.archive import (
     ArchiveDynamicOperatingEnvelopeResponse,
@@ -6,23 +8,43 @@ from envoy_schema.admin.schema.archive import (
     ArchiveSiteResponse,
     ArchiveTariffGeneratedRateResponse,
 )
+from fastapi_async_sqlalchemy import db
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from envoy.admin.crud.archive import (
+    ARCHIVE_EXPORT_MODELS,
+    ArchiveExportEntity,
     count_archive_does_for_period,
     count_archive_rates_for_period,
     count_archive_sites_for_period,
     select_archive_does_for_period,
+    select_archive_for_period,
     select_archive_rates_for_period,
     select_archive_sites_for_period,
 )
-from envoy.admin.mapper.archive import ArchiveListMapper
+from envoy.admin.mapper.archive import ArchiveListMapper, ArchiveMapper
+
+# How many archive records are fetched (in a single short transaction) per batch of a streamed export
+ARCHIVE_EXPORT_BATCH_SIZE = 1000
+
+ARCHIVE_EXPORT_MAPPERS: dict[ArchiveExportEntity, Callable[[Any], BaseModel]] = {
+    ArchiveExportEntity.SITE: ArchiveMapper.map_to_site_response,
+    ArchiveExportEntity.DYNAMIC_OPERATING_ENVELOPE: ArchiveMapper.map_to_doe_response,
+    ArchiveExportEntity.TARIFF_GENERATED_RATE: ArchiveMapper.map_to_rate_response,
+}
 
 
 class ArchiveListManager:
     @staticmethod
     async def get_archive_sites_for_period(
-        session: AsyncSession, start: int, limit: int, period_start: datetime, period_end: datetime, only_deletes: bool
+        session: AsyncSession,
+        start: int,
+        limit: int,
+        period_start: datetime,
+        period_end: datetime,
+        only_deletes: bool,
+        after_archive_id: int | None = None,
     ) -> ArchivePageResponse[ArchiveSiteResponse]:
         """Admin specific (paginated) fetch of archived site records that covers all aggregators."""
         archive_count = await count_archive_sites_for_period(
@@ -35,6 +57,7 @@ class ArchiveListManager:
             only_deletes=only_deletes,
             start=start,
             limit=limit,
+            after_archive_id=after_archive_id,
         )
         return ArchiveListMapper.map_to_sites_response(
             total_count=archive_count,
@@ -47,7 +70,13 @@ class ArchiveListManager:
 
     @staticmethod
     async def get_archive_does_for_period(
-        session: AsyncSession, start: int, limit: int, period_start: datetime, period_end: datetime, only_deletes: bool
+        session: AsyncSession,
+        start: int,
+        limit: int,
+        period_start: datetime,
+        period_end: datetime,
+        only_deletes: bool,
+        after_archive_id: int | None = None,
     ) -> ArchivePageResponse[ArchiveDynamicOperatingEnvelopeResponse]:
         """Admin specific (paginated) fetch of archived doe records that covers all aggregators."""
         archive_count = await count_archive_does_for_period(
@@ -60,6 +89,7 @@ class ArchiveListManager:
             only_deletes=only_deletes,
             start=start,
             limit=limit,
+            after_archive_id=after_archive_id,
         )
         return ArchiveListMapper.map_to_does_response(
             total_count=archive_count,
@@ -72,7 +102,13 @@ class ArchiveListManager:
 
     @staticmethod
     async def get_archive_rates_for_period(
-        session: AsyncSession, start: int, limit: int, period_start: datetime, period_end: datetime, only_deletes: bool
+        session: AsyncSession,
+        start: int,
+        limit: int,
+        period_start: datetime,
+        period_end: datetime,
+        only_deletes: bool,
+        after_archive_id: int | None = None,
     ) -> ArchivePageResponse[ArchiveTariffGeneratedRateResponse]:
         """Admin specific (paginated) fetch of archived rate records that covers all aggregators."""
         archive_count = await count_archive_rates_for_period(
@@ -85,6 +121,7 @@ class ArchiveListManager:
             only_deletes=only_deletes,
             start=start,
             limit=limit,
+            after_archive_id=after_archive_id,
         )
         return ArchiveListMapper.map_to_rates_response(
             total_count=archive_count,
@@ -94,3 +131,39 @@ class ArchiveListManager:
             period_end=period_end,
             rates=archive_records,
         )
+
+
+class ArchiveExportManager:
+    @staticmethod
+    async def stream_archive_ndjson(
+        entity: ArchiveExportEntity,
+        period_start: datetime,
+        period_end: datetime,
+        only_deletes: bool,
+    ) -> AsyncIterator[bytes]:
+        """Streams every archived entity within the period as NDJSON (one archive response model per line), ordered
+        by archive_id. The archive is walked in ARCHIVE_EXPORT_BATCH_SIZE pages via keyset pagination on archive_id -
+        each page is its own (short) transaction so an export spanning months of history never holds a long running
+        snapshot.
+
+        The request scoped session will have closed before a streaming response body is iterated so this will open (and
+        close) its own session for the duration of the export."""
+        archive_type = ARCHIVE_EXPORT_MODELS[entity]
+        map_to_response = ARCHIVE_EXPORT_MAPPERS[entity]
+        batch_size = ARCHIVE_EXPORT_BATCH_SIZE
+        after_archive_id: int | None = None
+        async with db():
+            while True:
+                records = await select_archive_for_period(
+                    db.session, archive_type, 0, batch_size, period_start, period_end, only_deletes, after_archive_id
+                )
+                if not records:
+                    return
+
+                chunk = b"".join(map_to_response(r).model_dump_json().encode() + b"\n" for r in records)
+                after_archive_id = records[-1].archive_id
+                await db.session.rollback()  # Releases the snapshot - nothing has been written
+                yield chunk
+
+                if len(records) < batch_size:
+                    return
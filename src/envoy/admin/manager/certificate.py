@@ -1,4 +1,4 @@
-import itertools
+from collections.abc import AsyncIterable, Sequence
 
 from envoy_schema.admin.schema.certificate import (
     CertificateAssignmentRequest,
@@ -6,11 +6,18 @@ from envoy_schema.admin.schema.certificate import (
     CertificateRequest,
     CertificateResponse,
 )
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from envoy.admin import crud, mapper
+from envoy.admin.manager.ingest import split_ndjson_lines
+from envoy.admin.schema.certificate import CertificateProvisionResponse
 from envoy.server import exception
 from envoy.server.crud.aggregator import select_aggregator
+from envoy.server.model.base import Certificate
+
+# Max number of streamed CertificateAssignmentRequests held in memory before they are provisioned
+PROVISION_BATCH_SIZE = 5000
 
 
 class CertificateManager:
@@ -28,6 +35,42 @@ class CertificateManager:
             total_count=cert_count, start=start, limit=limit, certificates=cert_list
         )
 
+    @staticmethod
+    async def _provision_certificates(
+        session: AsyncSession, aggregator_id: int, certs: Sequence[CertificateAssignmentRequest]
+    ) -> tuple[int, int]:
+        """Creates (if they don't exist) and assigns a batch of certs to aggregator_id using a fixed number of set
+        based statements (regardless of the batch size). Returns (created_count, assigned_count).
+
+        Raises InvalidIdError if a certificate id doesn't exist or an lfdi doesn't exist and has no expiry.
+        Changes will NOT be committed by this function"""
+        certificate_ids = sorted({c.certificate_id for c in certs if c.certificate_id is not None})
+        expiry_by_lfdi = {c.lfdi: c.expiry for c in certs if c.lfdi is not None and c.expiry is not None}
+        lfdis = sorted({c.lfdi for c in certs if c.lfdi is not None})
+
+        # If an id doesn't exist then raise
+        missing_ids = await crud.certificate.select_missing_certificate_ids(session, certificate_ids)
+        if missing_ids:
+            raise exception.InvalidIdError(f"Certificate with id {missing_ids[0]} does not exist")
+
+        # Create new ignore existing lfdis (the expiry of an existing lfdi is ignored)
+        new_certs = await crud.certificate.create_many_certificates_on_conflict_do_nothing(
+            session, (Certificate(lfdi=lfdi, expiry=expiry) for lfdi, expiry in expiry_by_lfdi.items())
+        )
+
+        # Any lfdi without an expiry must refer to an existing certificate
+        missing_lfdis = await crud.certificate.select_missing_certificate_lfdis(
+            session, [lfdi for lfdi in lfdis if lfdi not in expiry_by_lfdi]
+        )
+        if missing_lfdis:
+            raise exception.InvalidIdError(f"Certificate with lfdi {missing_lfdis[0]} does not exist (and no expiry)")
+
+        # Assign all to aggregator
+        assigned_ids = await crud.aggregator.assign_certificates_by_id_or_lfdi(
+            session, aggregator_id, certificate_ids, lfdis
+        )
+        return (len(new_certs), len(assigned_ids))
+
     @staticmethod
     async def add_many_certificates_for_aggregator(
         session: AsyncSession, aggregator_id: int, certs: list[CertificateAssignmentRequest]
@@ -35,7 +78,8 @@ class CertificateManager:
         """Create certificates if they don't exist ignore if they do and assign to aggregrator
 
         Will create the certificate first if needed. If an expiry is provided on a certificate that exists already,
-        then it is ignored and the original expiry is maintained.
+        then it is ignored and the original expiry is maintained. Certificates already assigned to the aggregator
+        are ignored.
 
         Args:
             session: Database session
@@ -50,42 +94,62 @@ class CertificateManager:
         if not await select_aggregator(session, aggregator_id):
             raise exception.NotFoundError(f"Aggregator with id {aggregator_id} not found")
 
-        # Perform mapping
-        mapped_certs = mapper.CertificateMapper.map_from_many_request(certs)
-        mapped_cert_ids = [mc.certificate_id for mc in mapped_certs if mc.certificate_id is not None]
-
-        # Filter existing
-        existing = await crud.certificate.select_many_certificates_by_id_or_lfdi(session, mapped_certs)
-        existing_ids: list[int] = []
-        existing_lfdis: list[str] = []
-        for e in existing:
-            existing_ids.append(e.certificate_id)
-            existing_lfdis.append(e.lfdi)
-
-        # If an id doesn't exist then raise
-        for mc_id in mapped_cert_ids:
-            if mc_id not in existing_ids:
-                raise exception.InvalidIdError(f"Certificate with id {mc_id} does not exist")
+        await CertificateManager._provision_certificates(session, aggregator_id, certs)
+        await session.commit()
 
-        # Filter to be created
-        certs_to_create = [c for c in mapped_certs if c.certificate_id is None and c.lfdi not in existing_lfdis]
+    @staticmethod
+    async def provision_certificates_for_aggregator(
+        session: AsyncSession, aggregator_id: int, chunks: AsyncIterable[bytes]
+    ) -> CertificateProvisionResponse:
+        """Streamed equivalent of add_many_certificates_for_aggregator for (very) large numbers of certificates. Every
+        NDJSON line in chunks is a CertificateAssignmentRequest. Only PROVISION_BATCH_SIZE lines are held in memory at
+        any time - each batch is applied with the same set based statements as add_many_certificates_for_aggregator.
 
-        # Create new ignore existing lfdis
-        new_certs = await crud.certificate.create_many_certificates_on_conflict_do_nothing(session, certs_to_create)
+        The request is all or nothing - every batch is committed in a single transaction at the end.
 
-        # Assign all to aggregator
-        new_cert_ids = (c.certificate_id for c in new_certs)
-        all_ids = itertools.chain(new_cert_ids, existing_ids)
+        Raises:
+            NotFoundError: if aggregator id is invalid
+            BadRequestError: if a line isn't a valid CertificateAssignmentRequest
+            InvalidIdError: if a certificate id supplied doesn't already exist
+        """
+        # Assess aggregator exists
+        if not await select_aggregator(session, aggregator_id):
+            raise exception.NotFoundError(f"Aggregator with id {aggregator_id} not found")
 
-        # Ensure something to assign otherwise return
-        peeker, producer = itertools.tee(all_ids)
-        try:
-            next(peeker)
-        except StopIteration:
-            return
+        received_count = 0
+        created_count = 0
+        assigned_count = 0
+        batch: list[CertificateAssignmentRequest] = []
+        line_number = 0
+        async for line in split_ndjson_lines(chunks):
+            line_number += 1
+            if not line.strip():
+                continue
+
+            try:
+                batch.append(CertificateAssignmentRequest.model_validate_json(line))
+            except ValidationError as exc:
+                raise exception.BadRequestError(
+                    f"Line {line_number} isn't a valid CertificateAssignmentRequest: {exc}"
+                ) from exc
+
+            if len(batch) >= PROVISION_BATCH_SIZE:
+                created, assigned = await CertificateManager._provision_certificates(session, aggregator_id, batch)
+                received_count += len(batch)
+                created_count += created
+                assigned_count += assigned
+                batch = []
+
+        if batch:
+            created, assigned = await CertificateManager._provision_certificates(session, aggregator_id, batch)
+            received_count += len(batch)
+            created_count += created
+            assigned_count += assigned
 
-        await crud.aggregator.assign_many_certificates(session, aggregator_id, producer)
         await session.commit()
+        return CertificateProvisionResponse(
+            received_count=received_count, created_count=created_count, assigned_count=assigned_count
+        )
 
     @staticmethod
     async def unassign_certificate_for_aggregator(
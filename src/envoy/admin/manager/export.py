@@ -0,0 +1,18 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi_async_sqlalchemy import db
+
+from envoy.admin.crud.export import ExportEntity, stream_export_csv
+
+
+class ExportManager:
+    @staticmethod
+    async def stream_entity_csv(entity: ExportEntity, changed_after: datetime | None) -> AsyncIterator[bytes]:
+        """Streams a CSV export of every entity (across all aggregators) that has changed since changed_after.
+
+        The request scoped session will have closed before a streaming response body is iterated so this will open (and
+        close) its own session for the duration of the export."""
+        async with db():
+            async for chunk in stream_export_csv(db.session, entity, changed_after):
+                yield chunk
@@ -0,0 +1,169 @@
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from datetime import datetime
+
+from envoy_schema.admin.schema.doe import DynamicOperatingEnvelopeRequest
+from envoy_schema.admin.schema.pricing import TariffGeneratedRateRequest
+from envoy_schema.admin.schema.site_control import SiteControlRequest
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.admin import crud
+from envoy.admin.crud.doe import supersede_then_insert_does
+from envoy.admin.crud.pricing import upsert_many_tariff_genrate
+from envoy.admin.mapper.doe import DoeListMapper
+from envoy.admin.mapper.ingest import IngestJobMapper
+from envoy.admin.mapper.pricing import TariffGeneratedRateListMapper
+from envoy.admin.mapper.site_control import SiteControlListMapper
+from envoy.admin.schema.ingest import IngestJobRequest, IngestJobResponse
+from envoy.notification.manager.notification import NotificationManager
+from envoy.server.crud.doe import select_site_control_group_by_id
+from envoy.server.exception import BadRequestError, ConflictError, NotFoundError
+from envoy.server.manager.time import utc_now
+from envoy.server.model.ingest import IngestJob, IngestJobRow, IngestJobStatus, IngestJobType
+from envoy.server.model.subscription import SubscriptionResource
+
+logger = logging.getLogger(__name__)
+
+# The request model that every uploaded (NDJSON) line must validate against (per job type)
+IngestRequest = TariffGeneratedRateRequest | DynamicOperatingEnvelopeRequest | SiteControlRequest
+INGEST_REQUEST_MODELS: dict[IngestJobType, type[IngestRequest]] = {
+    IngestJobType.TARIFF_GENERATED_RATE: TariffGeneratedRateRequest,
+    IngestJobType.DYNAMIC_OPERATING_ENVELOPE: DynamicOperatingEnvelopeRequest,
+    IngestJobType.SITE_CONTROL: SiteControlRequest,
+}
+
+# Max number of uploaded rows held in memory before they are written to the staging table
+STAGE_BATCH_SIZE = 5000
+
+
+async def split_ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Reassembles an (arbitrarily chunked) stream of bytes into individual lines (without the trailing newline)"""
+    remainder = b""
+    async for chunk in chunks:
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line
+    if remainder:
+        yield remainder
+
+
+class IngestJobManager:
+    @staticmethod
+    async def create_job(session: AsyncSession, request: IngestJobRequest) -> IngestJobResponse:
+        """Creates a new (empty) IngestJob that is ready to receive rows. Raises BadRequestError if the
+        site_control_group_id doesn't agree with the job_type"""
+        if request.job_type == IngestJobType.SITE_CONTROL:
+            if request.site_control_group_id is None:
+                raise BadRequestError("site_control_group_id must be set for SITE_CONTROL jobs")
+            if await select_site_control_group_by_id(session, request.site_control_group_id) is None:
+                raise BadRequestError(f"site_control_group_id {request.site_control_group_id} doesn't exist")
+        elif request.site_control_group_id is not None:
+            raise BadRequestError(f"site_control_group_id can't be set for {request.job_type.name} jobs")
+
+        job = IngestJobMapper.map_from_request(utc_now(), request)
+        session.add(job)
+        await session.flush()
+        await session.refresh(job)
+        response = IngestJobMapper.map_to_response(job)
+        await session.commit()
+        return response
+
+    @staticmethod
+    async def fetch_job(session: AsyncSession, ingest_job_id: int) -> IngestJobResponse:
+        """Fetches the current status/progress of an IngestJob. Raises NotFoundError if it doesn't exist"""
+        job = await crud.ingest.select_ingest_job(session, ingest_job_id)
+        if job is None:
+            raise NotFoundError(f"ingest_job_id {ingest_job_id} doesn't exist")
+        return IngestJobMapper.map_to_response(job)
+
+    @staticmethod
+    async def stage_rows(session: AsyncSession, ingest_job_id: int, chunks: AsyncIterable[bytes]) -> IngestJobResponse:
+        """Validates and stages every NDJSON line (one request object per line) in chunks against a RECEIVING
+        IngestJob. The body is streamed - only STAGE_BATCH_SIZE rows are held in memory at any time. This can be
+        called multiple times (multi part uploads) - rows are numbered in the order they are received.
+
+        The part is all or nothing - raises BadRequestError (identifying the line) if any line is invalid, NotFoundError
+        if the job doesn't exist and ConflictError if the job isn't RECEIVING"""
+        job = await crud.ingest.select_ingest_job(session, ingest_job_id, for_update=True)
+        if job is None:
+            raise NotFoundError(f"ingest_job_id {ingest_job_id} doesn't exist")
+        if job.status != IngestJobStatus.RECEIVING:
+            status = IngestJobStatus(job.status).name
+            raise ConflictError(f"ingest_job_id {ingest_job_id} is {status} and can't accept more rows")
+
+        model = INGEST_REQUEST_MODELS[job.job_type]
+        next_row_number = job.staged_rows + 1
+        batch: list[tuple[int, str]] = []
+        line_number = 0
+        async for line in split_ndjson_lines(chunks):
+            line_number += 1
+            if not line.strip():
+                continue
+
+            try:
+                item = model.model_validate_json(line)
+            except ValidationError as exc:
+                raise BadRequestError(f"Line {line_number} isn't a valid {model.__name__}: {exc}") from exc
+            batch.append((item.site_id, item.model_dump_json()))
+
+            if len(batch) >= STAGE_BATCH_SIZE:
+                await crud.ingest.insert_ingest_job_rows(session, ingest_job_id, next_row_number, batch)
+                next_row_number += len(batch)
+                batch = []
+
+        await crud.ingest.insert_ingest_job_rows(session, ingest_job_id, next_row_number, batch)
+        next_row_number += len(batch)
+
+        job.staged_rows = next_row_number - 1
+        job.changed_time = utc_now()
+        response = IngestJobMapper.map_to_response(job)
+        await session.commit()
+        return response
+
+    @staticmethod
+    async def submit_job(session: AsyncSession, ingest_job_id: int) -> IngestJobResponse:
+        """Marks the upload of a RECEIVING IngestJob as complete - the ingest worker will then start applying it.
+        Raises NotFoundError if the job doesn't exist and ConflictError if the job isn't RECEIVING"""
+        job = await crud.ingest.select_ingest_job(session, ingest_job_id, for_update=True)
+        if job is None:
+            raise NotFoundError(f"ingest_job_id {ingest_job_id} doesn't exist")
+        if job.status != IngestJobStatus.RECEIVING:
+            status = IngestJobStatus(job.status).name
+            raise ConflictError(f"ingest_job_id {ingest_job_id} is {status} and has already been submitted")
+
+        job.status = IngestJobStatus.PENDING
+        job.changed_time = utc_now()
+        response = IngestJobMapper.map_to_response(job)
+        await session.commit()
+        return response
+
+    @staticmethod
+    async def apply_rows(
+        session: AsyncSession, job: IngestJob, rows: Sequence[IngestJobRow], changed_time: datetime
+    ) -> None:
+        """Applies a chunk of staged rows for job using the same supersede/archive semantics as the equivalent
+        (single request) bulk endpoint and enqueues a single notification check for the chunk.
+
+        Changes will NOT be committed by this function"""
+        if job.job_type == IngestJobType.TARIFF_GENERATED_RATE:
+            rate_requests = [TariffGeneratedRateRequest.model_validate_json(r.payload) for r in rows]
+            rates = TariffGeneratedRateListMapper.map_from_request(changed_time, rate_requests)
+            await upsert_many_tariff_genrate(session, rates, changed_time)
+            resource = SubscriptionResource.TARIFF_GENERATED_RATE
+        elif job.job_type == IngestJobType.DYNAMIC_OPERATING_ENVELOPE:
+            doe_requests = [DynamicOperatingEnvelopeRequest.model_validate_json(r.payload) for r in rows]
+            await supersede_then_insert_does(
+                session, DoeListMapper.map_from_request(changed_time, doe_requests), changed_time
+            )
+            resource = SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE
+        elif job.job_type == IngestJobType.SITE_CONTROL and job.site_control_group_id is not None:
+            control_requests = [SiteControlRequest.model_validate_json(r.payload) for r in rows]
+            controls = SiteControlListMapper.map_from_request(job.site_control_group_id, changed_time, control_requests)
+            await supersede_then_insert_does(session, controls, changed_time)
+            resource = SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE
+        else:
+            raise BadRequestError(f"ingest_job_id {job.ingest_job_id} has an unsupported configuration")
+
+        await NotificationManager.notify_changed_deleted_entities(session, resource, changed_time)
@@ -7,12 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from envoy.admin.crud.site import select_single_site_no_scoping
 from envoy.admin.crud.site_reading import (
+    count_site_reading_rollups_for_site_and_time,
     count_site_readings_for_site_and_time,
     select_csip_aus_site_type_ids,
+    select_site_reading_rollups_for_site_and_time,
     select_site_readings_for_site_and_time,
 )
 from envoy.admin.mapper.site_reading import AdminSiteReadingMapper
 from envoy.server.model.site import Site
+from envoy.server.model.site_reading import SiteReadingRollupResolution
 
 
 class AdminSiteReadingManager:
@@ -27,8 +30,12 @@ class AdminSiteReadingManager:
         end_time: datetime,
         start: int = 0,
         limit: int = 500,
+        resolution: SiteReadingRollupResolution | None = None,
     ) -> CSIPAusSiteReadingPageResponse:
-        """Get site readings for specified site within a time range."""
+        """Get site readings for specified site within a time range.
+
+        If resolution is specified - readings will be served from the pre-aggregated rollups (one reading per bucket
+        whose value is the average of the underlying readings) instead of the raw readings."""
 
         # Convert CSIP unit to UOM for database query
         uom: UomType = AdminSiteReadingMapper.csip_unit_to_uom(csip_unit)
@@ -59,23 +66,42 @@ class AdminSiteReadingManager:
             return empty_return
 
         # Queries 3: Get total count and readings in parallel
-        total_count_task = count_site_readings_for_site_and_time(
-            session=session,
-            site_type_ids=site_type_ids,
-            start_time=start_time,
-            end_time=end_time,
-        )
-
-        site_readings_task = select_site_readings_for_site_and_time(
-            session=session,
-            site_type_ids=site_type_ids,
-            start_time=start_time,
-            end_time=end_time,
-            start=start,
-            limit=limit,
-        )
-
-        total_count, site_readings = await asyncio.gather(total_count_task, site_readings_task)
+        if resolution is None:
+            total_count, site_readings = await asyncio.gather(
+                count_site_readings_for_site_and_time(
+                    session=session,
+                    site_type_ids=site_type_ids,
+                    start_time=start_time,
+                    end_time=end_time,
+                ),
+                select_site_readings_for_site_and_time(
+                    session=session,
+                    site_type_ids=site_type_ids,
+                    start_time=start_time,
+                    end_time=end_time,
+                    start=start,
+                    limit=limit,
+                ),
+            )
+        else:
+            total_count, site_readings = await asyncio.gather(
+                count_site_reading_rollups_for_site_and_time(
+                    session=session,
+                    site_type_ids=site_type_ids,
+                    resolution=resolution,
+                    start_time=start_time,
+                    end_time=end_time,
+                ),
+                select_site_reading_rollups_for_site_and_time(
+                    session=session,
+                    site_type_ids=site_type_ids,
+                    resolution=resolution,
+                    start_time=start_time,
+                    end_time=end_time,
+                    start=start,
+                    limit=limit,
+                ),
+            )
 
         return AdminSiteReadingMapper.map_to_csip_aus_reading_page_response(
             site_readings=site_readings,
@@ -0,0 +1,104 @@
+import logging
+from collections.abc import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.admin import crud
+from envoy.admin.mapper.subscription import SubscriptionMapper
+from envoy.admin.schema.subscription import SubscriptionBulkResponse, SubscriptionRequest
+from envoy.server.crud.aggregator import select_aggregator
+from envoy.server.crud.subscription import upsert_subscriptions
+from envoy.server.exception import BadRequestError, NotFoundError
+from envoy.server.manager.der_constants import PUBLIC_SITE_DER_ID
+from envoy.server.manager.time import utc_now
+from envoy.server.model.subscription import Subscription, SubscriptionResource
+
+logger = logging.getLogger(__name__)
+
+SITE_DER_RESOURCES = {
+    SubscriptionResource.SITE_DER_AVAILABILITY,
+    SubscriptionResource.SITE_DER_RATING,
+    SubscriptionResource.SITE_DER_SETTING,
+    SubscriptionResource.SITE_DER_STATUS,
+}
+
+SITE_CONTROL_GROUP_RESOURCES = {
+    SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
+    SubscriptionResource.DEFAULT_SITE_CONTROL,
+}
+
+
+class SubscriptionManager:
+    @staticmethod
+    async def validate_subscriptions(session: AsyncSession, aggregator_id: int, subs: Sequence[Subscription]) -> None:
+        """Bulk equivalent of the sep2 SubscriptionManager validation - ensures every scoped site belongs to
+        aggregator_id and every linked resource exists (one query per referenced entity type). Raises BadRequestError
+        on the first invalid subscription"""
+
+        def requested_ids(resource_types: set[SubscriptionResource]) -> set[int]:
+            return set(s.resource_id for s in subs if s.resource_id is not None and s.resource_type in resource_types)
+
+        site_ids = set(s.scoped_site_id for s in subs if s.scoped_site_id is not None)
+        scg_ids = requested_ids(SITE_CONTROL_GROUP_RESOURCES)
+        tariff_ids = requested_ids({SubscriptionResource.TARIFF_GENERATED_RATE})
+        mup_ids = requested_ids({SubscriptionResource.READING})
+
+        valid_site_ids = (
+            await crud.subscription.select_aggregator_site_ids(session, aggregator_id, site_ids) if site_ids else set()
+        )
+        valid_scg_ids = await crud.subscription.select_site_control_group_ids(session, scg_ids) if scg_ids else set()
+        valid_tariff_ids = await crud.subscription.select_tariff_ids(session, tariff_ids) if tariff_ids else set()
+        valid_mup_ids = (
+            await crud.subscription.select_aggregator_site_reading_type_group_ids(session, aggregator_id, mup_ids)
+            if mup_ids
+            else set()
+        )
+
+        for sub in subs:
+            if sub.scoped_site_id is not None and sub.scoped_site_id not in valid_site_ids:
+                raise BadRequestError(
+                    f"subscribed_resource references EndDevice id {sub.scoped_site_id} which doesn't exist"
+                )
+
+            if sub.resource_id is None or sub.resource_type == SubscriptionResource.SITE_CONTROL_GROUP:
+                continue  # FSA is not scoped to particular aggregator, so just pass
+            elif sub.resource_type in SITE_CONTROL_GROUP_RESOURCES:
+                valid = sub.resource_id in valid_scg_ids
+            elif sub.resource_type == SubscriptionResource.TARIFF_GENERATED_RATE:
+                valid = sub.resource_id in valid_tariff_ids
+            elif sub.resource_type == SubscriptionResource.READING:
+                valid = sub.resource_id in valid_mup_ids
+            elif sub.resource_type in SITE_DER_RESOURCES:
+                valid = sub.resource_id == PUBLIC_SITE_DER_ID
+            else:
+                valid = False
+
+            if not valid:
+                raise BadRequestError(
+                    f"Invalid resource_id {sub.resource_id} for {sub.resource_type.name} on site {sub.scoped_site_id}"
+                )
+
+    @staticmethod
+    async def upsert_subscriptions_for_aggregator(
+        session: AsyncSession, aggregator_id: int, subscriptions: Sequence[SubscriptionRequest]
+    ) -> SubscriptionBulkResponse:
+        """Creates (or renews) every subscription on behalf of aggregator_id in a single transaction. Raises
+        NotFoundError if the aggregator doesn't exist or BadRequestError if any subscription is invalid (in which
+        case nothing is written)"""
+
+        aggregator = await select_aggregator(session, aggregator_id)
+        if aggregator is None:
+            raise NotFoundError(f"No aggregator with ID {aggregator_id} to receive subscriptions")
+        valid_domains = set(d.domain for d in aggregator.domains)
+
+        changed_time = utc_now()
+        subs = [
+            SubscriptionMapper.map_from_request(changed_time, aggregator_id, valid_domains, s) for s in subscriptions
+        ]
+        await SubscriptionManager.validate_subscriptions(session, aggregator_id, subs)
+
+        subscription_ids = await upsert_subscriptions(session, subs)
+        await session.commit()
+
+        logger.info(f"upsert_subscriptions_for_aggregator: aggregator {aggregator_id} upserted {len(subs)} subs")
+        return SubscriptionBulkResponse(subscription_ids=subscription_ids)
@@ -5,7 +5,9 @@ from .archive import *  # noqa: F403
 from .billing import *  # noqa: F403
 from .certificate import *  # noqa: F403
 from .doe import *  # noqa: F403
+from .ingest import *  # noqa: F403
 from .log import *  # noqa: F403
 from .pricing import *  # noqa: F403
 from .site import *  # noqa: F403
 from .site_control import *  # noqa: F403
+from .subscription import *  # noqa: F403
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from envoy.admin.schema.ingest import IngestJobRequest, IngestJobResponse
+from envoy.server.model.ingest import IngestJob, IngestJobStatus
+
+
+class IngestJobMapper:
+    @staticmethod
+    def map_from_request(changed_time: datetime, request: IngestJobRequest) -> IngestJob:
+        return IngestJob(
+            job_type=request.job_type,
+            site_control_group_id=request.site_control_group_id,
+            status=IngestJobStatus.RECEIVING,
+            changed_time=changed_time,
+            staged_rows=0,
+            applied_rows=0,
+            applied_chunks=0,
+            error=None,
+        )
+
+    @staticmethod
+    def map_to_response(job: IngestJob) -> IngestJobResponse:
+        return IngestJobResponse(
+            ingest_job_id=job.ingest_job_id,
+            job_type=job.job_type,
+            site_control_group_id=job.site_control_group_id,
+            status=job.status,
+            created_time=job.created_time,
+            changed_time=job.changed_time,
+            staged_rows=job.staged_rows,
+            applied_rows=job.applied_rows,
+            applied_chunks=job.applied_chunks,
+            error=job.error,
+        )
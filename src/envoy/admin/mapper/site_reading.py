@@ -10,7 +10,7 @@ from envoy_schema.admin.schema.site_reading import (
 )
 from envoy_schema.server.schema.sep2.types import FlowDirectionType, UomType
 
-from envoy.server.model.site_reading import SiteReading
+from envoy.server.model.site_reading import SiteReading, SiteReadingRollup, SiteReadingType
 
 
 class AdminSiteReadingMapper:
@@ -24,6 +24,17 @@ class AdminSiteReadingMapper:
         33: PhaseEnum.CN,
     }
 
+    @staticmethod
+    def _adjust_value(raw_value: Decimal, reading_type: SiteReadingType) -> Decimal:
+        """Applies the power of ten multiplier and load convention of reading_type to raw_value"""
+        adjusted_value = raw_value * (Decimal("10") ** reading_type.power_of_ten_multiplier)
+
+        # Apply flow direction (load convention: positive = import from grid)
+        if reading_type.flow_direction == FlowDirectionType.REVERSE:
+            adjusted_value *= -1
+
+        return adjusted_value
+
     @staticmethod
     def map_to_csip_aus_reading(
         site_reading: SiteReading, requested_unit: CSIPAusSiteReadingUnit
@@ -31,12 +42,8 @@ class AdminSiteReadingMapper:
 
         reading_type = site_reading.site_reading_type
 
-        # Convert raw value using power of ten multiplier
-        adjusted_value = Decimal(site_reading.value) * (Decimal("10") ** reading_type.power_of_ten_multiplier)
-
-        # Apply flow direction (load convention: positive = import from grid)
-        if reading_type.flow_direction == FlowDirectionType.REVERSE:
-            adjusted_value *= -1
+        # Convert raw value using power of ten multiplier (and load convention)
+        adjusted_value = AdminSiteReadingMapper._adjust_value(Decimal(site_reading.value), reading_type)
 
         # Map phase code to PhaseEnum with fallback to NA for unknown values
         phase_enum = AdminSiteReadingMapper.PHASE_CODE_TO_ENUM_MAP.get(reading_type.phase, PhaseEnum.NA)
@@ -49,9 +56,27 @@ class AdminSiteReadingMapper:
             csip_aus_unit=requested_unit,
         )
 
+    @staticmethod
+    def map_rollup_to_csip_aus_reading(
+        rollup: SiteReadingRollup, requested_unit: CSIPAusSiteReadingUnit
+    ) -> CSIPAusSiteReading:
+        """Maps a pre-aggregated rollup to a single reading spanning the entire bucket. All CSIPAusSiteReadingUnit are
+        instantaneous values so the bucket value is the average of the underlying readings."""
+
+        reading_type = rollup.site_reading_type
+        average_value = Decimal(rollup.value_sum) / Decimal(rollup.reading_count)
+
+        return CSIPAusSiteReading(
+            reading_start_time=rollup.bucket_start,
+            duration_seconds=rollup.resolution_seconds,
+            phase=AdminSiteReadingMapper.PHASE_CODE_TO_ENUM_MAP.get(reading_type.phase, PhaseEnum.NA),
+            value=AdminSiteReadingMapper._adjust_value(average_value, reading_type),
+            csip_aus_unit=requested_unit,
+        )
+
     @staticmethod
     def map_to_csip_aus_reading_page_response(
-        site_readings: Sequence[SiteReading],
+        site_readings: Sequence[SiteReading | SiteReadingRollup],
         total_count: int,
         start: int,
         limit: int,
@@ -62,7 +87,12 @@ class AdminSiteReadingMapper:
     ) -> CSIPAusSiteReadingPageResponse:
 
         csip_readings = [
-            AdminSiteReadingMapper.map_to_csip_aus_reading(reading, requested_unit) for reading in site_readings
+            (
+                AdminSiteReadingMapper.map_rollup_to_csip_aus_reading(reading, requested_unit)
+                if isinstance(reading, SiteReadingRollup)
+                else AdminSiteReadingMapper.map_to_csip_aus_reading(reading, requested_unit)
+            )
+            for reading in site_readings
         ]
 
         return CSIPAusSiteReadingPageResponse(
@@ -0,0 +1,50 @@
+from datetime import datetime
+from urllib.parse import urlparse
+
+from envoy.admin.schema.subscription import SubscriptionRequest
+from envoy.server.crud.site import VIRTUAL_END_DEVICE_SITE_ID
+from envoy.server.exception import InvalidMappingError
+from envoy.server.mapper.sep2.pub_sub import SubscriptionMapper as Sep2SubscriptionMapper
+from envoy.server.model.subscription import Subscription, SubscriptionCondition
+
+
+class SubscriptionMapper:
+    @staticmethod
+    def map_from_request(
+        changed_time: datetime, aggregator_id: int, aggregator_domains: set[str], subscription: SubscriptionRequest
+    ) -> Subscription:
+        """Converts a SubscriptionRequest to an internal Subscription for aggregator_id. Raises InvalidMappingError
+        if the subscribed resource isn't supported or the notification_uri is outside of aggregator_domains"""
+        resource, scoped_site_id, resource_id = Sep2SubscriptionMapper.parse_resource_href(
+            subscription.subscribed_resource
+        )
+
+        try:
+            uri = urlparse(subscription.notification_uri)
+        except Exception as ex:
+            raise InvalidMappingError(f"Error validating notification_uri: {ex}") from ex
+
+        if uri.hostname not in aggregator_domains:
+            raise InvalidMappingError(
+                f"notification_uri has host {uri.hostname} which does NOT match aggregator FQDNs: {aggregator_domains}"
+            )
+
+        # The virtual end device is interpreted as not having a site id scope
+        if scoped_site_id == VIRTUAL_END_DEVICE_SITE_ID:
+            scoped_site_id = None
+
+        return Subscription(
+            aggregator_id=aggregator_id,
+            changed_time=changed_time,
+            resource_type=resource,
+            resource_id=resource_id,
+            scoped_site_id=scoped_site_id,
+            notification_uri=subscription.notification_uri,
+            entity_limit=subscription.entity_limit,
+            conditions=[
+                SubscriptionCondition(
+                    attribute=c.attribute, lower_threshold=c.lower_threshold, upper_threshold=c.upper_threshold
+                )
+                for c in subscription.conditions
+            ],
+        )
@@ -0,0 +1 @@
+"""Admin API request/response models that aren't (yet) part of envoy_schema"""
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+# Streamed bulk provisioning (create + assign) of certificates for an aggregator. The body is NDJSON - one
+# CertificateAssignmentRequest per line (see NDJSON_CONTENT_TYPE)
+AggregatorCertificateProvisionUri = "/aggregator/{aggregator_id}/certificate_provision"
+
+
+class CertificateProvisionResponse(BaseModel):
+    """The outcome of a (streamed) bulk certificate provisioning request"""
+
+    received_count: int  # Total CertificateAssignmentRequest lines received
+    created_count: int  # Certificates created (new lfdis)
+    assigned_count: int  # New assignments to the aggregator (excludes certificates that were already assigned)
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from envoy.server.model.ingest import IngestJobStatus, IngestJobType
+
+# Asynchronous bulk ingest of tariff rates / site controls
+IngestJobListUri = "/ingest_job"
+IngestJobUri = "/ingest_job/{ingest_job_id}"
+IngestJobRowsUri = "/ingest_job/{ingest_job_id}/rows"  # NDJSON upload - can be repeated for multi part uploads
+IngestJobSubmitUri = "/ingest_job/{ingest_job_id}/submit"  # Marks the upload as complete (ready to apply)
+
+# The content type of IngestJobRowsUri uploads - one JSON request object per line
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+class IngestJobRequest(BaseModel):
+    """Creates a new (empty) IngestJob"""
+
+    job_type: IngestJobType
+    site_control_group_id: int | None = None  # Must be set for (and only for) IngestJobType.SITE_CONTROL
+
+
+class IngestJobResponse(BaseModel):
+    """The current status/progress of an IngestJob"""
+
+    ingest_job_id: int
+    job_type: IngestJobType
+    site_control_group_id: int | None
+    status: IngestJobStatus
+    created_time: datetime
+    changed_time: datetime
+    staged_rows: int  # Total rows uploaded
+    applied_rows: int  # Total rows applied (committed)
+    applied_chunks: int  # Total chunks (transactions) applied
+    error: str | None  # Why the job failed (if it did)
@@ -0,0 +1,28 @@
+from envoy_schema.server.schema.sep2.pub_sub import ConditionAttributeIdentifier
+from pydantic import BaseModel
+
+# Bulk upsert of subscriptions on behalf of an aggregator
+AggregatorSubscriptionListUri = "/aggregator/{aggregator_id}/subscription"
+
+
+class SubscriptionConditionRequest(BaseModel):
+    """Limits a subscription to only fire when attribute falls within the thresholds"""
+
+    attribute: ConditionAttributeIdentifier
+    lower_threshold: int
+    upper_threshold: int
+
+
+class SubscriptionRequest(BaseModel):
+    """A single subscription to be created (or renewed) on behalf of an aggregator"""
+
+    subscribed_resource: str  # sep2 href (without any href prefix) of the resource eg /edev/1/derp/2/derc
+    notification_uri: str  # Must have a host that matches one of the aggregator's domains
+    entity_limit: int  # The max number of entities to return in a single notification
+    conditions: list[SubscriptionConditionRequest] = []
+
+
+class SubscriptionBulkResponse(BaseModel):
+    """The outcome of a bulk subscription upsert"""
+
+    subscription_ids: list[int]  # The new (or renewed) subscription_id for each request (in the same order)
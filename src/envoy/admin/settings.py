@@ -21,6 +21,31 @@ class AppSettings(CommonSettings):
     read_only_user: str = "rouser"
     read_only_keys: list[str] = []  # Passwords that match with read_only_user and grant access to GET endpoints
 
+    enable_partition_maintenance: bool = False  # Will upcoming monthly partitions be created in the background?
+    partition_maintenance_interval_seconds: int = 3600  # How frequently partition maintenance will run
+    partition_months_ahead: int = 3  # How many months (beyond the current month) will have partitions pre created
+    site_reading_retention_months: int | None = None  # If set - site_reading partitions older than this are dropped
+    response_retention_months: int | None = None  # If set - response partitions older than this are dropped
+    site_log_event_retention_months: int | None = None  # If set - site_log_event partitions older than this are dropped
+
+    enable_site_reading_rollup_backfill: bool = False  # Will site reading rollups be recalculated on startup?
+    site_reading_rollup_backfill_batch_size: int = 100  # How many site reading types are backfilled per transaction
+
+    enable_archive_purge: bool = False  # Will archive rows that exceed archive_retention_days be purged?
+    archive_retention_days: dict[str, int] = {}  # Archive table name -> days that archived snapshots are retained
+    archive_deleted_retention_days: dict[str, int] = {}  # Archive table name -> days the latest deletion is retained
+    archive_purge_interval_seconds: int = 3600  # How frequently the archive purge will run
+    archive_purge_batch_size: int = 1000  # Max rows deleted per archive purge transaction
+    archive_purge_batch_pause_seconds: float = 0.5  # Pause between archive purge batches (throttling)
+    archive_purge_lock_timeout_ms: int = 2000  # lock_timeout for each archive purge transaction
+
+    enable_ingest_jobs: bool = (
+        False  # Will the asynchronous bulk ingest job API (and its background worker) be enabled?
+    )
+    ingest_job_chunk_size: int = 500  # Max staged rows applied per ingest job transaction
+    ingest_job_parallelism: int = 1  # Concurrent transactions used to apply an ingest job (rows partitioned by site)
+    ingest_job_poll_seconds: float = 1.0  # How frequently the ingest worker checks for newly submitted jobs
+
     @property
     def fastapi_kwargs(self) -> dict[str, Any]:
         return {
@@ -1,9 +1,12 @@
-from collections.abc import Callable, Iterable, Sequence
+from collections.abc import Sequence
 from datetime import datetime
-from typing import Any, cast
+from itertools import chain
+from typing import cast
 
-from sqlalchemy import Column, select
+from sqlalchemy import Column, ColumnElement, Row, Select, case, exists, func, inspect, literal, select, true
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from envoy.notification.crud.common import TArchiveResourceModel, TResourceModel
 from envoy.server.model.archive.base import ArchiveBase
@@ -14,13 +17,15 @@ def extract_source_archive_pk_columns(
     source_type: type[Base], archive_type: type[ArchiveBase]
 ) -> tuple[Column, Column]:
     """Internal utility for extracting the "primary key" column name from source_type. Also fetches the "equivalent"
-    column on the archive_type
+    column on the archive_type.
+
+    The ORM (mapper) primary key is used - for partitioned tables this will differ from the table primary key (which
+    must also include the partition key)
 
     returns (source_pk_col, archive_pk_col)"""
-    if not hasattr(source_type.__table__.primary_key, "columns"):
+    archive_pk_cols: list[Column] = cast(list, list(inspect(source_type).primary_key))
+    if len(archive_pk_cols) == 0:
         raise ValueError(f"Table {source_type} primary key has no configured columns")
-
-    archive_pk_cols: list[Column] = cast(list, source_type.__table__.primary_key.columns)
     if len(archive_pk_cols) != 1:
         raise Exception(f"source_type: {source_type} should only have a single primary key column defined,")
     source_pk_col: Column = archive_pk_cols[0]  # The archive type will have the same column - we can reuse this
@@ -42,6 +47,19 @@ def extract_source_archive_changed_deleted_columns(
     return (cast(Column, source_type.changed_time), cast(Column, archive_type.deleted_time))
 
 
+def _is_latest_snapshot_of_deletion(archive_type: type[ArchiveBase], archive_pk_col: Column) -> ColumnElement[bool]:
+    """Internal utility for generating a filter on archive_type that excludes a deleted snapshot if there is another
+    (later archived) deleted snapshot of the same source row with the same deleted_time. i.e. each deletion is only
+    matched once. The NOT EXISTS is resolved as a point lookup against the partial "deleted_snapshot" index"""
+    newer = aliased(archive_type)
+    return ~exists().where(
+        (getattr(newer, archive_pk_col.name) == archive_pk_col)
+        & newer.deleted_time.is_not(None)
+        & (newer.deleted_time == archive_type.deleted_time)
+        & (newer.archive_id > archive_type.archive_id)
+    )
+
+
 async def fetch_entities_with_archive_by_id(
     session: AsyncSession,
     source_type: type[TResourceModel],
@@ -69,18 +87,31 @@ async def fetch_entities_with_archive_by_id(
         return (source_entities, [])
 
     # If we are here - there are some primary_key_values that were NOT found - likely they have been deleted
-    # We now need to goto the archive for the primary key (which does have an index) and find the LATEST deletion
+    # We now need to goto the archive and find the LATEST deletion for each of those primary keys. Each primary key is
+    # a point lookup (LIMIT 1) against the partial "deleted_snapshot" index - the update snapshots are never visited
 
-    # NOTE - This leverages the postgresql DISTINCT ON functionality. Attempting to use this outside of
+    # NOTE - This leverages the postgresql unnest / LATERAL functionality. Attempting to use this outside of
     # postgresql environment will result in errors
+    requested_ids = (
+        func.unnest(literal(sorted(ids_not_in_source_table), type_=ARRAY(archive_pk_col.type)))
+        .table_valued("pk")
+        .render_derived()
+    )
+    latest_deletion = (
+        select(archive_type)
+        .where(archive_pk_col == requested_ids.c.pk)
+        .where(archive_type.deleted_time != None)  # noqa: E711 # The is not None doesn't parse with SQLAlchemy
+        .order_by(archive_type.deleted_time.desc(), archive_type.archive_time.desc())
+        .limit(1)
+        .lateral()
+    )
     archive_entities = (
         (
             await session.execute(
-                select(archive_type)
-                .distinct(archive_pk_col)
-                .order_by(archive_pk_col, archive_type.deleted_time.desc(), archive_type.archive_time.desc())
-                .where(archive_type.deleted_time != None)  # noqa: E711 # The is not None doesn't parse with SQLAlchemy
-                .where(archive_pk_col.in_(ids_not_in_source_table))
+                select(aliased(archive_type, latest_deletion))
+                .select_from(requested_ids)
+                .join(latest_deletion, true())
+                .order_by(requested_ids.c.pk)
             )
         )
         .scalars()
@@ -115,15 +146,13 @@ async def fetch_entities_with_archive_by_datetime(
     source_entities = (await session.execute(select(source_type).where(source_changed_time == cd_time))).scalars().all()
 
     # Lookup the archive tables (using deleted_time)
-    # NOTE - This leverages the postgresql DISTINCT ON functionality. Attempting to use this outside of
-    # postgresql environment will result in errors
     archive_entities = (
         (
             await session.execute(
                 select(archive_type)
-                .distinct(archive_pk_col)
-                .order_by(archive_pk_col, archive_deleted_time.desc(), archive_type.archive_time.desc())
                 .where(archive_deleted_time == cd_time)
+                .where(_is_latest_snapshot_of_deletion(archive_type, archive_pk_col))
+                .order_by(archive_pk_col)
             )
         )
         .scalars()
@@ -133,34 +162,92 @@ async def fetch_entities_with_archive_by_datetime(
     return (source_entities, archive_entities)
 
 
-def orm_relationship_map_parent_entities(
-    source_entities: Iterable[TResourceModel | TArchiveResourceModel],
-    get_parent_pk_id: Callable[[TResourceModel | TArchiveResourceModel], int],
-    parent_entities_by_pk: dict[int, Any],
-    source_relationship_prop_name: str,
-) -> None:
-    """Mutates source_entities to add "parent" relationships as if they had been fetched by SQLAlchemy ORM.
-
-    Eg - Given a source array of TariffGeneratedRate or ArchivedTariffGeneratedRate, set the "site" relationship
-    property to values from parent_entities_by_pk according to
-
-    source_entities: The entities to be decorated with values from parent_entities_by_pk under a specific property
-    get_parent_pk_id: A lambda that returns the FK reference to parent_entities_by_pk from a source entity
-    parent_entities_by_pk: All of the parent entities indexed by their primary key
-    source_relationship_prop_name: The name of the ORM relationship property on source_entity (eg: 'site')
-
-    Returns nothing but source_entities will be updated. If a parent relationship lookup cannot be made, a ValueError
-    will be raised"""
-
-    for src in source_entities:
-        parent_pk = get_parent_pk_id(src)
-        parent = parent_entities_by_pk.get(parent_pk, None)
-        if parent is None:
-            raise ValueError(f"Entity {src} has parent with ID {parent_pk} that couldn't be matched")
-
-        # We can't use setattr - some models struggle with our lazy=raise definition and pushing in a value
-        # It feels like a SQL alchemy oddity with relationships that are "single_parent=True" but I'm not 100% sure
-        # This method will be fine for the purposes we need for it - it might become problematic if this function
-        # starts getting wider use
-        src.__dict__[source_relationship_prop_name] = parent
-        # setattr(src, source_relationship_prop_name, parent)
+async def fetch_entities_with_archive_and_parent_by_datetime(
+    session: AsyncSession,
+    source_type: type[TResourceModel],
+    archive_type: type[TArchiveResourceModel],
+    parent_type: type[Base],
+    archive_parent_type: type[ArchiveBase],
+    parent_column_names: Sequence[str],
+    cd_time: datetime,
+) -> tuple[Sequence[Row], Sequence[Row]]:
+    """Similar to fetch_entities_with_archive_by_datetime but will also fetch the parent_column_names columns from the
+    "parent" of each entity (eg the Site of a TariffGeneratedRate). The parent will be sourced from parent_type or, if
+    it's been deleted, the most recent deletion in archive_parent_type. The parent values are joined in the same query
+    as the entities (no ORM relationships are populated). The entities reference their parent via a column with the
+    same name as the parent's primary key (eg site_id).
+
+    The return types will be a tuple of the form:
+        (source_rows, archive_rows)
+
+    Where every row is of the form (entity, *parent_column_values). If a parent can't be found for an entity, a
+    ValueError will be raised"""
+
+    source_changed_time, archive_deleted_time = extract_source_archive_changed_deleted_columns(
+        source_type, archive_type
+    )
+    _, archive_pk_col = extract_source_archive_pk_columns(source_type, archive_type)
+
+    # Lookup the source table (using changed_time)
+    source_rows = (
+        await session.execute(
+            _select_with_parent_columns(source_type, parent_type, archive_parent_type, parent_column_names).where(
+                source_changed_time == cd_time
+            )
+        )
+    ).all()
+
+    # Lookup the archive tables (using deleted_time)
+    # NOTE - This leverages the postgresql LATERAL functionality. Attempting to use this outside of
+    # postgresql environment will result in errors
+    archive_rows = (
+        await session.execute(
+            _select_with_parent_columns(archive_type, parent_type, archive_parent_type, parent_column_names)
+            .where(archive_deleted_time == cd_time)
+            .where(_is_latest_snapshot_of_deletion(archive_type, archive_pk_col))
+            .order_by(archive_pk_col)
+        )
+    ).all()
+
+    for row in chain(source_rows, archive_rows):
+        if row[1] is None:
+            raise ValueError(f"Entity {row[0]} has a parent {parent_type.__name__} that couldn't be matched")
+
+    return (source_rows, archive_rows)
+
+
+def _select_with_parent_columns(
+    entity_type: type[Base] | type[ArchiveBase],
+    parent_type: type[Base],
+    archive_parent_type: type[ArchiveBase],
+    parent_column_names: Sequence[str],
+) -> Select:
+    """Internal utility for generating a select of entity_type with the parent_column_names of its parent joined in.
+    The live parent_type is preferred with the latest deleted archive_parent_type being the fallback (this will
+    only be looked up if there is no live parent)"""
+    parent_pk_col, archive_parent_pk_col = extract_source_archive_pk_columns(parent_type, archive_parent_type)
+    entity_parent_id_col = cast(Column, entity_type.__table__.columns[parent_pk_col.name])
+
+    archived_parent = (
+        select(*[archive_parent_type.__table__.columns[name] for name in parent_column_names])
+        .where(parent_pk_col.is_(None))
+        .where(archive_parent_pk_col == entity_parent_id_col)
+        .where(archive_parent_type.deleted_time != None)  # noqa: E711 # The is not None doesn't parse with SQLAlchemy
+        .order_by(archive_parent_type.deleted_time.desc(), archive_parent_type.archive_time.desc())
+        .limit(1)
+        .lateral()
+    )
+
+    return (
+        select(
+            entity_type,
+            *[
+                case(
+                    (parent_pk_col.is_not(None), parent_type.__table__.columns[name]), else_=archived_parent.c[name]
+                ).label(name)
+                for name in parent_column_names
+            ],
+        )
+        .outerjoin(parent_type, parent_pk_col == entity_parent_id_col)
+        .outerjoin(archived_parent, true())
+    )
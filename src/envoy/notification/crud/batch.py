@@ -1,6 +1,5 @@
 from collections.abc import Iterable, Sequence
 from datetime import datetime
-from itertools import chain
 from typing import Any, Generic, cast
 
 from sqlalchemy import select
@@ -9,17 +8,18 @@ from sqlalchemy.orm import selectinload
 
 from envoy.admin.crud.aggregator import select_all_aggregators
 from envoy.notification.crud.archive import (
+    fetch_entities_with_archive_and_parent_by_datetime,
     fetch_entities_with_archive_by_datetime,
-    fetch_entities_with_archive_by_id,
-    orm_relationship_map_parent_entities,
 )
 from envoy.notification.crud.common import (
     ArchiveSiteScopedFunctionSetAssignment,
     ArchiveSiteScopedSiteControlGroup,
     ArchiveSiteScopedSiteControlGroupDefault,
+    SiteScopedEntity,
     SiteScopedFunctionSetAssignment,
     SiteScopedSiteControlGroup,
     SiteScopedSiteControlGroupDefault,
+    SiteScopedSiteReading,
     TArchiveResourceModel,
     TResourceModel,
 )
@@ -41,6 +41,7 @@ from envoy.server.model.archive.site import (
     ArchiveSiteDERStatus,
 )
 from envoy.server.model.archive.site_reading import ArchiveSiteReading, ArchiveSiteReadingType
+from envoy.server.model.archive.subscription import ArchiveSubscription
 from envoy.server.model.archive.tariff import ArchiveTariffGeneratedRate
 from envoy.server.model.doe import DynamicOperatingEnvelope, SiteControlGroup, SiteControlGroupDefault
 from envoy.server.model.site import Site, SiteDERAvailability, SiteDERRating, SiteDERSetting, SiteDERStatus
@@ -130,30 +131,26 @@ def get_batch_key(resource: SubscriptionResource, entity: TResourceModel) -> tup
         site: Site = cast(Site, entity)
         return (site.aggregator_id, site.site_id)
     elif resource == SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE:
-        doe = cast(DynamicOperatingEnvelope, entity)
-        return (doe.site.aggregator_id, doe.site_id, doe.site_control_group_id)
+        doe = cast(SiteScopedEntity[DynamicOperatingEnvelope], entity)
+        return (doe.aggregator_id, doe.site_id, doe.original.site_control_group_id)
     elif resource == SubscriptionResource.READING:
-        reading = cast(SiteReading, entity)
-        return (
-            reading.site_reading_type.aggregator_id,
-            reading.site_reading_type.site_id,
-            reading.site_reading_type.group_id,
-        )
+        reading = cast(SiteScopedSiteReading, entity)
+        return (reading.aggregator_id, reading.site_id, reading.group_id)
     elif resource == SubscriptionResource.TARIFF_GENERATED_RATE:
-        rate = cast(TariffGeneratedRate, entity)
-        return (rate.site.aggregator_id, rate.tariff_id, rate.site_id, rate.start_time.date())
+        rate = cast(SiteScopedEntity[TariffGeneratedRate], entity)
+        return (rate.aggregator_id, rate.original.tariff_id, rate.site_id, rate.original.start_time.date())
     elif resource == SubscriptionResource.SITE_DER_AVAILABILITY:
-        availability = cast(SiteDERAvailability, entity)
-        return (availability.site.aggregator_id, availability.site_id, PUBLIC_SITE_DER_ID)
+        availability = cast(SiteScopedEntity[SiteDERAvailability], entity)
+        return (availability.aggregator_id, availability.site_id, PUBLIC_SITE_DER_ID)
     elif resource == SubscriptionResource.SITE_DER_RATING:
-        rating = cast(SiteDERRating, entity)
-        return (rating.site.aggregator_id, rating.site_id, PUBLIC_SITE_DER_ID)
+        rating = cast(SiteScopedEntity[SiteDERRating], entity)
+        return (rating.aggregator_id, rating.site_id, PUBLIC_SITE_DER_ID)
     elif resource == SubscriptionResource.SITE_DER_SETTING:
-        setting = cast(SiteDERSetting, entity)
-        return (setting.site.aggregator_id, setting.site_id, PUBLIC_SITE_DER_ID)
+        setting = cast(SiteScopedEntity[SiteDERSetting], entity)
+        return (setting.aggregator_id, setting.site_id, PUBLIC_SITE_DER_ID)
     elif resource == SubscriptionResource.SITE_DER_STATUS:
-        status = cast(SiteDERStatus, entity)
-        return (status.site.aggregator_id, status.site_id, PUBLIC_SITE_DER_ID)
+        status = cast(SiteScopedEntity[SiteDERStatus], entity)
+        return (status.aggregator_id, status.site_id, PUBLIC_SITE_DER_ID)
     elif resource == SubscriptionResource.DEFAULT_SITE_CONTROL:
         default_control = cast(SiteScopedSiteControlGroupDefault, entity)
         return (
@@ -180,13 +177,13 @@ def get_subscription_filter_id(resource: SubscriptionResource, entity: TResource
         return cast(Site, entity).site_id
     elif resource == SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE:
         # DOE subscriptions can be scoped to a single DERP
-        return cast(DynamicOperatingEnvelope, entity).site_control_group_id
+        return cast(SiteScopedEntity[DynamicOperatingEnvelope], entity).original.site_control_group_id
     elif resource == SubscriptionResource.READING:
         # Reading subscriptions can be scoped to the overarching type
-        return cast(SiteReading, entity).site_reading_type.group_id
+        return cast(SiteScopedSiteReading, entity).group_id
     elif resource == SubscriptionResource.TARIFF_GENERATED_RATE:
         # rate subscriptions can be scoped to a single tariff
-        return cast(TariffGeneratedRate, entity).tariff_id
+        return cast(SiteScopedEntity[TariffGeneratedRate], entity).original.tariff_id
     elif resource == SubscriptionResource.SITE_DER_AVAILABILITY:
         # der entities get scoped to the parent der
         return PUBLIC_SITE_DER_ID  # There is only a single site DER per EndDevice - it has a static id
@@ -214,19 +211,19 @@ def get_site_id(resource: SubscriptionResource, entity: TResourceModel) -> int:
     if resource == SubscriptionResource.SITE:
         return cast(Site, entity).site_id
     elif resource == SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE:
-        return cast(DynamicOperatingEnvelope, entity).site_id
+        return cast(SiteScopedEntity[DynamicOperatingEnvelope], entity).site_id
     elif resource == SubscriptionResource.READING:
-        return cast(SiteReading, entity).site_reading_type.site_id
+        return cast(SiteScopedSiteReading, entity).site_id
     elif resource == SubscriptionResource.TARIFF_GENERATED_RATE:
-        return cast(TariffGeneratedRate, entity).site_id
+        return cast(SiteScopedEntity[TariffGeneratedRate], entity).site_id
     elif resource == SubscriptionResource.SITE_DER_AVAILABILITY:
-        return cast(SiteDERAvailability, entity).site_id
+        return cast(SiteScopedEntity[SiteDERAvailability], entity).site_id
     elif resource == SubscriptionResource.SITE_DER_RATING:
-        return cast(SiteDERRating, entity).site_id
+        return cast(SiteScopedEntity[SiteDERRating], entity).site_id
     elif resource == SubscriptionResource.SITE_DER_SETTING:
-        return cast(SiteDERSetting, entity).site_id
+        return cast(SiteScopedEntity[SiteDERSetting], entity).site_id
     elif resource == SubscriptionResource.SITE_DER_STATUS:
-        return cast(SiteDERStatus, entity).site_id
+        return cast(SiteScopedEntity[SiteDERStatus], entity).site_id
     elif resource == SubscriptionResource.DEFAULT_SITE_CONTROL:
         return cast(SiteScopedSiteControlGroupDefault, entity).site_id
     elif resource == SubscriptionResource.FUNCTION_SET_ASSIGNMENTS:
@@ -237,18 +234,25 @@ def get_site_id(resource: SubscriptionResource, entity: TResourceModel) -> int:
         raise NotificationError(f"{resource} is unsupported - unable to identify appropriate site id")
 
 
-async def select_subscriptions_for_resource(
-    session: AsyncSession, aggregator_id: int, resource: SubscriptionResource
+async def select_subscriptions_changed_after(
+    session: AsyncSession, changed_after: datetime | None
 ) -> Sequence[Subscription]:
-    """Fetches all subscriptions that 'might' match a change in a particular resource. Actual checks will not be made.
+    """Fetches every subscription with changed_time >= changed_after (or EVERY subscription if changed_after is None)
 
     Will populate the Subscription.conditions relationship"""
 
-    stmt = (
-        select(Subscription)
-        .where((Subscription.aggregator_id == aggregator_id) & (Subscription.resource_type == resource))
-        .options(selectinload(Subscription.conditions))
-    )
+    stmt = select(Subscription).options(selectinload(Subscription.conditions))
+    if changed_after is not None:
+        stmt = stmt.where(Subscription.changed_time >= changed_after)
+
+    resp = await session.execute(stmt)
+    return resp.scalars().all()
+
+
+async def select_subscription_ids_deleted_after(session: AsyncSession, deleted_after: datetime) -> Sequence[int]:
+    """Fetches the subscription_id of every subscription that was deleted at or after deleted_after"""
+
+    stmt = select(ArchiveSubscription.subscription_id).where(ArchiveSubscription.deleted_time >= deleted_after)
 
     resp = await session.execute(stmt)
     return resp.scalars().all()
@@ -277,284 +281,199 @@ async def fetch_sites_by_changed_at(
     return AggregatorBatchedEntities(timestamp, SubscriptionResource.SITE, active_sites, deleted_sites)
 
 
+async def fetch_site_scoped_entities_by_changed_at(
+    session: AsyncSession,
+    source_type: type[TResourceModel],
+    archive_type: type[TArchiveResourceModel],
+    timestamp: datetime,
+) -> tuple[list[SiteScopedEntity[TResourceModel]], list[SiteScopedEntity[TArchiveResourceModel]]]:
+    """Fetches all source_type entities (and archive_type deletions) matching the specified changed_at - each
+    wrapped with the values of its parent Site (live or archived). The parent Site values are joined in the same
+    query as the entities.
+
+    returns (active_entities, deleted_entities)"""
+
+    active_rows, deleted_rows = await fetch_entities_with_archive_and_parent_by_datetime(
+        session,
+        source_type,
+        archive_type,
+        Site,
+        ArchiveSite,
+        ["aggregator_id", "timezone_id"],
+        timestamp,
+    )
+
+    return (
+        [SiteScopedEntity(agg_id, e.site_id, tz_id, e) for e, agg_id, tz_id in active_rows],
+        [SiteScopedEntity(agg_id, e.site_id, tz_id, e) for e, agg_id, tz_id in deleted_rows],
+    )
+
+
+def localize_site_scoped_start_times(entities: Iterable[SiteScopedEntity]) -> None:
+    """Localizes every entity.original.start_time to be in the timezone of its parent Site (entities will be modified
+    in place)"""
+    for e in entities:
+        localize_start_time_for_entity(e.original, e.timezone_id)
+
+
 async def fetch_rates_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[TariffGeneratedRate, ArchiveTariffGeneratedRate]:
+) -> AggregatorBatchedEntities[SiteScopedEntity[TariffGeneratedRate], SiteScopedEntity[ArchiveTariffGeneratedRate]]:  # type: ignore # SiteScoped variables will work here - tests enforce it
     """Fetches all rates matching the specified changed_at and returns them keyed by their aggregator/site id
 
-    Will include the TariffGeneratedRate.site relationship
+    Each rate will be wrapped with its parent Site values (with start_time localized to the Site timezone)
 
-    Also fetches any site from the archive that was deleted at the specified timestamp"""
+    Also fetches any rate from the archive that was deleted at the specified timestamp"""
 
-    active_rates, deleted_rates = await fetch_entities_with_archive_by_datetime(
+    active_rates, deleted_rates = await fetch_site_scoped_entities_by_changed_at(
         session, TariffGeneratedRate, ArchiveTariffGeneratedRate, timestamp
     )
+    localize_site_scoped_start_times(active_rates)
+    localize_site_scoped_start_times(deleted_rates)
 
-    referenced_site_ids = {
-        e.site_id
-        for e in cast(Iterable[TariffGeneratedRate | ArchiveTariffGeneratedRate], chain(active_rates, deleted_rates))
-    }
-
-    active_sites, deleted_sites = await fetch_entities_with_archive_by_id(
-        session, Site, ArchiveSite, referenced_site_ids
-    )
-
-    # Map the "site" relationship
-    orm_relationship_map_parent_entities(
-        cast(Iterable[TariffGeneratedRate | ArchiveTariffGeneratedRate], chain(active_rates, deleted_rates)),
-        lambda e: e.site_id,
-        {e.site_id: e for e in cast(Iterable[Site | ArchiveSite], chain(active_sites, deleted_sites))},
-        "site",
+    return AggregatorBatchedEntities(
+        timestamp,
+        SubscriptionResource.TARIFF_GENERATED_RATE,
+        active_rates,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_rates,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
-    # localize start times using the new "site" relationship
-    for e in cast(Iterable[TariffGeneratedRate], chain(active_rates, deleted_rates)):
-        localize_start_time_for_entity(e, e.site.timezone_id)
-
-    return AggregatorBatchedEntities(timestamp, SubscriptionResource.TARIFF_GENERATED_RATE, active_rates, deleted_rates)
-
 
 async def fetch_does_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[DynamicOperatingEnvelope, ArchiveDynamicOperatingEnvelope]:
+) -> AggregatorBatchedEntities[
+    SiteScopedEntity[DynamicOperatingEnvelope], SiteScopedEntity[ArchiveDynamicOperatingEnvelope]  # type: ignore # SiteScoped variables will work here - tests enforce it
+]:
     """Fetches all DOEs matching the specified changed_at and returns them keyed by their aggregator/site id
 
-    Will include the DynamicOperatingEnvelope.site relationship
+    Each DOE will be wrapped with its parent Site values (with start_time localized to the Site timezone)
 
-    Also fetches any site from the archive that was deleted at the specified timestamp"""
+    Also fetches any DOE from the archive that was deleted at the specified timestamp"""
 
-    active_does, deleted_does = await fetch_entities_with_archive_by_datetime(
+    active_does, deleted_does = await fetch_site_scoped_entities_by_changed_at(
         session, DynamicOperatingEnvelope, ArchiveDynamicOperatingEnvelope, timestamp
     )
-
-    referenced_site_ids = {
-        e.site_id
-        for e in cast(
-            Iterable[DynamicOperatingEnvelope | ArchiveDynamicOperatingEnvelope], chain(active_does, deleted_does)
-        )
-    }
-
-    active_sites, deleted_sites = await fetch_entities_with_archive_by_id(
-        session, Site, ArchiveSite, referenced_site_ids
-    )
-
-    # Map the "site" relationship
-    orm_relationship_map_parent_entities(
-        cast(Iterable[DynamicOperatingEnvelope | ArchiveDynamicOperatingEnvelope], chain(active_does, deleted_does)),
-        lambda e: e.site_id,
-        {e.site_id: e for e in cast(Iterable[Site | ArchiveSite], chain(active_sites, deleted_sites))},
-        "site",
-    )
-
-    # localize start times using the new "site" relationship
-    for e in cast(Iterable[DynamicOperatingEnvelope], chain(active_does, deleted_does)):
-        localize_start_time_for_entity(e, e.site.timezone_id)
+    localize_site_scoped_start_times(active_does)
+    localize_site_scoped_start_times(deleted_does)
 
     return AggregatorBatchedEntities(
-        timestamp, SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE, active_does, deleted_does
+        timestamp,
+        SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
+        active_does,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_does,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
 
 async def fetch_readings_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[SiteReading, ArchiveSiteReading]:
+) -> AggregatorBatchedEntities[SiteScopedSiteReading, SiteScopedSiteReading]:  # type: ignore # SiteScoped variables will work here - tests enforce it
     """Fetches all site readings matching the specified changed_at and returns them keyed by their aggregator/site id
 
-    Will include the SiteReading.site_reading_type relationship"""
+    Each reading will be wrapped with its parent SiteReadingType values. These are joined in the same query as the
+    readings"""
 
-    active_readings, deleted_readings = await fetch_entities_with_archive_by_datetime(
-        session, SiteReading, ArchiveSiteReading, timestamp
+    active_rows, deleted_rows = await fetch_entities_with_archive_and_parent_by_datetime(
+        session,
+        SiteReading,
+        ArchiveSiteReading,
+        SiteReadingType,
+        ArchiveSiteReadingType,
+        ["aggregator_id", "site_id", "group_id"],
+        timestamp,
     )
 
-    referenced_site_reading_type_ids = {
-        e.site_reading_type_id
-        for e in cast(
-            Iterable[SiteReading | ArchiveSiteReading],
-            chain(active_readings, deleted_readings),
-        )
-    }
-
-    active_site_reading_types, deleted_site_reading_types = await fetch_entities_with_archive_by_id(
-        session, SiteReadingType, ArchiveSiteReadingType, referenced_site_reading_type_ids
-    )
+    active_readings = [
+        SiteScopedSiteReading(agg_id, site_id, group_id, e) for e, agg_id, site_id, group_id in active_rows
+    ]
+    deleted_readings = [
+        SiteScopedSiteReading(agg_id, site_id, group_id, e) for e, agg_id, site_id, group_id in deleted_rows
+    ]
 
-    # Map the "site_reading_type" relationship
-    orm_relationship_map_parent_entities(
-        cast(
-            Iterable[SiteReading | ArchiveSiteReading],
-            chain(active_readings, deleted_readings),
-        ),
-        lambda e: e.site_reading_type_id,
-        {
-            e.site_reading_type_id: e
-            for e in cast(
-                Iterable[SiteReadingType | ArchiveSiteReadingType],
-                chain(active_site_reading_types, deleted_site_reading_types),
-            )
-        },
-        "site_reading_type",
+    return AggregatorBatchedEntities(
+        timestamp,
+        SubscriptionResource.READING,
+        active_readings,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_readings,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
-    return AggregatorBatchedEntities(timestamp, SubscriptionResource.READING, active_readings, deleted_readings)
-
 
 async def fetch_der_availability_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[SiteDERAvailability, ArchiveSiteDERAvailability]:
+) -> AggregatorBatchedEntities[SiteScopedEntity[SiteDERAvailability], SiteScopedEntity[ArchiveSiteDERAvailability]]:  # type: ignore # SiteScoped variables will work here - tests enforce it
     """Fetches all der availabilities matching the specified changed_at and returns them keyed by their
     aggregator/site id
 
-    Will include the SiteDERAvailability.site relationship"""
+    Each SiteDERAvailability will be wrapped with its parent Site values"""
 
-    active_der_avails, deleted_der_avails = await fetch_entities_with_archive_by_datetime(
+    active_der_avails, deleted_der_avails = await fetch_site_scoped_entities_by_changed_at(
         session, SiteDERAvailability, ArchiveSiteDERAvailability, timestamp
     )
 
-    referenced_site_ids = {
-        e.site_id
-        for e in cast(
-            Iterable[SiteDERAvailability | ArchiveSiteDERAvailability],
-            chain(active_der_avails, deleted_der_avails),
-        )
-    }
-
-    active_sites, deleted_sites = await fetch_entities_with_archive_by_id(
-        session, Site, ArchiveSite, referenced_site_ids
-    )
-
-    # Map the "site" relationship for every der availability
-    orm_relationship_map_parent_entities(
-        cast(
-            Iterable[SiteDERAvailability | ArchiveSiteDERAvailability],
-            chain(active_der_avails, deleted_der_avails),
-        ),
-        lambda e: e.site_id,
-        {e.site_id: e for e in cast(Iterable[Site | ArchiveSite], chain(active_sites, deleted_sites))},
-        "site",
-    )
-
     return AggregatorBatchedEntities(
-        timestamp, SubscriptionResource.SITE_DER_AVAILABILITY, active_der_avails, deleted_der_avails
+        timestamp,
+        SubscriptionResource.SITE_DER_AVAILABILITY,
+        active_der_avails,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_der_avails,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
 
 async def fetch_der_rating_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[SiteDERRating, ArchiveSiteDERRating]:
+) -> AggregatorBatchedEntities[SiteScopedEntity[SiteDERRating], SiteScopedEntity[ArchiveSiteDERRating]]:  # type: ignore # SiteScoped variables will work here - tests enforce it
     """Fetches all der ratings matching the specified changed_at and returns them keyed by their
     aggregator/site id
 
-    Will include the SiteDERRating.site relationship"""
+    Each SiteDERRating will be wrapped with its parent Site values"""
 
-    active_der_ratings, deleted_der_ratings = await fetch_entities_with_archive_by_datetime(
+    active_der_ratings, deleted_der_ratings = await fetch_site_scoped_entities_by_changed_at(
         session, SiteDERRating, ArchiveSiteDERRating, timestamp
     )
 
-    referenced_site_ids = {
-        e.site_id
-        for e in cast(
-            Iterable[SiteDERRating | ArchiveSiteDERRating],
-            chain(active_der_ratings, deleted_der_ratings),
-        )
-    }
-
-    active_sites, deleted_sites = await fetch_entities_with_archive_by_id(
-        session, Site, ArchiveSite, referenced_site_ids
-    )
-
-    # Map the "site" relationship for every der rating
-    orm_relationship_map_parent_entities(
-        cast(
-            Iterable[SiteDERRating | ArchiveSiteDERRating],
-            chain(active_der_ratings, deleted_der_ratings),
-        ),
-        lambda e: e.site_id,
-        {e.site_id: e for e in cast(Iterable[Site | ArchiveSite], chain(active_sites, deleted_sites))},
-        "site",
-    )
-
     return AggregatorBatchedEntities(
-        timestamp, SubscriptionResource.SITE_DER_RATING, active_der_ratings, deleted_der_ratings
+        timestamp,
+        SubscriptionResource.SITE_DER_RATING,
+        active_der_ratings,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_der_ratings,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
 
 async def fetch_der_setting_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[SiteDERSetting, ArchiveSiteDERSetting]:
+) -> AggregatorBatchedEntities[SiteScopedEntity[SiteDERSetting], SiteScopedEntity[ArchiveSiteDERSetting]]:  # type: ignore # SiteScoped variables will work here - tests enforce it
     """Fetches all der settings matching the specified changed_at and returns them keyed by their
     aggregator/site id
 
-    Will include the SiteDERSetting.site relationship"""
+    Each SiteDERSetting will be wrapped with its parent Site values"""
 
-    active_der_settings, deleted_der_settings = await fetch_entities_with_archive_by_datetime(
+    active_der_settings, deleted_der_settings = await fetch_site_scoped_entities_by_changed_at(
         session, SiteDERSetting, ArchiveSiteDERSetting, timestamp
     )
 
-    referenced_site_ids = {
-        e.site_id
-        for e in cast(
-            Iterable[SiteDERSetting | ArchiveSiteDERSetting],
-            chain(active_der_settings, deleted_der_settings),
-        )
-    }
-
-    active_sites, deleted_sites = await fetch_entities_with_archive_by_id(
-        session, Site, ArchiveSite, referenced_site_ids
-    )
-
-    # Map the "site" relationship for every der setting
-    orm_relationship_map_parent_entities(
-        cast(
-            Iterable[SiteDERSetting | ArchiveSiteDERSetting],
-            chain(active_der_settings, deleted_der_settings),
-        ),
-        lambda e: e.site_id,
-        {e.site_id: e for e in cast(Iterable[Site | ArchiveSite], chain(active_sites, deleted_sites))},
-        "site",
-    )
-
     return AggregatorBatchedEntities(
-        timestamp, SubscriptionResource.SITE_DER_SETTING, active_der_settings, deleted_der_settings
+        timestamp,
+        SubscriptionResource.SITE_DER_SETTING,
+        active_der_settings,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_der_settings,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
 
 async def fetch_der_status_by_changed_at(
     session: AsyncSession, timestamp: datetime
-) -> AggregatorBatchedEntities[SiteDERStatus, ArchiveSiteDERStatus]:
+) -> AggregatorBatchedEntities[SiteScopedEntity[SiteDERStatus], SiteScopedEntity[ArchiveSiteDERStatus]]:  # type: ignore # SiteScoped variables will work here - tests enforce it
     """Fetches all der status matching the specified changed_at and returns them keyed by their
     aggregator/site id
 
-    Will include the SiteDERStatus.site relationship"""
+    Each SiteDERStatus will be wrapped with its parent Site values"""
 
-    active_der_statuses, deleted_der_statuses = await fetch_entities_with_archive_by_datetime(
+    active_der_statuses, deleted_der_statuses = await fetch_site_scoped_entities_by_changed_at(
         session, SiteDERStatus, ArchiveSiteDERStatus, timestamp
     )
 
-    referenced_site_ids = {
-        e.site_id
-        for e in cast(
-            Iterable[SiteDERStatus | ArchiveSiteDERStatus],
-            chain(active_der_statuses, deleted_der_statuses),
-        )
-    }
-
-    active_sites, deleted_sites = await fetch_entities_with_archive_by_id(
-        session, Site, ArchiveSite, referenced_site_ids
-    )
-
-    # Map the "site" relationship for every der status
-    orm_relationship_map_parent_entities(
-        cast(
-            Iterable[SiteDERStatus | ArchiveSiteDERStatus],
-            chain(active_der_statuses, deleted_der_statuses),
-        ),
-        lambda e: e.site_id,
-        {e.site_id: e for e in cast(Iterable[Site | ArchiveSite], chain(active_sites, deleted_sites))},
-        "site",
-    )
-
     return AggregatorBatchedEntities(
-        timestamp, SubscriptionResource.SITE_DER_STATUS, active_der_statuses, deleted_der_statuses
+        timestamp,
+        SubscriptionResource.SITE_DER_STATUS,
+        active_der_statuses,  # type: ignore # SiteScoped variables will work here - tests enforce it
+        deleted_der_statuses,  # type: ignore # SiteScoped variables will work here - tests enforce it
     )
 
 
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import TypeVar
+from typing import Generic, TypeVar
 
 from envoy.server.model.archive.doe import (
     ArchiveDynamicOperatingEnvelope,
@@ -81,6 +81,32 @@ class ArchiveSiteScopedSiteControlGroupDefault:
     original: ArchiveSiteControlGroupDefault
 
 
+TSiteScopedModel = TypeVar("TSiteScopedModel")
+
+
+@dataclass(slots=True)
+class SiteScopedEntity(Generic[TSiteScopedModel]):
+    """An entity (or archived entity) belonging to a Site - alongside the values from that parent Site (which may
+    also be archived) that are required for batching notifications. Replaces populating the ORM "site" relationship"""
+
+    aggregator_id: int
+    site_id: int
+    timezone_id: str
+    original: TSiteScopedModel  # eg: DynamicOperatingEnvelope or ArchiveDynamicOperatingEnvelope
+
+
+@dataclass(slots=True)
+class SiteScopedSiteReading:
+    """A SiteReading (or archived SiteReading) alongside the values from the parent SiteReadingType (which may also
+    be archived) that are required for batching notifications. Replaces populating the ORM "site_reading_type"
+    relationship"""
+
+    aggregator_id: int
+    site_id: int
+    group_id: int
+    original: SiteReading  # Can also be a (duck typed) ArchiveSiteReading
+
+
 TResourceModel = TypeVar(
     "TResourceModel",
     Site,
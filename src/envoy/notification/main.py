@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 from envoy.notification.exception import NotificationError
 from envoy.notification.handler import MtlsConfig, build_tls_verify
+from envoy.notification.registry import SubscriptionRegistry
 from envoy.notification.settings import AppSettings, generate_settings
 from envoy.notification.task.check import process_check_batch
 from envoy.notification.task.transmit import process_transmit_batch
@@ -44,10 +45,11 @@ async def run_poll_loop(
     notification_transmit rows) then sends due transmissions; it keeps draining while there is work and otherwise
     sleeps for notification_poll_seconds. Runs until stop_event is set."""
     logger.info("Notification worker started")
+    registry = SubscriptionRegistry()  # Kept for the lifetime of the worker - refreshed as checks are claimed
     while not stop_event.is_set():
         try:
             checks = await process_check_batch(
-                session_maker, settings.href_prefix, settings.notification_check_batch_size
+                session_maker, settings.href_prefix, settings.notification_check_batch_size, registry
             )
             transmits = await process_transmit_batch(
                 session_maker, tls_verify, settings.notification_transmit_batch_size
@@ -0,0 +1,133 @@
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.notification.crud.batch import select_subscription_ids_deleted_after, select_subscriptions_changed_after
+from envoy.server.manager.time import utc_now
+from envoy.server.model.subscription import Subscription, SubscriptionResource
+
+logger = logging.getLogger(__name__)
+
+# Subscription changed_time/deleted_time values are assigned BEFORE the writing transaction commits so a change can
+# become visible after a later timestamp has already been observed. Each incremental refresh will re-read changes this
+# far behind the previous refresh to catch these.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+# How often the registry is discarded and entirely reloaded (a backstop for anything REFRESH_OVERLAP can't catch)
+FULL_RELOAD_INTERVAL = timedelta(hours=1)
+
+RegistryKey = tuple[int, SubscriptionResource]  # (aggregator_id, resource_type)
+ScopeKey = tuple[int | None, int | None]  # (scoped_site_id, resource_id) - None matching "any"
+
+
+class SubscriptionRegistry:
+    """An in memory copy of every Subscription (with conditions) for use by the notification worker fan-out. This
+    avoids reloading (and re-hydrating) the candidate subscriptions for every notification_check.
+
+    Subscriptions are keyed by (aggregator_id, resource_type) and then indexed by (scoped_site_id, resource_id) so that
+    candidates for a batch of entities can be found without considering every subscription for the aggregator.
+
+    The registry is brought up to date by refresh() which is called each time the worker claims notification_check
+    work (the outbox) - inserts/renewals are found via Subscription.changed_time and deletes via
+    ArchiveSubscription.deleted_time. version is incremented whenever the contents change."""
+
+    version: int
+    _by_id: dict[int, Subscription]
+    _index: dict[RegistryKey, dict[ScopeKey, dict[int, Subscription]]]
+    _refreshed_at: datetime | None  # When the last refresh started
+    _reloaded_at: datetime | None  # When the last full reload started
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._by_id = {}
+        self._index = {}
+        self._refreshed_at = None
+        self._reloaded_at = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, sub: Subscription) -> None:
+        """Adds sub to the registry (replacing any existing subscription with the same subscription_id)"""
+        self.remove(sub.subscription_id)
+        self._by_id[sub.subscription_id] = sub
+        scopes = self._index.setdefault((sub.aggregator_id, sub.resource_type), {})
+        scopes.setdefault((sub.scoped_site_id, sub.resource_id), {})[sub.subscription_id] = sub
+
+    def remove(self, subscription_id: int) -> bool:
+        """Removes the subscription with subscription_id from the registry. Returns True if it was removed"""
+        sub = self._by_id.pop(subscription_id, None)
+        if sub is None:
+            return False
+
+        key = (sub.aggregator_id, sub.resource_type)
+        scope_key = (sub.scoped_site_id, sub.resource_id)
+        scopes = self._index[key]
+        del scopes[scope_key][subscription_id]
+        if not scopes[scope_key]:
+            del scopes[scope_key]
+        if not scopes:
+            del self._index[key]
+        return True
+
+    def candidates(
+        self, aggregator_id: int, resource: SubscriptionResource, scopes: Iterable[ScopeKey] | None
+    ) -> list[Subscription]:
+        """Returns the subscriptions (ordered by subscription_id) for aggregator_id/resource that might apply to
+        entities with the specified (site_id, subscription filter id) scopes. Actual checks will not be made.
+
+        If scopes is None - every subscription for aggregator_id/resource will be returned"""
+        indexed = self._index.get((aggregator_id, resource), None)
+        if not indexed:
+            return []
+
+        matches: dict[int, Subscription] = {}
+        if scopes is None:
+            for subs in indexed.values():
+                matches.update(subs)
+        else:
+            # Unscoped subscriptions apply to everything, otherwise the site and/or resource_id must match
+            scope_keys: set[ScopeKey] = {(None, None)}
+            for site_id, filter_id in scopes:
+                scope_keys.update([(site_id, None), (None, filter_id), (site_id, filter_id)])
+            for scope_key in scope_keys:
+                matches.update(indexed.get(scope_key, {}))
+
+        return [matches[sub_id] for sub_id in sorted(matches)]
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Brings the registry up to date with the subscriptions in the database. The first refresh (and every
+        FULL_RELOAD_INTERVAL after that) will load every subscription, otherwise only the changes since the last
+        refresh will be loaded."""
+        now = utc_now()
+        changed = False
+        if self._refreshed_at is None or self._reloaded_at is None or (now - self._reloaded_at) >= FULL_RELOAD_INTERVAL:
+            subs = await select_subscriptions_changed_after(session, None)
+            self._by_id.clear()
+            self._index.clear()
+            for sub in subs:
+                self.add(sub)
+            self._reloaded_at = now
+            changed = True
+        else:
+            since = self._refreshed_at - REFRESH_OVERLAP
+            subs = await select_subscriptions_changed_after(session, since)
+            for sub in subs:
+                existing = self._by_id.get(sub.subscription_id, None)
+                if existing is None or existing.changed_time != sub.changed_time:
+                    self.add(sub)
+                    changed = True
+
+            for subscription_id in await select_subscription_ids_deleted_after(session, since):
+                changed = self.remove(subscription_id) or changed
+
+        # The registry outlives session - detach everything so that it's not expired/refreshed by session activity
+        for sub in subs:
+            session.expunge(sub)
+
+        self._refreshed_at = now
+        if changed:
+            self.version += 1
+            logger.debug("SubscriptionRegistry updated to version %d (%d subscriptions)", self.version, len(self))
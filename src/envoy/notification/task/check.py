@@ -26,16 +26,18 @@ from envoy.notification.crud.batch import (
     fetch_sites_by_changed_at,
     get_site_id,
     get_subscription_filter_id,
-    select_subscriptions_for_resource,
 )
 from envoy.notification.crud.common import (
+    SiteScopedEntity,
     SiteScopedFunctionSetAssignment,
     SiteScopedSiteControlGroup,
     SiteScopedSiteControlGroupDefault,
+    SiteScopedSiteReading,
     TArchiveResourceModel,
     TResourceModel,
 )
 from envoy.notification.exception import NotificationError
+from envoy.notification.registry import SubscriptionRegistry
 from envoy.server.crud.site import VIRTUAL_END_DEVICE_SITE_ID
 from envoy.server.manager.server import RuntimeServerConfigManager, _map_server_config
 from envoy.server.manager.time import utc_now
@@ -44,7 +46,6 @@ from envoy.server.mapper.sep2.pub_sub import NotificationMapper, NotificationTyp
 from envoy.server.model.config.server import RuntimeServerConfig
 from envoy.server.model.doe import DynamicOperatingEnvelope
 from envoy.server.model.site import Site, SiteDERAvailability, SiteDERRating, SiteDERSetting, SiteDERStatus
-from envoy.server.model.site_reading import SiteReading
 from envoy.server.model.subscription import (
     NotificationCheck,
     NotificationTransmit,
@@ -190,7 +191,7 @@ def entities_serviced_by_subscription(
                 if c.attribute == ConditionAttributeIdentifier.READING_VALUE:
                     # If the reading is within the condition thresholds - don't include it
                     # (we only want values out of range)
-                    reading_value = cast(SiteReading, e).value
+                    reading_value = cast(SiteScopedSiteReading, e).original.value
                     low_range = c.lower_threshold is None or reading_value < c.lower_threshold
                     high_range = c.upper_threshold is None or reading_value > c.upper_threshold
 
@@ -261,7 +262,7 @@ def entities_to_notification(
             tariff_id=tariff_id,
             day=day,
             pricing_reading_type=pricing_reading_type,
-            rates=cast(Sequence[TariffGeneratedRate], entities),
+            rates=[e.original for e in cast(Sequence[SiteScopedEntity[TariffGeneratedRate]], entities)],
             sub=sub,
             scope=scope,
             notification_type=notification_type,
@@ -271,7 +272,7 @@ def entities_to_notification(
         _, _, site_control_group_id = batch_key
         return NotificationMapper.map_does_to_response(
             site_control_group_id=site_control_group_id,
-            does=cast(Sequence[DynamicOperatingEnvelope], entities),
+            does=[e.original for e in cast(Sequence[SiteScopedEntity[DynamicOperatingEnvelope]], entities)],
             sub=sub,
             scope=scope,
             notification_type=notification_type,
@@ -291,7 +292,7 @@ def entities_to_notification(
         _, _, group_id = batch_key
         return NotificationMapper.map_readings_to_response(
             group_id,
-            cast(Sequence[SiteReading], entities),
+            [e.original for e in cast(Sequence[SiteScopedSiteReading], entities)],
             sub,
             scope,
             notification_type,
@@ -299,28 +300,28 @@ def entities_to_notification(
     elif resource == SubscriptionResource.SITE_DER_AVAILABILITY:
         # SITE_DER_AVAILABILITY: (aggregator_id: int, site_id: int, site_der_id: int)
         _, site_id, site_der_id = batch_key
-        availability = cast(SiteDERAvailability, entities[0]) if len(entities) > 0 else None
+        availability = cast(SiteScopedEntity[SiteDERAvailability], entities[0]).original if len(entities) > 0 else None
         return NotificationMapper.map_der_availability_to_response(
             site_der_id, availability, site_id, sub, scope, notification_type
         )  # We will only EVER have single element lists for this resource
     elif resource == SubscriptionResource.SITE_DER_RATING:
         # SITE_DER_RATING: (aggregator_id: int, site_id: int, site_der_id: int)
         _, site_id, site_der_id = batch_key
-        rating = cast(SiteDERRating, entities[0]) if len(entities) > 0 else None
+        rating = cast(SiteScopedEntity[SiteDERRating], entities[0]).original if len(entities) > 0 else None
         return NotificationMapper.map_der_rating_to_response(
             site_der_id, rating, site_id, sub, scope, notification_type
         )  # We will only EVER have single element lists for this resource
     elif resource == SubscriptionResource.SITE_DER_SETTING:
         # SITE_DER_SETTING: (aggregator_id: int, site_id: int, site_der_id: int)
         _, site_id, site_der_id = batch_key
-        settings = cast(SiteDERSetting, entities[0]) if len(entities) > 0 else None
+        settings = cast(SiteScopedEntity[SiteDERSetting], entities[0]).original if len(entities) > 0 else None
         return NotificationMapper.map_der_settings_to_response(
             site_der_id, settings, site_id, sub, scope, notification_type
         )  # We will only EVER have single element lists for this resource
     elif resource == SubscriptionResource.SITE_DER_STATUS:
         # SITE_DER_STATUS: (aggregator_id: int, site_id: int, site_der_id: int)
         _, site_id, site_der_id = batch_key
-        status = cast(SiteDERStatus, entities[0]) if len(entities) > 0 else None
+        status = cast(SiteScopedEntity[SiteDERStatus], entities[0]).original if len(entities) > 0 else None
         return NotificationMapper.map_der_status_to_response(
             site_der_id, status, site_id, sub, scope, notification_type
         )  # We will only EVER have single element lists for this resource
@@ -391,6 +392,7 @@ async def check_db_change_or_delete(
     timestamp: datetime,
     href_prefix: str | None,
     config: RuntimeServerConfig,
+    registry: SubscriptionRegistry,
 ) -> None:
     """Inspects a particular timestamp within a particular named resource that has had a batch of inserts/updates/
     deletes - such that requesting all records with that changed_at timestamp will yield all resources to be inspected
@@ -401,7 +403,8 @@ async def check_db_change_or_delete(
 
     resource: The resource that is being checked for changes
     timestamp: The changed_at/deleted_time that will be used for finding resources (must be exact match)
-    config: The current runtime server config (used when mapping entities to notifications)"""
+    config: The current runtime server config (used when mapping entities to notifications)
+    registry: The (already refreshed) source of candidate subscriptions"""
 
     logger.debug("check_db_change_or_delete for resource %s at timestamp %s", resource, timestamp)
 
@@ -409,16 +412,16 @@ async def check_db_change_or_delete(
 
     # Now generate subscription notifications
     all_notifications: list[NotificationEntities] = []
-    aggregator_subs_cache: dict[int, Sequence[Subscription]] = {}  # keyed by aggregator_id
     for batch_key, agg_id, entities, notification_type in all_entity_batches(
         batched_entities.models_by_batch_key, batched_entities.deleted_by_batch_key
     ):
-        # We enumerate by aggregator ID at the top level (as a way of minimising the size of entities)
-        # We also cache the per aggregator subscriptions to minimise round trips to the db
-        candidate_subscriptions = aggregator_subs_cache.get(agg_id, None)
-        if candidate_subscriptions is None:
-            candidate_subscriptions = await select_subscriptions_for_resource(session, agg_id, resource)
-            aggregator_subs_cache[agg_id] = candidate_subscriptions
+        # Only consider the subscriptions that are unscoped or scoped to the sites/resources in this batch. An empty
+        # batch (eg a List pollRate change) applies to every subscription for the aggregator/resource
+        if entities:
+            scopes = set((get_site_id(resource, e), get_subscription_filter_id(resource, e)) for e in entities)
+            candidate_subscriptions = registry.candidates(agg_id, resource, scopes)
+        else:
+            candidate_subscriptions = registry.candidates(agg_id, resource, None)
 
         for sub in candidate_subscriptions:
             # Break the entities that apply to this subscription down into "pages" according to
@@ -488,14 +491,20 @@ async def check_db_change_or_delete(
 
 
 async def process_check_batch(
-    session_maker: async_sessionmaker[AsyncSession], href_prefix: str | None, batch_size: int
+    session_maker: async_sessionmaker[AsyncSession],
+    href_prefix: str | None,
+    batch_size: int,
+    registry: SubscriptionRegistry | None = None,
 ) -> int:
     """Claims and processes a batch of pending notification_check rows (with SELECT ... FOR UPDATE SKIP LOCKED so it's
     safe to run multiple workers). For each claimed check the matching subscriptions are fanned out into
     notification_transmit rows and the check row is deleted. Each check is processed inside its own savepoint so that a
     single failing check only rolls back its own (partial) fan-out - the rest of the batch still commits. A check that
     fails has its attempt counter incremented and is dropped (logged) once it exhausts MAX_CHECK_ATTEMPTS so it can't
-    wedge the queue. Returns the number of checks processed."""
+    wedge the queue. Returns the number of checks processed.
+
+    registry: The worker's SubscriptionRegistry - refreshed once per claimed batch. If None, a new registry will be
+    loaded for this batch only."""
     async with session_maker() as session:
         async with session.begin():
             # The FOR UPDATE SKIP LOCKED claim only stays multi-worker friendly while the planner can satisfy this
@@ -513,12 +522,16 @@ async def process_check_batch(
             if not checks:
                 return 0
 
+            if registry is None:
+                registry = SubscriptionRegistry()
+            await registry.refresh(session)
+
             config = await RuntimeServerConfigManager.fetch_current_config(session)
             for check in checks:
                 try:
                     async with session.begin_nested():
                         await check_db_change_or_delete(
-                            session, check.resource_type, check.changed_time, href_prefix, config
+                            session, check.resource_type, check.changed_time, href_prefix, config, registry
                         )
                         await session.delete(check)
                 except Exception as exc:
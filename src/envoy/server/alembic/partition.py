@@ -0,0 +1,99 @@
+"""Helpers shared by the migrations that convert existing tables into monthly RANGE partitioned tables.
+
+These are executed as part of historical migrations - any change made here will change what those migrations do."""
+
+from dataclasses import dataclass, field
+
+from alembic import op
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """Describes a table being converted to/from a table that's RANGE partitioned (monthly) on partition_column"""
+
+    table: str
+    id_col: str  # The (single column) primary key of the unpartitioned table
+    sequence: str  # The sequence that generates id_col values (retained across the conversion)
+    partition_column: str  # The timestamp column that the table is partitioned on
+    indexes: list[tuple[str, str]] = field(default_factory=list)  # (index_name, index_columns) non unique indexes
+    dropped_constraints: list[str] = field(default_factory=list)  # Constraints (other than the pkey) to drop/recreate
+    constraints_sql: list[str] = field(default_factory=list)  # Recreates dropped_constraints on the new table
+
+
+def create_month_partitions(t: PartitionedTable, source_table: str, months_ahead: int) -> None:
+    """Creates a monthly partition of t for every month of data currently in source_table and for the current month
+    (+ months_ahead months)."""
+    op.execute(
+        f"""
+    DO $$
+    DECLARE
+        month_start TIMESTAMPTZ;
+    BEGIN
+        FOR month_start IN
+            SELECT DISTINCT (date_trunc('month', {t.partition_column} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')
+            FROM {source_table}
+            UNION
+            SELECT (date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') + make_interval(months => m)
+            FROM generate_series(0, {months_ahead}) AS m
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF {t.table} FOR VALUES FROM (%L) TO (%L)',
+                '{t.table}_p' || to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM'),
+                month_start,
+                month_start + interval '1 month'
+            );
+        END LOOP;
+    END $$;
+    """  # noqa: S608  # nosec B608
+    )
+
+
+def _detach_table(t: PartitionedTable, renamed_table: str) -> None:
+    """Moves t out of the way (as renamed_table) dropping its constraints/indexes so the names can be reused"""
+    op.execute(f"ALTER SEQUENCE {t.sequence} OWNED BY NONE")
+    op.execute(f"ALTER TABLE {t.table} RENAME TO {renamed_table}")
+    op.execute(f"ALTER TABLE {renamed_table} DROP CONSTRAINT {t.table}_pkey")
+    for index_name, _ in t.indexes:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    for constraint in t.dropped_constraints:
+        op.execute(f"ALTER TABLE {renamed_table} DROP CONSTRAINT {constraint}")
+
+
+def _add_constraints_and_indexes(t: PartitionedTable, pkey_cols: str) -> None:
+    op.execute(f"ALTER TABLE {t.table} ADD CONSTRAINT {t.table}_pkey PRIMARY KEY ({pkey_cols})")
+    for sql in t.constraints_sql:
+        op.execute(sql)
+    for index_name, index_cols in t.indexes:
+        op.execute(f"CREATE INDEX {index_name} ON {t.table} ({index_cols})")
+
+
+def partition_table(t: PartitionedTable, months_ahead: int) -> None:
+    """Replaces t with an equivalent table that's RANGE partitioned on t.partition_column. The original data is copied
+    across and the original id sequence is retained."""
+    unpartitioned = f"{t.table}_unpartitioned"
+    _detach_table(t, unpartitioned)
+
+    op.execute(
+        f"CREATE TABLE {t.table} (LIKE {unpartitioned} INCLUDING DEFAULTS) PARTITION BY RANGE ({t.partition_column})"
+    )
+    _add_constraints_and_indexes(t, f"{t.id_col}, {t.partition_column}")
+
+    op.execute(f"CREATE TABLE {t.table}_default PARTITION OF {t.table} DEFAULT")
+    create_month_partitions(t, unpartitioned, months_ahead)
+
+    op.execute(f"INSERT INTO {t.table} SELECT * FROM {unpartitioned}")  # noqa: S608  # nosec B608
+    op.execute(f"DROP TABLE {unpartitioned}")
+    op.execute(f"ALTER SEQUENCE {t.sequence} OWNED BY {t.table}.{t.id_col}")
+
+
+def unpartition_table(t: PartitionedTable) -> None:
+    """Reverses partition_table - replacing the partitioned table with a regular table (keeping all data)"""
+    partitioned = f"{t.table}_partitioned"
+    _detach_table(t, partitioned)
+
+    op.execute(f"CREATE TABLE {t.table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO {t.table} SELECT * FROM {partitioned}")  # noqa: S608  # nosec B608
+    op.execute(f"DROP TABLE {partitioned} CASCADE")  # Will also drop all partitions
+
+    _add_constraints_and_indexes(t, t.id_col)
+    op.execute(f"ALTER SEQUENCE {t.sequence} OWNED BY {t.table}.{t.id_col}")
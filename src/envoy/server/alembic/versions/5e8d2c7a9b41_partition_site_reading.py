@@ -0,0 +1,56 @@
+"""partition_site_reading
+
+Revision ID: 5e8d2c7a9b41
+Revises: a1c4f7e9d2b8
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from envoy.server.alembic.partition import PartitionedTable, partition_table, unpartition_table
+
+# revision identifiers, used by Alembic.
+revision = "5e8d2c7a9b41"
+down_revision = "a1c4f7e9d2b8"
+branch_labels = None
+depends_on = None
+
+# How many months (beyond the current month) will have partitions pre created by this migration. Subsequent months
+# will be created by the partition maintenance task (or will land in the DEFAULT partition until then)
+MONTHS_AHEAD = 3
+
+_TABLES = [
+    PartitionedTable(
+        table="site_reading",
+        id_col="site_reading_id",
+        sequence="site_reading_site_reading_id_seq",
+        partition_column="time_period_start",
+        indexes=[("ix_site_reading_changed_time", "changed_time")],
+        dropped_constraints=["site_reading_type_id_time_period_start_uc", "site_reading_site_reading_type_id_fkey"],
+        constraints_sql=[
+            "ALTER TABLE site_reading ADD CONSTRAINT site_reading_type_id_time_period_start_uc "
+            "UNIQUE (site_reading_type_id, time_period_start)",
+            "ALTER TABLE site_reading ADD CONSTRAINT site_reading_site_reading_type_id_fkey "
+            "FOREIGN KEY (site_reading_type_id) REFERENCES site_reading_type(site_reading_type_id)",
+        ],
+    ),
+    PartitionedTable(
+        table="archive_site_reading",
+        id_col="archive_id",
+        sequence="archive_site_reading_archive_id_seq",
+        partition_column="time_period_start",
+        indexes=[
+            ("ix_archive_site_reading_deleted_time", "deleted_time"),
+            ("ix_archive_site_reading_site_reading_id", "site_reading_id"),
+        ],
+    ),
+]
+
+
+def upgrade() -> None:
+    for t in _TABLES:
+        partition_table(t, MONTHS_AHEAD)
+
+
+def downgrade() -> None:
+    for t in reversed(_TABLES):
+        unpartition_table(t)
@@ -0,0 +1,24 @@
+"""add_ingest_job_claimed_time
+
+Revision ID: a4c6e8f0b2d3
+Revises: d1e3f5a7b9c2
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4c6e8f0b2d3"
+down_revision = "d1e3f5a7b9c2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("ingest_job", sa.Column("claimed_time", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ingest_job", "claimed_time")
@@ -0,0 +1,50 @@
+"""add_archive_deleted_snapshot_indexes
+
+Revision ID: b7d9f1a3c5e6
+Revises: f3a5c7e9b1d2
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7d9f1a3c5e6"
+down_revision = "f3a5c7e9b1d2"
+branch_labels = None
+depends_on = None
+
+# archive table name keyed to the source table primary key column
+ARCHIVE_SOURCE_PKS = {
+    "archive_dynamic_operating_envelope": "dynamic_operating_envelope_id",
+    "archive_site": "site_id",
+    "archive_site_control_group": "site_control_group_id",
+    "archive_site_control_group_default": "site_control_group_default_id",
+    "archive_site_der_availability": "site_der_availability_id",
+    "archive_site_der_rating": "site_der_rating_id",
+    "archive_site_der_setting": "site_der_setting_id",
+    "archive_site_der_status": "site_der_status_id",
+    "archive_site_reading": "site_reading_id",
+    "archive_site_reading_type": "site_reading_type_id",
+    "archive_subscription": "subscription_id",
+    "archive_subscription_condition": "subscription_condition_id",
+    "archive_tariff": "tariff_id",
+    "archive_tariff_generated_rate": "tariff_generated_rate_id",
+}
+
+
+def upgrade() -> None:
+    for table, pk in ARCHIVE_SOURCE_PKS.items():
+        op.create_index(
+            f"{table}_deleted_snapshot",
+            table,
+            [pk, "deleted_time", "archive_time"],
+            unique=False,
+            postgresql_where=sa.text("deleted_time IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    for table in ARCHIVE_SOURCE_PKS:
+        op.drop_index(f"{table}_deleted_snapshot", table_name=table)
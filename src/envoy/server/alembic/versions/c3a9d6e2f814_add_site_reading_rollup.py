@@ -0,0 +1,42 @@
+"""add_site_reading_rollup
+
+Revision ID: c3a9d6e2f814
+Revises: 5e8d2c7a9b41
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3a9d6e2f814"
+down_revision = "5e8d2c7a9b41"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NOTE: Existing readings are NOT rolled up by this migration (it could take a very long time on large tables). The
+    # admin server's rollup backfill task is responsible for populating the rollups for existing readings.
+    op.create_table(
+        "site_reading_rollup",
+        sa.Column("site_reading_type_id", sa.Integer(), nullable=False),
+        sa.Column("resolution_seconds", sa.INTEGER(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("changed_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("reading_count", sa.INTEGER(), nullable=False),
+        sa.Column("value_sum", sa.BigInteger(), nullable=False),
+        sa.Column("value_min", sa.BigInteger(), nullable=False),
+        sa.Column("value_max", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["site_reading_type_id"], ["site_reading_type.site_reading_type_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint(
+            "site_reading_type_id", "resolution_seconds", "bucket_start", name="site_reading_rollup_pkey"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("site_reading_rollup")
@@ -0,0 +1,71 @@
+"""partition_response_log_event
+
+Revision ID: d1e3f5a7b9c2
+Revises: b7d9f1a3c5e6
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from envoy.server.alembic.partition import PartitionedTable, partition_table, unpartition_table
+
+# revision identifiers, used by Alembic.
+revision = "d1e3f5a7b9c2"
+down_revision = "b7d9f1a3c5e6"
+branch_labels = None
+depends_on = None
+
+# How many months (beyond the current month) will have partitions pre created by this migration. Subsequent months
+# will be created by the partition maintenance task (or will land in the DEFAULT partition until then)
+MONTHS_AHEAD = 3
+
+
+def _site_fkey_sql(table: str) -> str:
+    return (
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_site_id_fkey "
+        "FOREIGN KEY (site_id) REFERENCES site(site_id) ON DELETE CASCADE"
+    )
+
+
+def _created_time_partitioned(table: str, id_col: str, sequence: str, index: tuple[str, str]) -> PartitionedTable:
+    """Every table is RANGE partitioned (monthly) on created_time and has a cascading site_id foreign key"""
+    return PartitionedTable(
+        table=table,
+        id_col=id_col,
+        sequence=sequence,
+        partition_column="created_time",
+        indexes=[index],
+        dropped_constraints=[f"{table}_site_id_fkey"],
+        constraints_sql=[_site_fkey_sql(table)],
+    )
+
+
+_TABLES = [
+    _created_time_partitioned(
+        "dynamic_operating_envelope_response",
+        "dynamic_operating_envelope_response_id",
+        "dynamic_operating_envelope_re_dynamic_operating_envelope_re_seq",
+        ("ix_dynamic_operating_envelope_response_site_id_created_time", "site_id, created_time"),
+    ),
+    _created_time_partitioned(
+        "tariff_generated_rate_response",
+        "tariff_generated_rate_response_id",
+        "tariff_generated_rate_respons_tariff_generated_rate_respons_seq",
+        ("ix_tariff_generated_rate_response_site_id_created_time", "site_id, created_time"),
+    ),
+    _created_time_partitioned(
+        "site_log_event",
+        "site_log_event_id",
+        "site_log_event_site_log_event_id_seq",
+        ("site_log_event_site_id_created_time_log_event_id_idx", "site_id, created_time, log_event_id"),
+    ),
+]
+
+
+def upgrade() -> None:
+    for t in _TABLES:
+        partition_table(t, MONTHS_AHEAD)
+
+
+def downgrade() -> None:
+    for t in reversed(_TABLES):
+        unpartition_table(t)
@@ -0,0 +1,42 @@
+"""add_archive_time_indexes
+
+Revision ID: d8f1b3c5e7a2
+Revises: c3a9d6e2f814
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d8f1b3c5e7a2"
+down_revision = "c3a9d6e2f814"
+branch_labels = None
+depends_on = None
+
+ARCHIVE_TABLES = [
+    "archive_dynamic_operating_envelope",
+    "archive_site",
+    "archive_site_control_group",
+    "archive_site_control_group_default",
+    "archive_site_der_availability",
+    "archive_site_der_rating",
+    "archive_site_der_setting",
+    "archive_site_der_status",
+    "archive_site_reading",
+    "archive_site_reading_type",
+    "archive_subscription",
+    "archive_subscription_condition",
+    "archive_tariff",
+    "archive_tariff_generated_rate",
+]
+
+
+def upgrade() -> None:
+    for table in ARCHIVE_TABLES:
+        op.create_index(op.f(f"ix_{table}_archive_time"), table, ["archive_time"], unique=False)
+
+
+def downgrade() -> None:
+    for table in ARCHIVE_TABLES:
+        op.drop_index(op.f(f"ix_{table}_archive_time"), table_name=table)
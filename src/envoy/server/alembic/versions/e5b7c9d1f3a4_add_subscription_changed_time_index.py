@@ -0,0 +1,23 @@
+"""add_subscription_changed_time_index
+
+Revision ID: e5b7c9d1f3a4
+Revises: d8f1b3c5e7a2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5b7c9d1f3a4"
+down_revision = "d8f1b3c5e7a2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_subscription_changed_time"), "subscription", ["changed_time"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_subscription_changed_time"), table_name="subscription")
@@ -0,0 +1,53 @@
+"""add_ingest_job_tables
+
+Revision ID: f3a5c7e9b1d2
+Revises: e5b7c9d1f3a4
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f3a5c7e9b1d2"
+down_revision = "e5b7c9d1f3a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingest_job",
+        sa.Column("ingest_job_id", sa.Integer(), nullable=False),
+        sa.Column("job_type", sa.INTEGER(), nullable=False),
+        sa.Column("site_control_group_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.INTEGER(), nullable=False),
+        sa.Column("created_time", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("changed_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("staged_rows", sa.INTEGER(), nullable=False),
+        sa.Column("applied_rows", sa.INTEGER(), nullable=False),
+        sa.Column("applied_chunks", sa.INTEGER(), nullable=False),
+        sa.Column("error", sa.VARCHAR(length=1024), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["site_control_group_id"], ["site_control_group.site_control_group_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("ingest_job_id"),
+    )
+    op.create_index(op.f("ix_ingest_job_status"), "ingest_job", ["status"], unique=False)
+
+    op.create_table(
+        "ingest_job_row",
+        sa.Column("ingest_job_id", sa.Integer(), nullable=False),
+        sa.Column("row_number", sa.INTEGER(), nullable=False),
+        sa.Column("site_id", sa.INTEGER(), nullable=False),
+        sa.Column("payload", sa.TEXT(), nullable=False),
+        sa.ForeignKeyConstraint(["ingest_job_id"], ["ingest_job.ingest_job_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ingest_job_id", "row_number"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ingest_job_row")
+    op.drop_index(op.f("ix_ingest_job_status"), table_name="ingest_job")
+    op.drop_table("ingest_job")
@@ -1,8 +1,12 @@
+import hashlib
 import logging
+from asyncio import to_thread
+from collections import OrderedDict
 from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
+from typing import Any
 from urllib.parse import quote
 
 import jwt
@@ -11,6 +15,8 @@ from httpx import AsyncClient
 from envoy.server.api.auth.jwks import JWK, decode_b64_bytes_to_int, rsa_pem_from_jwk
 from envoy.server.cache import AsyncCache, ExpiringValue
 from envoy.server.exception import InternalError, UnauthorizedError
+from envoy.server.manager.time import utc_now
+from envoy.server.metrics import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +58,104 @@ _TOKEN_URI_FORMAT = "http://169.254.169.254/metadata/identity/oauth2/token?api-v
 _PUBLIC_KEY_URI_FORMAT = "https://login.microsoftonline.com/{tenant_id}/discovery/v2.0/keys"
 TOKEN_EXPIRY_BUFFER_SECONDS = 120  # Tokens will have their expiry reduced by this many seconds (to act as a buffer)
 REQUEST_TIMEOUT_SECONDS = 60
+DEFAULT_VALIDATED_TOKEN_CACHE_MAX_SIZE = 1024  # How many validated tokens will be held in memory (LRU eviction)
+DEFAULT_VALIDATED_TOKEN_EXPIRY_BUFFER_SECONDS = 30  # Validated tokens will be evicted this many seconds before "exp"
+
+
+class ValidatedTokenCache:
+    """A bounded, in memory cache of Azure AD tokens that have ALREADY been fully validated (signature, audience,
+    issuer etc). Entries are keyed by a SHA256 hash of the raw token (the token itself is never retained) and hold
+    the verified claims until the token "exp" (minus expiry_buffer_seconds). Least recently used entries are evicted
+    once max_size is reached.
+
+    Lookups and evictions are also recorded against the process wide MetricsRegistry (if metrics are enabled).
+
+    This cache is "async safe" (no awaits occur during access) but it is NOT thread safe."""
+
+    _cache: OrderedDict[bytes, ExpiringValue[dict[str, Any]]]
+    max_size: int
+    expiry_buffer_seconds: int
+
+    hits: int  # Number of lookups that were served from the cache
+    misses: int  # Number of lookups that required full validation
+    evictions: int  # Number of entries removed to keep the cache under max_size
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_VALIDATED_TOKEN_CACHE_MAX_SIZE,
+        expiry_buffer_seconds: int = DEFAULT_VALIDATED_TOKEN_EXPIRY_BUFFER_SECONDS,
+    ) -> None:
+        self._cache = OrderedDict()
+        self.max_size = max_size
+        self.expiry_buffer_seconds = expiry_buffer_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _token_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction (0 -> 1) of lookups served from the cache. 0 if no lookups have occurred"""
+        total = self.hits + self.misses
+        return (self.hits / total) if total else 0.0
+
+    def _record_lookup(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        registry = get_metrics_registry()
+        if registry is not None:
+            registry.azure_ad_token_cache_lookups.inc(("hit" if hit else "miss",))
+
+    def clear(self) -> None:
+        """Removes all cached tokens (metric counters are left untouched)"""
+        self._cache.clear()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Returns the previously validated claims for token or None if token isn't cached (or has expired)"""
+        key = self._token_key(token)
+        expiring_value = self._cache.get(key, None)
+        if expiring_value is None:
+            self._record_lookup(False)
+            return None
+
+        if expiring_value.is_expired():
+            del self._cache[key]
+            self._record_lookup(False)
+            return None
+
+        self._cache.move_to_end(key)
+        self._record_lookup(True)
+        return expiring_value.value
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        """Stores the validated claims for token. Tokens without a numeric "exp" claim (or ones that will expire within
+        expiry_buffer_seconds) will NOT be cached as there is no safe expiry to assign."""
+        exp = claims.get("exp", None) if isinstance(claims, dict) else None
+        if isinstance(exp, bool) or not isinstance(exp, int | float):
+            return
+
+        expiry = datetime.fromtimestamp(exp, tz=UTC) - timedelta(seconds=self.expiry_buffer_seconds)
+        if expiry <= utc_now():
+            return
+
+        key = self._token_key(token)
+        self._cache[key] = ExpiringValue(expiry=expiry, value=claims)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+            registry = get_metrics_registry()
+            if registry is not None:
+                registry.azure_ad_token_cache_evictions.inc()
 
 
 def parse_from_jwks_json(keys: Iterable[dict[str, str]]) -> dict[str, ExpiringValue[JWK]]:
@@ -117,11 +221,15 @@ async def update_jwk_cache(cfg: AzureADManagedIdentityConfig) -> dict[str, Expir
         return updated_cache
 
 
-async def validate_azure_ad_token(cfg: AzureADManagedIdentityConfig, cache: AsyncCache[str, JWK], token: str) -> None:
+async def validate_azure_ad_token(
+    cfg: AzureADManagedIdentityConfig, cache: AsyncCache[str, JWK], token: str
+) -> dict[str, Any]:
     """
     Given a raw JSON Web Token from Azure AD - decompose and validate that it's authorised for accessing this
     server instance (defined by cfg). This function will utilise an internal cache to minimise outgoing validation
-    requests
+    requests. The (CPU heavy) signature verification is run in a worker thread to avoid blocking the event loop.
+
+    Returns the decoded (validated) claims of the token
 
     raises UnableToContactAzureServicesError if the underlying Azure AD services cant be accessed
     raises UnauthorizedError if the token is malformed
@@ -142,7 +250,8 @@ async def validate_azure_ad_token(cfg: AzureADManagedIdentityConfig, cache: Asyn
         raise UnauthorizedError(f"jwk key_id '{key_id}' not found")
 
     # Decode / Validate the token
-    decoded = jwt.decode(
+    decoded = await to_thread(
+        jwt.decode,
         token,
         jwk.pem_public,
         verify=True,
@@ -152,6 +261,7 @@ async def validate_azure_ad_token(cfg: AzureADManagedIdentityConfig, cache: Asyn
     )
 
     logger.debug(f"Validated token {decoded}")
+    return decoded
 
 
 async def request_azure_ad_token(cfg: AzureADResourceTokenConfig) -> AzureADToken:
@@ -4,8 +4,11 @@ import jwt
 from fastapi import HTTPException, Request
 
 from envoy.server.api.auth.azure import (
+    DEFAULT_VALIDATED_TOKEN_CACHE_MAX_SIZE,
+    DEFAULT_VALIDATED_TOKEN_EXPIRY_BUFFER_SECONDS,
     AzureADManagedIdentityConfig,
     UnableToContactAzureServicesError,
+    ValidatedTokenCache,
     update_jwk_cache,
     validate_azure_ad_token,
 )
@@ -18,17 +21,31 @@ class AzureADAuthDepends:
     """Dependency class for handling authentication from an Azure Active Directory deployment that will be receiving
     a JWT bearer token signed by an IDP for the specified tenant. It will be using the VM managed identity
     for all parties (services forwarding the requests and the host for this server instance)
+
+    Successfully validated tokens are cached (until shortly before they expire) so that repeated requests with the
+    same bearer token skip the signature verification entirely.
     """
 
     ad_config: AzureADManagedIdentityConfig
     cache: AsyncCache[str, JWK]
+    token_cache: ValidatedTokenCache
 
-    def __init__(self, tenant_id: str, client_id: str, valid_issuer: str) -> None:
+    def __init__(
+        self,
+        tenant_id: str,
+        client_id: str,
+        valid_issuer: str,
+        token_cache_max_size: int = DEFAULT_VALIDATED_TOKEN_CACHE_MAX_SIZE,
+        token_cache_expiry_buffer_seconds: int = DEFAULT_VALIDATED_TOKEN_EXPIRY_BUFFER_SECONDS,
+    ) -> None:
         # fastapi will always return headers in lowercase form
         self.ad_config = AzureADManagedIdentityConfig(
             tenant_id=tenant_id, client_id=client_id, valid_issuer=valid_issuer
         )
         self.cache = AsyncCache(update_fn=update_jwk_cache)
+        self.token_cache = ValidatedTokenCache(
+            max_size=token_cache_max_size, expiry_buffer_seconds=token_cache_expiry_buffer_seconds
+        )
 
     async def __call__(self, request: Request) -> None:
         # Extract bearer token
@@ -48,8 +65,12 @@ class AzureADAuthDepends:
 
         token = token_parts[1]
 
+        # If we've seen (and fully validated) this token recently - there is no need to validate it again
+        if self.token_cache.get(token) is not None:
+            return
+
         try:
-            await validate_azure_ad_token(self.ad_config, self.cache, token)
+            claims = await validate_azure_ad_token(self.ad_config, self.cache, token)
         except UnableToContactAzureServicesError as exc:
             raise HTTPException(
                 status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail="Unable to access auth services."
@@ -60,3 +81,5 @@ class AzureADAuthDepends:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="Invalid Azure AD Token") from exc
         except Exception as exc:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="Unknown error") from exc
+
+        self.token_cache.put(token, claims)
@@ -0,0 +1,11 @@
+from fastapi import Request
+
+from envoy.server.health_monitor import HealthMonitor
+
+HEALTH_MONITOR_ATTR = "health_monitor"
+
+
+def fetch_health_monitor(request: Request) -> HealthMonitor | None:
+    """Fetches the HealthMonitor from FastAPI app state (stored under HEALTH_MONITOR_ATTR during application startup).
+    Returns None if background health checks aren't enabled (checks should be run on demand)"""
+    return getattr(request.app.state, HEALTH_MONITOR_ATTR, None)
@@ -3,6 +3,7 @@ import binascii
 import logging
 import re
 import urllib.parse
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
 from cryptography.hazmat.primitives import hashes
@@ -12,9 +13,10 @@ from fastapi_async_sqlalchemy import db
 
 from envoy.server.api.error_handler import LoggedHttpException
 from envoy.server.cache import AsyncCache, ExpiringValue
-from envoy.server.crud.auth import ClientIdDetails, select_all_client_id_details
+from envoy.server.crud.auth import ClientIdDetails, select_all_client_id_details, select_client_id_details
 from envoy.server.crud.common import convert_lfdi_to_sfdi
 from envoy.server.crud.site import select_single_site_with_sfdi
+from envoy.server.manager.time import utc_now
 from envoy.server.model.aggregator import NULL_AGGREGATOR_ID
 from envoy.server.request_scope import CertificateType
 
@@ -24,6 +26,10 @@ logger = logging.getLogger(__name__)
 class LFDIAuthError(Exception): ...  # noqa: E701
 
 
+# How long (at most) an aggregator certificate lookup will be cached before being reloaded from the DB
+DEFAULT_LFDI_AUTH_CACHE_TTL_SECONDS = 60.0
+
+
 # NOTE: The below `is_valid_x` functions are ONLY checking format validity, nothing else.
 def is_valid_lfdi(lfdi_str: str) -> bool:
     """Checks if string has valid lfdi format - 40 char long and hexadecimal (case-insensitive)"""
@@ -66,7 +72,16 @@ def is_valid_pem(pem_str: str) -> bool:
     return True
 
 
-async def update_client_id_details_cache(_: object) -> dict[str, ExpiringValue[ClientIdDetails]]:
+def client_id_details_cache_expiry(cid: ClientIdDetails, cache_ttl_seconds: float | None) -> datetime:
+    """Calculates when the cached ClientIdDetails for cid should be reloaded. This is the certificate expiry, capped at
+    cache_ttl_seconds from now (if set) so that admin changes (eg unassigning/deleting the certificate) will be picked
+    up by the next request after the ttl."""
+    if cache_ttl_seconds is None:
+        return cid.expiry
+    return min(cid.expiry, utc_now() + timedelta(seconds=cache_ttl_seconds))
+
+
+async def update_client_id_details_cache(cache_ttl_seconds: float | None) -> dict[str, ExpiringValue[ClientIdDetails]]:
     """To be called on cache miss. Updates the entire clientIdDetails cache with active (non-expired) client details
     from the Certificate and AggregatorCertificateAssignment tables.
     """
@@ -74,9 +89,28 @@ async def update_client_id_details_cache(_: object) -> dict[str, ExpiringValue[C
     # We create a fresh session here to ensure that anything fetched from the DB does NOT pollute the
     # session used by the rest of the request - This is out of an abundance of paranoia
     async with db():
-        # This will include expired certs
+        # This will include expired certs. Certs with multiple assignments resolve to their last (most recent) one
         client_ids = await select_all_client_id_details(db.session)
-    return {cid.lfdi: ExpiringValue(expiry=cid.expiry, value=cid) for cid in client_ids}
+    return {
+        cid.lfdi: ExpiringValue(expiry=client_id_details_cache_expiry(cid, cache_ttl_seconds), value=cid)
+        for cid in client_ids
+    }
+
+
+async def update_client_id_details_cache_entry(
+    cache_ttl_seconds: float | None, lfdi: str
+) -> ExpiringValue[ClientIdDetails] | None:
+    """To be called on cache miss. Fetches the (expired or not) client details for a single lfdi so that the cache
+    can be updated incrementally. Provisioning a large number of new aggregator certificates will then only cost a
+    single (indexed) lookup as each certificate is first seen, rather than a reload of every certificate.
+    """
+
+    # Fresh session for the same reasons as update_client_id_details_cache
+    async with db():
+        cid = await select_client_id_details(db.session, lfdi)
+    return (
+        None if cid is None else ExpiringValue(expiry=client_id_details_cache_expiry(cid, cache_ttl_seconds), value=cid)
+    )
 
 
 class LFDIAuthDepends:
@@ -91,13 +125,22 @@ class LFDIAuthDepends:
 
     cert_header: str
     allow_device_registration: bool
+    cache_ttl_seconds: float | None  # Aggregator certs are reloaded at least this often (None - only at cert expiry)
     aggregator_cert_cache: AsyncCache[str, ClientIdDetails]
 
-    def __init__(self, cert_header: str, allow_device_registration: bool) -> None:
+    def __init__(
+        self,
+        cert_header: str,
+        allow_device_registration: bool,
+        cache_ttl_seconds: float | None = DEFAULT_LFDI_AUTH_CACHE_TTL_SECONDS,
+    ) -> None:
         # fastapi will always return headers in lowercase form
         self.cert_header = cert_header.lower()
         self.allow_device_registration = allow_device_registration
-        self.aggregator_cert_cache = AsyncCache(update_fn=update_client_id_details_cache)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.aggregator_cert_cache = AsyncCache(
+            update_fn=update_client_id_details_cache, update_key_fn=update_client_id_details_cache_entry
+        )
 
     async def __call__(self, request: Request) -> None:
         # Try extracting the lfdi from either the PEM if we receive it directly or the fingerprint if we get that
@@ -141,8 +184,9 @@ class LFDIAuthDepends:
                 logger, exc=exc, status_code=HTTPStatus.BAD_REQUEST, detail="Unrecognised client certificate."
             ) from exc
 
-        # get client id details from cache, will return None if expired or never existed.
-        expirable_client_id = await self.aggregator_cert_cache.get_value_ignore_expiry(None, lfdi)
+        # get client id details from cache, will return None if expired or never existed. A cached value is reloaded
+        # once its expiry passes, so a returned value that's still expired means the certificate itself has expired
+        expirable_client_id = await self.aggregator_cert_cache.get_value_ignore_expiry(self.cache_ttl_seconds, lfdi)
         site_id: int | None = None
         aggregator_id: int | None = None
         if expirable_client_id:
@@ -0,0 +1,16 @@
+from fastapi import Request
+
+LIST_STREAMING_MIN_LIMIT_ATTR = "list_streaming_min_limit"
+DEFAULT_LIST_STREAMING_MIN_LIMIT = None
+
+
+def fetch_list_streaming_min_limit(request: Request) -> int | None:
+    """Fetches the minimum list limit (l query param) that will have its list response streamed from FastAPI app state
+    under the expected attribute name. None means that list responses are never streamed."""
+    return getattr(request.app.state, LIST_STREAMING_MIN_LIMIT_ATTR, DEFAULT_LIST_STREAMING_MIN_LIMIT)
+
+
+def is_list_response_streamed(request: Request, limit: int) -> bool:
+    """True if a list response (for a request with the specified limit) should be streamed"""
+    min_limit = fetch_list_streaming_min_limit(request)
+    return min_limit is not None and limit >= min_limit
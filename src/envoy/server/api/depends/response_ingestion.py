@@ -0,0 +1,19 @@
+from fastapi import Request
+
+from envoy.server.manager.response import ResponseSubjectCache
+from envoy.server.response_writer import ResponseBatchWriter
+
+RESPONSE_SUBJECT_CACHE_ATTR = "response_subject_cache"
+RESPONSE_BATCH_WRITER_ATTR = "response_batch_writer"
+
+
+def fetch_response_subject_cache(request: Request) -> ResponseSubjectCache | None:
+    """Fetches the ResponseSubjectCache from FastAPI app state (stored under RESPONSE_SUBJECT_CACHE_ATTR during
+    application startup). Returns None if the cache isn't installed"""
+    return getattr(request.app.state, RESPONSE_SUBJECT_CACHE_ATTR, None)
+
+
+def fetch_response_batch_writer(request: Request) -> ResponseBatchWriter | None:
+    """Fetches the ResponseBatchWriter from FastAPI app state (stored under RESPONSE_BATCH_WRITER_ATTR during
+    application startup). Returns None if response batching isn't enabled"""
+    return getattr(request.app.state, RESPONSE_BATCH_WRITER_ATTR, None)
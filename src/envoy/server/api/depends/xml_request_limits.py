@@ -0,0 +1,18 @@
+from fastapi import Request
+
+XML_REQUEST_MAX_BODY_BYTES_ATTR = "xml_request_max_body_bytes"
+XML_REQUEST_MAX_ELEMENTS_ATTR = "xml_request_max_elements"
+DEFAULT_XML_REQUEST_MAX_BODY_BYTES = 16 * 1024 * 1024
+DEFAULT_XML_REQUEST_MAX_ELEMENTS = 500000
+
+
+def fetch_xml_request_max_body_bytes(request: Request) -> int:
+    """Fetches the maximum size (in bytes) of an XML request body from FastAPI app state under the expected attribute
+    name."""
+    return getattr(request.app.state, XML_REQUEST_MAX_BODY_BYTES_ATTR, DEFAULT_XML_REQUEST_MAX_BODY_BYTES)
+
+
+def fetch_xml_request_max_elements(request: Request) -> int:
+    """Fetches the maximum number of elements in an XML request body from FastAPI app state under the expected
+    attribute name."""
+    return getattr(request.app.state, XML_REQUEST_MAX_ELEMENTS_ATTR, DEFAULT_XML_REQUEST_MAX_ELEMENTS)
@@ -1,22 +1,166 @@
+import re
+from collections.abc import AsyncGenerator, AsyncIterator
 from http import HTTPStatus
+from time import perf_counter
 from typing import Generic, TypeVar
 
 from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from lxml import etree
 from pydantic_xml import BaseXmlModel
 from pydantic_xml.errors import ParsingError
 
+from envoy.server.api.depends.xml_request_limits import (
+    fetch_xml_request_max_body_bytes,
+    fetch_xml_request_max_elements,
+)
+from envoy.server.metrics import get_metrics_registry
+
 SEP_XML_MIME: str = "application/sep+xml"
 
 LOCATION_HEADER_NAME: str = "Location"
 
 TBaseXmlModel = TypeVar("TBaseXmlModel", bound=BaseXmlModel)
 
+# Streamed XML list responses are written in chunks of (roughly) this many bytes
+XML_LIST_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Matches the root element name (group 1) and any namespace declarations that immediately follow it (group 2)
+_XML_ROOT_ELEMENT = re.compile(rb'^<([^\s/>]+)((?:\s+xmlns(?::[\w.-]+)?="[^"]*")*)')
+
+
+def render_xml(content: BaseXmlModel) -> bytes:
+    """Renders content as the XML body of a sep2 response"""
+    rendered = content.to_xml(skip_empty=False, exclude_none=True, exclude_unset=True)
+    return rendered.encode() if isinstance(rendered, str) else rendered
+
 
 class XmlResponse(Response):
     media_type = SEP_XML_MIME
 
     def render(self, content: BaseXmlModel) -> str | bytes:  # ty:ignore[invalid-method-override] # Base is too restrictive
-        return content.to_xml(skip_empty=False, exclude_none=True, exclude_unset=True)
+        registry = get_metrics_registry()
+        if registry is None:
+            return render_xml(content)
+
+        start = perf_counter()
+        rendered = render_xml(content)
+        registry.xml_render_duration.observe(perf_counter() - start, (type(content).__name__,))
+        return rendered
+
+
+def split_xml_list_envelope(envelope: BaseXmlModel) -> tuple[bytes, bytes, bytes]:
+    """Renders envelope (a sep2 list model with no items set) and splits it into the (opening, closing) tags that the
+    rendered list items will be written between. Items are written after any other child elements of the list (which
+    is where every sep2 list places them). The namespace declarations made on the list element are also returned.
+
+    Returns (opening, closing, namespace_declarations)"""
+    rendered = render_xml(envelope)
+    match = _XML_ROOT_ELEMENT.match(rendered)
+    if match is None:
+        raise ValueError(f"Unable to identify the root element of rendered {type(envelope).__name__}")
+    element_name, namespace_declarations = match.group(1), match.group(2)
+
+    closing = b"</" + element_name + b">"
+    if rendered.endswith(b"/>"):
+        return (rendered[:-2] + b">", closing, namespace_declarations)
+    if rendered.endswith(closing):
+        return (rendered[: -len(closing)], closing, namespace_declarations)
+    raise ValueError(f"Unable to identify the closing tag of rendered {type(envelope).__name__}")
+
+
+def render_xml_list_item(item: BaseXmlModel, namespace_declarations: bytes) -> bytes:
+    """Renders item as a fragment to be written inside a list element. Any namespace declarations matching those
+    already made by the list element (see split_xml_list_envelope) are omitted"""
+    rendered = render_xml(item)
+    match = _XML_ROOT_ELEMENT.match(rendered)
+    if match is None or match.group(2) != namespace_declarations:
+        return rendered
+    return b"<" + match.group(1) + rendered[match.end() :]
+
+
+async def render_xml_list_stream(models: AsyncGenerator[BaseXmlModel, None]) -> AsyncIterator[bytes]:
+    """Renders a sep2 list response (as XML) incrementally. models must first yield the list envelope (the list model
+    with all/results set but no items) and then each of the list items (in order). Only a single chunk of rendered
+    XML (and whatever models is holding) will be in memory at any time."""
+    try:
+        envelope = await anext(models, None)
+        if envelope is None:
+            raise ValueError("No list envelope was yielded")
+
+        start = perf_counter()
+        opening, closing, namespace_declarations = split_xml_list_envelope(envelope)
+        render_seconds = perf_counter() - start
+
+        buffer = bytearray(opening)
+        async for item in models:
+            start = perf_counter()
+            buffer += render_xml_list_item(item, namespace_declarations)
+            render_seconds += perf_counter() - start
+
+            if len(buffer) >= XML_LIST_STREAM_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+
+        buffer += closing
+        yield bytes(buffer)
+    finally:
+        await models.aclose()
+
+    registry = get_metrics_registry()
+    if registry is not None:
+        registry.xml_render_duration.observe(render_seconds, (type(envelope).__name__,))
+
+
+class XmlListStreamingResponse(StreamingResponse):
+    """Streams a sep2 list response - see render_xml_list_stream for what models must yield"""
+
+    media_type = SEP_XML_MIME
+
+    def __init__(self, models: AsyncGenerator[BaseXmlModel, None], status_code: int = HTTPStatus.OK) -> None:
+        super().__init__(render_xml_list_stream(models), status_code=status_code)
+
+
+def xml_element_name(model_class: type[BaseXmlModel]) -> str:
+    """Returns the (namespace qualified) root element name that model_class will parse from/serialise to. Eg:
+    {urn:ieee:std:2030.5:ns}MirrorMeterReading"""
+    serializer = model_class.__xml_serializer__
+    if serializer is None:
+        raise ValueError(f"{model_class.__name__} has not been fully initialised.")
+    return serializer.element_name
+
+
+async def parse_xml_body(request: Request, max_body_bytes: int, max_elements: int) -> etree._Element:
+    """Parses the body of request into an lxml element tree - incrementally as the body is received. The body will be
+    rejected (HTTP Request Entity Too Large) as soon as it exceeds max_body_bytes or max_elements. Entities are not
+    resolved and no network access is permitted.
+
+    Raises XMLSyntaxError if the body isn't well formed XML"""
+    content_length = request.headers.get("content-length", None)
+    if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+        raise HTTPException(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, detail=f"request body exceeds {max_body_bytes} bytes")
+
+    parser = etree.XMLPullParser(events=("start",), resolve_entities=False, no_network=True)
+    body_bytes = 0
+    element_count = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+
+        body_bytes += len(chunk)
+        if body_bytes > max_body_bytes:
+            raise HTTPException(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, detail=f"request body exceeds {max_body_bytes} bytes"
+            )
+
+        parser.feed(chunk)
+        element_count += sum(1 for _ in parser.read_events())
+        if element_count > max_elements:
+            raise HTTPException(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, detail=f"request body exceeds {max_elements} XML elements"
+            )
+
+    return parser.close()
 
 
 class XmlRequest(Generic[TBaseXmlModel]):
@@ -31,9 +175,10 @@ class XmlRequest(Generic[TBaseXmlModel]):
     payload: Annotated[EndDeviceRequest, Depends(XmlRequest(EndDeviceRequest))]
 
     XmlRequest does support multiple request representations. In these case, a list of possible request representations
-    are passed to XmlRequest. XmlRequest will then try to parse the XML in turn for each request representation,
-    returning as soon as parsing succeeds. Since we return on the first successful parsing, the order of the model
-    classes is significant when the same XML request body could be successfully parsed by more than one model classes.
+    are passed to XmlRequest. The body is parsed (once) into an element tree and the root element name (including
+    namespace) is used to select the request representation to validate against. If multiple request representations
+    share the same root element, they will be tried in turn (using the already parsed tree), returning as soon as
+    parsing succeeds - so the order of the model classes is significant in this case.
 
     Here is an example of using multiple request representations from the Metering Mirror function set. It accepts
     either a MirrorMeterReadingRequest or a MirrorMeterReadingListRequest.
@@ -43,24 +188,28 @@ class XmlRequest(Generic[TBaseXmlModel]):
         Depends(XmlRequest(MirrorMeterReadingRequest, MirrorMeterReadingListRequest)),
     ]
 
-    If passing fails for all the request representations, then a HTTP Bad Request is raised.
+    If parsing fails for all the request representations, then a HTTP Bad Request is raised. Bodies that exceed the
+    configured size/element limits (see xml_request_limits) are rejected with a HTTP Request Entity Too Large.
     """
 
     def __init__(self, *model_classes: type[TBaseXmlModel]) -> None:
         self.model_classes = model_classes
+        self.model_classes_by_element: dict[str, list[type[TBaseXmlModel]]] = {}
+        for model_class in model_classes:
+            self.model_classes_by_element.setdefault(xml_element_name(model_class), []).append(model_class)
 
     async def __call__(self, request: Request) -> TBaseXmlModel:
-        model = None
-        for model_class in self.model_classes:
+        root = await parse_xml_body(
+            request,
+            max_body_bytes=fetch_xml_request_max_body_bytes(request),
+            max_elements=fetch_xml_request_max_elements(request),
+        )
+
+        for model_class in self.model_classes_by_element.get(root.tag, []):
             try:
-                body = await request.body()
-                model = model_class.from_xml(body)
-                break  # Stop at the first model class that successfully parses
+                return model_class.from_xml_tree(root)
             except ParsingError:
                 pass
 
-        # A ParsingError was raised for all the model classes, so parsing the body failed
-        if not model:
-            raise HTTPException(HTTPStatus.BAD_REQUEST.value, detail="request body couldn't map to model XML")
-
-        return model
+        # The root element didn't match (or a ParsingError was raised for) all the model classes
+        raise HTTPException(HTTPStatus.BAD_REQUEST.value, detail="request body couldn't map to model XML")
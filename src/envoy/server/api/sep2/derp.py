@@ -5,6 +5,7 @@ from envoy_schema.server.schema import uri
 from fastapi import APIRouter, Query, Request, Response
 from fastapi_async_sqlalchemy import db
 
+from envoy.server.api.depends.list_streaming import is_list_response_streamed
 from envoy.server.api.error_handler import LoggedHttpException
 from envoy.server.api.request import (
     extract_datetime_from_paging_param,
@@ -12,7 +13,7 @@ from envoy.server.api.request import (
     extract_request_claims,
     extract_start_from_paging_param,
 )
-from envoy.server.api.response import XmlResponse
+from envoy.server.api.response import XmlListStreamingResponse, XmlResponse
 from envoy.server.exception import BadRequestError, NotFoundError
 from envoy.server.manager.derp import DERControlManager, DERProgramManager
 
@@ -145,17 +146,28 @@ async def get_dercontrol_list(
         limit: list query parameter for the maximum number of objects to return. Default 1.
 
     Returns:
-        fastapi.Response object.
+        fastapi.Response object. Large pages may be streamed (see list_streaming_min_limit).
     """
 
     try:
+        scope = extract_request_claims(request).to_site_request_scope(site_id)
+        start_value = extract_start_from_paging_param(start)
+        changed_after = extract_datetime_from_paging_param(after)
+        limit_value = extract_limit_from_paging_param(limit)
+        if is_list_response_streamed(request, limit_value):
+            return XmlListStreamingResponse(
+                DERControlManager.stream_doe_controls_for_scope(
+                    scope, der_program_id, start_value, changed_after, limit_value
+                )
+            )
+
         derc_list = await DERControlManager.fetch_doe_controls_for_scope(
             db.session,
-            scope=extract_request_claims(request).to_site_request_scope(site_id),
+            scope=scope,
             der_program_id=der_program_id,
-            start=extract_start_from_paging_param(start),
-            changed_after=extract_datetime_from_paging_param(after),
-            limit=extract_limit_from_paging_param(limit),
+            start=start_value,
+            changed_after=changed_after,
+            limit=limit_value,
         )
     except BadRequestError as ex:
         raise LoggedHttpException(logger, ex, status_code=HTTPStatus.BAD_REQUEST, detail=ex.message) from ex
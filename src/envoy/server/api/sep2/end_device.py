@@ -6,6 +6,7 @@ from envoy_schema.server.schema.sep2.end_device import EndDeviceRequest
 from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi_async_sqlalchemy import db
 
+from envoy.server.api.depends.list_streaming import is_list_response_streamed
 from envoy.server.api.error_handler import LoggedHttpException
 from envoy.server.api.request import (
     extract_datetime_from_paging_param,
@@ -13,7 +14,7 @@ from envoy.server.api.request import (
     extract_request_claims,
     extract_start_from_paging_param,
 )
-from envoy.server.api.response import LOCATION_HEADER_NAME, XmlRequest, XmlResponse
+from envoy.server.api.response import LOCATION_HEADER_NAME, XmlListStreamingResponse, XmlRequest, XmlResponse
 from envoy.server.exception import BadRequestError, ConflictError, ForbiddenError, NotFoundError
 from envoy.server.manager.end_device import EndDeviceManager, RegistrationManager
 from envoy.server.mapper.common import generate_href
@@ -82,8 +83,8 @@ async def get_enddevice_list(
     start: list[int] = Query([0], alias="s"),
     after: list[int] = Query([0], alias="a"),
     limit: list[int] = Query([1], alias="l"),
-) -> XmlResponse:
-    """Responds with a EndDeviceList resource.
+) -> Response:
+    """Responds with a EndDeviceList resource. Large pages may be streamed (see list_streaming_min_limit).
 
     Args:
         request: FastAPI request object.
@@ -95,15 +96,18 @@ async def get_enddevice_list(
         fastapi.Response object.
 
     """
+    scope = extract_request_claims(request).to_unregistered_request_scope()
+    start_value = extract_start_from_paging_param(start)
+    after_value = extract_datetime_from_paging_param(after)
+    limit_value = extract_limit_from_paging_param(limit)
 
-    return XmlResponse(
-        await EndDeviceManager.fetch_enddevicelist_for_scope(
-            db.session,
-            extract_request_claims(request).to_unregistered_request_scope(),
-            start=extract_start_from_paging_param(start),
-            after=extract_datetime_from_paging_param(after),
-            limit=extract_limit_from_paging_param(limit),
+    if is_list_response_streamed(request, limit_value):
+        return XmlListStreamingResponse(
+            EndDeviceManager.stream_enddevicelist_for_scope(scope, start_value, after_value, limit_value)
         )
+
+    return XmlResponse(
+        await EndDeviceManager.fetch_enddevicelist_for_scope(db.session, scope, start_value, after_value, limit_value)
     )
 
 
@@ -7,6 +7,7 @@ from envoy_schema.server.schema.sep2.response import Response as Sep2Response
 from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi_async_sqlalchemy import db
 
+from envoy.server.api.depends.response_ingestion import fetch_response_batch_writer, fetch_response_subject_cache
 from envoy.server.api.error_handler import LoggedHttpException
 from envoy.server.api.request import (
     extract_datetime_from_paging_param,
@@ -227,6 +228,8 @@ async def create_response(
             scope=extract_request_claims(request).to_site_request_scope(site_id),
             response_set_type=response_set_type,
             response=payload,
+            subject_cache=fetch_response_subject_cache(request),
+            batch_writer=fetch_response_batch_writer(request),
         )
 
         return Response(status_code=HTTPStatus.CREATED, headers={LOCATION_HEADER_NAME: location_href})
@@ -1,9 +1,12 @@
 import logging
 from http import HTTPStatus
+from time import monotonic
 
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Request, Response
 from fastapi_async_sqlalchemy import db
 
+from envoy.server.api.depends.health_monitor import fetch_health_monitor
+from envoy.server.health_monitor import HealthMonitor, HealthSnapshot
 from envoy.server.manager.health import HealthManager
 
 logger = logging.getLogger(__name__)
@@ -12,82 +15,119 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 HEALTH_URI = "/status/health"
+HEALTH_LIVENESS_URI = "/status/live"
 
 HEALTH_DOE_URI = "/status/doe"
 HEALTH_DYNAMIC_PRICE_URI = "/status/dynamicprices"
 
 
+def generate_health_response(content: str, passing: bool, snapshot: HealthSnapshot | None, now: float) -> Response:
+    """Generates the plaintext health check response. If the check was served from a background snapshot, its age (in
+    whole seconds) will be included in the Age header"""
+    headers = {"Content-Type": "text/plain"}
+    if snapshot is not None:
+        headers["Age"] = str(int(snapshot.age_seconds(now)))
+    status_code = HTTPStatus.OK if passing else HTTPStatus.INTERNAL_SERVER_ERROR
+    return Response(content=content, status_code=status_code, headers=headers)
+
+
+def generate_missing_snapshot_response(monitor: HealthMonitor) -> Response:
+    """Generates the failing response for when background health checks haven't completed recently"""
+    return Response(
+        content=f"No health check has completed in the last {monitor.max_age_seconds}s",
+        status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+        headers={"Content-Type": "text/plain"},
+    )
+
+
+@router.head(HEALTH_LIVENESS_URI)
+@router.get(HEALTH_LIVENESS_URI, status_code=HTTPStatus.OK)
+async def get_liveness() -> Response:
+    """Responds with a HTTP 200 if the server process is able to serve requests. The database is never consulted.
+
+    Returns:
+        fastapi.Response object.
+    """
+    return Response(content="OK", status_code=HTTPStatus.OK, headers={"Content-Type": "text/plain"})
+
+
 @router.head(HEALTH_URI)
 @router.get(HEALTH_URI, status_code=HTTPStatus.OK)
-async def get_health(check_data: bool = True) -> Response:
+async def get_health(request: Request, check_data: bool = True) -> Response:
     """Responds with a HTTP 200 if the server diagnostics report everything is OK. HTTP 500 otherwise.
 
-    Response will be a plaintext encoding of the passing/failing health checks
+    Response will be a plaintext encoding of the passing/failing health checks. If background health checks are
+    enabled, the most recent result is served (with its age in the Age header).
 
     Returns:
         fastapi.Response object.
     """
 
-    check = await HealthManager.run_health_check(db.session)
-    headers = {"Content-Type": "text/plain"}
-    content = str(check)
-
-    if not check.database_connectivity:
-        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
-    elif check_data and not check.database_has_data:
-        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+    now = monotonic()
+    monitor = fetch_health_monitor(request)
+    if monitor is None:
+        snapshot = None
+        check = await HealthManager.run_health_check(db.session)
     else:
-        status_code = HTTPStatus.OK
+        snapshot = monitor.fresh(monitor.health, now)
+        if snapshot is None:
+            return generate_missing_snapshot_response(monitor)
+        check = snapshot.check
 
-    return Response(content=content, status_code=status_code, headers=headers)
+    passing = check.database_connectivity and (check.database_has_data or not check_data)
+    return generate_health_response(str(check), passing, snapshot, now)
 
 
 @router.head(HEALTH_DOE_URI)
 @router.get(HEALTH_DOE_URI, status_code=HTTPStatus.OK)
-async def get_doe_health() -> Response:
+async def get_doe_health(request: Request) -> Response:
     """Responds with a HTTP 200 if the server dynamic operating envelope diagnostics report everything is OK.
     HTTP 500 otherwise.
 
-    Response will be a plaintext encoding of the passing/failing health checks
+    Response will be a plaintext encoding of the passing/failing health checks. If background health checks are
+    enabled, the most recent result is served (with its age in the Age header).
 
     Returns:
         fastapi.Response object.
     """
 
-    check = await HealthManager.run_dynamic_operating_envelope_check(db.session)
-    headers = {"Content-Type": "text/plain"}
-    content = str(check)
-
-    if not check.has_does:
-        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
-    elif not check.has_future_does:
-        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+    now = monotonic()
+    monitor = fetch_health_monitor(request)
+    if monitor is None:
+        snapshot = None
+        check = await HealthManager.run_dynamic_operating_envelope_check(db.session)
     else:
-        status_code = HTTPStatus.OK
+        snapshot = monitor.fresh(monitor.dynamic_operating_envelope, now)
+        if snapshot is None:
+            return generate_missing_snapshot_response(monitor)
+        check = snapshot.check
 
-    return Response(content=content, status_code=status_code, headers=headers)
+    passing = check.has_does and check.has_future_does
+    return generate_health_response(str(check), passing, snapshot, now)
 
 
 @router.head(HEALTH_DYNAMIC_PRICE_URI)
 @router.get(HEALTH_DYNAMIC_PRICE_URI, status_code=HTTPStatus.OK)
-async def get_dynamic_price_health() -> Response:
+async def get_dynamic_price_health(request: Request) -> Response:
     """Responds with a HTTP 200 if the server dynamic prices diagnostics report everything is OK. HTTP 500 otherwise.
 
-    Response will be a plaintext encoding of the passing/failing health checks
+    Response will be a plaintext encoding of the passing/failing health checks. If background health checks are
+    enabled, the most recent result is served (with its age in the Age header).
 
     Returns:
         fastapi.Response object.
     """
 
-    check = await HealthManager.run_dynamic_price_check(db.session)
-    headers = {"Content-Type": "text/plain"}
-    content = str(check)
-
-    if not check.has_dynamic_prices:
-        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
-    elif not check.has_future_prices:
-        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+    now = monotonic()
+    monitor = fetch_health_monitor(request)
+    if monitor is None:
+        snapshot = None
+        check = await HealthManager.run_dynamic_price_check(db.session)
     else:
-        status_code = HTTPStatus.OK
+        snapshot = monitor.fresh(monitor.dynamic_price, now)
+        if snapshot is None:
+            return generate_missing_snapshot_response(monitor)
+        check = snapshot.check
 
-    return Response(content=content, status_code=status_code, headers=headers)
+    passing = check.has_dynamic_prices and check.has_future_prices
+    return generate_health_response(str(check), passing, snapshot, now)
@@ -0,0 +1,29 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, HTTPException, Response
+from fastapi_async_sqlalchemy import db
+
+from envoy.server.manager.metrics import MetricsManager
+from envoy.server.metrics import get_metrics_registry
+
+router = APIRouter()
+
+METRICS_URI = "/status/metrics"
+
+PROMETHEUS_TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(METRICS_URI, status_code=HTTPStatus.OK)
+async def get_metrics() -> Response:
+    """Responds with the server's hot path metrics (per route latency/database queries, XML render times and
+    notification queue depth) encoded using the Prometheus text exposition format.
+
+    Returns:
+        fastapi.Response object.
+    """
+    registry = get_metrics_registry()
+    if registry is None:
+        raise HTTPException(HTTPStatus.NOT_FOUND, detail="Metrics are not enabled.")
+
+    content = await MetricsManager.generate_metrics(db.session, registry)
+    return Response(content=content, status_code=HTTPStatus.OK, headers={"Content-Type": PROMETHEUS_TEXT_CONTENT_TYPE})
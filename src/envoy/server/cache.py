@@ -32,23 +32,35 @@ class AsyncCache(Generic[K, V]):
     """A simple in memory cache that's 'async safe' but not thread safe. It allows an internal
     cache to be maintained that can be automatically updated on a cache miss.
 
-    This cache is designed to be all or nothing - it does NOT support incremental changes."""
+    By default this cache is all or nothing - every cache miss will replace the entire cache. If an update_key_fn is
+    supplied, cache misses will instead be resolved incrementally (only the missed key will be reloaded)."""
 
     _cache: dict[K, ExpiringValue[V]]
     _lock: Lock
     _update_fn: Callable[[Any], Awaitable[dict[K, ExpiringValue[V]]]]  # Called when the cache is missed
+    _update_key_fn: (
+        Callable[[Any, K], Awaitable[ExpiringValue[V] | None]] | None
+    )  # If set - called (instead of _update_fn) when a single key is missed
     _force_update_delay_seconds: float  # How long force_update should wait between attempts (in seconds)
 
     def __init__(
-        self, update_fn: Callable[[Any], Awaitable[dict[K, ExpiringValue[V]]]], force_update_delay_seconds: float = 1.0
+        self,
+        update_fn: Callable[[Any], Awaitable[dict[K, ExpiringValue[V]]]],
+        force_update_delay_seconds: float = 1.0,
+        update_key_fn: Callable[[Any, K], Awaitable[ExpiringValue[V] | None]] | None = None,
     ) -> None:
         """update_fn will be called whenever a cache miss happens during get_value. The return value of this
         function will form the new cache. Exceptions raised will abort the cache update and propagate up
-        through the call to get_value"""
+        through the call to get_value.
+
+        If update_key_fn is specified, it will be called (with the missed key) instead of update_fn during get_value.
+        The return value will replace (or remove if None) that single key, the rest of the cache is left untouched.
+        update_fn will still be used by force_update"""
         super().__init__()
         self._cache = {}
         self._lock = Lock()
         self._update_fn = update_fn
+        self._update_key_fn = update_key_fn
         self._force_update_delay_seconds = force_update_delay_seconds
 
     async def clear(self) -> None:
@@ -93,7 +105,14 @@ class AsyncCache(Generic[K, V]):
                 return expiring_value
 
             # Perform the cache update
-            self._cache = await self._update_fn(update_arg)
+            if self._update_key_fn is None:
+                self._cache = await self._update_fn(update_arg)
+            else:
+                updated_value = await self._update_key_fn(update_arg, key)
+                if updated_value is None:
+                    self._cache.pop(key, None)
+                else:
+                    self._cache[key] = updated_value
 
             # Now it's the final attempt - either get it or raise an error
             # we do this test from within the lock so we're sure that no other updates
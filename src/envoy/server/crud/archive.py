@@ -3,10 +3,11 @@ from datetime import datetime
 from itertools import chain
 from typing import Any
 
-from sqlalchemy import Delete, Select, delete, insert, literal, select
+from sqlalchemy import Delete, Select, delete, exists, insert, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased
 
-from envoy.server.model.archive.base import ARCHIVE_BASE_COLUMNS, ArchiveBase
+from envoy.server.model.archive.base import ARCHIVE_BASE_COLUMNS, ARCHIVE_TABLE_PREFIX, ArchiveBase
 from envoy.server.model.base import Base
 
 
@@ -77,3 +78,65 @@ async def delete_rows_into_archive(
     insert_from_delete_stmt = insert(archive_table).from_select(returned_cols, delete_cte)
 
     await session.execute(insert_from_delete_stmt)
+
+
+def find_archive_types() -> list[type[ArchiveBase]]:
+    """Returns every mapped archive model type (ordered by table name)"""
+    return sorted(
+        (m.class_ for m in Base.registry.mappers if issubclass(m.class_, ArchiveBase)),
+        key=lambda t: t.__tablename__,
+    )
+
+
+def extract_archive_source_pk_column(archive_type: type[ArchiveBase]) -> InstrumentedAttribute:
+    """Returns the archive_type column that holds the (ORM) primary key of the original source table row. Raises a
+    ValueError if the source table can't be found"""
+    source_table_name = archive_type.__tablename__[len(ARCHIVE_TABLE_PREFIX) :]  # noqa: E203
+    for mapper in Base.registry.mappers:
+        if getattr(mapper.class_, "__tablename__", None) == source_table_name and not issubclass(
+            mapper.class_, ArchiveBase
+        ):
+            return getattr(archive_type, mapper.primary_key[0].name)
+    raise ValueError(f"Unable to find source table {source_table_name} for archive type {archive_type}")
+
+
+async def purge_archive_rows(
+    session: AsyncSession,
+    archive_type: type[ArchiveBase],
+    archived_before: datetime,
+    deleted_before: datetime | None,
+    limit: int,
+) -> int:
+    """Permanently deletes a single batch (of at most limit rows) of archive_type rows, oldest archive_time first.
+
+    A row will be purged if its archive_time precedes archived_before AND it is an "update" snapshot (i.e. no
+    deleted_time) or a deleted snapshot that has been superseded by a later deleted snapshot of the same source row.
+    The latest deleted snapshot of every source row is retained as it's required for reporting deletions to clients
+    querying with changed_after (or for notifications).
+
+    If deleted_before is set - those latest deleted snapshots will ALSO be purged once their deleted_time precedes
+    deleted_before (clients asking for changes prior to this will no longer be informed of the deletion).
+
+    Rows locked by other transactions are skipped. Returns the number of rows that were purged."""
+
+    source_pk_col = extract_archive_source_pk_column(archive_type)
+    newer = aliased(archive_type)
+    superseded = exists().where(
+        (getattr(newer, source_pk_col.key) == source_pk_col)
+        & newer.deleted_time.is_not(None)
+        & (tuple_(newer.deleted_time, newer.archive_id) > tuple_(archive_type.deleted_time, archive_type.archive_id))
+    )
+
+    purgeable = (archive_type.archive_time < archived_before) & (archive_type.deleted_time.is_(None) | superseded)
+    if deleted_before is not None:
+        purgeable = purgeable | (archive_type.deleted_time < deleted_before)
+
+    batch_ids = (
+        select(archive_type.archive_id)
+        .where(purgeable)
+        .order_by(archive_type.archive_time.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    resp = await session.execute(delete(archive_type).where(archive_type.archive_id.in_(batch_ids.scalar_subquery())))
+    return resp.rowcount  # ty:ignore[unresolved-attribute]
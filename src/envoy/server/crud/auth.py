@@ -18,18 +18,50 @@ async def select_all_client_id_details(session: AsyncSession) -> list[ClientIdDe
     """Query to retrieve all client id details sourced from the 'certificate' and
     'aggregator_certificate_assignment' tables.
 
-    Expired certificates WILL be returned by this function
+    Expired certificates WILL be returned by this function. If a certificate has multiple assignments, they will be
+    returned in assignment_id order (so the last one matches select_client_id_details)
     """
-    stmt = select(
-        Certificate.lfdi,
-        AggregatorCertificateAssignment.aggregator_id,
-        Certificate.expiry,
-    ).join(
-        AggregatorCertificateAssignment,
-        Certificate.certificate_id == AggregatorCertificateAssignment.certificate_id,
-    )  # Inner join implies that aggregator certs will be returned
+    stmt = (
+        select(
+            Certificate.lfdi,
+            AggregatorCertificateAssignment.aggregator_id,
+            Certificate.expiry,
+        )
+        .join(
+            AggregatorCertificateAssignment,
+            Certificate.certificate_id == AggregatorCertificateAssignment.certificate_id,
+        )  # Inner join implies that aggregator certs will be returned
+        .order_by(AggregatorCertificateAssignment.assignment_id)
+    )
 
     resp = await session.execute(stmt)
 
     mapping = resp.mappings().all()
     return [ClientIdDetails(**cid) for cid in mapping]
+
+
+async def select_client_id_details(session: AsyncSession, lfdi: str) -> ClientIdDetails | None:
+    """Similar to select_all_client_id_details but only fetches the client id details for a single lfdi. Returns None
+    if lfdi isn't an aggregator certificate. If the certificate has multiple assignments, the most recent (highest
+    assignment_id) is returned.
+
+    An expired certificate WILL be returned by this function"""
+    stmt = (
+        select(
+            Certificate.lfdi,
+            AggregatorCertificateAssignment.aggregator_id,
+            Certificate.expiry,
+        )
+        .join(
+            AggregatorCertificateAssignment,
+            Certificate.certificate_id == AggregatorCertificateAssignment.certificate_id,
+        )
+        .where(Certificate.lfdi == lfdi)
+        .order_by(AggregatorCertificateAssignment.assignment_id.desc())
+        .limit(1)
+    )
+
+    resp = await session.execute(stmt)
+
+    mapping = resp.mappings().one_or_none()
+    return None if mapping is None else ClientIdDetails(**mapping)
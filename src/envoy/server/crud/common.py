@@ -1,7 +1,9 @@
+from collections.abc import Iterable
+from datetime import date, datetime
 from typing import TypeVar
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import Row
+from sqlalchemy import ColumnElement, Date, Row, cast, func
 
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.doe import DynamicOperatingEnvelope
@@ -12,14 +14,27 @@ EntityWithStartTime = TypeVar(
 )
 
 
+# How many rows are fetched (per round trip) from a server side cursor when a page of a list is being streamed
+LIST_STREAM_YIELD_PER = 100
+
+
 def localize_start_time_for_entity(entity: EntityWithStartTime, tz_name: str) -> EntityWithStartTime:
     """Localizes a entity.start_time to be in the local timezone passed in as the second
     element in the tuple. Returns the Entity (it will be modified in place)"""
-    tz = ZoneInfo(tz_name)
-    entity.start_time = entity.start_time.astimezone(tz)
+    entity.start_time = entity.start_time.astimezone(ZoneInfo(tz_name))
     return entity
 
 
+def localize_start_times(entities: Iterable[EntityWithStartTime], tz_name: str) -> list[EntityWithStartTime]:
+    """Localizes every entity.start_time to be in the tz_name timezone. Returns the entities as a list (they will be
+    modified in place)"""
+    tz = ZoneInfo(tz_name)
+    localized = list(entities)
+    for entity in localized:
+        entity.start_time = entity.start_time.astimezone(tz)
+    return localized
+
+
 def localize_start_time(entity_and_tz: Row[tuple[EntityWithStartTime, str]] | None) -> EntityWithStartTime:
     """Localizes a Entity.start_time to be in the local timezone passed in as the second
     element in the tuple. Returns the Entity (it will be modified in place)"""
@@ -32,6 +47,20 @@ def localize_start_time(entity_and_tz: Row[tuple[EntityWithStartTime, str]] | No
     return localize_start_time_for_entity(entity, tz_name)
 
 
+def localize_start_time_rows(
+    entities_and_tz: Iterable[Row[tuple[EntityWithStartTime, str]] | tuple[EntityWithStartTime, str]],
+) -> list[EntityWithStartTime]:
+    """Applies localize_start_time to every row - Localizes each Entity.start_time to be in the local timezone passed in
+    as the second element of its row. Returns the Entities (in order - they will be modified in place)"""
+    return [localize_start_time_for_entity(entity, tz_name) for entity, tz_name in entities_and_tz]
+
+
+def local_date_expr(tz_name: str | ColumnElement[str], timestamp: ColumnElement[datetime]) -> ColumnElement[date]:
+    """Generates a SQL expression for the date of timestamp (a timestamptz) in the tz_name timezone (ie
+    (timestamp AT TIME ZONE tz_name)::date) - for callers that only need local dates (and not localized entities)"""
+    return cast(func.timezone(tz_name, timestamp), Date)
+
+
 def sum_digits(n: int) -> int:
     """Sums all base10 digits in n and returns the results.
     Eg:
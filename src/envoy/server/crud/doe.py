@@ -1,12 +1,16 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime
-from typing import cast
 
-from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy import CompoundSelect, Row, Select, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from envoy.server.crud.common import localize_start_time, localize_start_time_for_entity
+from envoy.server.crud.common import (
+    LIST_STREAM_YIELD_PER,
+    localize_start_time_for_entity,
+    localize_start_time_rows,
+    localize_start_times,
+)
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope as ArchiveDOE
 from envoy.server.model.doe import DynamicOperatingEnvelope as DOE
 from envoy.server.model.doe import SiteControlGroup
@@ -44,12 +48,17 @@ async def select_doe_include_deleted(
     if primary_table_doe is not None:
         return localize_start_time_for_entity(primary_table_doe, site_timezone_id)
 
-    # Check archive otherwise
+    # Check archive otherwise (the latest deletion is a point lookup on the partial deleted_snapshot index)
     archive_table_doe = (
         await session.execute(
             select(ArchiveDOE)
-            .where((ArchiveDOE.dynamic_operating_envelope_id == doe_id) & (ArchiveDOE.deleted_time.is_not(None)))
-            .order_by(ArchiveDOE.deleted_time.desc())
+            .where(
+                (ArchiveDOE.dynamic_operating_envelope_id == doe_id)
+                & (ArchiveDOE.site_id == site_id)
+                & (ArchiveDOE.deleted_time.is_not(None))
+            )
+            .order_by(ArchiveDOE.deleted_time.desc(), ArchiveDOE.archive_time.desc())
+            .limit(1)
         )
     ).scalar_one_or_none()
     if archive_table_doe is not None:
@@ -156,7 +165,7 @@ async def _does_at_timestamp(
     if is_counting:
         return resp.scalar_one()
     else:
-        return [localize_start_time(doe_and_tz) for doe_and_tz in resp.all()]
+        return localize_start_time_rows(resp.tuples())
 
 
 async def count_active_does_include_deleted(
@@ -223,6 +232,49 @@ async def select_active_does_include_deleted(
 
     Orders by 2030.5 requirements on DERControl which is start ASC, creation DESC, id DESC"""
 
+    stmt = (
+        _select_active_does_include_deleted(site_control_group_id, site, now, changed_after)
+        .limit(limit)
+        .offset(start)
+        .order_by(DOE.start_time.asc(), DOE.changed_time.desc(), DOE.dynamic_operating_envelope_id.desc())
+    )
+
+    resp = await session.execute(stmt)
+    return localize_start_times([_map_active_doe_row(t) for t in resp.all()], site.timezone_id)
+
+
+async def stream_active_does_include_deleted(
+    session: AsyncSession,
+    site_control_group_id: int,
+    site: Site,
+    now: datetime,
+    start: int,
+    changed_after: datetime,
+    limit: int,
+) -> AsyncIterator[tuple[DOE | ArchiveDOE, int]]:
+    """Streaming equivalent of select_active_does_include_deleted - the page of DOEs is read from a server side cursor
+    (rather than being loaded in full). Each DOE is paired with the total count of DOEs matching the filter (see
+    count_active_does_include_deleted) - calculated by the same statement so it's always consistent with the page."""
+
+    does = _select_active_does_include_deleted(site_control_group_id, site, now, changed_after).subquery()
+    stmt = (
+        select(does, func.count().over().label("total_count"))
+        .limit(limit)
+        .offset(start)
+        .order_by(does.c.start_time.asc(), does.c.changed_time.desc(), does.c.dynamic_operating_envelope_id.desc())
+    )
+
+    resp = await session.stream(stmt.execution_options(yield_per=LIST_STREAM_YIELD_PER))
+    async for t in resp:
+        yield (localize_start_time_for_entity(_map_active_doe_row(t), site.timezone_id), t.total_count)
+
+
+def _select_active_does_include_deleted(
+    site_control_group_id: int, site: Site, now: datetime, changed_after: datetime
+) -> CompoundSelect:
+    """The (unordered / unpaginated) UNION ALL of the DOEs and archived (deleted) DOEs that are selected by
+    select_active_does_include_deleted. Rows can be mapped with _map_active_doe_row"""
+
     select_active_does = select(
         DOE.dynamic_operating_envelope_id,
         DOE.site_control_group_id,
@@ -287,76 +339,64 @@ async def select_active_does_include_deleted(
         select_active_does = select_active_does.where(DOE.changed_time >= changed_after)
         select_archive_does = select_archive_does.where(ArchiveDOE.deleted_time >= changed_after)
 
-    stmt = (
-        select_active_does.union_all(select_archive_does)
-        .limit(limit)
-        .offset(start)
-        .order_by(DOE.start_time.asc(), DOE.changed_time.desc(), DOE.dynamic_operating_envelope_id.desc())
-    )
-
-    resp = await session.execute(stmt)
-
-    # This is (annoyingly) the only real way to take the UNION ALL query and return multiple element types
-    # We use the literal "is_archive" from our query to differentiate archive from normal rows
-    return [
-        (
-            localize_start_time_for_entity(
-                ArchiveDOE(
-                    dynamic_operating_envelope_id=t.dynamic_operating_envelope_id,
-                    site_control_group_id=t.site_control_group_id,
-                    site_id=t.site_id,
-                    calculation_log_id=t.calculation_log_id,
-                    created_time=t.created_time,
-                    changed_time=t.changed_time,
-                    start_time=t.start_time,
-                    duration_seconds=t.duration_seconds,
-                    end_time=t.end_time,
-                    superseded=t.superseded,
-                    randomize_start_seconds=t.randomize_start_seconds,
-                    import_limit_active_watts=t.import_limit_active_watts,
-                    export_limit_watts=t.export_limit_watts,
-                    generation_limit_active_watts=t.generation_limit_active_watts,
-                    load_limit_active_watts=t.load_limit_active_watts,
-                    set_energized=t.set_energized,
-                    set_connected=t.set_connected,
-                    set_point_percentage=t.set_point_percentage,
-                    ramp_time_seconds=t.ramp_time_seconds,
-                    display_id=t.display_id,
-                    archive_id=t.archive_id,
-                    archive_time=t.archive_time,
-                    deleted_time=t.deleted_time,
-                ),
-                site.timezone_id,
-            )
-            if t.is_archive
-            else localize_start_time_for_entity(
-                DOE(
-                    dynamic_operating_envelope_id=t.dynamic_operating_envelope_id,
-                    site_control_group_id=t.site_control_group_id,
-                    site_id=t.site_id,
-                    calculation_log_id=t.calculation_log_id,
-                    created_time=t.created_time,
-                    changed_time=t.changed_time,
-                    start_time=t.start_time,
-                    duration_seconds=t.duration_seconds,
-                    end_time=t.end_time,
-                    superseded=t.superseded,
-                    randomize_start_seconds=t.randomize_start_seconds,
-                    import_limit_active_watts=t.import_limit_active_watts,
-                    export_limit_watts=t.export_limit_watts,
-                    generation_limit_active_watts=t.generation_limit_active_watts,
-                    load_limit_active_watts=t.load_limit_active_watts,
-                    set_energized=t.set_energized,
-                    set_connected=t.set_connected,
-                    set_point_percentage=t.set_point_percentage,
-                    ramp_time_seconds=t.ramp_time_seconds,
-                    display_id=t.display_id,
-                ),
-                site.timezone_id,
-            )
+    return select_active_does.union_all(select_archive_does)
+
+
+def _map_active_doe_row(t: Row) -> DOE | ArchiveDOE:
+    """Maps a row from _select_active_does_include_deleted to a DOE or ArchiveDOE.
+
+    This is (annoyingly) the only real way to take the UNION ALL query and return multiple element types
+    We use the literal "is_archive" from our query to differentiate archive from normal rows"""
+    return (
+        ArchiveDOE(
+            dynamic_operating_envelope_id=t.dynamic_operating_envelope_id,
+            site_control_group_id=t.site_control_group_id,
+            site_id=t.site_id,
+            calculation_log_id=t.calculation_log_id,
+            created_time=t.created_time,
+            changed_time=t.changed_time,
+            start_time=t.start_time,
+            duration_seconds=t.duration_seconds,
+            end_time=t.end_time,
+            superseded=t.superseded,
+            randomize_start_seconds=t.randomize_start_seconds,
+            import_limit_active_watts=t.import_limit_active_watts,
+            export_limit_watts=t.export_limit_watts,
+            generation_limit_active_watts=t.generation_limit_active_watts,
+            load_limit_active_watts=t.load_limit_active_watts,
+            set_energized=t.set_energized,
+            set_connected=t.set_connected,
+            set_point_percentage=t.set_point_percentage,
+            ramp_time_seconds=t.ramp_time_seconds,
+            display_id=t.display_id,
+            archive_id=t.archive_id,
+            archive_time=t.archive_time,
+            deleted_time=t.deleted_time,
+        )
+        if t.is_archive
+        else DOE(
+            dynamic_operating_envelope_id=t.dynamic_operating_envelope_id,
+            site_control_group_id=t.site_control_group_id,
+            site_id=t.site_id,
+            calculation_log_id=t.calculation_log_id,
+            created_time=t.created_time,
+            changed_time=t.changed_time,
+            start_time=t.start_time,
+            duration_seconds=t.duration_seconds,
+            end_time=t.end_time,
+            superseded=t.superseded,
+            randomize_start_seconds=t.randomize_start_seconds,
+            import_limit_active_watts=t.import_limit_active_watts,
+            export_limit_watts=t.export_limit_watts,
+            generation_limit_active_watts=t.generation_limit_active_watts,
+            load_limit_active_watts=t.load_limit_active_watts,
+            set_energized=t.set_energized,
+            set_connected=t.set_connected,
+            set_point_percentage=t.set_point_percentage,
+            ramp_time_seconds=t.ramp_time_seconds,
+            display_id=t.display_id,
         )
-        for t in resp.all()
-    ]
+    )
 
 
 async def count_does_at_timestamp(
@@ -482,25 +522,6 @@ async def count_site_control_groups(session: AsyncSession, changed_after: dateti
     )  # ty:ignore[invalid-return-type]
 
 
-async def count_site_control_groups_by_fsa_id(session: AsyncSession) -> dict[int, int]:
-    """Returns a dictionary keyed by the SiteControlGroup.fsa_id with a value indicating the count
-    of SiteControlGroup's with that fsa_id"""
-    kvps = (
-        (
-            await session.execute(
-                select(SiteControlGroup.fsa_id, func.count())
-                .group_by(SiteControlGroup.fsa_id)
-                .where(SiteControlGroup.fsa_id.is_not(None))
-            )
-        )
-        .tuples()
-        .all()
-    )
-
-    # We safely cast here because we've filtered out the None values during the SQL query
-    return dict(cast(list[tuple[int, int]], kvps))
-
-
 async def select_site_control_group_by_id(
     session: AsyncSession, site_control_group_id: int, include_default: bool = False
 ) -> SiteControlGroup | None:
@@ -0,0 +1,51 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, literal, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.model.doe import SiteControlGroup
+from envoy.server.model.tariff import Tariff
+
+
+async def select_function_set_assignments_summary(session: AsyncSession) -> Sequence[tuple[int, int, datetime]]:
+    """Fetches every distinct fsa_id (across Tariff and SiteControlGroup) in a single query, returning a tuple of
+    (fsa_id, site_control_group_count, max_changed_time) for each. max_changed_time is the latest changed_time of any
+    Tariff/SiteControlGroup with that fsa_id. Results are ordered by fsa_id"""
+    fsa_sources = union_all(
+        select(Tariff.fsa_id.label("fsa_id"), literal(0).label("is_derp"), Tariff.changed_time.label("changed_time")),
+        select(
+            SiteControlGroup.fsa_id.label("fsa_id"),
+            literal(1).label("is_derp"),
+            SiteControlGroup.changed_time.label("changed_time"),
+        ).where(SiteControlGroup.fsa_id.is_not(None)),
+    ).subquery()
+
+    stmt = (
+        select(fsa_sources.c.fsa_id, func.sum(fsa_sources.c.is_derp), func.max(fsa_sources.c.changed_time))
+        .group_by(fsa_sources.c.fsa_id)
+        .order_by(fsa_sources.c.fsa_id)
+    )
+    resp = await session.execute(stmt)
+    return [(fsa_id, int(derp_count), changed_time) for fsa_id, derp_count, changed_time in resp.tuples().all()]
+
+
+async def select_function_set_assignments_version(session: AsyncSession) -> tuple[Any, ...]:
+    """Fetches a cheap "version" of the rows underlying select_function_set_assignments_summary - the row count, max
+    primary key and max changed_time of both Tariff and SiteControlGroup. Any insert/delete (or update that sets
+    changed_time) of either table will change the version. The version should only be compared for equality"""
+    tariffs = select(
+        func.count().label("row_count"),
+        func.max(Tariff.tariff_id).label("max_id"),
+        func.max(Tariff.changed_time).label("max_changed_time"),
+    ).subquery()
+    groups = select(
+        func.count().label("row_count"),
+        func.max(SiteControlGroup.site_control_group_id).label("max_id"),
+        func.max(SiteControlGroup.changed_time).label("max_changed_time"),
+    ).subquery()
+
+    # Both subqueries are single row aggregates so this "join" is always exactly one row
+    resp = await session.execute(select(*tariffs.c, *groups.c).select_from(tariffs.join(groups, true())))
+    return tuple(resp.one())
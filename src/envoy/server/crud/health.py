@@ -1,5 +1,6 @@
 import logging
 from dataclasses import dataclass
+from datetime import datetime
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from envoy.server.manager.time import utc_now
 from envoy.server.model.aggregator import Aggregator
 from envoy.server.model.doe import DynamicOperatingEnvelope
+from envoy.server.model.subscription import NotificationCheck, NotificationTransmit
 from envoy.server.model.tariff import TariffGeneratedRate
 
 logger = logging.getLogger(__name__)
@@ -41,10 +43,11 @@ async def check_database(session: AsyncSession, check: HealthCheck) -> None:
 
     Any raised exceptions will be caught and logged."""
     try:
-        stmt = select(func.count()).select_from(Aggregator)
+        # Existence probe (rather than a count) so that this stays cheap regardless of table size
+        stmt = select(select(Aggregator.aggregator_id).exists())
         resp = await session.execute(stmt)
 
-        check.database_has_data = resp.scalar_one() > 0
+        check.database_has_data = bool(resp.scalar_one())
         check.database_connectivity = True
     except Exception as ex:
         check.database_connectivity = False
@@ -60,7 +63,7 @@ async def check_dynamic_prices(session: AsyncSession, check: DynamicPriceCheck)
         # match more quickly
         now = utc_now()
         future_rate_stmt = (
-            select(TariffGeneratedRate)
+            select(TariffGeneratedRate.tariff_generated_rate_id)
             .where(TariffGeneratedRate.start_time >= now)
             .order_by(TariffGeneratedRate.tariff_generated_rate_id.desc())
             .limit(1)
@@ -75,9 +78,9 @@ async def check_dynamic_prices(session: AsyncSession, check: DynamicPriceCheck)
 
         # At this point there's nothing in the future - but maybe we have historical data
         check.has_future_prices = False
-        count_rate_stmt = select(func.count()).select_from(TariffGeneratedRate)
-        count_rate_resp = await session.execute(count_rate_stmt)
-        check.has_dynamic_prices = count_rate_resp.scalar_one() > 0
+        any_rate_stmt = select(select(TariffGeneratedRate.tariff_generated_rate_id).exists())
+        any_rate_resp = await session.execute(any_rate_stmt)
+        check.has_dynamic_prices = bool(any_rate_resp.scalar_one())
     except Exception as ex:
         check.has_dynamic_prices = False
         check.has_future_prices = False
@@ -93,7 +96,7 @@ async def check_dynamic_operating_envelopes(session: AsyncSession, check: Dynami
         # match more quickly
         now = utc_now()
         future_doe_stmt = (
-            select(DynamicOperatingEnvelope)
+            select(DynamicOperatingEnvelope.dynamic_operating_envelope_id)
             .where(DynamicOperatingEnvelope.start_time >= now)
             .order_by(DynamicOperatingEnvelope.dynamic_operating_envelope_id.desc())
             .limit(1)
@@ -108,10 +111,30 @@ async def check_dynamic_operating_envelopes(session: AsyncSession, check: Dynami
 
         # At this point there's nothing in the future - but maybe we have historical data
         check.has_future_does = False
-        count_doe_stmt = select(func.count()).select_from(DynamicOperatingEnvelope)
-        count_rate_resp = await session.execute(count_doe_stmt)
-        check.has_does = count_rate_resp.scalar_one() > 0
+        any_doe_stmt = select(select(DynamicOperatingEnvelope.dynamic_operating_envelope_id).exists())
+        any_doe_resp = await session.execute(any_doe_stmt)
+        check.has_does = bool(any_doe_resp.scalar_one())
     except Exception as ex:
         check.has_does = False
         check.has_future_does = False
         logger.error(f"check_dynamic_prices: Exception checking database for rates {ex}")
+
+
+@dataclass
+class NotificationQueueStats:
+    """A snapshot of the size of a notification work queue"""
+
+    depth: int  # Number of items currently in the queue
+    oldest_created_time: datetime | None  # created_time of the oldest item in the queue (None if empty)
+
+
+async def select_notification_queue_stats(session: AsyncSession) -> dict[str, NotificationQueueStats]:
+    """Fetches the depth/oldest item of the notification_check and notification_transmit queues (keyed by table
+    name)"""
+    stats: dict[str, NotificationQueueStats] = {}
+    for queue_type in (NotificationCheck, NotificationTransmit):
+        depth, oldest_created_time = (
+            await session.execute(select(func.count(), func.min(queue_type.created_time)).select_from(queue_type))
+        ).one()
+        stats[queue_type.__tablename__] = NotificationQueueStats(depth=depth, oldest_created_time=oldest_created_time)
+    return stats
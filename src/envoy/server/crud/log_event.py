@@ -45,7 +45,9 @@ async def _log_responses(
 
     site_id: If None - no site_id filter applied, otherwise filter on site_id = Value
 
-    Orders by 2030.5 requirements on LogEvent which is created DESC, LogEventID DESC"""
+    Orders by 2030.5 requirements on LogEvent which is created DESC, LogEventID DESC (with the id DESC as a tiebreaker
+    so that pages are stable). The created_after filter is on the partition key - partitions that end before it are
+    never visited"""
 
     select_clause: Select[tuple[int]] | Select[tuple[SiteLogEvent]]
     if is_counting:
@@ -69,7 +71,9 @@ async def _log_responses(
         stmt = stmt.where(SiteLogEvent.site_id == site_id)
 
     if not is_counting:
-        stmt = stmt.order_by(SiteLogEvent.created_time.desc(), SiteLogEvent.log_event_id.desc())
+        stmt = stmt.order_by(
+            SiteLogEvent.created_time.desc(), SiteLogEvent.log_event_id.desc(), SiteLogEvent.site_log_event_id.desc()
+        )
 
     resp = await session.execute(stmt)
     if is_counting:
@@ -0,0 +1,159 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Every range partitioned table will have a catch all partition with this suffix. Any row that doesn't fall into a
+# monthly partition (eg - readings for a month that hasn't yet had a partition created) will end up here.
+DEFAULT_PARTITION_SUFFIX = "_default"
+
+# Monthly partitions are named like "{parent_table}_p{YYYYMM}"
+MONTH_PARTITION_REGEX = re.compile(r"^(?P<parent>.+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+@dataclass(frozen=True)
+class MonthPartition:
+    """A single monthly range partition of a partitioned table"""
+
+    parent_table: str  # The name of the partitioned table that this partition belongs to
+    partition_table: str  # The name of the partition table
+    month_start: datetime  # The (inclusive) lower bound of this partition (start of month in UTC)
+
+    @property
+    def month_end(self) -> datetime:
+        """The (exclusive) upper bound of this partition (start of the following month in UTC)"""
+        return self.month_start + relativedelta(months=1)
+
+
+def start_of_month(dt: datetime) -> datetime:
+    """Returns the start of the (UTC) month that dt falls within. Naive datetimes are assumed to be UTC"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    dt = dt.astimezone(UTC)
+    return datetime(dt.year, dt.month, 1, tzinfo=UTC)
+
+
+def month_partition_name(parent_table: str, month_start: datetime) -> str:
+    """Generates the name of the monthly partition of parent_table that starts at month_start"""
+    return f"{parent_table}_p{month_start.year:04d}{month_start.month:02d}"
+
+
+async def fetch_month_partitions(session: AsyncSession, parent_table: str) -> list[MonthPartition]:
+    """Fetches all of the monthly partitions currently attached to parent_table (ordered by month_start ascending).
+    The default partition (and any other partitions not following the monthly naming convention) are excluded"""
+
+    resp = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_catalog.pg_inherits i "
+            "INNER JOIN pg_catalog.pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent_table AS regclass)"
+        ),
+        {"parent_table": parent_table},
+    )
+
+    partitions: list[MonthPartition] = []
+    for partition_table in resp.scalars().all():
+        match = MONTH_PARTITION_REGEX.match(partition_table)
+        if match is None or match.group("parent") != parent_table:
+            continue
+        month_start = datetime(int(match.group("year")), int(match.group("month")), 1, tzinfo=UTC)
+        partitions.append(MonthPartition(parent_table, partition_table, month_start))
+
+    return sorted(partitions, key=lambda p: p.month_start)
+
+
+async def create_month_partition(session: AsyncSession, parent_table: str, month_start: datetime) -> bool:
+    """Creates the monthly partition of parent_table that covers the (UTC) month containing month_start. If the default
+    partition already has rows that belong in the new partition, they will be moved across as part of the creation.
+
+    parent_table must be a table that's been RANGE partitioned on a timestamp column.
+
+    Returns True if a new partition was created, False if the partition already exists."""
+
+    month_start = start_of_month(month_start)
+    month_end = month_start + relativedelta(months=1)
+    partition_table = month_partition_name(parent_table, month_start)
+    default_table = parent_table + DEFAULT_PARTITION_SUFFIX
+
+    exists = (
+        await session.execute(text("SELECT to_regclass(:partition_table)"), {"partition_table": partition_table})
+    ).scalar_one()
+    if exists is not None:
+        return False
+
+    partition_key = (
+        await session.execute(
+            text("SELECT pg_catalog.pg_get_partkeydef(CAST(:parent_table AS regclass))"),
+            {"parent_table": parent_table},
+        )
+    ).scalar_one()
+    if not partition_key:
+        raise ValueError(f"Table {parent_table} is not a partitioned table.")
+    partition_column = partition_key.split("(", 1)[1].rstrip(")").strip()  # eg: RANGE (time_period_start)
+
+    lower = month_start.isoformat()
+    upper = month_end.isoformat()
+    logger.info(f"Creating partition {partition_table} of {parent_table} for [{lower}, {upper})")
+
+    # We can't just create the partition directly - if the default partition has any rows that fall into the new range
+    # postgresql will reject the new partition. Instead, we create a standalone table, move any of those rows across and
+    # then attach it (which will re-validate that the default partition no longer holds any rows in this range)
+    # NOTE: All identifiers here are generated internally - they are never sourced from a client
+    await session.execute(
+        text(f'CREATE TABLE "{partition_table}" (LIKE "{parent_table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    )
+    await session.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default_table}" '  # noqa: S608  # nosec B608
+            f'WHERE "{partition_column}" >= :lower AND "{partition_column}" < :upper RETURNING *) '
+            f'INSERT INTO "{partition_table}" SELECT * FROM moved'
+        ),
+        {"lower": month_start, "upper": month_end},
+    )
+    await session.execute(
+        text(
+            f'ALTER TABLE "{parent_table}" ATTACH PARTITION "{partition_table}" '
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+    return True
+
+
+async def ensure_month_partitions(
+    session: AsyncSession, parent_table: str, now: datetime, months_ahead: int
+) -> list[str]:
+    """Ensures that parent_table has monthly partitions for the month containing now and the subsequent months_ahead
+    months. Existing partitions are left untouched.
+
+    Returns the names of any newly created partitions"""
+    created: list[str] = []
+    current_month = start_of_month(now)
+    for offset in range(months_ahead + 1):
+        month_start = current_month + relativedelta(months=offset)
+        if await create_month_partition(session, parent_table, month_start):
+            created.append(month_partition_name(parent_table, month_start))
+    return created
+
+
+async def drop_month_partitions_before(session: AsyncSession, parent_table: str, before: datetime) -> list[str]:
+    """Detaches and drops every monthly partition of parent_table whose entire range falls before the specified
+    datetime. This is a cheap, metadata only operation (compared with deleting the rows individually) but the rows
+    will be removed permanently - they will NOT be archived.
+
+    Returns the names of the dropped partitions"""
+    dropped: list[str] = []
+    for partition in await fetch_month_partitions(session, parent_table):
+        if partition.month_end > before:
+            continue
+
+        logger.info(f"Dropping partition {partition.partition_table} of {parent_table}")
+        await session.execute(text(f'ALTER TABLE "{parent_table}" DETACH PARTITION "{partition.partition_table}"'))
+        await session.execute(text(f'DROP TABLE "{partition.partition_table}"'))
+        dropped.append(partition.partition_table)
+    return dropped
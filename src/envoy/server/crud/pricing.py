@@ -2,25 +2,14 @@ from collections.abc import Sequence
 from datetime import date, datetime, time, timedelta
 from itertools import islice
 
-from sqlalchemy import TIMESTAMP, Date, Select, cast, func, select
+from sqlalchemy import TIMESTAMP, Select, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from envoy.server.crud.common import localize_start_time, localize_start_time_for_entity
+from envoy.server.crud.common import local_date_expr, localize_start_time, localize_start_times
 from envoy.server.model.site import Site
 from envoy.server.model.tariff import Tariff, TariffGeneratedRate
 
 
-async def select_tariff_fsa_ids(session: AsyncSession, changed_after: datetime) -> Sequence[int]:
-    """Fetches the distinct values for "fsa_id" across all Tariff instances (optionally filtering
-    on Tariff.changed_time that were changed after changed_after)"""
-    stmt = select(func.distinct(Tariff.fsa_id))
-    if changed_after != datetime.min:
-        stmt = stmt.where(Tariff.changed_time >= changed_after)
-
-    resp = await session.execute(stmt)
-    return resp.scalars().all()
-
-
 async def select_tariff_count(session: AsyncSession, after: datetime, fsa_id: int | None) -> int:
     """Fetches the number of tariffs stored
 
@@ -174,7 +163,7 @@ async def _tariff_rates_for_day(
     if only_count:
         return resp.scalar_one()
     else:
-        return [localize_start_time_for_entity(rate, site_timezone_id) for rate in resp.scalars()]
+        return localize_start_times(resp.scalars(), site_timezone_id)
 
 
 async def count_tariff_rates_for_day(
@@ -267,8 +256,8 @@ async def _select_rate_day_range(
     # Ensure that the min/max happens first otherwise the query planner will do a full index scan (rather than
     # a single index lookup)
     stmt = select(
-        cast(func.timezone(site_timezone_id, func.min(TariffGeneratedRate.start_time)), Date),
-        cast(func.timezone(site_timezone_id, func.max(TariffGeneratedRate.start_time)), Date),
+        local_date_expr(site_timezone_id, func.min(TariffGeneratedRate.start_time)),
+        local_date_expr(site_timezone_id, func.max(TariffGeneratedRate.start_time)),
     ).where((TariffGeneratedRate.tariff_id == tariff_id) & (TariffGeneratedRate.site_id == site_id))
 
     if changed_after != datetime.min:
@@ -1,7 +1,7 @@
 from collections.abc import Sequence
 from datetime import datetime
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, func, insert, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -82,7 +82,9 @@ async def _doe_responses(
 
     site_id: If None - no site_id filter applied, otherwise filter on site_id = Value
 
-    Orders by 2030.5 requirements on Response which is created DESC, site_id ASC
+    Orders by 2030.5 requirements on Response which is created DESC, site_id ASC (with the id DESC as a tiebreaker so
+    that pages are stable). The created_after filter is on the partition key - partitions that end before it are never
+    visited
 
     Will populate the "site" relationship for all returned entities"""
 
@@ -108,7 +110,11 @@ async def _doe_responses(
         stmt = stmt.where(DOEResponse.site_id == site_id)
 
     if not is_counting:
-        stmt = stmt.order_by(DOEResponse.created_time.desc(), DOEResponse.site_id.asc())
+        stmt = stmt.order_by(
+            DOEResponse.created_time.desc(),
+            DOEResponse.site_id.asc(),
+            DOEResponse.dynamic_operating_envelope_response_id.desc(),
+        )
 
     resp = await session.execute(stmt)
     if is_counting:
@@ -130,7 +136,9 @@ async def _rate_responses(
 
     site_id: If None - no site_id filter applied, otherwise filter on site_id = Value
 
-    Orders by 2030.5 requirements on Response which is created DESC, site_id ASC
+    Orders by 2030.5 requirements on Response which is created DESC, site_id ASC (with the id DESC as a tiebreaker so
+    that pages are stable). The created_after filter is on the partition key - partitions that end before it are never
+    visited
 
     Will populate the "site" relationship for all returned entities"""
 
@@ -156,7 +164,11 @@ async def _rate_responses(
         stmt = stmt.where(RateResponse.site_id == site_id)
 
     if not is_counting:
-        stmt = stmt.order_by(RateResponse.created_time.desc(), RateResponse.site_id.asc())
+        stmt = stmt.order_by(
+            RateResponse.created_time.desc(),
+            RateResponse.site_id.asc(),
+            RateResponse.tariff_generated_rate_response_id.desc(),
+        )
 
     resp = await session.execute(stmt)
     if is_counting:
@@ -217,3 +229,34 @@ async def select_tariff_generated_rate_responses(
     Orders by 2030.5 requirements on Response which is created DESC, site ASC"""
 
     return await _rate_responses(False, session, aggregator_id, site_id, start, limit, created_after)  # ty:ignore[invalid-return-type]  # Test coverage will ensure that it's an entity list
+
+
+async def allocate_response_ids(
+    session: AsyncSession, response_type: type[DOEResponse | RateResponse], count: int
+) -> list[int]:
+    """Reserves count primary key values (in a single round trip) from the id sequence backing response_type's table.
+
+    The values are unique (they will never be handed out by the sequence again) but are not guaranteed to be
+    contiguous"""
+    if count <= 0:
+        return []
+
+    pk_column = inspect(response_type).primary_key[0]
+    stmt = select(func.nextval(func.pg_get_serial_sequence(response_type.__tablename__, pk_column.name))).select_from(
+        func.generate_series(1, count)
+    )
+    return list((await session.execute(stmt)).scalars().all())
+
+
+async def insert_responses(session: AsyncSession, responses: Sequence[DOEResponse] | Sequence[RateResponse]) -> None:
+    """Inserts all responses (which must be of the same type and have their primary keys already assigned) using a
+    single multi row INSERT. created_time will be assigned by the database.
+
+    Changes will NOT be committed by this function"""
+    if not responses:
+        return
+
+    response_type = type(responses[0])
+    columns = [c.key for c in inspect(response_type).column_attrs if c.key != "created_time"]
+    rows = [{col: getattr(r, col) for col in columns} for r in responses]
+    await session.execute(insert(response_type).values(rows))
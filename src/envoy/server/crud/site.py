@@ -1,9 +1,11 @@
 # TODO: rename module to site.py
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, TypeVar
 
 from envoy_schema.server.schema.sep2.types import DeviceCategory
-from sqlalchemy import delete, func, select
+from sqlalchemy import Select, delete, exists, func, select
 from sqlalchemy.dialects.postgresql import insert as psql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -41,6 +43,8 @@ from envoy.server.settings import settings
 # Only a site_id of 0 is left, which we will use for the virtual end-device/site associated with the aggregator
 VIRTUAL_END_DEVICE_SITE_ID = 0
 
+TSelect = TypeVar("TSelect", bound=Select)
+
 
 async def select_aggregator_site_count(session: AsyncSession, aggregator_id: int, after: datetime) -> int:
     """Fetches the number of sites 'owned' by the specified aggregator (with an additional filter on the site
@@ -68,9 +72,35 @@ async def select_all_sites_with_aggregator_id(
     """Selects sites for an aggregator with some basic pagination / filtering based on change time
 
     Results will be ordered according to sep2 spec which is changedTime then sfdi"""
-    stmt = (
-        select(Site)
-        .where((Site.aggregator_id == aggregator_id) & (Site.changed_time >= after))
+    stmt = _select_aggregator_sites_page(select(Site), aggregator_id, start, after, limit)
+
+    resp = await session.execute(stmt)
+    return resp.scalars().all()
+
+
+async def stream_all_sites_with_aggregator_id(
+    session: AsyncSession,
+    aggregator_id: int,
+    start: int,
+    after: datetime,
+    limit: int,
+) -> AsyncIterator[tuple[Site, int]]:
+    """Streaming equivalent of select_all_sites_with_aggregator_id - the page of sites is read from a server side cursor
+    (rather than being loaded in full). Each site is paired with the total count of sites matching the filter (see
+    select_aggregator_site_count) - calculated by the same statement so it's always consistent with the page."""
+    stmt = _select_aggregator_sites_page(select(Site, func.count().over()), aggregator_id, start, after, limit)
+
+    resp = await session.stream(stmt.execution_options(yield_per=common.LIST_STREAM_YIELD_PER))
+    async for site, total_count in resp:
+        yield (site, total_count)
+
+
+def _select_aggregator_sites_page(
+    stmt: TSelect, aggregator_id: int, start: int, after: datetime, limit: int
+) -> TSelect:
+    """Applies the aggregator / changed_time filter and sep2 ordering (changedTime then sfdi) / pagination to stmt"""
+    return (
+        stmt.where((Site.aggregator_id == aggregator_id) & (Site.changed_time >= after))
         .offset(start)
         .limit(limit)
         .order_by(
@@ -79,9 +109,6 @@ async def select_all_sites_with_aggregator_id(
         )
     )
 
-    resp = await session.execute(stmt)
-    return resp.scalars().all()
-
 
 async def get_virtual_site_for_aggregator(
     session: AsyncSession, aggregator_id: int, aggregator_lfdi: str, post_rate_seconds: int | None
@@ -103,6 +130,17 @@ async def get_virtual_site_for_aggregator(
     )
 
     timezone_id = first_site_under_aggregator.timezone_id if first_site_under_aggregator else settings.default_timezone
+    return build_virtual_site(aggregator_id, aggregator_lfdi, timezone_id, post_rate_seconds)
+
+
+def build_virtual_site(
+    aggregator_id: int, aggregator_lfdi: str, timezone_id: str, post_rate_seconds: int | None
+) -> Site:
+    """Creates (in memory) the virtual site that represents the aggregator. No DB lookups are made - it's assumed that
+    the aggregator exists and timezone_id has been sourced from the first site under the aggregator.
+
+    Raises ValueError if aggregator lfdi cannot be converted to an sfdi.
+    """
 
     # lfdi is hex string, convert to sfdi (integer)
     try:
@@ -135,6 +173,67 @@ async def get_virtual_site_for_aggregator(
     )
 
 
+@dataclass(frozen=True)
+class AggregatorSiteSummary:
+    """The page independent parts of an aggregator's EndDeviceList"""
+
+    aggregator_exists: bool
+    first_site_timezone_id: str | None  # timezone_id of the site with the lowest site_id (None if there are no sites)
+    site_count: int  # Total number of sites under the aggregator (no changed_time filter)
+    subscription_count: int  # Total number of subscriptions under the aggregator
+
+
+async def select_aggregator_site_summary(session: AsyncSession, aggregator_id: int) -> AggregatorSiteSummary:
+    """Fetches an AggregatorSiteSummary for aggregator_id (as a single query)"""
+    first_site_timezone = (
+        select(Site.timezone_id)
+        .where(Site.aggregator_id == aggregator_id)
+        .order_by(Site.site_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    site_count = select(func.count()).select_from(Site).where(Site.aggregator_id == aggregator_id).scalar_subquery()
+    subscription_count = (
+        select(func.count())
+        .select_from(Subscription)
+        .where(Subscription.aggregator_id == aggregator_id)
+        .scalar_subquery()
+    )
+    stmt = select(
+        exists().where(Aggregator.aggregator_id == aggregator_id),
+        first_site_timezone,
+        site_count,
+        subscription_count,
+    )
+
+    resp = await session.execute(stmt)
+    aggregator_exists, first_site_timezone_id, site_total, subscription_total = resp.one()
+    return AggregatorSiteSummary(
+        aggregator_exists=aggregator_exists,
+        first_site_timezone_id=first_site_timezone_id,
+        site_count=site_total,
+        subscription_count=subscription_total,
+    )
+
+
+async def select_aggregator_site_summary_version(session: AsyncSession) -> tuple[Any, ...]:
+    """Fetches a cheap "version" of the rows underlying select_aggregator_site_summary (for every aggregator). Each
+    part is a max/count over an indexed column (or the tiny aggregator table) so this is far cheaper than counting an
+    aggregator's sites. Any Site/Subscription insert or delete (or Site update that sets changed_time) will change the
+    version. The version should only be compared for equality"""
+    stmt = select(
+        select(func.count()).select_from(Aggregator).scalar_subquery(),
+        select(func.max(Aggregator.aggregator_id)).scalar_subquery(),
+        select(func.max(Site.site_id)).scalar_subquery(),
+        select(func.max(Site.changed_time)).scalar_subquery(),
+        select(func.max(ArchiveSite.deleted_time)).scalar_subquery(),
+        select(func.max(Subscription.subscription_id)).scalar_subquery(),
+        select(func.max(ArchiveSubscription.deleted_time)).scalar_subquery(),
+    )
+    resp = await session.execute(stmt)
+    return tuple(resp.one())
+
+
 async def select_first_site_under_aggregator(session: AsyncSession, aggregator_id: int) -> Site | None:
     """Selects the Site with the lowest site_id and aggregator_id. Returns None if a match isn't found"""
     stmt = select(Site).where(Site.aggregator_id == aggregator_id).limit(1).order_by(Site.site_id)
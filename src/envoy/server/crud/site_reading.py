@@ -1,16 +1,45 @@
-from collections.abc import Sequence
+import math
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
-from datetime import datetime
-from typing import cast
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import Any, cast
 
 from envoy_schema.server.schema.sep2.types import RoleFlagsType
-from sqlalchemy import Select, and_, distinct, func, insert, or_, select
+from sqlalchemy import (
+    INTEGER,
+    ColumnElement,
+    DateTime,
+    Select,
+    any_,
+    distinct,
+    extract,
+    func,
+    insert,
+    inspect,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as psql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, aliased
 
 from envoy.server.crud.archive import delete_rows_into_archive
 from envoy.server.model.archive.site_reading import ArchiveSiteReading, ArchiveSiteReadingType
 from envoy.server.model.site import Site
-from envoy.server.model.site_reading import SITE_READING_TYPE_GROUP_ID_SEQUENCE, SiteReading, SiteReadingType
+from envoy.server.model.site_reading import (
+    SITE_READING_TYPE_GROUP_ID_SEQUENCE,
+    SiteReading,
+    SiteReadingRollup,
+    SiteReadingRollupResolution,
+    SiteReadingType,
+)
+
+# The max number of SiteReadings that will be deleted/inserted by a single statement in upsert_site_readings
+SITE_READING_UPSERT_BATCH_SIZE = 5000
 
 
 @dataclass(frozen=True)
@@ -65,33 +94,20 @@ async def fetch_site_reading_types_for_group(
     return resp.scalars().all()
 
 
-async def fetch_site_reading_type_for_mrid(
-    session: AsyncSession, aggregator_id: int, site_id: int, mrid: str
-) -> SiteReadingType | None:
-    """Fetches the SiteReadingType matched by the specified site scope / mrid. Returns None if not found."""
-    stmt = select(SiteReadingType).where(
-        (SiteReadingType.aggregator_id == aggregator_id)
-        & (SiteReadingType.site_id == site_id)
-        & (SiteReadingType.mrid == mrid)
-    )
-
-    resp = await session.execute(stmt)
-    return resp.scalar_one_or_none()
-
+async def fetch_site_reading_types_for_mrids(
+    session: AsyncSession, aggregator_id: int, mrids: Sequence[str]
+) -> Sequence[SiteReadingType]:
+    """Fetches every SiteReadingType (for aggregator_id - across ALL sites) whose mrid is in mrids. This allows a batch
+    of MirrorMeterReading mRIDs to be checked for ownership/conflicts with a single query."""
+    if not mrids:
+        return []
 
-async def fetch_any_site_reading_type_for_mrids_other_site(
-    session: AsyncSession, aggregator_id: int, site_id: int, mrids: list[str]
-) -> SiteReadingType | None:
-    """Returns the first SiteReadingType whose mrid is in mrids but belongs to a different site.
-    Returns None if all mrids are unowned or owned by site_id."""
     stmt = select(SiteReadingType).where(
-        (SiteReadingType.aggregator_id == aggregator_id)
-        & (SiteReadingType.mrid.in_(mrids))
-        & (SiteReadingType.site_id != site_id)
+        (SiteReadingType.aggregator_id == aggregator_id) & (SiteReadingType.mrid.in_(mrids))
     )
 
     resp = await session.execute(stmt)
-    return resp.scalars().first()
+    return resp.scalars().all()
 
 
 async def _fetch_site_reading_type_groups(
@@ -163,34 +179,247 @@ async def count_grouped_site_reading_details(
     )
 
 
-async def upsert_site_readings(session: AsyncSession, now: datetime, site_readings: list[SiteReading]) -> None:
+def _deduplicate_site_readings(site_readings: Sequence[SiteReading]) -> Sequence[SiteReading]:
+    """Removes all but the last SiteReading for each site_reading_type_id / time_period_start (preserving order)"""
+    by_key = {(sr.site_reading_type_id, sr.time_period_start): sr for sr in site_readings}
+    if len(by_key) == len(site_readings):
+        return site_readings
+    return list(by_key.values())
+
+
+def _column_values(site_readings: Sequence[SiteReading], column_name: str) -> list[Any]:
+    """The values of column_name (across site_readings) for binding as an array. Enums (eg QualityFlagsType) are
+    converted to their plain value - asyncpg would otherwise treat an iterable IntFlag as a nested array"""
+    values = [getattr(sr, column_name) for sr in site_readings]
+    return [v.value if isinstance(v, Enum) else v for v in values]
+
+
+async def _replace_site_reading_batch(
+    session: AsyncSession, now: datetime, site_readings: Sequence[SiteReading]
+) -> None:
+    """Deletes (archiving) any SiteReading conflicting with site_readings before inserting site_readings. The
+    readings are sent as one array parameter per column (and unnest-ed) so each statement has a fixed shape regardless
+    of how many readings are in the batch"""
+
+    # The conflict keys - the explicit time range ensures only the partitions that could hold a conflict are visited
+    min_start = min(sr.time_period_start for sr in site_readings)
+    max_start = max(sr.time_period_start for sr in site_readings)
+    conflict_keys = (
+        func.unnest(
+            literal([sr.site_reading_type_id for sr in site_readings], type_=ARRAY(INTEGER)),
+            literal([sr.time_period_start for sr in site_readings], type_=ARRAY(DateTime(timezone=True))),
+        )
+        .table_valued("site_reading_type_id", "time_period_start")
+        .render_derived()
+    )
+    await delete_rows_into_archive(
+        session,
+        SiteReading,
+        ArchiveSiteReading,
+        now,
+        lambda q: q.where(
+            (SiteReading.time_period_start >= min_start)
+            & (SiteReading.time_period_start <= max_start)
+            & tuple_(SiteReading.site_reading_type_id, SiteReading.time_period_start).in_(
+                select(conflict_keys.c.site_reading_type_id, conflict_keys.c.time_period_start)
+            )
+        ),
+    )
+
+    # Now we can do the inserts (the partition key is part of the table primary key but must still be inserted)
+    table = SiteReading.__table__
+    orm_pk_cols = list(inspect(SiteReading).primary_key)
+    insert_cols = [c for c in table.c if c not in orm_pk_cols and not c.server_default]
+    new_rows = (
+        func.unnest(*(literal(_column_values(site_readings, c.name), type_=ARRAY(c.type)) for c in insert_cols))
+        .table_valued(*(c.name for c in insert_cols))
+        .render_derived()
+    )
+    await session.execute(insert(SiteReading).from_select([c.name for c in insert_cols], select(*new_rows.c)))
+
+
+async def upsert_site_readings(session: AsyncSession, now: datetime, site_readings: Sequence[SiteReading]) -> None:
     """Creates or updates the specified site readings. It's assumed that each SiteReading will have
     been assigned a valid site_reading_type_id before calling this function. No validation will be made for ownership
 
-    Conflicting readings will be deleted (and archived) before being re-inserted.
+    Conflicting readings will be deleted (and archived) before being re-inserted and the touched rollup buckets
+    recalculated. This happens in batches of (at most) SITE_READING_UPSERT_BATCH_SIZE readings, so the cost of each
+    statement is bounded regardless of the number of readings. If the same reading (site_reading_type_id /
+    time_period_start) is specified multiple times, the last one will be kept.
 
     now: The current changed_time to mark any updated (deleted and replaced) records with
     site_readings: The readings to insert/update"""
 
-    # Start by deleting all conflicts (archiving them as we go)
-    where_clause_and_elements = (
-        and_(
-            SiteReading.site_reading_type_id == sr.site_reading_type_id,
-            SiteReading.time_period_start == sr.time_period_start,
+    if not site_readings:
+        return
+
+    # Duplicates are removed across ALL readings (not per batch) - otherwise a later batch would replace (and archive)
+    # a reading that was only just inserted by an earlier batch
+    site_readings = _deduplicate_site_readings(site_readings)
+    for batch_start in range(0, len(site_readings), SITE_READING_UPSERT_BATCH_SIZE):
+        batch = site_readings[batch_start : batch_start + SITE_READING_UPSERT_BATCH_SIZE]
+        await _replace_site_reading_batch(session, now, batch)
+
+        # Keep the pre-aggregated rollups in sync with the buckets that this batch touched
+        await upsert_site_reading_rollups(session, now, batch)
+
+
+def site_reading_rollup_bucket_start(dt: datetime, resolution: SiteReadingRollupResolution) -> datetime:
+    """Returns the (UTC) start of the rollup bucket (at resolution) that dt falls within"""
+    epoch_seconds = math.floor(dt.timestamp() / resolution) * resolution
+    return datetime.fromtimestamp(epoch_seconds, tz=UTC)
+
+
+def _rollup_bucket_start_clause(
+    time_col: QueryableAttribute[datetime], resolution: SiteReadingRollupResolution
+) -> ColumnElement[datetime]:
+    """SQL equivalent of site_reading_rollup_bucket_start. The resolution is rendered inline so that the exact same
+    expression can be used in both the SELECT and GROUP BY clauses"""
+    width = literal_column(str(int(resolution)))
+    return func.to_timestamp(func.floor(extract("epoch", time_col) / width) * width)
+
+
+async def _upsert_site_reading_rollups_for_resolution(
+    session: AsyncSession,
+    now: datetime,
+    resolution: SiteReadingRollupResolution,
+    site_reading_type_ids: Sequence[int],
+    buckets: set[tuple[int, datetime]] | None,
+) -> None:
+    """Recalculates the rollups at resolution for site_reading_type_ids, inserting/updating as required. The smallest
+    resolution is calculated from SiteReading, every other resolution is calculated from the next smallest rollup.
+
+    buckets: If specified - only these (site_reading_type_id, bucket_start) buckets will be recalculated. Otherwise
+             every bucket for site_reading_type_ids is recalculated"""
+
+    # Values are bound as arrays (rather than one parameter per value) so the statement stays within asyncpg's bind
+    # parameter limit regardless of how many buckets are being recalculated
+    srt_ids_array = literal(list(site_reading_type_ids), type_=ARRAY(INTEGER))
+
+    resolutions = list(SiteReadingRollupResolution)
+    resolution_idx = resolutions.index(resolution)
+    if resolution_idx == 0:
+        srt_col: Any = SiteReading.site_reading_type_id
+        time_col: Any = SiteReading.time_period_start
+        aggregates = [
+            func.count(),
+            func.sum(SiteReading.value),
+            func.min(SiteReading.value),
+            func.max(SiteReading.value),
+        ]
+        source_filter: ColumnElement[bool] = srt_col == any_(srt_ids_array)
+    else:
+        source = aliased(SiteReadingRollup)
+        srt_col = source.site_reading_type_id
+        time_col = source.bucket_start
+        aggregates = [
+            func.sum(source.reading_count),
+            func.sum(source.value_sum),
+            func.min(source.value_min),
+            func.max(source.value_max),
+        ]
+        source_filter = (srt_col == any_(srt_ids_array)) & (
+            source.resolution_seconds == int(resolutions[resolution_idx - 1])
         )
-        for sr in site_readings
+
+    bucket_start = _rollup_bucket_start_clause(time_col, resolution)
+    select_stmt = (
+        select(
+            srt_col,
+            literal(int(resolution)),
+            bucket_start,
+            literal(now, DateTime(timezone=True)),
+            *aggregates,
+        )
+        .where(source_filter)
+        .group_by(srt_col, bucket_start)
     )
-    or_clause = or_(*where_clause_and_elements)
-    await delete_rows_into_archive(session, SiteReading, ArchiveSiteReading, now, lambda q: q.where(or_clause))
+    if buckets is not None:
+        # The explicit time range allows partition pruning / index range scans before the precise bucket filter
+        bucket_list = list(buckets)
+        bucket_srt_ids = [srt_id for srt_id, _ in bucket_list]
+        bucket_starts = [start for _, start in bucket_list]
+        min_bucket = min(bucket_starts)
+        max_bucket = max(bucket_starts)
+        bucket_keys = (
+            func.unnest(
+                literal(bucket_srt_ids, type_=ARRAY(INTEGER)),
+                literal(bucket_starts, type_=ARRAY(DateTime(timezone=True))),
+            )
+            .table_valued("site_reading_type_id", "bucket_start")
+            .render_derived()
+        )
+        select_stmt = select_stmt.where(
+            (time_col >= min_bucket)
+            & (time_col < max_bucket + timedelta(seconds=resolution))
+            & tuple_(srt_col, bucket_start).in_(select(bucket_keys.c.site_reading_type_id, bucket_keys.c.bucket_start))
+        )
 
-    # Now we can do the inserts
-    table = SiteReading.__table__
-    update_cols = [c.name for c in table.c if c not in list(table.primary_key.columns) and not c.server_default]  # ty:ignore[unresolved-attribute]
+    insert_stmt = psql_insert(SiteReadingRollup).from_select(
+        [
+            SiteReadingRollup.site_reading_type_id,
+            SiteReadingRollup.resolution_seconds,
+            SiteReadingRollup.bucket_start,
+            SiteReadingRollup.changed_time,
+            SiteReadingRollup.reading_count,
+            SiteReadingRollup.value_sum,
+            SiteReadingRollup.value_min,
+            SiteReadingRollup.value_max,
+        ],
+        select_stmt,
+    )
     await session.execute(
-        insert(SiteReading).values([{k: getattr(sr, k) for k in update_cols} for sr in site_readings])
+        insert_stmt.on_conflict_do_update(
+            index_elements=[
+                SiteReadingRollup.site_reading_type_id,
+                SiteReadingRollup.resolution_seconds,
+                SiteReadingRollup.bucket_start,
+            ],
+            set_={
+                "changed_time": insert_stmt.excluded.changed_time,
+                "reading_count": insert_stmt.excluded.reading_count,
+                "value_sum": insert_stmt.excluded.value_sum,
+                "value_min": insert_stmt.excluded.value_min,
+                "value_max": insert_stmt.excluded.value_max,
+            },
+        )
     )
 
 
+async def upsert_site_reading_rollups(
+    session: AsyncSession, now: datetime, site_readings: Iterable[SiteReading]
+) -> None:
+    """Incrementally updates the SiteReadingRollup buckets (at every resolution) that the specified site_readings fall
+    within. Only the touched buckets are recalculated. It's assumed that site_readings have already been persisted.
+
+    now: The changed_time to mark any inserted/updated rollups with"""
+
+    touched_readings = [(sr.site_reading_type_id, sr.time_period_start) for sr in site_readings]
+    if not touched_readings:
+        return
+
+    site_reading_type_ids = sorted({srt_id for srt_id, _ in touched_readings})
+    for resolution in SiteReadingRollupResolution:
+        buckets = {(srt_id, site_reading_rollup_bucket_start(t, resolution)) for srt_id, t in touched_readings}
+        await _upsert_site_reading_rollups_for_resolution(session, now, resolution, site_reading_type_ids, buckets)
+
+
+async def recalculate_site_reading_rollups(
+    session: AsyncSession, now: datetime, site_reading_type_ids: Sequence[int]
+) -> None:
+    """Recalculates every SiteReadingRollup bucket (at every resolution) for the specified site reading types from the
+    underlying SiteReading rows. Intended for backfilling rollups for readings that predate the rollup tables.
+
+    Buckets whose SiteReading rows have since been removed (eg by partition retention) are left untouched.
+
+    now: The changed_time to mark any inserted/updated rollups with"""
+    if not site_reading_type_ids:
+        return
+
+    for resolution in SiteReadingRollupResolution:
+        await _upsert_site_reading_rollups_for_resolution(session, now, resolution, site_reading_type_ids, None)
+
+
 async def delete_site_reading_type_group(
     session: AsyncSession, aggregator_id: int, site_id: int | None, group_id: int, deleted_time: datetime
 ) -> bool:
@@ -1,7 +1,8 @@
 from collections.abc import Sequence
 from datetime import datetime
 
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import INTEGER, and_, any_, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -247,3 +248,146 @@ async def upsert_subscription(session: AsyncSession, subscription: Subscription)
 
         await session.flush()
         return existing_sub.subscription_id
+
+
+SubscriptionKey = tuple[int, int, int | None, int | None]  # (aggregator_id, resource_type, scoped_site_id, resource_id)
+SUBSCRIPTION_KEY_COLUMNS = ("aggregator_id", "resource_type", "scoped_site_id", "resource_id")
+
+
+def _subscription_key(subscription: Subscription) -> SubscriptionKey:
+    return (
+        subscription.aggregator_id,
+        int(subscription.resource_type),
+        subscription.scoped_site_id,
+        subscription.resource_id,
+    )
+
+
+async def upsert_subscriptions(session: AsyncSession, subscriptions: Sequence[Subscription]) -> list[int]:
+    """Bulk version of upsert_subscription - inserts (or updates) every subscription (and any linked conditions) using
+    a fixed number of statements (regardless of the number of subscriptions).
+
+    A subscription "clashes" with an existing subscription if it shares the same aggregator_id, resource_type,
+    scoped_site_id and resource_id. Clashes are treated as renewals (subscription_id is kept, existing state/conditions
+    are archived and the conditions replaced). If subscriptions contains multiple entries for the same key, the last
+    entry will be the one that is persisted.
+
+    Returns the new (or existing) subscription_id for each element of subscriptions (in the same order)
+
+    NOTE - this will not populate/affect any models in the session, all operations occur on the DB directly"""
+
+    if not subscriptions:
+        return []
+
+    # Any duplicated keys within the batch collapse to the last entry
+    subs_by_key: dict[SubscriptionKey, Subscription] = {}
+    for sub in subscriptions:
+        subs_by_key[_subscription_key(sub)] = sub
+
+    # Step 1 - Identify all "clashes" in a single query by joining the existing subscriptions against the set of
+    # incoming keys. IS NOT DISTINCT FROM is used to match the nullable columns (NULL must match NULL). The keys are
+    # bound as one array per column (and unnest-ed) so the statement stays within asyncpg's bind parameter limit
+    # regardless of the number of subscriptions
+    keys = (
+        func.unnest(
+            *(
+                literal([key[idx] for key in subs_by_key.keys()], type_=ARRAY(INTEGER))
+                for idx in range(len(SUBSCRIPTION_KEY_COLUMNS))
+            )
+        )
+        .table_valued(*SUBSCRIPTION_KEY_COLUMNS)
+        .render_derived(name="upsert_keys")
+    )
+    clash_resp = await session.execute(
+        select(
+            keys.c.aggregator_id,
+            keys.c.resource_type,
+            keys.c.scoped_site_id,
+            keys.c.resource_id,
+            func.max(Subscription.subscription_id),
+        )
+        .join(
+            Subscription,
+            and_(
+                Subscription.aggregator_id == keys.c.aggregator_id,
+                Subscription.resource_type == keys.c.resource_type,
+                Subscription.scoped_site_id.is_not_distinct_from(keys.c.scoped_site_id),
+                Subscription.resource_id.is_not_distinct_from(keys.c.resource_id),
+            ),
+        )
+        .group_by(keys.c.aggregator_id, keys.c.resource_type, keys.c.scoped_site_id, keys.c.resource_id)
+    )
+    existing_ids: dict[SubscriptionKey, int] = {
+        (agg_id, resource_type, scoped_site_id, resource_id): sub_id
+        for agg_id, resource_type, scoped_site_id, resource_id, sub_id in clash_resp.all()
+    }
+
+    # Step 2 - Archive every clashing subscription (and its conditions) in their current state and clear out the
+    # conditions (they'll be replaced)
+    if existing_ids:
+        clash_ids = literal(list(existing_ids.values()), type_=ARRAY(INTEGER))
+        await copy_rows_into_archive(
+            session,
+            Subscription,
+            ArchiveSubscription,
+            lambda q: q.where(Subscription.subscription_id == any_(clash_ids)),
+        )
+        await copy_rows_into_archive(
+            session,
+            SubscriptionCondition,
+            ArchiveSubscriptionCondition,
+            lambda q: q.where(SubscriptionCondition.subscription_id == any_(clash_ids)),
+        )
+        await session.execute(
+            delete(SubscriptionCondition).where(SubscriptionCondition.subscription_id == any_(clash_ids))
+        )
+
+        # Update the renewed subscriptions (bulk UPDATE by primary key)
+        await session.execute(
+            update(Subscription),
+            [
+                {
+                    "subscription_id": sub_id,
+                    "changed_time": subs_by_key[key].changed_time,
+                    "entity_limit": subs_by_key[key].entity_limit,
+                    "notification_uri": subs_by_key[key].notification_uri,
+                }
+                for key, sub_id in existing_ids.items()
+            ],
+        )
+
+    # Step 3 - Insert the brand new subscriptions - created_time/subscription_id will be generated by the DB
+    new_keys = [key for key in subs_by_key.keys() if key not in existing_ids]
+    if new_keys:
+        new_ids = await session.scalars(
+            insert(Subscription).returning(Subscription.subscription_id, sort_by_parameter_order=True),
+            [
+                {
+                    "aggregator_id": subs_by_key[key].aggregator_id,
+                    "changed_time": subs_by_key[key].changed_time,
+                    "resource_type": subs_by_key[key].resource_type,
+                    "resource_id": subs_by_key[key].resource_id,
+                    "scoped_site_id": subs_by_key[key].scoped_site_id,
+                    "notification_uri": subs_by_key[key].notification_uri,
+                    "entity_limit": subs_by_key[key].entity_limit,
+                }
+                for key in new_keys
+            ],
+        )
+        existing_ids.update(zip(new_keys, new_ids.all(), strict=True))
+
+    # Step 4 - (Re)insert all conditions with a multi row insert
+    condition_rows = [
+        {
+            "subscription_id": existing_ids[key],
+            "attribute": c.attribute,
+            "lower_threshold": c.lower_threshold,
+            "upper_threshold": c.upper_threshold,
+        }
+        for key, sub in subs_by_key.items()
+        for c in (sub.conditions or [])
+    ]
+    if condition_rows:
+        await session.execute(insert(SubscriptionCondition), condition_rows)
+
+    return [existing_ids[_subscription_key(sub)] for sub in subscriptions]
@@ -0,0 +1,122 @@
+import logging
+from asyncio import Lock
+from collections.abc import AsyncIterator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.cache import ExpiringValue
+from envoy.server.crud.site import select_aggregator_site_summary, select_aggregator_site_summary_version
+from envoy.server.manager.time import utc_now
+from envoy.server.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EndDeviceListHeader:
+    """The parts of an aggregator's EndDeviceList that don't depend on the page being requested"""
+
+    aggregator_exists: bool
+    virtual_site_timezone_id: str  # The virtual site shares its timezone with the first site under the aggregator
+    site_count: int  # Total number of sites under the aggregator (excluding the virtual site / any changed_after)
+    subscription_count: int  # Total number of subscriptions under the aggregator (linked from the virtual site)
+
+
+async def load_end_device_list_header(session: AsyncSession, aggregator_id: int) -> EndDeviceListHeader:
+    """Builds an EndDeviceListHeader for aggregator_id from the current DB state (a single query)"""
+    summary = await select_aggregator_site_summary(session, aggregator_id)
+    return EndDeviceListHeader(
+        aggregator_exists=summary.aggregator_exists,
+        virtual_site_timezone_id=(
+            summary.first_site_timezone_id if summary.first_site_timezone_id else settings.default_timezone
+        ),
+        site_count=summary.site_count,
+        subscription_count=summary.subscription_count,
+    )
+
+
+@dataclass(frozen=True)
+class _VersionedHeader:
+    header: EndDeviceListHeader
+    version: tuple[Any, ...]  # The select_aggregator_site_summary_version that header was loaded at
+
+
+class EndDeviceListHeaderCache:
+    """Holds the most recently loaded EndDeviceListHeader (per aggregator) for up to ttl_seconds. Every get makes a
+    cheap version probe (see select_aggregator_site_summary_version) so that Site/Subscription writes made by ANY
+    process (eg the admin server or another server replica) are visible on the very next request. The version is
+    shared by all aggregators, so a write under one aggregator will cause every other aggregator's header to reload
+    (once). The ttl bounds how stale a header can become for writes that the version can't detect.
+
+    This cache is "async safe" but it is NOT thread safe."""
+
+    _headers: dict[int, ExpiringValue[_VersionedHeader]]  # Keyed by aggregator_id
+    _locks: dict[int, Lock]  # Keyed by aggregator_id - loads for different aggregators don't block each other
+    ttl_seconds: float
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self._headers = {}
+        self._locks = {}
+        self.ttl_seconds = ttl_seconds
+
+    def _get_current(self, aggregator_id: int, version: tuple[Any, ...]) -> EndDeviceListHeader | None:
+        cached = self._headers.get(aggregator_id, None)
+        if cached is None or cached.is_expired() or cached.value.version != version:
+            return None
+        return cached.value.header
+
+    async def get(self, session: AsyncSession, aggregator_id: int) -> EndDeviceListHeader:
+        """Returns the cached header for aggregator_id - loading it (via session) if it's missing/expired/out of
+        date"""
+        version = await select_aggregator_site_summary_version(session)
+        header = self._get_current(aggregator_id, version)
+        if header is not None:
+            return header
+
+        lock = self._locks.setdefault(aggregator_id, Lock())
+        async with lock:
+            # Another coroutine may have loaded the header while we were waiting on the lock
+            header = self._get_current(aggregator_id, version)
+            if header is not None:
+                return header
+
+            # The version is probed BEFORE loading - a write that races this load will change the version (forcing
+            # the next get to reload) rather than being masked by this header
+            header = await load_end_device_list_header(session, aggregator_id)
+            expiry = utc_now() + timedelta(seconds=self.ttl_seconds)
+            self._headers[aggregator_id] = ExpiringValue(expiry=expiry, value=_VersionedHeader(header, version))
+            return header
+
+
+# The process wide header cache (only set while enable_end_device_list_header_cache is active)
+_header_cache: EndDeviceListHeaderCache | None = None
+
+
+async def fetch_end_device_list_header(session: AsyncSession, aggregator_id: int) -> EndDeviceListHeader:
+    """Fetches the current EndDeviceListHeader for aggregator_id - from the process wide cache if it's enabled,
+    otherwise it will be loaded via session"""
+    if _header_cache is None:
+        return await load_end_device_list_header(session, aggregator_id)
+    return await _header_cache.get(session, aggregator_id)
+
+
+def enable_end_device_list_header_cache(ttl_seconds: float) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+    """Returns a FastAPI lifespan context manager that enables the process wide EndDeviceListHeader cache (with the
+    specified ttl_seconds) for the lifetime of the app"""
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        global _header_cache
+        _header_cache = EndDeviceListHeaderCache(ttl_seconds)
+        logger.info(f"EndDeviceList header cache enabled (ttl {ttl_seconds}s)")
+        try:
+            yield
+        finally:
+            _header_cache = None
+
+    return context_manager
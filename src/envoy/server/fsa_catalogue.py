@@ -0,0 +1,123 @@
+import logging
+from asyncio import Lock
+from collections.abc import AsyncIterator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.cache import ExpiringValue
+from envoy.server.crud.function_set_assignments import (
+    select_function_set_assignments_summary,
+    select_function_set_assignments_version,
+)
+from envoy.server.manager.time import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FunctionSetAssignmentsCatalogue:
+    """The (global) set of FunctionSetAssignments - derived from the distinct fsa_id values across every Tariff and
+    SiteControlGroup"""
+
+    fsa_ids: list[int]  # Every distinct fsa_id (sorted ascending)
+    derp_counts_by_fsa_id: dict[int, int]  # Count of SiteControlGroups (DERPrograms) keyed by fsa_id (omits 0 counts)
+    changed_times_by_fsa_id: dict[int, datetime]  # Latest Tariff/SiteControlGroup changed_time keyed by fsa_id
+
+    def fsa_ids_changed_after(self, changed_after: datetime) -> list[int]:
+        """Returns the (sorted) fsa_ids with at least one Tariff/SiteControlGroup changed at/after changed_after"""
+        if changed_after == datetime.min:
+            return self.fsa_ids
+        return [fsa_id for fsa_id in self.fsa_ids if self.changed_times_by_fsa_id[fsa_id] >= changed_after]
+
+
+async def load_function_set_assignments_catalogue(session: AsyncSession) -> FunctionSetAssignmentsCatalogue:
+    """Builds a FunctionSetAssignmentsCatalogue from the current DB state (a single query)"""
+    summary = await select_function_set_assignments_summary(session)
+    return FunctionSetAssignmentsCatalogue(
+        fsa_ids=[fsa_id for fsa_id, _, _ in summary],
+        derp_counts_by_fsa_id={fsa_id: derp_count for fsa_id, derp_count, _ in summary if derp_count},
+        changed_times_by_fsa_id={fsa_id: changed_time for fsa_id, _, changed_time in summary},
+    )
+
+
+class FunctionSetAssignmentsCatalogueCache:
+    """Holds the most recently loaded FunctionSetAssignmentsCatalogue for up to ttl_seconds. Every get makes a cheap
+    version probe (see select_function_set_assignments_version) so that Tariff/SiteControlGroup writes made by ANY
+    process (eg the admin server or another server replica) are visible on the very next request. The ttl bounds how
+    stale the catalogue can become for writes that the version can't detect.
+
+    This cache is "async safe" but it is NOT thread safe."""
+
+    _catalogue: ExpiringValue[FunctionSetAssignmentsCatalogue] | None
+    _version: tuple[Any, ...] | None  # The select_function_set_assignments_version that _catalogue was loaded at
+    _lock: Lock
+    ttl_seconds: float
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self._catalogue = None
+        self._version = None
+        self._lock = Lock()
+        self.ttl_seconds = ttl_seconds
+
+    def _get_current(self, version: tuple[Any, ...]) -> FunctionSetAssignmentsCatalogue | None:
+        cached = self._catalogue
+        if cached is None or cached.is_expired() or self._version != version:
+            return None
+        return cached.value
+
+    async def get(self, session: AsyncSession) -> FunctionSetAssignmentsCatalogue:
+        """Returns the cached catalogue - loading it (via session) if it's missing/expired/out of date"""
+        version = await select_function_set_assignments_version(session)
+        catalogue = self._get_current(version)
+        if catalogue is not None:
+            return catalogue
+
+        async with self._lock:
+            # Another coroutine may have loaded the catalogue while we were waiting on the lock
+            catalogue = self._get_current(version)
+            if catalogue is not None:
+                return catalogue
+
+            # The version is probed BEFORE loading - a write that races this load will change the version (forcing
+            # the next get to reload) rather than being masked by this catalogue
+            catalogue = await load_function_set_assignments_catalogue(session)
+            expiry = utc_now() + timedelta(seconds=self.ttl_seconds)
+            self._catalogue = ExpiringValue(expiry=expiry, value=catalogue)
+            self._version = version
+            return catalogue
+
+
+# The process wide catalogue cache (only set while enable_function_set_assignments_catalogue_cache is active)
+_catalogue_cache: FunctionSetAssignmentsCatalogueCache | None = None
+
+
+async def fetch_function_set_assignments_catalogue(session: AsyncSession) -> FunctionSetAssignmentsCatalogue:
+    """Fetches the current FunctionSetAssignmentsCatalogue - from the process wide cache if it's enabled, otherwise
+    it will be loaded via session"""
+    if _catalogue_cache is None:
+        return await load_function_set_assignments_catalogue(session)
+    return await _catalogue_cache.get(session)
+
+
+def enable_function_set_assignments_catalogue_cache(
+    ttl_seconds: float,
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+    """Returns a FastAPI lifespan context manager that enables the process wide FunctionSetAssignmentsCatalogue cache
+    (with the specified ttl_seconds) for the lifetime of the app"""
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        global _catalogue_cache
+        _catalogue_cache = FunctionSetAssignmentsCatalogueCache(ttl_seconds)
+        logger.info(f"FunctionSetAssignments catalogue cache enabled (ttl {ttl_seconds}s)")
+        try:
+            yield
+        finally:
+            _catalogue_cache = None
+
+    return context_manager
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Generic, TypeVar
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from envoy.server.crud.health import DynamicOperatingEnvelopeCheck, DynamicPriceCheck, HealthCheck
+from envoy.server.manager.health import HealthManager
+
+logger = logging.getLogger(__name__)
+
+# A snapshot older than this many check intervals is treated as failing (the monitor has stalled or the checks are
+# hanging) rather than being served indefinitely
+MAX_SNAPSHOT_AGE_INTERVALS = 3
+
+TCheck = TypeVar("TCheck", HealthCheck, DynamicPriceCheck, DynamicOperatingEnvelopeCheck)
+
+
+@dataclass(frozen=True)
+class HealthSnapshot(Generic[TCheck]):
+    """The result of a single health check run in the background"""
+
+    check: TCheck
+    checked_at: float  # time.monotonic() value of when the check completed
+
+    def age_seconds(self, now: float) -> float:
+        """How old (in seconds) this snapshot is at now (a time.monotonic() value)"""
+        return max(0.0, now - self.checked_at)
+
+
+class HealthMonitor:
+    """Holds the most recent result of every health check. These are refreshed in the background (every
+    interval_seconds) by run_health_monitor so that health probes can be answered without touching the database.
+
+    A snapshot will be None until its check has completed at least once"""
+
+    interval_seconds: float
+    health: HealthSnapshot[HealthCheck] | None
+    dynamic_price: HealthSnapshot[DynamicPriceCheck] | None
+    dynamic_operating_envelope: HealthSnapshot[DynamicOperatingEnvelopeCheck] | None
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self.health = None
+        self.dynamic_price = None
+        self.dynamic_operating_envelope = None
+
+    @property
+    def max_age_seconds(self) -> float:
+        """Snapshots older than this should no longer be trusted"""
+        return self.interval_seconds * MAX_SNAPSHOT_AGE_INTERVALS
+
+    def fresh(self, snapshot: HealthSnapshot[TCheck] | None, now: float) -> HealthSnapshot[TCheck] | None:
+        """Returns snapshot if it exists and is within max_age_seconds at now (a time.monotonic() value). None
+        otherwise"""
+        if snapshot is None or snapshot.age_seconds(now) > self.max_age_seconds:
+            return None
+        return snapshot
+
+
+async def _run_check(
+    session_maker: async_sessionmaker[AsyncSession], run: Callable[[AsyncSession], Awaitable[TCheck]]
+) -> HealthSnapshot[TCheck]:
+    # Each check gets its own session so that a failure in one can't poison the transaction of another
+    async with session_maker() as session:
+        check = await run(session)
+    return HealthSnapshot(check=check, checked_at=monotonic())
+
+
+async def run_health_checks(session_maker: async_sessionmaker[AsyncSession], monitor: HealthMonitor) -> None:
+    """Runs every health check once - updating the snapshots stored in monitor"""
+    monitor.health = await _run_check(session_maker, HealthManager.run_health_check)
+    monitor.dynamic_price = await _run_check(session_maker, HealthManager.run_dynamic_price_check)
+    monitor.dynamic_operating_envelope = await _run_check(
+        session_maker, HealthManager.run_dynamic_operating_envelope_check
+    )
+
+
+async def run_health_monitor(
+    session_maker: async_sessionmaker[AsyncSession], monitor: HealthMonitor, stop_event: asyncio.Event
+) -> None:
+    """Periodically updates the snapshots in monitor until stop_event is set. If a round of checks can't be completed,
+    the existing snapshots will be left to age (eventually being treated as failing)"""
+    while not stop_event.is_set():
+        try:
+            await run_health_checks(session_maker, monitor)
+        except Exception as exc:
+            logger.error("Failure running background health checks", exc_info=exc)
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=monitor.interval_seconds)
+        except TimeoutError:
+            pass
+
+
+def enable_health_monitor(
+    db_kwargs: dict[str, Any], interval_seconds: float
+) -> tuple[HealthMonitor, Callable[[FastAPI], _AsyncGeneratorContextManager]]:
+    """Creates a HealthMonitor (with a dedicated engine) and a FastAPI lifespan context manager that keeps it up to
+    date in the background (started on app startup, stopped on shutdown).
+
+    db_kwargs - The db_middleware_kwargs (db_url + optional engine_args) used to build the monitor's session maker"""
+    engine = create_async_engine(db_kwargs["db_url"], **db_kwargs.get("engine_args", {}))
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    monitor = HealthMonitor(interval_seconds)
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(run_health_monitor(session_maker, monitor, stop_event))
+        try:
+            yield
+        finally:
+            stop_event.set()
+            await task
+            await engine.dispose()
+
+    return monitor, context_manager
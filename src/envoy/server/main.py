@@ -1,4 +1,6 @@
 import logging
+from collections.abc import Callable
+from contextlib import _AsyncGeneratorContextManager
 
 import uvicorn
 from fastapi import Depends, FastAPI, HTTPException
@@ -11,9 +13,13 @@ from envoy.notification.handler import enable_notification_client
 from envoy.notification.main import enable_notification_worker
 from envoy.server.api.depends.allow_nmi_updates import ALLOW_NMI_UPDATES_ATTR
 from envoy.server.api.depends.azure_ad_auth import AzureADAuthDepends
+from envoy.server.api.depends.health_monitor import HEALTH_MONITOR_ATTR
 from envoy.server.api.depends.lfdi_auth import LFDIAuthDepends
+from envoy.server.api.depends.list_streaming import LIST_STREAMING_MIN_LIMIT_ATTR
 from envoy.server.api.depends.nmi_validator import NMI_VALIDATOR_ATTR
 from envoy.server.api.depends.request_state_settings import RequestStateSettingsDepends
+from envoy.server.api.depends.response_ingestion import RESPONSE_BATCH_WRITER_ATTR, RESPONSE_SUBJECT_CACHE_ATTR
+from envoy.server.api.depends.xml_request_limits import XML_REQUEST_MAX_BODY_BYTES_ATTR, XML_REQUEST_MAX_ELEMENTS_ATTR
 from envoy.server.api.error_handler import (
     general_exception_handler,
     http_exception_handler,
@@ -21,9 +27,17 @@ from envoy.server.api.error_handler import (
     xml_exception_handler,
 )
 from envoy.server.api.router import routers, unsecured_routers
+from envoy.server.api.unsecured.metrics import router as metrics_router
 from envoy.server.database import enable_dynamic_azure_ad_database_credentials
+from envoy.server.end_device_list_header import enable_end_device_list_header_cache
 from envoy.server.endpoint_exclusion import generate_routers_with_excluded_endpoints
+from envoy.server.fsa_catalogue import enable_function_set_assignments_catalogue_cache
+from envoy.server.health_monitor import HealthMonitor, enable_health_monitor
 from envoy.server.lifespan import generate_combined_lifespan_manager
+from envoy.server.manager.response import ResponseSubjectCache
+from envoy.server.metrics import MetricsMiddleware, enable_metrics
+from envoy.server.read_replica import ReadReplica, ReadReplicaRoutingMiddleware
+from envoy.server.response_writer import ResponseBatchWriter, enable_response_batch_writer
 from envoy.server.settings import AppSettings, settings
 
 # Setup logs
@@ -31,11 +45,32 @@ logging.basicConfig(style="{", level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def generate_cache_lifespan_managers(
+    new_settings: AppSettings,
+) -> list[Callable[[FastAPI], _AsyncGeneratorContextManager]]:
+    """Generates the lifespan managers for the (optional) in process caches enabled by new_settings"""
+    lifespan_managers: list[Callable[[FastAPI], _AsyncGeneratorContextManager]] = []
+
+    # Optionally cache the (global) FunctionSetAssignments catalogue in process
+    if new_settings.fsa_catalogue_cache_ttl_seconds:
+        lifespan_managers.append(
+            enable_function_set_assignments_catalogue_cache(new_settings.fsa_catalogue_cache_ttl_seconds)
+        )
+
+    # Optionally cache the (per aggregator) EndDeviceList header in process
+    if new_settings.edev_list_header_cache_ttl_seconds:
+        lifespan_managers.append(enable_end_device_list_header_cache(new_settings.edev_list_header_cache_ttl_seconds))
+
+    return lifespan_managers
+
+
 def generate_app(new_settings: AppSettings) -> FastAPI:
     """Generates a new app instance utilising the specific settings instance"""
 
     lfdi_auth = LFDIAuthDepends(
-        cert_header=new_settings.cert_header, allow_device_registration=new_settings.allow_device_registration
+        cert_header=new_settings.cert_header,
+        allow_device_registration=new_settings.allow_device_registration,
+        cache_ttl_seconds=new_settings.lfdi_auth_cache_ttl_seconds,
     )
     global_dependencies = [Depends(lfdi_auth)]
     lifespan_managers = []
@@ -48,6 +83,20 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
         lifespan_managers.append(enable_notification_client())
         lifespan_managers.append(enable_notification_worker(new_settings.db_middleware_kwargs))
 
+    # Optionally group Response writes (from many devices) into batched transactions written in the background
+    response_batch_writer: ResponseBatchWriter | None = None
+    if new_settings.enable_response_batching:
+        response_batch_writer, response_batch_writer_manager = enable_response_batch_writer(
+            new_settings.db_middleware_kwargs,
+            max_batch_size=new_settings.response_batch_max_size,
+            max_delay_seconds=new_settings.response_batch_max_delay_ms / 1000,
+            max_queue_size=new_settings.response_batch_max_queue_size,
+        )
+        lifespan_managers.append(response_batch_writer_manager)
+
+    # Optionally cache (in process) the parts of the FSA/EndDevice lists that don't change between requests
+    lifespan_managers.extend(generate_cache_lifespan_managers(new_settings))
+
     # Azure AD Auth is an optional extension enabled via configuration settings
     azure_ad_settings = new_settings.azure_ad_kwargs
     if azure_ad_settings:
@@ -56,6 +105,8 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
             tenant_id=azure_ad_settings["tenant_id"],
             client_id=azure_ad_settings["client_id"],
             valid_issuer=azure_ad_settings["issuer"],
+            token_cache_max_size=new_settings.azure_ad_token_cache_max_size,
+            token_cache_expiry_buffer_seconds=new_settings.azure_ad_token_cache_expiry_buffer_secs,
         )
         global_dependencies.insert(0, Depends(azure_ad_auth))
 
@@ -75,8 +126,38 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
                 )
             )
 
+    # Optionally run the (database) health checks in the background - serving the cached results to health probes.
+    # Registered after the dynamic database credentials so that the first checks don't run without them
+    health_monitor: HealthMonitor | None = None
+    if new_settings.health_check_interval_seconds:
+        health_monitor, health_monitor_manager = enable_health_monitor(
+            new_settings.db_middleware_kwargs, new_settings.health_check_interval_seconds
+        )
+        lifespan_managers.append(health_monitor_manager)
+
+    # Optionally route GET/HEAD request reads to a read replica (writes always go to the primary)
+    db_middleware_kwargs = new_settings.db_middleware_kwargs
+    read_replica: ReadReplica | None = None
+    if new_settings.read_database_url:
+        logger.info(f"Enabling read replica routing (max staleness {new_settings.read_database_max_staleness_secs}s)")
+        read_replica = ReadReplica(
+            str(new_settings.read_database_url),
+            engine_args=db_middleware_kwargs.get("engine_args", None),
+            max_staleness_seconds=new_settings.read_database_max_staleness_secs,
+        )
+        db_middleware_kwargs = read_replica.routing_middleware_kwargs(db_middleware_kwargs)
+        lifespan_managers.append(read_replica.enable_lag_monitor(new_settings.read_database_lag_check_secs))
+
     new_app = FastAPI(**new_settings.fastapi_kwargs, lifespan=generate_combined_lifespan_manager(lifespan_managers))
-    new_app.add_middleware(SQLAlchemyMiddleware, **new_settings.db_middleware_kwargs)
+    new_app.add_middleware(SQLAlchemyMiddleware, **db_middleware_kwargs)
+    if read_replica:
+        new_app.add_middleware(
+            ReadReplicaRoutingMiddleware, status=read_replica.status, client_key_header=new_settings.cert_header
+        )
+
+    # Optionally record per route latency / database query metrics (exposed on the unsecured metrics endpoint)
+    if new_settings.enable_metrics:
+        new_app.add_middleware(MetricsMiddleware, registry=enable_metrics())
 
     # install routers
     if new_settings.exclude_endpoints:
@@ -88,6 +169,8 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
         new_app.include_router(router, dependencies=global_dependencies)
     for router in unsecured_routers:
         new_app.include_router(router)
+    if new_settings.enable_metrics:
+        new_app.include_router(metrics_router)
 
     # Manually inject configured NMI validator into app state
     if new_settings.nmi_validation and new_settings.nmi_validation.nmi_validation_enabled:
@@ -95,9 +178,30 @@ def generate_app(new_settings: AppSettings) -> FastAPI:
     else:
         setattr(new_app.state, NMI_VALIDATOR_ATTR, None)
 
+    # Inject the Response ingestion helpers
+    setattr(
+        new_app.state,
+        RESPONSE_SUBJECT_CACHE_ATTR,
+        ResponseSubjectCache(
+            max_size=new_settings.response_subject_cache_max_size,
+            ttl_seconds=new_settings.response_subject_cache_ttl_seconds,
+        ),
+    )
+    setattr(new_app.state, RESPONSE_BATCH_WRITER_ATTR, response_batch_writer)
+
+    # Inject the (optional) background health check results
+    setattr(new_app.state, HEALTH_MONITOR_ATTR, health_monitor)
+
     # Inject allow nmi updates setting
     setattr(new_app.state, ALLOW_NMI_UPDATES_ATTR, new_settings.allow_nmi_updates)
 
+    # Inject the XML request body limits
+    setattr(new_app.state, XML_REQUEST_MAX_BODY_BYTES_ATTR, new_settings.xml_request_max_body_bytes)
+    setattr(new_app.state, XML_REQUEST_MAX_ELEMENTS_ATTR, new_settings.xml_request_max_elements)
+
+    # Inject the minimum list limit that will be streamed
+    setattr(new_app.state, LIST_STREAMING_MIN_LIMIT_ATTR, new_settings.list_streaming_min_limit)
+
     new_app.add_exception_handler(HTTPException, http_exception_handler)
     new_app.add_exception_handler(ValidationError, validation_exception_handler)
     new_app.add_exception_handler(XMLSyntaxError, xml_exception_handler)
@@ -0,0 +1,353 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from dateutil.relativedelta import relativedelta
+from fastapi import FastAPI
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from envoy.server.crud.archive import find_archive_types, purge_archive_rows
+from envoy.server.crud.partition import drop_month_partitions_before, ensure_month_partitions, start_of_month
+from envoy.server.crud.site_reading import recalculate_site_reading_rollups
+from envoy.server.manager.time import utc_now
+from envoy.server.model.archive.base import ArchiveBase
+from envoy.server.model.archive.site_reading import ArchiveSiteReading
+from envoy.server.model.response import DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse
+from envoy.server.model.site import SiteLogEvent
+from envoy.server.model.site_reading import SiteReading, SiteReadingType
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary (but constant) key for the postgresql advisory lock that serialises partition maintenance across instances
+PARTITION_MAINTENANCE_LOCK_KEY = 0x656E766F79_01
+
+# The archive purge will never delete batches larger than this (regardless of configuration)
+MAX_ARCHIVE_PURGE_BATCH_SIZE = 50000
+
+
+@dataclass(frozen=True)
+class ArchiveRetentionPolicy:
+    """How long the rows of a single archive table are retained before being purged (see purge_archive_rows)"""
+
+    archive_type: type[ArchiveBase]
+    retention: timedelta  # Snapshots archived longer ago than this are purged (the latest deleted snapshot is kept)
+    deleted_retention: timedelta | None  # If set - the latest deleted snapshot is purged once it's older than this
+
+
+# The tables that are monthly RANGE partitioned on time_period_start
+SITE_READING_PARTITIONED_TABLES: list[str] = [
+    SiteReading.__tablename__,
+    ArchiveSiteReading.__tablename__,
+]
+
+# The (append only) response tables that are monthly RANGE partitioned on created_time
+RESPONSE_PARTITIONED_TABLES: list[str] = [
+    DynamicOperatingEnvelopeResponse.__tablename__,
+    TariffGeneratedRateResponse.__tablename__,
+]
+
+# The (append only) log event tables that are monthly RANGE partitioned on created_time
+SITE_LOG_EVENT_PARTITIONED_TABLES: list[str] = [SiteLogEvent.__tablename__]
+
+# Every table that is monthly RANGE partitioned (and will be maintained by run_partition_maintenance)
+PARTITIONED_TABLES: list[str] = (
+    SITE_READING_PARTITIONED_TABLES + RESPONSE_PARTITIONED_TABLES + SITE_LOG_EVENT_PARTITIONED_TABLES
+)
+
+
+def _create_session_maker(db_kwargs: dict[str, Any]) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """Creates a dedicated engine/session maker for a background task from the db_middleware_kwargs (db_url + optional
+    engine_args)."""
+    engine = create_async_engine(db_kwargs["db_url"], **db_kwargs.get("engine_args", {}))
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def partition_retention_months(
+    site_reading_months: int | None, response_months: int | None, site_log_event_months: int | None
+) -> dict[str, int]:
+    """Generates the retention_months (keyed by partitioned table name) for run_partition_maintenance. Tables whose
+    retention is None are omitted (i.e. kept forever)"""
+    retention_months: dict[str, int] = {}
+    for tables, months in [
+        (SITE_READING_PARTITIONED_TABLES, site_reading_months),
+        (RESPONSE_PARTITIONED_TABLES, response_months),
+        (SITE_LOG_EVENT_PARTITIONED_TABLES, site_log_event_months),
+    ]:
+        if months is not None:
+            retention_months.update((table, months) for table in tables)
+    return retention_months
+
+
+async def run_partition_maintenance(
+    session: AsyncSession, now: datetime, months_ahead: int, retention_months: dict[str, int]
+) -> None:
+    """Ensures all partitioned tables have monthly partitions covering now (+ months_ahead months). Any table listed
+    in retention_months (keyed by table name) will also have partitions that end more than its retention months before
+    the start of the current month dropped.
+
+    Changes will NOT be committed by this function"""
+
+    # Only one instance should be running DDL at a time - the lock is released at the end of the transaction
+    await session.execute(select(func.pg_advisory_xact_lock(PARTITION_MAINTENANCE_LOCK_KEY)))
+
+    for table in PARTITIONED_TABLES:
+        created = await ensure_month_partitions(session, table, now, months_ahead)
+        if created:
+            logger.info(f"Created partitions {created} for {table}")
+
+        table_retention_months = retention_months.get(table, None)
+        if table_retention_months is not None:
+            drop_before = start_of_month(now) - relativedelta(months=table_retention_months)
+            dropped = await drop_month_partitions_before(session, table, drop_before)
+            if dropped:
+                logger.info(f"Dropped partitions {dropped} for {table} (older than {drop_before})")
+
+
+async def run_partition_maintenance_loop(
+    session_maker: async_sessionmaker[AsyncSession],
+    interval_seconds: float,
+    months_ahead: int,
+    retention_months: dict[str, int],
+    stop_event: asyncio.Event,
+) -> None:
+    """Runs run_partition_maintenance every interval_seconds until stop_event is set. Errors are logged and the next
+    cycle will be attempted as normal"""
+    logger.info("Partition maintenance started")
+    while not stop_event.is_set():
+        try:
+            async with session_maker() as session:
+                await run_partition_maintenance(session, utc_now(), months_ahead, retention_months)
+                await session.commit()
+        except Exception as exc:
+            logger.error("Unexpected exception during partition maintenance", exc_info=exc)
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except TimeoutError:
+            pass
+    logger.info("Partition maintenance stopped")
+
+
+def enable_partition_maintenance(
+    db_kwargs: dict[str, Any], interval_seconds: float, months_ahead: int, retention_months: dict[str, int]
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+    """Returns a FastAPI lifespan context manager that periodically creates upcoming monthly partitions for the
+    partitioned tables (and optionally drops partitions older than retention_months - see partition_retention_months).
+
+    db_kwargs - The db_middleware_kwargs (db_url + optional engine_args) used to build the task's session maker."""
+    engine, session_maker = _create_session_maker(db_kwargs)
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(
+            run_partition_maintenance_loop(session_maker, interval_seconds, months_ahead, retention_months, stop_event)
+        )
+        try:
+            yield
+        finally:
+            stop_event.set()
+            await task
+            await engine.dispose()
+
+    return context_manager
+
+
+async def run_site_reading_rollup_backfill(
+    session_maker: async_sessionmaker[AsyncSession], batch_size: int, stop_event: asyncio.Event
+) -> int:
+    """Recalculates the SiteReadingRollup buckets for every SiteReadingType from the underlying readings. Reading types
+    are processed in batches of batch_size (ordered by id) with each batch being committed before moving onto the next
+    so that progress isn't lost (and locks aren't held) for the duration of the entire backfill.
+
+    Stops early (after the current batch) if stop_event is set. Returns the number of reading types processed"""
+    logger.info("Site reading rollup backfill started")
+    processed = 0
+    last_site_reading_type_id = 0
+    while not stop_event.is_set():
+        async with session_maker() as session:
+            resp = await session.execute(
+                select(SiteReadingType.site_reading_type_id)
+                .where(SiteReadingType.site_reading_type_id > last_site_reading_type_id)
+                .order_by(SiteReadingType.site_reading_type_id)
+                .limit(batch_size)
+            )
+            site_reading_type_ids = resp.scalars().all()
+            if not site_reading_type_ids:
+                break
+
+            await recalculate_site_reading_rollups(session, utc_now(), site_reading_type_ids)
+            await session.commit()
+
+        processed += len(site_reading_type_ids)
+        last_site_reading_type_id = site_reading_type_ids[-1]
+
+    logger.info(f"Site reading rollup backfill finished. Processed {processed} site reading types")
+    return processed
+
+
+def enable_site_reading_rollup_backfill(
+    db_kwargs: dict[str, Any], batch_size: int
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+    """Returns a FastAPI lifespan context manager that runs a single site reading rollup backfill (in the background)
+    on startup. Any backfill still running on shutdown will be stopped after its current batch.
+
+    db_kwargs - The db_middleware_kwargs (db_url + optional engine_args) used to build the task's session maker."""
+    engine, session_maker = _create_session_maker(db_kwargs)
+
+    async def backfill(stop_event: asyncio.Event) -> None:
+        try:
+            await run_site_reading_rollup_backfill(session_maker, batch_size, stop_event)
+        except Exception as exc:
+            logger.error("Unexpected exception during site reading rollup backfill", exc_info=exc)
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(backfill(stop_event))
+        try:
+            yield
+        finally:
+            stop_event.set()
+            await task
+            await engine.dispose()
+
+    return context_manager
+
+
+def parse_archive_retention_policies(
+    retention_days: dict[str, int], deleted_retention_days: dict[str, int]
+) -> list[ArchiveRetentionPolicy]:
+    """Generates an ArchiveRetentionPolicy for every archive table named in retention_days (keyed by archive table
+    name eg "archive_site"). deleted_retention_days can optionally extend those policies with a deleted retention.
+
+    Raises ValueError if an unknown archive table is referenced (or deleted_retention_days has no matching
+    retention_days entry)"""
+    archive_types_by_table = {t.__tablename__: t for t in find_archive_types()}
+
+    for table in list(retention_days.keys()) + list(deleted_retention_days.keys()):
+        if table not in archive_types_by_table:
+            raise ValueError(f"'{table}' is not a known archive table. Valid: {sorted(archive_types_by_table.keys())}")
+    for table in deleted_retention_days.keys():
+        if table not in retention_days:
+            raise ValueError(f"Archive table '{table}' has a deleted retention but no retention.")
+
+    policies: list[ArchiveRetentionPolicy] = []
+    for table, days in sorted(retention_days.items()):
+        deleted_days = deleted_retention_days.get(table, None)
+        policies.append(
+            ArchiveRetentionPolicy(
+                archive_type=archive_types_by_table[table],
+                retention=timedelta(days=days),
+                deleted_retention=None if deleted_days is None else timedelta(days=deleted_days),
+            )
+        )
+    return policies
+
+
+async def purge_archive_table(
+    session_maker: async_sessionmaker[AsyncSession],
+    policy: ArchiveRetentionPolicy,
+    now: datetime,
+    batch_size: int,
+    lock_timeout_ms: int,
+    batch_pause_seconds: float,
+    stop_event: asyncio.Event,
+) -> int:
+    """Purges all rows from policy.archive_type that have exceeded the retention policy (relative to now). Rows are
+    purged in batches of batch_size with each batch being committed in its own (lock_timeout_ms limited) transaction.
+    batch_pause_seconds will be waited between batches to limit the impact on other database users.
+
+    Stops early (after the current batch) if stop_event is set. Returns the total number of rows purged"""
+    batch_size = min(batch_size, MAX_ARCHIVE_PURGE_BATCH_SIZE)
+    archived_before = now - policy.retention
+    deleted_before = None if policy.deleted_retention is None else now - policy.deleted_retention
+
+    total_purged = 0
+    while not stop_event.is_set():
+        async with session_maker() as session:
+            # Rather than queueing behind (or blocking) long running transactions - bail out and try again next cycle
+            await session.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+            purged = await purge_archive_rows(session, policy.archive_type, archived_before, deleted_before, batch_size)
+            await session.commit()
+
+        total_purged += purged
+        if purged < batch_size:
+            break
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=batch_pause_seconds)
+        except TimeoutError:
+            pass
+    return total_purged
+
+
+async def run_archive_purge_loop(
+    session_maker: async_sessionmaker[AsyncSession],
+    policies: list[ArchiveRetentionPolicy],
+    interval_seconds: float,
+    batch_size: int,
+    lock_timeout_ms: int,
+    batch_pause_seconds: float,
+    stop_event: asyncio.Event,
+) -> None:
+    """Runs purge_archive_table for every policy every interval_seconds until stop_event is set. Errors (eg lock
+    timeouts) are logged and the remaining tables/cycles will be attempted as normal"""
+    logger.info(f"Archive purge started for {[p.archive_type.__tablename__ for p in policies]}")
+    while not stop_event.is_set():
+        for policy in policies:
+            if stop_event.is_set():
+                break
+
+            table = policy.archive_type.__tablename__
+            try:
+                purged = await purge_archive_table(
+                    session_maker, policy, utc_now(), batch_size, lock_timeout_ms, batch_pause_seconds, stop_event
+                )
+                if purged:
+                    logger.info(f"Purged {purged} rows from {table}")
+            except Exception as exc:
+                logger.error(f"Unexpected exception purging {table}", exc_info=exc)
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except TimeoutError:
+            pass
+    logger.info("Archive purge stopped")
+
+
+def enable_archive_purge(
+    db_kwargs: dict[str, Any],
+    policies: list[ArchiveRetentionPolicy],
+    interval_seconds: float,
+    batch_size: int,
+    lock_timeout_ms: int,
+    batch_pause_seconds: float,
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+    """Returns a FastAPI lifespan context manager that periodically purges archive rows that have exceeded their
+    retention policy (see run_archive_purge_loop).
+
+    db_kwargs - The db_middleware_kwargs (db_url + optional engine_args) used to build the task's session maker."""
+    engine, session_maker = _create_session_maker(db_kwargs)
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(
+            run_archive_purge_loop(
+                session_maker, policies, interval_seconds, batch_size, lock_timeout_ms, batch_pause_seconds, stop_event
+            )
+        )
+        try:
+            yield
+        finally:
+            stop_event.set()
+            await task
+            await engine.dispose()
+
+    return context_manager
@@ -1,3 +1,4 @@
+from collections.abc import AsyncGenerator
 from datetime import datetime
 
 from envoy_schema.server.schema.sep2.der import (
@@ -6,6 +7,7 @@ from envoy_schema.server.schema.sep2.der import (
     DERProgramListResponse,
     DERProgramResponse,
 )
+from fastapi_async_sqlalchemy import db
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from envoy.server.crud.doe import (
@@ -17,6 +19,7 @@ from envoy.server.crud.doe import (
     select_does_at_timestamp,
     select_site_control_group_by_id,
     select_site_control_groups,
+    stream_active_does_include_deleted,
 )
 from envoy.server.crud.site import select_single_site_with_site_id
 from envoy.server.exception import NotFoundError
@@ -166,6 +169,58 @@ class DERControlManager:
             now,
         )
 
+    @staticmethod
+    async def stream_doe_controls_for_scope(
+        scope: SiteRequestScope,
+        der_program_id: int,
+        start: int,
+        changed_after: datetime,
+        limit: int,
+    ) -> AsyncGenerator[DERControlListResponse | DERControlResponse, None]:
+        """Streaming equivalent of fetch_doe_controls_for_scope. Yields the DERControlList envelope (without any
+        DERControl items) followed by each DERControl in the page (see XmlListStreamingResponse). DOEs are read from a
+        server side cursor so the memory used doesn't grow with limit.
+
+        The request scoped session will have closed before a streaming response body is iterated so this will open (and
+        close) its own session for the duration of the stream."""
+
+        async with db():
+            session = db.session
+            now = utc_now()
+            config = await RuntimeServerConfigManager.fetch_current_config(session)
+
+            site = await select_single_site_with_site_id(session, scope.site_id, scope.aggregator_id)
+            if site is None:
+                # Site isn't in scope - return empty list
+                yield DERControlMapper.map_to_list_envelope(
+                    scope, der_program_id, 0, 0, DERControlListSource.DER_CONTROL_LIST
+                )
+                return
+
+            # The total count is calculated alongside the page of DOEs - we need it before anything can be written
+            does = stream_active_does_include_deleted(session, der_program_id, site, now, start, changed_after, limit)
+            first = await anext(does, None)
+            if first is None:
+                total_count = await count_active_does_include_deleted(session, der_program_id, site, now, changed_after)
+            else:
+                total_count = first[1]
+
+            yield DERControlMapper.map_to_list_envelope(
+                scope,
+                der_program_id,
+                total_count,
+                min(limit, max(0, total_count - start)),
+                DERControlListSource.DER_CONTROL_LIST,
+            )
+            if first is not None:
+                yield DERControlMapper.map_to_response(
+                    scope, der_program_id, first[0], config.site_control_pow10_encoding, now
+                )
+            async for doe, _ in does:
+                yield DERControlMapper.map_to_response(
+                    scope, der_program_id, doe, config.site_control_pow10_encoding, now
+                )
+
     @staticmethod
     async def fetch_active_doe_controls_for_scope(
         session: AsyncSession,
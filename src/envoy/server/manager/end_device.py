@@ -1,7 +1,8 @@
 import logging
 import os
-from collections.abc import Sequence
-from datetime import datetime
+from collections.abc import AsyncGenerator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from secrets import randbelow, token_bytes
 
 from envoy_schema.server.schema.csip_aus.connection_point import ConnectionPointResponse
@@ -11,12 +12,14 @@ from envoy_schema.server.schema.sep2.end_device import (
     EndDeviceResponse,
     RegistrationResponse,
 )
+from fastapi_async_sqlalchemy import db
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from envoy.notification.manager.notification import NotificationManager
 from envoy.server.crud.archive import copy_rows_into_archive
 from envoy.server.crud.site import (
+    build_virtual_site,
     delete_site_for_aggregator,
     get_virtual_site_for_aggregator,
     insert_site_for_aggregator,
@@ -25,8 +28,12 @@ from envoy.server.crud.site import (
     select_single_site_with_lfdi,
     select_single_site_with_sfdi,
     select_single_site_with_site_id,
+    stream_all_sites_with_aggregator_id,
 )
 from envoy.server.crud.subscription import count_subscriptions_for_site
+from envoy.server.end_device_list_header import (
+    fetch_end_device_list_header,
+)
 from envoy.server.exception import (
     BadRequestError,
     ConflictError,
@@ -61,13 +68,31 @@ MAX_REGISTRATION_PIN = 99999
 logger = logging.getLogger(__name__)
 
 
+# Site changed_time values are never earlier than this - any changed after filter at/before it won't filter anything
+UNFILTERED_CHANGED_AFTER = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def is_unfiltered_changed_after(after: datetime) -> bool:
+    """Returns True if a changed after filter of after can't exclude any site. This will be the case for the API
+    default (a=0 which is the unix epoch) as well as datetime.min. Naive datetimes are assumed to be UTC"""
+    if after.tzinfo is None:
+        after = after.replace(tzinfo=UTC)
+    return after <= UNFILTERED_CHANGED_AFTER
+
+
 async def fetch_sites_and_count_for_claims(
     session: AsyncSession,
     scope: UnregisteredRequestScope,
     start: int,
     after: datetime,
     limit: int,
+    aggregator_site_count: int | None = None,
 ) -> tuple[Sequence[Site], int]:
+    """Fetches the page of sites (and total count) visible to scope.
+
+    aggregator_site_count: If set (and scope is for an aggregator) - the total count of ALL sites under the aggregator.
+                           This will be used instead of counting (if after doesn't filter anything - see
+                           is_unfiltered_changed_after)"""
 
     # Are we selecting all sites for an aggregator or are we scoped to a particular site
     if scope.source == CertificateType.DEVICE_CERTIFICATE:
@@ -93,12 +118,63 @@ async def fetch_sites_and_count_for_claims(
             return ([], 0)
     elif scope.source == CertificateType.AGGREGATOR_CERTIFICATE:
         site_list = await select_all_sites_with_aggregator_id(session, scope.aggregator_id, start, after, limit)
-        site_count = await select_aggregator_site_count(session, scope.aggregator_id, after)
+        if aggregator_site_count is not None and is_unfiltered_changed_after(after):
+            site_count = aggregator_site_count
+        else:
+            site_count = await select_aggregator_site_count(session, scope.aggregator_id, after)
         return (site_list, site_count)
     else:
         raise ValueError(f"Unsupported scope source: {scope.source}")
 
 
+@dataclass(frozen=True)
+class EndDeviceListPage:
+    """How a page of an EndDeviceList is split between the (aggregator) virtual site and the sites that need fetching"""
+
+    includes_virtual_site: bool  # Is the virtual site part of the list (regardless of whether it's on this page)
+    virtual_site: Site | None  # The virtual site (if it's on this page)
+    subscription_count: int  # Subscriptions linked from the virtual site (0 if it's not on this page)
+    aggregator_site_count: int | None  # Total sites under the aggregator (from the EndDeviceList header) if known
+    site_start: int  # The start to use when fetching the page of sites
+    site_limit: int  # The limit to use when fetching the page of sites
+
+
+async def fetch_end_device_list_page(
+    session: AsyncSession, scope: UnregisteredRequestScope, start: int, limit: int
+) -> EndDeviceListPage:
+    """Calculates the EndDeviceListPage for the specified start/limit. For an aggregator:
+
+    start = 0 return [virtual_site, site_1, site_2, site_3, ...]
+    start = 1 return [site_1, site_2, site_3, ...]
+    start = 2 return [site_2, site_3, ...]
+    """
+    if scope.source != CertificateType.AGGREGATOR_CERTIFICATE:
+        return EndDeviceListPage(False, None, 0, None, start, limit)
+
+    # The page independent parts of the list (virtual site, counts) come from the (cacheable) header
+    header = await fetch_end_device_list_header(session, scope.aggregator_id)
+    virtual_site: Site | None = None
+    subscription_count = 0
+    if start == 0:
+        if limit > 0:
+            # Get the virtual site associated with the aggregator
+            if header.aggregator_exists:
+                virtual_site = build_virtual_site(
+                    aggregator_id=scope.aggregator_id,
+                    aggregator_lfdi=scope.lfdi,
+                    timezone_id=header.virtual_site_timezone_id,
+                    post_rate_seconds=None,
+                )
+            subscription_count = header.subscription_count
+
+        # Adjust limit to account for the virtual site
+        limit = max(0, limit - 1)
+
+    # Ensure a start value of either 0 or 1 will return the first site for the aggregator
+    start = max(0, start - 1)
+    return EndDeviceListPage(True, virtual_site, subscription_count, header.site_count, start, limit)
+
+
 class EndDeviceManager:
     @staticmethod
     async def fetch_enddevice_for_scope(
@@ -300,37 +376,19 @@ class EndDeviceManager:
         start = 1 return [site_1, site_2, site_3, ...]
         start = 2 return [site_2, site_3, ...]
         """
-        virtual_site: Site | None = None
-        includes_virtual_site = scope.source == CertificateType.AGGREGATOR_CERTIFICATE
-        subscription_count = 0  # This is lazily evaluated
         fsa_count = len(
             await FunctionSetAssignmentsManager.fetch_distinct_function_set_assignment_ids(session, datetime.min)
         )  # The count of function set assignments is invariant to the EndDevice (in our implementation)
 
-        # Include the aggregator virtual site?
-        if includes_virtual_site:
-            if start == 0:
-                if limit > 0:
-                    # Get the virtual site associated with the aggregator
-                    virtual_site = await get_virtual_site_for_aggregator(
-                        session=session,
-                        aggregator_id=scope.aggregator_id,
-                        aggregator_lfdi=scope.lfdi,
-                        post_rate_seconds=None,
-                    )
-                    subscription_count = await count_subscriptions_for_site(session, scope.aggregator_id, None, None)
-
-                # Adjust limit to account for the virtual site
-                limit = max(0, limit - 1)
-
-            # Ensure a start value of either 0 or 1 will return the first site for the aggregator
-            start = max(0, start - 1)
+        page = await fetch_end_device_list_page(session, scope, start, limit)
 
         # Are we selecting all sites for an aggregator or are we scoped to a particular site
-        site_list, site_count = await fetch_sites_and_count_for_claims(session, scope, start, after, limit)
+        site_list, site_count = await fetch_sites_and_count_for_claims(
+            session, scope, page.site_start, after, page.site_limit, page.aggregator_site_count
+        )
 
         # site_count should include the virtual site
-        if includes_virtual_site:
+        if page.includes_virtual_site:
             site_count += 1
 
         # fetch runtime server config
@@ -340,13 +398,70 @@ class EndDeviceManager:
             scope=scope,
             site_list=site_list,
             site_count=site_count,
-            virtual_site=virtual_site,
+            virtual_site=page.virtual_site,
             disable_registration=config.disable_edev_registration,
             pollrate_seconds=config.edevl_pollrate_seconds,
             total_fsa_links=fsa_count,
-            total_subscription_links=subscription_count,
+            total_subscription_links=page.subscription_count,
         )
 
+    @staticmethod
+    async def stream_enddevicelist_for_scope(
+        scope: UnregisteredRequestScope,
+        start: int,
+        after: datetime,
+        limit: int,
+    ) -> AsyncGenerator[EndDeviceListResponse | EndDeviceResponse, None]:
+        """Streaming equivalent of fetch_enddevicelist_for_scope. Yields the EndDeviceList envelope (without any
+        EndDevice items) followed by each EndDevice in the page (see XmlListStreamingResponse). Sites are read from a
+        server side cursor so the memory used doesn't grow with limit.
+
+        The request scoped session will have closed before a streaming response body is iterated so this will open (and
+        close) its own session for the duration of the stream."""
+        async with db():
+            session = db.session
+            if scope.source != CertificateType.AGGREGATOR_CERTIFICATE:
+                # A device cert will only ever see (at most) its own EndDevice - there is nothing worth streaming
+                edev_list = await EndDeviceManager.fetch_enddevicelist_for_scope(session, scope, start, after, limit)
+                end_devices = edev_list.EndDevice or []
+                edev_list.EndDevice = None
+                yield edev_list
+                for end_device in end_devices:
+                    yield end_device
+                return
+
+            fsa_count = len(
+                await FunctionSetAssignmentsManager.fetch_distinct_function_set_assignment_ids(session, datetime.min)
+            )
+            config = await RuntimeServerConfigManager.fetch_current_config(session)
+            page = await fetch_end_device_list_page(session, scope, start, limit)
+
+            # The total count is calculated alongside the page of sites - we need it before anything can be written
+            sites = stream_all_sites_with_aggregator_id(
+                session, scope.aggregator_id, page.site_start, after, page.site_limit
+            )
+            first = await anext(sites, None)
+            if first is None and page.aggregator_site_count is not None and is_unfiltered_changed_after(after):
+                site_count = page.aggregator_site_count
+            elif first is None:
+                site_count = await select_aggregator_site_count(session, scope.aggregator_id, after)
+            else:
+                site_count = first[1]
+            result_count = min(page.site_limit, max(0, site_count - page.site_start))
+
+            yield EndDeviceListMapper.map_to_list_envelope(
+                scope,
+                site_count=site_count + 1,  # site_count should include the virtual site
+                result_count=result_count + (1 if page.virtual_site else 0),
+                pollrate_seconds=config.edevl_pollrate_seconds,
+            )
+            if page.virtual_site:
+                yield VirtualEndDeviceMapper.map_to_response(scope, page.virtual_site, page.subscription_count)
+            if first is not None:
+                yield EndDeviceMapper.map_to_response(scope, first[0], config.disable_edev_registration, fsa_count)
+            async for site, _ in sites:
+                yield EndDeviceMapper.map_to_response(scope, site, config.disable_edev_registration, fsa_count)
+
 
 class RegistrationManager:
     @staticmethod
@@ -1,5 +1,4 @@
 from datetime import datetime
-from itertools import chain
 
 from envoy_schema.server.schema.sep2.function_set_assignments import (
     FunctionSetAssignmentsListResponse,
@@ -7,9 +6,8 @@ from envoy_schema.server.schema.sep2.function_set_assignments import (
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from envoy.server.crud.doe import count_site_control_groups_by_fsa_id, select_site_control_group_fsa_ids
-from envoy.server.crud.pricing import select_tariff_fsa_ids
 from envoy.server.crud.site import select_single_site_with_site_id
+from envoy.server.fsa_catalogue import fetch_function_set_assignments_catalogue
 from envoy.server.manager.server import RuntimeServerConfigManager
 from envoy.server.mapper.sep2.function_set_assignments import FunctionSetAssignmentsMapper
 from envoy.server.request_scope import SiteRequestScope
@@ -29,21 +27,23 @@ class FunctionSetAssignmentsManager:
             return None
 
         # Check that our FSA ID exists somewhere in the DB
-        if (fsa_id not in await select_site_control_group_fsa_ids(session, datetime.min)) and (
-            fsa_id not in await select_tariff_fsa_ids(session, datetime.min)
-        ):
+        catalogue = await fetch_function_set_assignments_catalogue(session)
+        if fsa_id not in catalogue.changed_times_by_fsa_id:
             return None
 
-        derp_counts_by_fsa_id = await count_site_control_groups_by_fsa_id(session)
         return FunctionSetAssignmentsMapper.map_to_response(
-            scope=scope, fsa_id=fsa_id, total_tp_links=None, total_derp_links=derp_counts_by_fsa_id.get(fsa_id)
+            scope=scope,
+            fsa_id=fsa_id,
+            total_tp_links=None,
+            total_derp_links=catalogue.derp_counts_by_fsa_id.get(fsa_id),
         )
 
     @staticmethod
     async def fetch_distinct_function_set_assignment_ids(session: AsyncSession, changed_after: datetime) -> list[int]:
-        site_control_fsa_ids = await select_site_control_group_fsa_ids(session, changed_after)
-        tariff_fsa_ids = await select_tariff_fsa_ids(session, changed_after)
-        return sorted(set(chain(site_control_fsa_ids, tariff_fsa_ids)))
+        """Fetches the sorted, distinct fsa_ids (across Tariffs and SiteControlGroups) with at least one entity
+        changed at/after changed_after (served from the FunctionSetAssignmentsCatalogue)"""
+        catalogue = await fetch_function_set_assignments_catalogue(session)
+        return catalogue.fsa_ids_changed_after(changed_after)
 
     @staticmethod
     async def fetch_function_set_assignments_list_for_scope(
@@ -60,12 +60,8 @@ class FunctionSetAssignmentsManager:
         if site is None:
             return None
 
-        derp_counts_by_fsa_id = await count_site_control_groups_by_fsa_id(session)
-
-        # Combine the IDs into a sorted, distinct list
-        distinct_fsa_ids = await FunctionSetAssignmentsManager.fetch_distinct_function_set_assignment_ids(
-            session, changed_after
-        )
+        catalogue = await fetch_function_set_assignments_catalogue(session)
+        distinct_fsa_ids = catalogue.fsa_ids_changed_after(changed_after)
         end_index = start + limit
         paginated_fsa_ids = distinct_fsa_ids[start:end_index]
 
@@ -77,5 +73,5 @@ class FunctionSetAssignmentsManager:
             fsa_ids=paginated_fsa_ids,
             total_fsa_ids=len(distinct_fsa_ids),
             pollrate_seconds=config.fsal_pollrate_seconds,
-            derp_counts_by_fsa_id=derp_counts_by_fsa_id,
+            derp_counts_by_fsa_id=catalogue.derp_counts_by_fsa_id,
         )
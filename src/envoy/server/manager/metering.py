@@ -2,6 +2,7 @@ import logging
 from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime
+from time import perf_counter
 
 from envoy_schema.server.schema.sep2.metering_mirror import (
     MirrorMeterReading,
@@ -19,11 +20,10 @@ from envoy.server.crud.site_reading import (
     GroupedSiteReadingTypeDetails,
     count_grouped_site_reading_details,
     delete_site_reading_type_group,
-    fetch_any_site_reading_type_for_mrids_other_site,
     fetch_grouped_site_reading_details,
-    fetch_site_reading_type_for_mrid,
     fetch_site_reading_types_for_group,
     fetch_site_reading_types_for_group_mrid,
+    fetch_site_reading_types_for_mrids,
     generate_site_reading_type_group_id,
     upsert_site_readings,
 )
@@ -37,6 +37,7 @@ from envoy.server.mapper.sep2.metering import (
     MirrorUsagePointListMapper,
     MirrorUsagePointMapper,
 )
+from envoy.server.metrics import get_metrics_registry
 from envoy.server.model.archive.site_reading import ArchiveSiteReadingType
 from envoy.server.model.site_reading import SiteReadingType
 from envoy.server.model.subscription import SubscriptionResource
@@ -85,26 +86,27 @@ class MirrorMeteringManager:
         )
         srts_by_mrid: CaseInsensitiveDict[SiteReadingType] = CaseInsensitiveDict((srt.mrid, srt) for srt in group_srts)
 
+        # Resolve every new MMR mRID (across all of this aggregator's sites) with a single query
         new_mmr_mrids = [mmr.mRID for mmr in mup.mirrorMeterReadings if mmr.mRID not in srts_by_mrid]
-        if new_mmr_mrids and await fetch_any_site_reading_type_for_mrids_other_site(
-            session, scope.aggregator_id, site_id, new_mmr_mrids
-        ):
+        existing_srts = await fetch_site_reading_types_for_mrids(session, scope.aggregator_id, new_mmr_mrids)
+        if any(srt.site_id != site_id for srt in existing_srts):
             raise NotFoundError("One or more MirrorMeterReading mRIDs are owned by a different EndDevice")
 
         # If this is a new MUP mrid - we can insert it as is
         if not group_srts:
             created = True
-            group_id = await generate_site_reading_type_group_id(session)
 
             # Check that none of the individual MMR mRIDs already exist under a different MUP for this site.
-            for mmr in mup.mirrorMeterReadings:
-                existing = await fetch_site_reading_type_for_mrid(
-                    session, aggregator_id=scope.aggregator_id, site_id=site_id, mrid=mmr.mRID
+            if existing_srts:
+                existing_mrids: CaseInsensitiveDict[SiteReadingType] = CaseInsensitiveDict(
+                    (srt.mrid, srt) for srt in existing_srts
+                )
+                conflicting_mrid = next(mmr.mRID for mmr in mup.mirrorMeterReadings if mmr.mRID in existing_mrids)
+                raise BadRequestError(
+                    f"MirrorMeterReading mRID {conflicting_mrid} already exists under a different MirrorUsagePoint"
                 )
-                if existing is not None:
-                    raise BadRequestError(
-                        f"MirrorMeterReading mRID {mmr.mRID} already exists under a different MirrorUsagePoint"
-                    )
+
+            group_id = await generate_site_reading_type_group_id(session)
 
             # Start by creating the site reading types and getting them in the database
             for mmr in mup.mirrorMeterReadings:
@@ -349,6 +351,7 @@ class MirrorMeteringManager:
 
         raises NotFoundError if the underlying mups DNE/doesn't belong to aggregator_id"""
 
+        stage_start = perf_counter()
         mmrs_to_insert: list[MirrorMeterReading] = []
         mmrs_to_update: list[tuple[MirrorMeterReading, SiteReadingType]] = []
         for mmr in mmrs:
@@ -410,9 +413,30 @@ class MirrorMeteringManager:
         if mmrs_to_insert or mmrs_to_update:
             await session.flush()
 
+        reading_types_end = perf_counter()
+
         # Finally generate any site readings from the MMR's push them to the DB
         site_readings = MirrorMeterReadingMapper.map_from_request(mmrs, srts_by_mrid, changed_time)
+        map_end = perf_counter()
         if site_readings:
             await upsert_site_readings(session, changed_time, site_readings)
+        upsert_end = perf_counter()
+
         await NotificationManager.notify_changed_deleted_entities(session, SubscriptionResource.READING, changed_time)
         await session.commit()
+
+        stage_durations = {
+            "reading_types": reading_types_end - stage_start,
+            "map": map_end - reading_types_end,
+            "upsert": upsert_end - map_end,
+            "commit": perf_counter() - upsert_end,
+        }
+        registry = get_metrics_registry()
+        if registry is not None:
+            for stage, duration in stage_durations.items():
+                registry.reading_ingest_stage_duration.observe(duration, (stage,))
+            registry.readings_ingested.inc(amount=len(site_readings))
+        logger.debug(
+            f"Ingested {len(site_readings)} readings ({len(mmrs)} MMRs) for group_id {group_id}. "
+            + " ".join(f"{stage}={duration:.3f}s" for stage, duration in stage_durations.items())
+        )
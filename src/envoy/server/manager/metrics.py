@@ -0,0 +1,28 @@
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from envoy.server.crud.health import select_notification_queue_stats
+from envoy.server.manager.time import utc_now
+from envoy.server.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsManager:
+    @staticmethod
+    async def generate_metrics(session: AsyncSession, registry: MetricsRegistry) -> str:
+        """Updates the point in time gauges (eg notification queue depth) in registry and then renders every metric
+        using the Prometheus text exposition format.
+
+        A failure to query the database will be logged (the gauges will retain their previous values)"""
+        try:
+            now = utc_now()
+            for queue_name, stats in (await select_notification_queue_stats(session)).items():
+                registry.notification_queue_depth.set(stats.depth, (queue_name,))
+                oldest_age = (now - stats.oldest_created_time).total_seconds() if stats.oldest_created_time else 0
+                registry.notification_queue_oldest_age.set(max(0.0, oldest_age), (queue_name,))
+        except Exception as exc:
+            logger.error("Failure fetching notification queue metrics", exc_info=exc)
+
+        return registry.render()
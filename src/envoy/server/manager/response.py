@@ -1,5 +1,7 @@
 import logging
-from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from itertools import islice
 from typing import cast
 
@@ -13,6 +15,7 @@ from envoy_schema.server.schema.sep2.response import (
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from envoy.server.cache import ExpiringValue
 from envoy.server.crud.doe import select_doe_by_display_id_include_deleted, select_doe_include_deleted
 from envoy.server.crud.pricing import select_tariff_generated_rate_for_scope
 from envoy.server.crud.response import (
@@ -25,16 +28,81 @@ from envoy.server.crud.response import (
 )
 from envoy.server.crud.site import select_single_site_with_lfdi
 from envoy.server.exception import BadRequestError, NotFoundError
-from envoy.server.mapper.constants import MridType, ResponseSetType
+from envoy.server.manager.time import utc_now
+from envoy.server.mapper.constants import MridType, PricingReadingType, ResponseSetType
 from envoy.server.mapper.sep2.mrid import MridMapper
 from envoy.server.mapper.sep2.response import ResponseListMapper, ResponseMapper, ResponseSetMapper
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.doe import DynamicOperatingEnvelope
-from envoy.server.model.response import DynamicOperatingEnvelopeResponse
+from envoy.server.model.response import DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse
 from envoy.server.request_scope import DeviceOrAggregatorRequestScope, SiteRequestScope
+from envoy.server.response_writer import ResponseBatchWriter
 
 logger = logging.getLogger(__name__)
 
+# Defaults for the ResponseSubjectCache
+DEFAULT_RESPONSE_SUBJECT_CACHE_MAX_SIZE = 10000
+DEFAULT_RESPONSE_SUBJECT_CACHE_TTL_SECONDS = 300
+
+ResponseSubjectCacheKey = tuple[ResponseSetType, int, int, str]  # (response_set_type, aggregator_id, site_id, subject)
+
+
+@dataclass(frozen=True)
+class ResponseSubject:
+    """The (validated) entity that a Response is responding to"""
+
+    subject_id: int  # dynamic_operating_envelope_id or tariff_generated_rate_id (depending on the response set)
+    site_id: int  # The site that owns the subject
+    pricing_reading_type: PricingReadingType | None = None  # Only set for TARIFF_GENERATED_RATES responses
+
+
+class ResponseSubjectCache:
+    """A bounded, in memory cache of Response subjects that have ALREADY been validated as accessible to a particular
+    aggregator/site. Devices will typically send several responses (received/started/completed) for the same subject
+    in quick succession - this avoids repeating the (relatively expensive) subject lookup each time. Least recently
+    used entries are evicted once max_size is reached and entries expire after ttl_seconds.
+
+    This cache is "async safe" (no awaits occur during access) but it is NOT thread safe."""
+
+    _cache: OrderedDict[ResponseSubjectCacheKey, ExpiringValue[ResponseSubject]]
+    max_size: int
+    ttl_seconds: int
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_RESPONSE_SUBJECT_CACHE_MAX_SIZE,
+        ttl_seconds: int = DEFAULT_RESPONSE_SUBJECT_CACHE_TTL_SECONDS,
+    ) -> None:
+        self._cache = OrderedDict()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, key: ResponseSubjectCacheKey) -> ResponseSubject | None:
+        """Returns the previously validated subject for key or None if it isn't cached (or has expired)"""
+        expiring_value = self._cache.get(key, None)
+        if expiring_value is None:
+            return None
+
+        if expiring_value.is_expired():
+            del self._cache[key]
+            return None
+
+        self._cache.move_to_end(key)
+        return expiring_value.value
+
+    def put(self, key: ResponseSubjectCacheKey, subject: ResponseSubject) -> None:
+        """Stores the validated subject for key (evicting the least recently used entries if required)"""
+        if self.max_size <= 0:
+            return
+
+        self._cache[key] = ExpiringValue(expiry=utc_now() + timedelta(seconds=self.ttl_seconds), value=subject)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
 
 class ResponseManager:
     @staticmethod
@@ -150,33 +218,16 @@ class ResponseManager:
             )
 
     @staticmethod
-    async def create_response_for_scope(
+    async def _resolve_response_subject(
         session: AsyncSession,
         scope: SiteRequestScope,
         response_set_type: ResponseSetType,
         response: DERControlResponse | PriceResponse | Response,
-    ) -> str:
-        """Creates a new Response entry in the database for the specified subject.
-
-        raises BadRequestError if the subject doesn't parse or doesn't map to an accessible entity on record.
-
-        Returns the href associated with the new Response entity
-        """
-
-        try:
-            mrid_type = MridMapper.decode_and_validate_mrid_type(scope, response.subject)
-        except ValueError as exc:
-            logger.error(f"{response.subject} doesn't validate/decode for iana pen {scope.iana_pen}", exc_info=exc)
-            raise BadRequestError(
-                f"subject '{response.subject}' doesn't reference a valid MRID from this utility server"
-            ) from exc
-
-        lfdi_matched_site = await select_single_site_with_lfdi(session, response.endDeviceLFDI, scope.aggregator_id)
-        if lfdi_matched_site is None or lfdi_matched_site.site_id != scope.site_id:
-            raise BadRequestError(
-                f"endDeviceLFDI '{response.endDeviceLFDI}' doesn't match EndDevice with ID {scope.site_id}."
-            )
+        mrid_type: MridType,
+    ) -> ResponseSubject:
+        """Looks up the (already decoded) subject of response against the entities accessible to scope.
 
+        raises BadRequestError if the subject doesn't map to an accessible entity on record."""
         if response_set_type == ResponseSetType.SITE_CONTROLS:
             if mrid_type != MridType.DYNAMIC_OPERATING_ENVELOPE:
                 raise BadRequestError(f"{mrid_type} responses are not accepted to this list.")
@@ -194,17 +245,7 @@ class ResponseManager:
                 raise BadRequestError(
                     f"subject '{response.subject}' references a DOE not available on this utility server"
                 )
-
-            doe_response = ResponseMapper.map_from_doe_request(cast(DERControlResponse, response), doe)
-
-            # Once we commit, the object becomes mostly detached and can't be referenced. So we need to do any
-            # remaining operations on it between flush and commit
-            session.add(doe_response)
-            await session.flush()
-            href = ResponseMapper.doe_response_href(scope, doe_response)
-            await session.commit()
-
-            return href
+            return ResponseSubject(subject_id=doe.dynamic_operating_envelope_id, site_id=doe.site_id)
 
         elif response_set_type == ResponseSetType.TARIFF_GENERATED_RATES:
             if mrid_type != MridType.TIME_TARIFF_INTERVAL:
@@ -221,19 +262,83 @@ class ResponseManager:
                 raise BadRequestError(
                     f"subject '{response.subject}' references a price not available on this utility server"
                 )
+            return ResponseSubject(
+                subject_id=tariff_generated_rate.tariff_generated_rate_id,
+                site_id=tariff_generated_rate.site_id,
+                pricing_reading_type=pricing_reading_type,
+            )
+        else:
+            logger.error(f"Unknown response set type {response_set_type} ({int(response_set_type)})")
+            raise BadRequestError(f"Responses for {response_set_type} are NOT supported.")
+
+    @staticmethod
+    async def create_response_for_scope(
+        session: AsyncSession,
+        scope: SiteRequestScope,
+        response_set_type: ResponseSetType,
+        response: DERControlResponse | PriceResponse | Response,
+        subject_cache: ResponseSubjectCache | None = None,
+        batch_writer: ResponseBatchWriter | None = None,
+    ) -> str:
+        """Creates a new Response entry in the database for the specified subject.
+
+        subject_cache: If set - will be used to avoid repeated database lookups of the same subject
+        batch_writer: If set - the response will be written as part of a batch (instead of via session)
+
+        raises BadRequestError if the subject doesn't parse or doesn't map to an accessible entity on record.
+
+        Returns the href associated with the new Response entity
+        """
+
+        try:
+            mrid_type = MridMapper.decode_and_validate_mrid_type(scope, response.subject)
+        except ValueError as exc:
+            logger.error(f"{response.subject} doesn't validate/decode for iana pen {scope.iana_pen}", exc_info=exc)
+            raise BadRequestError(
+                f"subject '{response.subject}' doesn't reference a valid MRID from this utility server"
+            ) from exc
+
+        lfdi_matched_site = await select_single_site_with_lfdi(session, response.endDeviceLFDI, scope.aggregator_id)
+        if lfdi_matched_site is None or lfdi_matched_site.site_id != scope.site_id:
+            raise BadRequestError(
+                f"endDeviceLFDI '{response.endDeviceLFDI}' doesn't match EndDevice with ID {scope.site_id}."
+            )
 
-            rate_response = ResponseMapper.map_from_price_request(
-                cast(PriceResponse, response), tariff_generated_rate, pricing_reading_type
+        cache_key = (response_set_type, scope.aggregator_id, scope.site_id, response.subject)
+        subject = subject_cache.get(cache_key) if subject_cache is not None else None
+        if subject is None:
+            subject = await ResponseManager._resolve_response_subject(
+                session, scope, response_set_type, response, mrid_type
             )
+            if subject_cache is not None:
+                subject_cache.put(cache_key, subject)
 
+        new_response: DynamicOperatingEnvelopeResponse | TariffGeneratedRateResponse
+        if response_set_type == ResponseSetType.SITE_CONTROLS:
+            new_response = ResponseMapper.map_from_doe_request(
+                cast(DERControlResponse, response), subject.subject_id, subject.site_id
+            )
+        else:
+            new_response = ResponseMapper.map_from_price_request(
+                cast(PriceResponse, response),
+                subject.subject_id,
+                subject.site_id,
+                cast(PricingReadingType, subject.pricing_reading_type),
+            )
+
+        if batch_writer is not None:
+            await batch_writer.submit(new_response)
+        else:
             # Once we commit, the object becomes mostly detached and can't be referenced. So we need to do any
             # remaining operations on it between flush and commit
-            session.add(rate_response)
+            session.add(new_response)
             await session.flush()
-            href = ResponseMapper.price_response_href(scope, rate_response)
-            await session.commit()
 
-            return href
+        if isinstance(new_response, DynamicOperatingEnvelopeResponse):
+            href = ResponseMapper.doe_response_href(scope, new_response)
         else:
-            logger.error(f"Unknown response set type {response_set_type} ({int(response_set_type)})")
-            raise BadRequestError(f"Responses for {response_set_type} are NOT supported.")
+            href = ResponseMapper.price_response_href(scope, new_response)
+
+        if batch_writer is None:
+            await session.commit()
+        return href
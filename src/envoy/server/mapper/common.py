@@ -1,6 +1,7 @@
 from collections import abc
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from decimal import Decimal
+from functools import lru_cache
 from itertools import chain
 from typing import Any, Generic, TypeVar
 
@@ -9,30 +10,47 @@ from envoy_schema.server.schema.sep2.types import DEVICE_CATEGORY_ALL_SET, Devic
 from envoy.server.exception import InvalidMappingError
 from envoy.server.request_scope import BaseRequestScope
 
+# The maximum number of compiled (uri_format, href_prefix) href templates that will be cached
+HREF_TEMPLATE_CACHE_SIZE = 4096
+
+
+def _join_href_parts(uri_format: str, prefix: str, uri: str) -> str:
+    """Joins prefix and uri (collapsing any empty parts). The leading slash of the result will mirror uri_format"""
+    joined = "/".join(p for p in chain(prefix.split("/"), uri.split("/")) if p)
+    return "/" + joined if uri_format.startswith("/") else joined
+
+
+@lru_cache(maxsize=HREF_TEMPLATE_CACHE_SIZE)
+def compile_href_template(uri_format: str, href_prefix: str | None) -> Callable[..., str]:
+    """Compiles uri_format and href_prefix into a formatter that accepts the str.format args/kwargs for uri_format and
+    returns the same value as generate_href. The prefix is normalised (and folded into the format string) once so
+    that the cost of generating a href doesn't depend on the complexity of the prefix.
+
+    Compiled formatters are cached per (uri_format, href_prefix)"""
+    if href_prefix is None:
+        return uri_format.format
+
+    leading_slash = "/" if uri_format.startswith("/") else ""
+    prefix_parts = [p for p in href_prefix.split("/") if p]
+    template = leading_slash + "/".join(prefix_parts + [p for p in uri_format.split("/") if p])
+
+    def format_href(*args: object, **kwargs: object) -> str:
+        href = template.format(*args, **kwargs)
+
+        # Formatted values that introduce empty/leading/trailing parts need the full join rules applied
+        if "//" in href or href.endswith("/") or (not leading_slash and href.startswith("/")):
+            return _join_href_parts(uri_format, href_prefix, uri_format.format(*args, **kwargs))
+        return href
+
+    return format_href
+
 
 def generate_href(uri_format: str, request_scope: BaseRequestScope, *args: object, **kwargs: object) -> str:
     """Generates a href from a format string and an optional static prefix. Any args/kwargs will be forwarded to
     str.format (being applied to uri_format).
 
     If a prefix is applied - the state of the leading slash will mirror uri_format"""
-    uri = uri_format.format(*args, **kwargs)
-    prefix = request_scope.href_prefix
-    if prefix is None:
-        return uri
-
-    # The uri_format dictates whether the uri should be relative/absolute
-    join_parts = (p for p in chain(prefix.split("/"), uri.split("/")) if p)
-    joined = "/".join(join_parts)
-    if uri_format.startswith("/"):
-        if joined.startswith("/"):
-            return joined
-        else:
-            return "/" + joined
-    else:
-        if joined.startswith("/"):
-            return joined[1:]
-        else:
-            return joined
+    return compile_href_template(uri_format, request_scope.href_prefix)(*args, **kwargs)
 
 
 def remove_href_prefix(href: str, request_scope: BaseRequestScope) -> str:
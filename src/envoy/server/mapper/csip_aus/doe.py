@@ -282,14 +282,7 @@ class DERControlMapper:
 
         source - What is this requesting this mapping? It will determine the href generated for the derc list"""
 
-        href: str
-        if source == DERControlListSource.DER_CONTROL_LIST:
-            href = DERControlMapper.site_control_list_href(request_scope, site_control_group_id)
-        elif source == DERControlListSource.ACTIVE_DER_CONTROL_LIST:
-            href = DERControlMapper.active_control_list_href(request_scope, site_control_group_id)
-        else:
-            raise InvalidMappingError(f"Unsupported source {source} for calculating href")
-
+        href = DERControlMapper.control_list_href(request_scope, site_control_group_id, source)
         return DERControlListResponse.model_validate(
             {
                 "href": href,
@@ -305,6 +298,37 @@ class DERControlMapper:
             }
         )
 
+    @staticmethod
+    def map_to_list_envelope(
+        request_scope: DeviceOrAggregatorRequestScope,
+        site_control_group_id: int,
+        total_controls: int,
+        result_count: int,
+        source: DERControlListSource,
+    ) -> DERControlListResponse:
+        """Similar to map_to_list_response but the DERControl items are NOT included (they're expected to be streamed
+        after the envelope)"""
+        return DERControlListResponse.model_validate(
+            {
+                "href": DERControlMapper.control_list_href(request_scope, site_control_group_id, source),
+                "all_": total_controls,
+                "results": result_count,
+                "subscribable": SubscribableType.resource_supports_non_conditional_subscriptions,
+            }
+        )
+
+    @staticmethod
+    def control_list_href(
+        request_scope: DeviceOrAggregatorRequestScope, site_control_group_id: int, source: DERControlListSource
+    ) -> str:
+        """Generates the href for the DERControl list identified by source"""
+        if source == DERControlListSource.DER_CONTROL_LIST:
+            return DERControlMapper.site_control_list_href(request_scope, site_control_group_id)
+        elif source == DERControlListSource.ACTIVE_DER_CONTROL_LIST:
+            return DERControlMapper.active_control_list_href(request_scope, site_control_group_id)
+        else:
+            raise InvalidMappingError(f"Unsupported source {source} for calculating href")
+
 
 class DERProgramMapper:
     @staticmethod
@@ -124,6 +124,20 @@ class EndDeviceListMapper:
             EndDevice=end_devices,
         )
 
+    @staticmethod
+    def map_to_list_envelope(
+        scope: BaseRequestScope, site_count: int, result_count: int, pollrate_seconds: int
+    ) -> EndDeviceListResponse:
+        """Similar to map_to_response but the EndDevice items are NOT included (they're expected to be streamed after
+        the envelope). site_count and result_count should include the virtual site (if it will be streamed)"""
+        return EndDeviceListResponse(
+            href=generate_href(uri.EndDeviceListUri, scope),
+            pollRate=pollrate_seconds,
+            all_=site_count,
+            results=result_count,
+            subscribable=SubscribableType.resource_supports_non_conditional_subscriptions,
+        )
+
 
 class RegistrationMapper:
     @staticmethod
@@ -1,4 +1,5 @@
 from datetime import UTC, datetime
+from functools import lru_cache
 
 from envoy.server.mapper.constants import MridType, PricingReadingType, ResponseSetType
 from envoy.server.model.doe import SiteControlGroupDefault
@@ -39,17 +40,28 @@ def encode_mrid(mrid_type: MridType, id: int, iana_pen: int) -> str:
     id:  (92 bits) Unsigned int - an mrid_type specific value
     iana_pen: (32 bits) Unsigned int - The IANA Private Enterprise Number of the org hosting this server"""
 
-    if iana_pen < 0 or iana_pen > MAX_IANA_PEN:
-        raise ValueError(f"iana_pen {iana_pen} is not in the range 0 -> {MAX_IANA_PEN}")
-
     if id < 0 or id > MAX_MRID_ID:
         raise ValueError(f"id {id} is not in the range 0 -> {MAX_MRID_ID}")
 
+    return _encode_mrid_type(mrid_type) + f"{id:023x}" + _encode_iana_pen(iana_pen)
+
+
+@lru_cache
+def _encode_mrid_type(mrid_type: MridType | int) -> str:
+    """Returns the (cached) leading hex digit of an mrid for mrid_type. Raises ValueError if out of range"""
     mrid_type_int = int(mrid_type)
     if mrid_type_int < 0 or mrid_type_int > MAX_MRID_TYPE:
         raise ValueError(f"mrid_type {mrid_type_int} is not in the range 0 -> {MAX_MRID_TYPE}")
+    return f"{mrid_type_int:x}"
+
 
-    return f"{mrid_type_int:x}{id:023x}{iana_pen:08x}"
+@lru_cache(maxsize=64)
+def _encode_iana_pen(iana_pen: int) -> str:
+    """Returns the (cached) trailing 8 hex digits of an mrid for iana_pen. A server will typically only ever use a
+    single iana_pen so this is calculated (and range checked) once. Raises ValueError if out of range"""
+    if iana_pen < 0 or iana_pen > MAX_IANA_PEN:
+        raise ValueError(f"iana_pen {iana_pen} is not in the range 0 -> {MAX_IANA_PEN}")
+    return f"{iana_pen:08x}"
 
 
 def decode_mrid_type(mrid: str) -> MridType:
@@ -17,7 +17,6 @@ from envoy.server.mapper.sep2.mrid import MridMapper
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.doe import DynamicOperatingEnvelope
 from envoy.server.model.response import DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse
-from envoy.server.model.tariff import TariffGeneratedRate
 from envoy.server.request_scope import BaseRequestScope, DeviceOrAggregatorRequestScope
 
 # From sep2 Table 27 - This will indicate that response to each SPECIFIC event is requested
@@ -85,16 +84,17 @@ class ResponseMapper:
     @staticmethod
     def map_from_price_request(
         r: PriceResponse | Response,
-        tariff_generated_rate: TariffGeneratedRate,
+        tariff_generated_rate_id: int,
+        site_id: int,
         pricing_reading_type: PricingReadingType,
     ) -> TariffGeneratedRateResponse:
         """Maps a sep2 PriceResponse to an internal TariffGeneratedRateResponse model that references a specific
-        PricingReadingType within a TariffGeneratedRate"""
+        PricingReadingType within the TariffGeneratedRate (owned by site_id) with tariff_generated_rate_id"""
 
         # createdTime will be managed by the DB itself
         return TariffGeneratedRateResponse(
-            tariff_generated_rate_id_snapshot=tariff_generated_rate.tariff_generated_rate_id,
-            site_id=tariff_generated_rate.site_id,
+            tariff_generated_rate_id_snapshot=tariff_generated_rate_id,
+            site_id=site_id,
             response_type=r.status,
             pricing_reading_type=pricing_reading_type,
         )
@@ -125,14 +125,16 @@ class ResponseMapper:
     @staticmethod
     def map_from_doe_request(
         r: DERControlResponse | Response,
-        dynamic_operating_envelope: DynamicOperatingEnvelope | ArchiveDynamicOperatingEnvelope,
+        dynamic_operating_envelope_id: int,
+        site_id: int,
     ) -> DynamicOperatingEnvelopeResponse:
-        """Maps a sep2 DERControlResponse to an internal DynamicOperatingEnvelopeResponse model."""
+        """Maps a sep2 DERControlResponse to an internal DynamicOperatingEnvelopeResponse model that references the
+        DynamicOperatingEnvelope (owned by site_id) with dynamic_operating_envelope_id"""
 
         # createdTime will be managed by the DB itself
         return DynamicOperatingEnvelopeResponse(
-            dynamic_operating_envelope_id_snapshot=dynamic_operating_envelope.dynamic_operating_envelope_id,
-            site_id=dynamic_operating_envelope.site_id,
+            dynamic_operating_envelope_id_snapshot=dynamic_operating_envelope_id,
+            site_id=site_id,
             response_type=r.status,
         )
 
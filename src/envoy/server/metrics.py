@@ -0,0 +1,281 @@
+from collections.abc import Iterable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Default histogram buckets (seconds) for HTTP request durations
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Default histogram buckets (seconds) for rendering a single XML response
+RENDER_DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+# The route label applied to requests that didn't match any route
+UNMATCHED_ROUTE = "unmatched"
+
+# The key (in Connection.info) used for tracking the start time of the in progress cursor execution
+QUERY_START_TIME_KEY = "envoy_metrics_query_start_time"
+
+Labels = tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Labels, label_values: Labels, extra: str | None = None) -> str:
+    parts = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing value (per unique set of label values)"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, label_values: Labels = (), amount: float = 1.0) -> None:
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for label_values, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """A value that can arbitrarily go up or down (per unique set of label values)"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, label_values: Labels = ()) -> None:
+        self.values[label_values] = value
+
+
+class Histogram:
+    """Counts observed values into cumulative buckets (per unique set of label values)"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels, buckets: Iterable[float]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts: dict[Labels, list[int]] = {}
+        self.sums: dict[Labels, float] = {}
+        self.counts: dict[Labels, int] = {}
+
+    def observe(self, value: float, label_values: Labels = ()) -> None:
+        bucket_counts = self.bucket_counts.get(label_values, None)
+        if bucket_counts is None:
+            bucket_counts = [0] * len(self.buckets)
+            self.bucket_counts[label_values] = bucket_counts
+            self.sums[label_values] = 0.0
+            self.counts[label_values] = 0
+
+        for idx, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                bucket_counts[idx] += 1
+                break
+        self.sums[label_values] += value
+        self.counts[label_values] += 1
+
+    def samples(self) -> Iterator[str]:
+        for label_values, bucket_counts in sorted(self.bucket_counts.items()):
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets, bucket_counts, strict=True):
+                cumulative += count
+                le = f'le="{_format_value(upper_bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, label_values, le)} {cumulative}"
+            inf_labels = _format_labels(self.label_names, label_values, 'le="+Inf"')
+            yield f"{self.name}_bucket{inf_labels} {self.counts[label_values]}"
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(self.sums[label_values])}"
+            yield f"{self.name}_count{labels} {self.counts[label_values]}"
+
+
+Metric = Counter | Gauge | Histogram
+
+
+class MetricsRegistry:
+    """The set of hot path metrics recorded by the server. Rendered using the Prometheus text exposition format"""
+
+    def __init__(self) -> None:
+        route_labels = ("method", "route")
+        self.http_requests = Counter(
+            "envoy_http_requests_total", "Total HTTP requests by route and status", (*route_labels, "status")
+        )
+        self.http_request_duration = Histogram(
+            "envoy_http_request_duration_seconds",
+            "HTTP request duration by route",
+            route_labels,
+            REQUEST_DURATION_BUCKETS,
+        )
+        self.db_queries = Counter("envoy_db_queries_total", "Total database queries issued by route", route_labels)
+        self.db_query_duration = Counter(
+            "envoy_db_query_duration_seconds_total",
+            "Total time spent executing database queries by route",
+            route_labels,
+        )
+        self.xml_render_duration = Histogram(
+            "envoy_xml_render_duration_seconds",
+            "Time spent rendering XML responses by model",
+            ("model",),
+            RENDER_DURATION_BUCKETS,
+        )
+        self.reading_ingest_stage_duration = Histogram(
+            "envoy_reading_ingest_stage_duration_seconds",
+            "Time spent in each stage of ingesting MirrorMeterReadings",
+            ("stage",),
+            REQUEST_DURATION_BUCKETS,
+        )
+        self.readings_ingested = Counter("envoy_readings_ingested_total", "Total site readings ingested")
+        self.azure_ad_token_cache_lookups = Counter(
+            "envoy_azure_ad_token_cache_lookups_total",
+            "Validated Azure AD token cache lookups by result (hit or miss)",
+            ("result",),
+        )
+        self.azure_ad_token_cache_evictions = Counter(
+            "envoy_azure_ad_token_cache_evictions_total",
+            "Validated Azure AD tokens evicted to keep the cache under its max size",
+        )
+        self.notification_queue_depth = Gauge(
+            "envoy_notification_queue_depth", "Number of items waiting in a notification queue", ("queue",)
+        )
+        self.notification_queue_oldest_age = Gauge(
+            "envoy_notification_queue_oldest_age_seconds",
+            "Age of the oldest item waiting in a notification queue (0 if empty)",
+            ("queue",),
+        )
+
+    @property
+    def metrics(self) -> list[Metric]:
+        return [
+            self.http_requests,
+            self.http_request_duration,
+            self.db_queries,
+            self.db_query_duration,
+            self.xml_render_duration,
+            self.reading_ingest_stage_duration,
+            self.readings_ingested,
+            self.azure_ad_token_cache_lookups,
+            self.azure_ad_token_cache_evictions,
+            self.notification_queue_depth,
+            self.notification_queue_oldest_age,
+        ]
+
+    def render(self) -> str:
+        """Renders every metric using the Prometheus text exposition format (version 0.0.4)"""
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestMetrics:
+    """Database activity attributed to the request currently being processed"""
+
+    query_count: int = 0
+    query_seconds: float = 0.0
+
+
+# The process wide metrics registry - only populated once metrics have been enabled
+_metrics_registry: MetricsRegistry | None = None
+
+# Set (per request) by MetricsMiddleware - accumulates the database activity for the current request
+_request_metrics: ContextVar[RequestMetrics | None] = ContextVar("_request_metrics", default=None)
+
+
+def get_metrics_registry() -> MetricsRegistry | None:
+    """Returns the process wide MetricsRegistry or None if metrics haven't been enabled"""
+    return _metrics_registry
+
+
+def _before_cursor_execute(conn: Connection, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+    if _request_metrics.get() is not None:
+        conn.info[QUERY_START_TIME_KEY] = perf_counter()
+
+
+def _after_cursor_execute(conn: Connection, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+    start_time = conn.info.pop(QUERY_START_TIME_KEY, None)
+    request_metrics = _request_metrics.get()
+    if request_metrics is None or start_time is None:
+        return
+    request_metrics.query_count += 1
+    request_metrics.query_seconds += perf_counter() - start_time
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # A failed execution never reaches after_cursor_execute - don't let its start time leak into the next one
+    if context.connection is not None:
+        context.connection.info.pop(QUERY_START_TIME_KEY, None)
+
+
+def enable_metrics() -> MetricsRegistry:
+    """Enables metrics collection for this process (idempotent) - installing the database query hooks (for all
+    engines) and returning the process wide MetricsRegistry. Until this is called, metrics collection has no cost"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+    return _metrics_registry
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records the latency, status and database query count/time of every HTTP request against
+    the matched route template (eg /edev/{site_id})"""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_metrics = RequestMetrics()
+        token = _request_metrics.set(request_metrics)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            _request_metrics.reset(token)
+
+            route = scope.get("route", None)
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            self.registry.http_requests.inc((*labels, str(status_code)))
+            self.registry.http_request_duration.observe(duration, labels)
+            self.registry.db_queries.inc(labels, request_metrics.query_count)
+            self.registry.db_query_duration.inc(labels, request_metrics.query_seconds)
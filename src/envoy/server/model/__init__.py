@@ -11,4 +11,5 @@ from .subscription import *  # noqa  # isort:skip
 from .log import *  # noqa  # isort:skip
 from .response import *  # noqa  # isort:skip
 from .server import *  # noqa  # isort:skip
+from .ingest import *  # noqa  # isort:skip
 import envoy.server.model.archive  # noqa  # isort:skip
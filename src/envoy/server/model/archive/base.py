@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from envoy.server.model.base import Base
@@ -29,8 +29,10 @@ class ArchiveBase(Base):
 
     # When the archived row was copied into the archived table
     # This is NOT guaranteed to align with the changed_time (for notification server lookups)
-    # it's purely an auditing value for when the row archived
-    archive_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # it's purely an auditing value for when the row archived. Indexed to support purging by age
+    archive_time: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
 
     # If set, this will be when the row in the original table was deleted (meaning this should be the archived row).
     # This WILL align with the changed_times shared with the notification server.
@@ -40,3 +42,16 @@ class ArchiveBase(Base):
 
 
 ARCHIVE_BASE_COLUMNS: set[str] = {"archive_id", "archive_time", "deleted_time"}
+
+
+def deleted_snapshot_index(archive_table_name: str, source_pk_column_name: str) -> Index:
+    """Generates a partial index (for an archive table's __table_args__) over ONLY the deleted snapshots of each source
+    row (keyed by the source primary key). Finding the latest deletion of a source row is then a point lookup that
+    never visits the (far more numerous) update snapshots of that row."""
+    return Index(
+        f"{archive_table_name}_deleted_snapshot",
+        source_pk_column_name,
+        "deleted_time",
+        "archive_time",
+        postgresql_where=text("deleted_time IS NOT NULL"),
+    )
@@ -5,7 +5,7 @@ from sqlalchemy import BOOLEAN, DECIMAL, INTEGER, VARCHAR, BigInteger, DateTime,
 from sqlalchemy.orm import Mapped, mapped_column
 
 import envoy.server.model as original_models
-from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, ArchiveBase
+from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, ArchiveBase, deleted_snapshot_index
 from envoy.server.model.constants import DOE_DECIMAL_PLACES
 
 
@@ -26,6 +26,8 @@ class ArchiveSiteControlGroup(ArchiveBase):
 
     display_id: Mapped[int | None] = mapped_column(nullable=True)
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_control_group_id"),)
+
 
 class ArchiveSiteControlGroupDefault(ArchiveBase):
     """Represents fields that map to a subset of the attributes defined in CSIP-AUS' DefaultDERControl resource. These
@@ -52,6 +54,8 @@ class ArchiveSiteControlGroupDefault(ArchiveBase):
     load_limit_active_watts: Mapped[Decimal | None] = mapped_column(DECIMAL(16, DOE_DECIMAL_PLACES), nullable=True)
     ramp_rate_percent_per_second: Mapped[int | None] = mapped_column(nullable=True)  # hundredths of percent per sec
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_control_group_default_id"),)
+
 
 class ArchiveDynamicOperatingEnvelope(ArchiveBase):
     """Represents a dynamic operating envelope for a site at a particular time interval"""
@@ -96,6 +100,7 @@ class ArchiveDynamicOperatingEnvelope(ArchiveBase):
     display_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     __table_args__ = (
+        deleted_snapshot_index(__tablename__, "dynamic_operating_envelope_id"),
         Index(
             "archive_doe_site_control_group_id_end_time_deleted_time_site_id",
             "site_control_group_id",
@@ -20,7 +20,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 import envoy.server.model as original_models
 from envoy.server.model.archive import ArchiveBase
-from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX
+from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, deleted_snapshot_index
 
 
 class ArchiveSite(ArchiveBase):
@@ -39,6 +39,8 @@ class ArchiveSite(ArchiveBase):
     registration_pin: Mapped[int] = mapped_column(INTEGER, nullable=False)
     post_rate_seconds: Mapped[int | None] = mapped_column(INTEGER, nullable=True)
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_id"),)
+
 
 class ArchiveSiteDERRating(ArchiveBase):
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.SiteDERRating.__tablename__
@@ -96,6 +98,8 @@ class ArchiveSiteDERRating(ArchiveBase):
     der_type: Mapped[DERType] = mapped_column(INTEGER)
     doe_modes_supported: Mapped[DOESupportedMode | None] = mapped_column(INTEGER, nullable=True)
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_der_rating_id"),)
+
 
 class ArchiveSiteDERSetting(ArchiveBase):
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.SiteDERSetting.__tablename__
@@ -153,6 +157,8 @@ class ArchiveSiteDERSetting(ArchiveBase):
     v_ref_ofs_multiplier: Mapped[int | None] = mapped_column(INTEGER, nullable=True)
     doe_modes_enabled: Mapped[DOESupportedMode | None] = mapped_column(INTEGER, nullable=True)
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_der_setting_id"),)
+
 
 class ArchiveSiteDERAvailability(ArchiveBase):
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.SiteDERAvailability.__tablename__
@@ -175,6 +181,8 @@ class ArchiveSiteDERAvailability(ArchiveBase):
     estimated_w_avail_value: Mapped[int | None] = mapped_column(INTEGER, nullable=True)
     estimated_w_avail_multiplier: Mapped[int | None] = mapped_column(INTEGER, nullable=True)
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_der_availability_id"),)
+
 
 class ArchiveSiteDERStatus(ArchiveBase):
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.SiteDERStatus.__tablename__
@@ -201,3 +209,5 @@ class ArchiveSiteDERStatus(ArchiveBase):
     storage_mode_status_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     storage_connect_status: Mapped[ConnectStatusType | None] = mapped_column(INTEGER, nullable=True)
     storage_connect_status_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_der_status_id"),)
@@ -16,7 +16,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 import envoy.server.model as original_models
 from envoy.server.model.archive import ArchiveBase
-from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX
+from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, deleted_snapshot_index
 
 
 class ArchiveSiteReadingType(ArchiveBase):
@@ -48,8 +48,13 @@ class ArchiveSiteReadingType(ArchiveBase):
     created_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # When the reading set was created
     changed_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # When the reading set was last altered
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "site_reading_type_id"),)
+
 
 class ArchiveSiteReading(ArchiveBase):
+    """Partitioned the same way as SiteReading (monthly on time_period_start) so that old partitions of both tables
+    can be detached/dropped together"""
+
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.site_reading.SiteReading.__tablename__
 
     site_reading_id: Mapped[int] = mapped_column(BigInteger, index=True)
@@ -59,8 +64,14 @@ class ArchiveSiteReading(ArchiveBase):
 
     local_id: Mapped[int | None] = mapped_column(INTEGER, nullable=True)
     quality_flags: Mapped[QualityFlagsType] = mapped_column(INTEGER)
-    time_period_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    time_period_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)  # Partition key
     time_period_seconds: Mapped[int] = mapped_column(INTEGER)  # Length of the reading in seconds
     value: Mapped[int] = mapped_column(
         BigInteger
     )  # actual reading value - type/power of ten are defined in the parent reading set
+
+    __table_args__ = (
+        deleted_snapshot_index(__tablename__, "site_reading_id"),
+        {"postgresql_partition_by": "RANGE (time_period_start)"},
+    )
+    __mapper_args__ = {"primary_key": ["archive_id"]}
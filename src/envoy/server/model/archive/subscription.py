@@ -5,7 +5,7 @@ from sqlalchemy import INTEGER, VARCHAR, DateTime
 from sqlalchemy.orm import Mapped, mapped_column
 
 import envoy.server.model as original_models
-from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, ArchiveBase
+from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, ArchiveBase, deleted_snapshot_index
 
 
 class ArchiveSubscription(ArchiveBase):
@@ -23,6 +23,8 @@ class ArchiveSubscription(ArchiveBase):
     notification_uri: Mapped[str] = mapped_column(VARCHAR(length=2048))
     entity_limit: Mapped[int] = mapped_column(INTEGER)
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "subscription_id"),)
+
 
 class ArchiveSubscriptionCondition(ArchiveBase):
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.SubscriptionCondition.__tablename__
@@ -33,3 +35,5 @@ class ArchiveSubscriptionCondition(ArchiveBase):
     attribute: Mapped[ConditionAttributeIdentifier] = mapped_column(INTEGER)
     lower_threshold: Mapped[int] = mapped_column(INTEGER, nullable=False)
     upper_threshold: Mapped[int] = mapped_column(INTEGER, nullable=False)
+
+    __table_args__ = (deleted_snapshot_index(__tablename__, "subscription_condition_id"),)
@@ -6,7 +6,7 @@ from sqlalchemy import DECIMAL, INTEGER, BigInteger, DateTime, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 import envoy.server.model as original_models
-from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, ArchiveBase
+from envoy.server.model.archive.base import ARCHIVE_TABLE_PREFIX, ArchiveBase, deleted_snapshot_index
 
 
 class ArchiveTariff(ArchiveBase):
@@ -19,6 +19,8 @@ class ArchiveTariff(ArchiveBase):
     created_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     changed_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
+    __table_args__ = (deleted_snapshot_index(__tablename__, "tariff_id"),)
+
 
 class ArchiveTariffGeneratedRate(ArchiveBase):
     __tablename__ = ARCHIVE_TABLE_PREFIX + original_models.TariffGeneratedRate.__tablename__
@@ -35,3 +37,5 @@ class ArchiveTariffGeneratedRate(ArchiveBase):
     export_active_price: Mapped[Decimal] = mapped_column(DECIMAL(10, original_models.tariff.PRICE_DECIMAL_PLACES))
     import_reactive_price: Mapped[Decimal] = mapped_column(DECIMAL(10, original_models.tariff.PRICE_DECIMAL_PLACES))
     export_reactive_price: Mapped[Decimal] = mapped_column(DECIMAL(10, original_models.tariff.PRICE_DECIMAL_PLACES))
+
+    __table_args__ = (deleted_snapshot_index(__tablename__, "tariff_generated_rate_id"),)
@@ -0,0 +1,66 @@
+from datetime import datetime
+from enum import IntEnum, auto
+
+from sqlalchemy import INTEGER, TEXT, VARCHAR, DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from envoy.server.model.base import Base
+
+
+class IngestJobType(IntEnum):
+    """The type of rows that an IngestJob will stage/apply"""
+
+    TARIFF_GENERATED_RATE = auto()  # TariffGeneratedRateRequest rows
+    DYNAMIC_OPERATING_ENVELOPE = auto()  # DynamicOperatingEnvelopeRequest rows (for the default site control group)
+    SITE_CONTROL = auto()  # SiteControlRequest rows (for IngestJob.site_control_group_id)
+
+
+class IngestJobStatus(IntEnum):
+    """The lifecycle of an IngestJob"""
+
+    RECEIVING = auto()  # Rows are being uploaded (staged) - nothing has been applied
+    PENDING = auto()  # The upload is complete - waiting for the ingest worker to start applying it
+    APPLYING = auto()  # The ingest worker is applying the staged rows (in chunks)
+    COMPLETE = auto()  # Every staged row has been applied
+    FAILED = auto()  # A chunk failed to apply - see IngestJob.error. Previously applied chunks remain applied
+
+
+class IngestJob(Base):
+    """A (potentially very large) bulk upload of tariff rates / site controls. Rows are staged (as IngestJobRow) and
+    then applied by the admin ingest worker in bounded transactional chunks"""
+
+    __tablename__ = "ingest_job"
+
+    ingest_job_id: Mapped[int] = mapped_column(primary_key=True)
+    job_type: Mapped[IngestJobType] = mapped_column(INTEGER)  # The type of rows being ingested
+    site_control_group_id: Mapped[int | None] = mapped_column(
+        ForeignKey("site_control_group.site_control_group_id", ondelete="CASCADE"), nullable=True
+    )  # Only set for IngestJobType.SITE_CONTROL - the group that the controls will be added to
+    status: Mapped[IngestJobStatus] = mapped_column(INTEGER, index=True)
+    created_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )  # When the job was created
+    changed_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True)
+    )  # When the job last changed (rows staged, status changed or a chunk applied)
+    claimed_time: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )  # When the job was last claimed by an ingest worker - identifies that worker's lease (None if never claimed)
+    staged_rows: Mapped[int] = mapped_column(INTEGER, default=0)  # Total rows uploaded
+    applied_rows: Mapped[int] = mapped_column(INTEGER, default=0)  # Total rows applied (committed)
+    applied_chunks: Mapped[int] = mapped_column(INTEGER, default=0)  # Total chunks (transactions) applied
+    error: Mapped[str | None] = mapped_column(VARCHAR(length=1024), nullable=True)  # Why the job FAILED (if it did)
+
+
+class IngestJobRow(Base):
+    """A single staged (validated but not yet applied) row belonging to an IngestJob. Rows are deleted as they are
+    applied (in the same transaction)"""
+
+    __tablename__ = "ingest_job_row"
+
+    ingest_job_id: Mapped[int] = mapped_column(
+        ForeignKey("ingest_job.ingest_job_id", ondelete="CASCADE"), primary_key=True
+    )
+    row_number: Mapped[int] = mapped_column(INTEGER, primary_key=True)  # 1 based position in the upload (all parts)
+    site_id: Mapped[int] = mapped_column(INTEGER)  # Rows are partitioned by site when applying in parallel
+    payload: Mapped[str] = mapped_column(TEXT)  # The validated request model (JSON encoded)
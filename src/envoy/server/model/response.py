@@ -12,7 +12,8 @@ from envoy.server.model.site import Site
 class DynamicOperatingEnvelopeResponse(Base):
     """Represents a client response to a specific dynamic operating envelope.
 
-    These are explicitly NOT archived - primarily for performance / storage purposes"""
+    These are explicitly NOT archived - primarily for performance / storage purposes. The underlying table is RANGE
+    partitioned (monthly) on created_time - as far as the ORM is concerned, the id still uniquely identifies a row."""
 
     __tablename__ = "dynamic_operating_envelope_response"
     dynamic_operating_envelope_response_id: Mapped[int] = mapped_column(
@@ -24,8 +25,8 @@ class DynamicOperatingEnvelopeResponse(Base):
     )  # The parent site that ultimately owns the DOE. Redundant, but included for select query performance
 
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
-    )  # When the response was created
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
+    )  # When the response was created. This is the partition key
 
     response_type: Mapped[ResponseType | None] = mapped_column(INTEGER, nullable=True)
 
@@ -33,13 +34,16 @@ class DynamicOperatingEnvelopeResponse(Base):
 
     __table_args__ = (
         Index("ix_dynamic_operating_envelope_response_site_id_created_time", "site_id", "created_time", unique=False),
+        {"postgresql_partition_by": "RANGE (created_time)"},
     )
+    __mapper_args__ = {"primary_key": ["dynamic_operating_envelope_response_id"]}
 
 
 class TariffGeneratedRateResponse(Base):
     """Represents a client response to a specific tariff generated rate
 
-    These are explicitly NOT archived - primarily for performance / storage purposes"""
+    These are explicitly NOT archived - primarily for performance / storage purposes. The underlying table is RANGE
+    partitioned (monthly) on created_time - as far as the ORM is concerned, the id still uniquely identifies a row."""
 
     __tablename__ = "tariff_generated_rate_response"
     tariff_generated_rate_response_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -49,8 +53,8 @@ class TariffGeneratedRateResponse(Base):
     )  # The parent site that ultimately owns the rate. Redundant, but included for select query performance
 
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
-    )  # When the response was created
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
+    )  # When the response was created. This is the partition key
 
     response_type: Mapped[ResponseType | None] = mapped_column(INTEGER, nullable=True)
     pricing_reading_type: Mapped[PricingReadingType] = mapped_column(
@@ -61,4 +65,6 @@ class TariffGeneratedRateResponse(Base):
 
     __table_args__ = (
         Index("ix_tariff_generated_rate_response_site_id_created_time", "site_id", "created_time", unique=False),
+        {"postgresql_partition_by": "RANGE (created_time)"},
     )
+    __mapper_args__ = {"primary_key": ["tariff_generated_rate_response_id"]}
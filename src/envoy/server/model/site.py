@@ -333,7 +333,10 @@ class SiteDERStatus(Base):
 
 class SiteLogEvent(Base):
     """Represents a "log event" occurring for a particular site. A log event is any "unusual" event that a site /
-    EndDevice has come across through interacting with one of the various function sets."""
+    EndDevice has come across through interacting with one of the various function sets.
+
+    The underlying table is RANGE partitioned (monthly) on created_time - as far as the ORM is concerned,
+    site_log_event_id still uniquely identifies a row."""
 
     __tablename__ = "site_log_event"
 
@@ -341,8 +344,8 @@ class SiteLogEvent(Base):
     site_id: Mapped[int] = mapped_column(ForeignKey("site.site_id", ondelete="CASCADE"))
 
     created_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
-    )  # When this record was created
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
+    )  # When this record was created. This is the partition key
 
     details: Mapped[str | None] = mapped_column(VARCHAR(32), nullable=True)  # Human readable string
     extended_data: Mapped[int | None] = mapped_column(INTEGER, nullable=True)  # Additional details from client
@@ -356,4 +359,6 @@ class SiteLogEvent(Base):
 
     __table_args__ = (
         Index("site_log_event_site_id_created_time_log_event_id_idx", "site_id", "created_time", "log_event_id"),
+        {"postgresql_partition_by": "RANGE (created_time)"},
     )
+    __mapper_args__ = {"primary_key": ["site_log_event_id"]}
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import IntEnum
 
 from envoy_schema.server.schema.sep2.types import (
     AccumulationBehaviourType,
@@ -11,7 +12,18 @@ from envoy_schema.server.schema.sep2.types import (
     RoleFlagsType,
     UomType,
 )
-from sqlalchemy import INTEGER, VARCHAR, BigInteger, DateTime, ForeignKey, Index, Sequence, UniqueConstraint, func
+from sqlalchemy import (
+    INTEGER,
+    VARCHAR,
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    PrimaryKeyConstraint,
+    Sequence,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from envoy.server.model import Base, Site
@@ -92,11 +104,15 @@ class SiteReadingType(Base):
 
 class SiteReading(Base):
     """The actual underlying time and value readings. These are explicitly kept 'thin' as this table will receive a
-    mountain of rows"""
+    mountain of rows.
+
+    The underlying table is RANGE partitioned (monthly) on time_period_start. Postgresql requires the partition key to
+    be included in the primary key but, as far as the ORM is concerned, site_reading_id still uniquely identifies a row.
+    Queries that filter on time_period_start will only touch the relevant partitions."""
 
     __tablename__ = "site_reading"
 
-    site_reading_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    site_reading_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     site_reading_type_id: Mapped[int] = mapped_column(ForeignKey("site_reading_type.site_reading_type_id"))
     created_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -107,7 +123,9 @@ class SiteReading(Base):
 
     local_id: Mapped[int | None] = mapped_column(INTEGER, nullable=True)  # Internal id assigned by aggregator
     quality_flags: Mapped[QualityFlagsType] = mapped_column(INTEGER)
-    time_period_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # When the reading starts
+    time_period_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )  # When the reading starts. This is the partition key
     time_period_seconds: Mapped[int] = mapped_column(INTEGER)  # Length of the reading in seconds
     value: Mapped[int] = mapped_column(
         BigInteger
@@ -117,4 +135,45 @@ class SiteReading(Base):
 
     __table_args__ = (
         UniqueConstraint("site_reading_type_id", "time_period_start", name="site_reading_type_id_time_period_start_uc"),
+        {"postgresql_partition_by": "RANGE (time_period_start)"},
+    )
+    __mapper_args__ = {"primary_key": ["site_reading_id"]}
+
+
+class SiteReadingRollupResolution(IntEnum):
+    """The fixed bucket widths (in seconds) that SiteReading values are pre-aggregated into. Buckets are aligned to the
+    unix epoch (i.e. DAY buckets are UTC days)"""
+
+    FIFTEEN_MINUTES = 900
+    HOUR = 3600
+    DAY = 86400
+
+
+class SiteReadingRollup(Base):
+    """Pre-aggregated SiteReading values for a single SiteReadingType over a fixed width time bucket (see
+    SiteReadingRollupResolution). A SiteReading contributes to the bucket that its time_period_start falls within.
+
+    These are derived values - they are maintained alongside SiteReading (see upsert_site_readings) and are never
+    archived. Rows are removed automatically (via cascade) when the parent SiteReadingType is deleted."""
+
+    __tablename__ = "site_reading_rollup"
+
+    site_reading_type_id: Mapped[int] = mapped_column(
+        ForeignKey("site_reading_type.site_reading_type_id", ondelete="CASCADE")
+    )
+    resolution_seconds: Mapped[SiteReadingRollupResolution] = mapped_column(INTEGER)  # Width of the bucket
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # Inclusive start of the bucket
+    changed_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # When the bucket was last recalculated
+
+    reading_count: Mapped[int] = mapped_column(INTEGER)  # Number of SiteReading rows in this bucket
+    value_sum: Mapped[int] = mapped_column(BigInteger)  # Sum of SiteReading.value for this bucket
+    value_min: Mapped[int] = mapped_column(BigInteger)  # Smallest SiteReading.value for this bucket
+    value_max: Mapped[int] = mapped_column(BigInteger)  # Largest SiteReading.value for this bucket
+
+    site_reading_type: Mapped["SiteReadingType"] = relationship(lazy="raise")
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "site_reading_type_id", "resolution_seconds", "bucket_start", name="site_reading_rollup_pkey"
+        ),
     )
@@ -37,7 +37,9 @@ class Subscription(Base):
     created_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )  # When the subscription was created
-    changed_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # When the subscription was last altered
+    changed_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True
+    )  # When the subscription was last altered
 
     resource_type: Mapped[SubscriptionResource] = mapped_column(INTEGER)  # What resource type is being subscribed to
     resource_id: Mapped[int | None] = mapped_column(
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Mapper, Session
+from sqlalchemy.sql import ClauseElement
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# If a request includes this header (with any value) - all of its reads will be made against the primary database
+READ_PRIMARY_HEADER = "x-envoy-read-primary"
+
+# HTTP methods that are eligible to have their reads routed to the read replica
+READ_ONLY_METHODS = {"GET", "HEAD"}
+
+# The upper bound on how many clients will have their most recent write tracked (oldest writes are evicted first)
+DEFAULT_MAX_TRACKED_CLIENTS = 10000
+
+# Reports how far (in seconds) the replica is behind the primary. A replica that has replayed everything that it has
+# received is treated as current (pg_last_xact_replay_timestamp will keep aging if the primary is idle). A database
+# that isn't in recovery (i.e. isn't a replica) is always current.
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# Set (per request) by ReadReplicaRoutingMiddleware - True if reads can be made against the read replica
+_read_replica_enabled: ContextVar[bool] = ContextVar("_read_replica_enabled", default=False)
+
+
+class ReadReplicaStatus:
+    """Tracks whether the read replica can currently serve reads and which clients have recently written to the
+    primary (and so should continue reading from the primary until the replica has had time to catch up)"""
+
+    max_staleness_seconds: float
+    replica_lag_seconds: float | None  # Most recently measured replica lag. None if unknown/unreachable
+    max_tracked_clients: int
+    _last_write_by_client: OrderedDict[str, float]
+
+    def __init__(self, max_staleness_seconds: float, max_tracked_clients: int = DEFAULT_MAX_TRACKED_CLIENTS) -> None:
+        self.max_staleness_seconds = max_staleness_seconds
+        self.replica_lag_seconds = None
+        self.max_tracked_clients = max_tracked_clients
+        self._last_write_by_client = OrderedDict()
+
+    @property
+    def replica_available(self) -> bool:
+        """True if the replica lag is known and within the configured staleness bound"""
+        return self.replica_lag_seconds is not None and self.replica_lag_seconds <= self.max_staleness_seconds
+
+    def record_write(self, client_key: str, now: float) -> None:
+        """Records that client_key has just written to the primary (now is a time.monotonic() value)"""
+        self._last_write_by_client[client_key] = now
+        self._last_write_by_client.move_to_end(client_key)
+        while len(self._last_write_by_client) > self.max_tracked_clients:
+            self._last_write_by_client.popitem(last=False)
+
+    def recently_wrote(self, client_key: str, now: float) -> bool:
+        """True if client_key has written to the primary within the staleness bound (now is a time.monotonic()
+        value). Any reads made by this client should go to the primary so that they can read their own writes"""
+        last_write = self._last_write_by_client.get(client_key, None)
+        if last_write is None:
+            return False
+        if now - last_write > self.max_staleness_seconds:
+            del self._last_write_by_client[client_key]
+            return False
+        return True
+
+
+def generate_read_replica_session_class(replica_engine: AsyncEngine) -> type[Session]:
+    """Generates a Session class (for use as a sync_session_class of an AsyncSession) that will route SELECT
+    statements to replica_engine for any request that ReadReplicaRoutingMiddleware has flagged as being read replica
+    eligible. Everything else (flushes, DML, SELECT ... FOR UPDATE, raw text statements) goes to the session's primary
+    bind."""
+
+    class ReadReplicaRoutingSession(Session):
+        def get_bind(
+            self,
+            mapper: Mapper[Any] | type[Any] | None = None,
+            clause: ClauseElement | None = None,
+            **kw: Any,  # noqa: ANN401
+        ) -> Engine | Connection:
+            if (
+                _read_replica_enabled.get()
+                and not self._flushing
+                and clause is not None
+                and getattr(clause, "is_select", False)
+                and getattr(clause, "_for_update_arg", None) is None
+            ):
+                return replica_engine.sync_engine
+            return super().get_bind(mapper, clause=clause, **kw)
+
+    return ReadReplicaRoutingSession
+
+
+class ReadReplicaRoutingMiddleware:
+    """ASGI middleware that flags GET/HEAD requests as being eligible for having their reads served by the read
+    replica. Requests will instead be served by the primary if:
+
+    - The replica is unavailable or lagging beyond the staleness bound
+    - The request includes the READ_PRIMARY_HEADER
+    - The client (identified by client_key_header) has written to the primary within the staleness bound"""
+
+    def __init__(self, app: ASGIApp, status: ReadReplicaStatus, client_key_header: str) -> None:
+        self.app = app
+        self.status = status
+        self.client_key_header = client_key_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        client_key = headers.get(self.client_key_header, None)
+
+        if scope["method"] not in READ_ONLY_METHODS:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if client_key:
+                    self.status.record_write(client_key, monotonic())
+            return
+
+        use_replica = (
+            self.status.replica_available
+            and READ_PRIMARY_HEADER not in headers
+            and not (client_key and self.status.recently_wrote(client_key, monotonic()))
+        )
+        token = _read_replica_enabled.set(use_replica)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _read_replica_enabled.reset(token)
+
+
+async def fetch_replica_lag_seconds(session: AsyncSession) -> float:
+    """Fetches how far (in seconds) the database behind session is lagging behind its primary (0 for a primary)"""
+    return float((await session.execute(text(REPLICA_LAG_SQL))).scalar_one())
+
+
+async def run_replica_lag_monitor(
+    session_maker: async_sessionmaker[AsyncSession],
+    status: ReadReplicaStatus,
+    interval_seconds: float,
+    stop_event: asyncio.Event,
+) -> None:
+    """Periodically updates status.replica_lag_seconds until stop_event is set. Any failure to reach the replica will
+    mark it as unavailable (routing all reads to the primary) until the next successful check"""
+    while not stop_event.is_set():
+        try:
+            async with session_maker() as session:
+                status.replica_lag_seconds = await fetch_replica_lag_seconds(session)
+            if not status.replica_available:
+                logger.warning(f"Read replica lag of {status.replica_lag_seconds}s exceeds staleness bound.")
+        except Exception as exc:
+            logger.error("Failure checking read replica lag", exc_info=exc)
+            status.replica_lag_seconds = None
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except TimeoutError:
+            pass
+
+
+class ReadReplica:
+    """Bundles the engine and status of a single read replica database"""
+
+    engine: AsyncEngine
+    status: ReadReplicaStatus
+
+    def __init__(
+        self, read_database_url: str, engine_args: dict[str, Any] | None, max_staleness_seconds: float
+    ) -> None:
+        self.engine = create_async_engine(read_database_url, **(engine_args or {}))
+        self.status = ReadReplicaStatus(max_staleness_seconds)
+
+    def routing_middleware_kwargs(self, db_kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Given the db_middleware_kwargs for the primary - returns an updated copy that will route eligible reads
+        to this replica"""
+        session_args = dict(db_kwargs.get("session_args", {}))
+        session_args["sync_session_class"] = generate_read_replica_session_class(self.engine)
+        return {**db_kwargs, "session_args": session_args}
+
+    def enable_lag_monitor(self, interval_seconds: float) -> Callable[[FastAPI], _AsyncGeneratorContextManager]:
+        """Returns a FastAPI lifespan context manager that monitors the replica lag in the background (started on app
+        startup, stopped on shutdown). Until the first check succeeds, all reads will be made against the primary"""
+        session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def context_manager(app: FastAPI) -> AsyncIterator:
+            stop_event = asyncio.Event()
+            task = asyncio.create_task(
+                run_replica_lag_monitor(session_maker, self.status, interval_seconds, stop_event)
+            )
+            try:
+                yield
+            finally:
+                stop_event.set()
+                await task
+                await self.engine.dispose()
+
+        return context_manager
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from envoy.server.crud.response import allocate_response_ids, insert_responses
+from envoy.server.model.response import DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse
+
+logger = logging.getLogger(__name__)
+
+ResponseEntity = DynamicOperatingEnvelopeResponse | TariffGeneratedRateResponse
+
+
+@dataclass
+class PendingResponse:
+    """A response that's waiting to be written by a ResponseBatchWriter"""
+
+    response: ResponseEntity  # Will have its primary key assigned once written
+    written: asyncio.Future[None]  # Resolved once response has been committed (or failed to be written)
+
+
+class ResponseBatchWriter:
+    """Groups concurrently submitted responses into batches that are written using a single transaction (one multi row
+    INSERT per response type). This trades a small, bounded amount of latency (max_delay_seconds) for drastically fewer
+    (and larger) transactions when many devices are posting responses at the same time.
+
+    Callers of submit will wait until their response has been committed - a response that has been acknowledged to
+    a client will never be lost. If a batch fails to write, each response is retried in its own transaction so that a
+    single bad response can't fail the rest of the batch."""
+
+    session_maker: async_sessionmaker[AsyncSession]
+    max_batch_size: int
+    max_delay_seconds: float
+    _queue: asyncio.Queue[PendingResponse]
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        max_batch_size: int,
+        max_delay_seconds: float,
+        max_queue_size: int,
+    ) -> None:
+        self.session_maker = session_maker
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._queue = asyncio.Queue(maxsize=max_queue_size)
+
+    async def submit(self, response: ResponseEntity) -> None:
+        """Queues response to be written as part of the next batch - waiting until it has been committed. The primary
+        key of response will be populated on return.
+
+        Will raise an exception if the response could not be written. If the queue is full, this will wait for space"""
+        pending = PendingResponse(response=response, written=asyncio.get_running_loop().create_future())
+        await self._queue.put(pending)
+        await pending.written
+
+    async def _next_batch(self, stop_event: asyncio.Event) -> list[PendingResponse]:
+        """Waits for the next response to arrive and then collects any others that arrive within max_delay_seconds (up
+        to max_batch_size). Returns an empty list if stop_event is set while waiting for the first response"""
+        if self._queue.empty():
+            get_task = asyncio.create_task(self._queue.get())
+            stop_task = asyncio.create_task(stop_event.wait())
+            await asyncio.wait([get_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+            stop_task.cancel()
+            if not get_task.done():
+                get_task.cancel()
+                return []
+            batch = [get_task.result()]
+        else:
+            batch = [self._queue.get_nowait()]
+
+        deadline = asyncio.get_running_loop().time() + self.max_delay_seconds
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0 or stop_event.is_set():
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: list[PendingResponse]) -> None:
+        """Writes (and commits) every response in batch using a single transaction"""
+        async with self.session_maker() as session:
+            for response_type in (DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse):
+                responses = [p.response for p in batch if isinstance(p.response, response_type)]
+                if not responses:
+                    continue
+
+                ids = await allocate_response_ids(session, response_type, len(responses))
+                for response, response_id in zip(responses, ids, strict=True):
+                    if isinstance(response, DynamicOperatingEnvelopeResponse):
+                        response.dynamic_operating_envelope_response_id = response_id
+                    else:
+                        response.tariff_generated_rate_response_id = response_id
+                await insert_responses(session, responses)  # ty:ignore[invalid-argument-type]
+            await session.commit()
+
+    async def flush_batch(self, batch: list[PendingResponse]) -> None:
+        """Writes batch - resolving the written future of every PendingResponse once complete"""
+        try:
+            await self._write(batch)
+            for pending in batch:
+                if not pending.written.done():
+                    pending.written.set_result(None)
+            return
+        except Exception as exc:
+            if len(batch) == 1:
+                if not batch[0].written.done():
+                    batch[0].written.set_exception(exc)
+                return
+            logger.warning(f"Failure writing batch of {len(batch)} responses. Retrying individually.", exc_info=exc)
+
+        for pending in batch:
+            await self.flush_batch([pending])
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """Continually writes batches of submitted responses until stop_event is set. Any responses that are still
+        queued at that point will be written before returning"""
+        while not stop_event.is_set():
+            batch = await self._next_batch(stop_event)
+            if batch:
+                await self.flush_batch(batch)
+
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.max_batch_size, self._queue.qsize()))]
+            await self.flush_batch(batch)
+
+
+def enable_response_batch_writer(
+    db_kwargs: dict[str, Any], max_batch_size: int, max_delay_seconds: float, max_queue_size: int
+) -> tuple[ResponseBatchWriter, Callable[[FastAPI], _AsyncGeneratorContextManager]]:
+    """Creates a ResponseBatchWriter (with a dedicated engine) and a FastAPI lifespan context manager that runs it in
+    the background (started on app startup, stopped on shutdown - after writing any outstanding responses).
+
+    db_kwargs - The db_middleware_kwargs (db_url + optional engine_args) used to build the writer's session maker"""
+    engine = create_async_engine(db_kwargs["db_url"], **db_kwargs.get("engine_args", {}))
+    writer = ResponseBatchWriter(
+        async_sessionmaker(engine, expire_on_commit=False),
+        max_batch_size=max_batch_size,
+        max_delay_seconds=max_delay_seconds,
+        max_queue_size=max_queue_size,
+    )
+
+    @asynccontextmanager
+    async def context_manager(app: FastAPI) -> AsyncIterator:
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(writer.run(stop_event))
+        try:
+            yield
+        finally:
+            stop_event.set()
+            await task
+            await engine.dispose()
+
+    return writer, context_manager
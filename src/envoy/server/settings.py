@@ -6,6 +6,10 @@ from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings
 
 from envoy.server.api.depends.allow_nmi_updates import DEFAULT_ALLOW_NMI_UPDATES
+from envoy.server.api.depends.xml_request_limits import (
+    DEFAULT_XML_REQUEST_MAX_BODY_BYTES,
+    DEFAULT_XML_REQUEST_MAX_ELEMENTS,
+)
 from envoy.server.endpoint_exclusion import EndpointExclusionSet
 from envoy.server.manager.nmi_validator import DNSPParticipantId, NmiValidator
 from envoy.settings import CommonSettings
@@ -48,12 +52,29 @@ class AppSettings(CommonSettings):
     cert_header: str = "x-forwarded-client-cert"  # either client certificate in PEM format or the sha256 fingerprint
 
     allow_device_registration: bool = False  # True: LFDI auth will allow unknown certs to register single EndDevices
+    lfdi_auth_cache_ttl_seconds: float | None = 60  # Cached aggregator certs are reloaded at least this often
 
     nmi_validation: NmiValidationSettings = Field(default_factory=NmiValidationSettings)
 
     allow_nmi_updates: bool = DEFAULT_ALLOW_NMI_UPDATES
     exclude_endpoints: EndpointExclusionSet | None = None
 
+    xml_request_max_body_bytes: int = DEFAULT_XML_REQUEST_MAX_BODY_BYTES  # Larger XML request bodies are rejected
+    xml_request_max_elements: int = DEFAULT_XML_REQUEST_MAX_ELEMENTS  # XML request bodies with more elements rejected
+    list_streaming_min_limit: int | None = None  # If set, list requests with at least this limit are streamed
+
+    enable_metrics: bool = False  # Will per route/XML render/notification queue metrics be exposed on /status/metrics?
+    health_check_interval_seconds: float | None = None  # If set, /status checks run in the background this often
+    fsa_catalogue_cache_ttl_seconds: float | None = None  # If set, the FSA catalogue is cached in process this long
+    edev_list_header_cache_ttl_seconds: float | None = None  # If set, EndDeviceList headers are cached this long
+
+    response_subject_cache_max_size: int = 0  # Max number of validated Response subjects cached (0 disables)
+    response_subject_cache_ttl_seconds: int = 300  # How long a validated Response subject will be cached for
+    enable_response_batching: bool = False  # Will Responses be written in batches by a background writer?
+    response_batch_max_size: int = 500  # Max number of Responses written per batch (transaction)
+    response_batch_max_delay_ms: int = 50  # Max time a Response will wait for other Responses to join its batch
+    response_batch_max_queue_size: int = 10000  # Max number of Responses waiting to be written (before blocking)
+
     @property
     def fastapi_kwargs(self) -> dict[str, Any]:
         return {
@@ -37,11 +37,16 @@ class CommonSettings(BaseSettings):
     azure_ad_client_id: str | None = None  # Client ID of the app in the Azure AD (if none - disables Azure AD Auth)
     azure_ad_valid_issuer: str | None = None  # Valid Issuer of tokens in the Azure AD (if none - no Azure AD Auth)
     azure_ad_db_resource_id: str | None = None  # Will be used to mint AD tokens as a database password alternative
+    azure_ad_token_cache_max_size: int = 1024  # Max number of validated Azure AD tokens held in memory
+    azure_ad_token_cache_expiry_buffer_secs: int = 30  # Cached Azure AD tokens are evicted this long before "exp"
     azure_ad_db_refresh_secs: int = (
         14400  # How frequently (in seconds) will the Azure AD DB token be manually refreshed. Default 4 hours.
     )
 
     database_url: PostgresDsn
+    read_database_url: PostgresDsn | None = None  # If set - GET/HEAD request reads will be served by this replica
+    read_database_max_staleness_secs: float = 5.0  # Replica lag (and read-your-writes window) before using primary
+    read_database_lag_check_secs: float = 5.0  # How frequently (in seconds) the read replica lag is checked
     default_timezone: str = "Australia/Brisbane"
 
     href_prefix: str | None = None  # Will ensure all outgoing href's are prefixed with this value (None = disabled)
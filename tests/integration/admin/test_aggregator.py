@@ -1,5 +1,6 @@
 import datetime as dt
 import json
+from collections.abc import AsyncIterator
 from http import HTTPStatus
 
 import psycopg
@@ -22,6 +23,8 @@ from envoy_schema.admin.schema.certificate import (
 from httpx import AsyncClient
 
 from envoy.admin import crud
+from envoy.admin.schema.certificate import AggregatorCertificateProvisionUri, CertificateProvisionResponse
+from envoy.admin.schema.ingest import NDJSON_CONTENT_TYPE
 from envoy.server.model import AggregatorCertificateAssignment, Certificate
 from tests.integration import response
 
@@ -245,6 +248,57 @@ async def test_assign_certificates_to_aggregator_bad_certificate_id(admin_client
     assert res_post.status_code == HTTPStatus.BAD_REQUEST
 
 
+@pytest.mark.anyio
+async def test_provision_certificates_for_aggregator(
+    admin_client_auth: AsyncClient, pg_base_config: psycopg.Connection
+) -> None:
+    """Testing of the '/aggregator/{agg_id}/certificate_provision' endpoint using a (chunked) NDJSON POST"""
+    certs = [
+        CertificateAssignmentRequest(certificate_id=4),
+        CertificateAssignmentRequest(lfdi="SOMEFAKELFDI1", expiry=dt.datetime.now() + dt.timedelta(365)),
+        CertificateAssignmentRequest(lfdi="SOMEFAKELFDI2", expiry=dt.datetime.now() + dt.timedelta(365)),
+    ]
+    body = "\n".join(c.model_dump_json() for c in certs).encode()
+
+    async def chunked_body() -> AsyncIterator[bytes]:
+        yield body[:10]
+        yield body[10:]
+
+    res_post = await admin_client_auth.post(
+        AggregatorCertificateProvisionUri.format(aggregator_id=1),
+        content=chunked_body(),
+        headers={"Content-Type": NDJSON_CONTENT_TYPE},
+    )
+    assert res_post.status_code == HTTPStatus.CREATED
+    result = CertificateProvisionResponse.model_validate_json(response.read_response_body_string(res_post))
+    assert result == CertificateProvisionResponse(received_count=3, created_count=2, assigned_count=3)
+
+    async with generate_async_session(pg_base_config) as session:
+        agg_certs = await crud.certificate.select_all_certificates_for_aggregator(session, 1, 0, 500)
+        assert [c.lfdi for c in agg_certs][-2:] == ["SOMEFAKELFDI1", "SOMEFAKELFDI2"]
+        assert 4 in [c.certificate_id for c in agg_certs]
+
+
+@pytest.mark.parametrize(
+    "aggregator_id, body, expected_status",
+    [
+        (1111, b'{"certificate_id": 4}', HTTPStatus.NOT_FOUND),
+        (1, b'{"certificate_id": 4444}', HTTPStatus.BAD_REQUEST),
+        (1, b'{"certificate_id": 4}\nnot json', HTTPStatus.BAD_REQUEST),
+    ],
+)
+@pytest.mark.anyio
+async def test_provision_certificates_for_aggregator_errors(
+    admin_client_auth: AsyncClient, aggregator_id: int, body: bytes, expected_status: HTTPStatus
+) -> None:
+    res_post = await admin_client_auth.post(
+        AggregatorCertificateProvisionUri.format(aggregator_id=aggregator_id),
+        content=body,
+        headers={"Content-Type": NDJSON_CONTENT_TYPE},
+    )
+    assert res_post.status_code == expected_status
+
+
 @pytest.mark.parametrize(
     "agg_id,cert_id,expected_ids",
     [
@@ -1,4 +1,5 @@
 import json
+import unittest.mock as mock
 from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
 
@@ -18,7 +19,10 @@ from envoy_schema.admin.schema.uri import (
     ArchiveForPeriodTariffGeneratedRate,
 )
 from httpx import AsyncClient
+from pydantic import BaseModel
 
+from envoy.admin.api.archive import ARCHIVE_EXPORT_URI
+from envoy.admin.crud.archive import ArchiveExportEntity
 from envoy.server.api.request import MAX_LIMIT
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.archive.site import ArchiveSite
@@ -212,3 +216,110 @@ async def test_get_archive_for_period_does(
     assert page.total_count == expected_count
     assert_list_type(ArchiveDynamicOperatingEnvelopeResponse, page.entities, len(expected_archive_ids))
     assert expected_archive_ids == [e.archive_id for e in page.entities]
+
+
+@pytest.mark.parametrize(
+    "after_archive_id, limit, only_deletes, expected_archive_ids, expected_count",
+    [
+        (None, 2, False, [1, 3], 3),
+        (1, 2, False, [3, 4], 3),
+        (3, 2, False, [4], 3),
+        (4, 2, False, [], 3),
+        (1, 99, True, [2], 2),
+    ],
+)
+@pytest.mark.anyio
+async def test_get_archive_for_period_sites_keyset(
+    admin_client_auth: AsyncClient,
+    pg_base_config,
+    after_archive_id: int | None,
+    limit: int,
+    only_deletes: bool,
+    expected_archive_ids: list[int],
+    expected_count: int,
+):
+    """Keyset pagination (via after_archive_id) should page through the period without skipping/repeating entities"""
+
+    await populate_archive_with_type(pg_base_config, ArchiveSite)
+
+    params: dict = {"only_deletes": only_deletes, "limit": limit}
+    if after_archive_id is not None:
+        params["after_archive_id"] = after_archive_id
+    response = await admin_client_auth.get(
+        ArchiveForPeriodSites.format(period_start=DT1.isoformat(), period_end=DT2.isoformat()), params=params
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    page = ArchivePageResponse[ArchiveSiteResponse](**json.loads(read_response_body_string(response)))
+    assert page.total_count == expected_count
+    assert expected_archive_ids == [e.archive_id for e in page.entities]
+
+
+@pytest.mark.parametrize(
+    "entity, archive_type, response_type",
+    [
+        (ArchiveExportEntity.SITE, ArchiveSite, ArchiveSiteResponse),
+        (
+            ArchiveExportEntity.DYNAMIC_OPERATING_ENVELOPE,
+            ArchiveDynamicOperatingEnvelope,
+            ArchiveDynamicOperatingEnvelopeResponse,
+        ),
+        (
+            ArchiveExportEntity.TARIFF_GENERATED_RATE,
+            ArchiveTariffGeneratedRate,
+            ArchiveTariffGeneratedRateResponse,
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "only_deletes, expected_archive_ids",
+    [(False, [1, 3, 4]), (True, [1, 2])],
+)
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+@pytest.mark.anyio
+async def test_get_archive_export(
+    admin_client_auth: AsyncClient,
+    pg_base_config,
+    entity: ArchiveExportEntity,
+    archive_type: type,
+    response_type: type[BaseModel],
+    only_deletes: bool,
+    expected_archive_ids: list[int],
+    batch_size: int,
+):
+    """The streamed export should return every archived entity in the period (in archive_id order) as NDJSON
+    regardless of how many batches it is fetched in"""
+
+    await populate_archive_with_type(pg_base_config, archive_type)
+
+    with mock.patch("envoy.admin.manager.archive.ARCHIVE_EXPORT_BATCH_SIZE", batch_size):
+        response = await admin_client_auth.get(
+            ARCHIVE_EXPORT_URI.format(period_start=DT1.isoformat(), period_end=DT2.isoformat(), entity=entity.value),
+            params={"only_deletes": only_deletes},
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["Content-Type"].startswith("application/x-ndjson")
+
+    lines = read_response_body_string(response).splitlines()
+    entities = [response_type.model_validate_json(line) for line in lines]
+    assert expected_archive_ids == [json.loads(line)["archive_id"] for line in lines]
+    assert_list_type(response_type, entities, len(expected_archive_ids))
+
+
+@pytest.mark.anyio
+async def test_get_archive_export_empty(admin_client_auth: AsyncClient):
+    response = await admin_client_auth.get(
+        ARCHIVE_EXPORT_URI.format(
+            period_start=DT1.isoformat(), period_end=DT2.isoformat(), entity=ArchiveExportEntity.SITE.value
+        )
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert read_response_body_string(response) == ""
+
+
+@pytest.mark.anyio
+async def test_get_archive_export_invalid_entity(admin_client_auth: AsyncClient):
+    response = await admin_client_auth.get(
+        ARCHIVE_EXPORT_URI.format(period_start=DT1.isoformat(), period_end=DT2.isoformat(), entity="aggregators")
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,51 @@
+import csv
+import io
+from datetime import UTC, datetime
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from envoy.admin.api.export import EXPORT_URI
+from envoy.admin.crud.export import EXPORT_MODELS, ExportEntity
+from tests.integration.response import read_response_body_string
+
+
+@pytest.mark.parametrize("entity", list(ExportEntity))
+@pytest.mark.anyio
+async def test_get_export(admin_client_auth: AsyncClient, entity: ExportEntity):
+    response = await admin_client_auth.get(EXPORT_URI.format(entity=entity.value))
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["Content-Type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(read_response_body_string(response))))
+    assert len(rows) > 0
+    assert list(rows[0].keys()) == [c.name for c in EXPORT_MODELS[entity].__table__.columns]
+
+
+@pytest.mark.parametrize(
+    "changed_after, expected_site_ids",
+    [
+        (None, [1, 2, 3, 4, 5, 6]),
+        (datetime(2022, 2, 3, 5, 0, 0, tzinfo=UTC), [2, 3, 4, 5, 6]),
+        (datetime(2099, 1, 1, tzinfo=UTC), []),
+    ],
+)
+@pytest.mark.anyio
+async def test_get_export_changed_after(
+    admin_client_auth: AsyncClient, changed_after: datetime | None, expected_site_ids: list[int]
+):
+    params = {"changed_after": changed_after.isoformat()} if changed_after else {}
+    response = await admin_client_auth.get(EXPORT_URI.format(entity=ExportEntity.SITE.value), params=params)
+    assert response.status_code == HTTPStatus.OK
+
+    body = read_response_body_string(response)
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert [int(r["site_id"]) for r in rows] == expected_site_ids
+    assert body.startswith("site_id,"), "Header row should always be included"
+
+
+@pytest.mark.anyio
+async def test_get_export_invalid_entity(admin_client_auth: AsyncClient):
+    response = await admin_client_auth.get(EXPORT_URI.format(entity="aggregator"))
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,312 @@
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from assertical.fixtures.fastapi import start_app_with_client
+from assertical.fixtures.postgres import generate_async_session
+from envoy_schema.admin.schema.pricing import TariffGeneratedRateRequest
+from envoy_schema.admin.schema.site_control import SiteControlRequest
+from httpx import AsyncClient
+from psycopg import Connection
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from envoy.admin.crud.ingest import count_ingest_job_rows, insert_ingest_job_rows, select_ingest_job
+from envoy.admin.ingest_worker import apply_ingest_job
+from envoy.admin.main import generate_app
+from envoy.admin.schema.ingest import (
+    NDJSON_CONTENT_TYPE,
+    IngestJobListUri,
+    IngestJobRequest,
+    IngestJobResponse,
+    IngestJobRowsUri,
+    IngestJobSubmitUri,
+    IngestJobUri,
+)
+from envoy.admin.settings import generate_settings
+from envoy.server.model.doe import DynamicOperatingEnvelope
+from envoy.server.model.ingest import IngestJob, IngestJobRow, IngestJobStatus, IngestJobType
+from envoy.server.model.subscription import NotificationCheck, SubscriptionResource
+from envoy.server.model.tariff import TariffGeneratedRate
+
+
+@pytest.fixture
+async def ingest_client(pg_base_config: Connection):
+    """Admin client with ingest jobs (and notifications) enabled - small chunks applied in parallel"""
+    os.environ["ENABLE_INGEST_JOBS"] = "true"
+    os.environ["INGEST_JOB_CHUNK_SIZE"] = "2"
+    os.environ["INGEST_JOB_PARALLELISM"] = "2"
+    os.environ["INGEST_JOB_POLL_SECONDS"] = "0.1"
+    os.environ["ENABLE_NOTIFICATIONS"] = "true"
+    settings = generate_settings()
+    app = generate_app(settings)
+    async with start_app_with_client(app, client_auth=(settings.admin_username, settings.admin_password)) as c:
+        yield c
+
+
+def rate(site_id: int, hour: int, price: str) -> TariffGeneratedRateRequest:
+    return TariffGeneratedRateRequest(
+        tariff_id=1,
+        site_id=site_id,
+        calculation_log_id=None,
+        start_time=datetime(2030, 1, 1, hour, tzinfo=UTC),
+        duration_seconds=300,
+        import_active_price=Decimal(price),
+        export_active_price=Decimal("-1.5"),
+        import_reactive_price=Decimal("0"),
+        export_reactive_price=Decimal("0"),
+    )
+
+
+def to_ndjson(items: list[TariffGeneratedRateRequest] | list[SiteControlRequest]) -> bytes:
+    return b"".join(i.model_dump_json().encode() + b"\n" for i in items)
+
+
+async def create_job(client: AsyncClient, request: IngestJobRequest) -> IngestJobResponse:
+    response = await client.post(IngestJobListUri, content=request.model_dump_json())
+    assert response.status_code == HTTPStatus.CREATED
+    return IngestJobResponse.model_validate_json(response.text)
+
+
+async def wait_for_job(client: AsyncClient, ingest_job_id: int) -> IngestJobResponse:
+    for _ in range(100):
+        response = await client.get(IngestJobUri.format(ingest_job_id=ingest_job_id))
+        assert response.status_code == HTTPStatus.OK
+        job = IngestJobResponse.model_validate_json(response.text)
+        if job.status in (IngestJobStatus.COMPLETE, IngestJobStatus.FAILED):
+            return job
+        await asyncio.sleep(0.1)
+    raise AssertionError(f"Job {ingest_job_id} didn't finish")
+
+
+@pytest.mark.anyio
+async def test_ingest_job_tariff_generated_rates(ingest_client: AsyncClient, pg_base_config):
+    job = await create_job(ingest_client, IngestJobRequest(job_type=IngestJobType.TARIFF_GENERATED_RATE))
+    assert job.status == IngestJobStatus.RECEIVING
+    assert job.staged_rows == 0
+    rows_uri = IngestJobRowsUri.format(ingest_job_id=job.ingest_job_id)
+
+    # First part is streamed in pieces that don't line up with the lines (chunked transfer encoding)
+    part_1 = to_ndjson([rate(1, 1, "1.1"), rate(2, 1, "2.1"), rate(1, 2, "1.2")])
+
+    async def stream_part_1() -> AsyncIterator[bytes]:
+        for idx in range(0, len(part_1), 7):
+            yield part_1[idx : idx + 7]
+
+    response = await ingest_client.post(
+        rows_uri, content=stream_part_1(), headers={"Content-Type": NDJSON_CONTENT_TYPE}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert IngestJobResponse.model_validate_json(response.text).staged_rows == 3
+
+    # Second part replaces an earlier rate (same site/start_time) - it must be applied after the first
+    part_2 = to_ndjson([rate(2, 2, "2.2"), rate(4, 1, "4.1"), rate(1, 1, "1.11")])
+    response = await ingest_client.post(rows_uri, content=part_2, headers={"Content-Type": NDJSON_CONTENT_TYPE})
+    assert response.status_code == HTTPStatus.OK
+    assert IngestJobResponse.model_validate_json(response.text).staged_rows == 6
+
+    response = await ingest_client.post(IngestJobSubmitUri.format(ingest_job_id=job.ingest_job_id))
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert IngestJobResponse.model_validate_json(response.text).status in (
+        IngestJobStatus.PENDING,
+        IngestJobStatus.APPLYING,
+        IngestJobStatus.COMPLETE,
+    )
+
+    job = await wait_for_job(ingest_client, job.ingest_job_id)
+    assert job.status == IngestJobStatus.COMPLETE, job.error
+    assert job.applied_rows == 6
+    assert job.applied_chunks == 4  # Sites 2/4 (partition 0) have 2 rows. Site 1 (partition 1) has 3 rows
+
+    # Can't add any more rows (or resubmit) now
+    response = await ingest_client.post(rows_uri, content=part_2)
+    assert response.status_code == HTTPStatus.CONFLICT
+    response = await ingest_client.post(IngestJobSubmitUri.format(ingest_job_id=job.ingest_job_id))
+    assert response.status_code == HTTPStatus.CONFLICT
+
+    async with generate_async_session(pg_base_config) as session:
+        rates = (
+            (
+                await session.execute(
+                    select(TariffGeneratedRate)
+                    .where(TariffGeneratedRate.start_time >= datetime(2030, 1, 1, tzinfo=UTC))
+                    .order_by(TariffGeneratedRate.site_id, TariffGeneratedRate.start_time)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert [(r.site_id, r.start_time.hour, r.import_active_price) for r in rates] == [
+            (1, 1, Decimal("1.11")),
+            (1, 2, Decimal("1.2")),
+            (2, 1, Decimal("2.1")),
+            (2, 2, Decimal("2.2")),
+            (4, 1, Decimal("4.1")),
+        ]
+
+        # One notification check per chunk and no staged rows left behind
+        checks = (await session.execute(select(NotificationCheck))).scalars().all()
+        assert len(checks) == job.applied_chunks
+        assert all(c.resource_type == SubscriptionResource.TARIFF_GENERATED_RATE for c in checks)
+        assert len(set(c.changed_time for c in checks)) == len(checks)
+        assert (await session.execute(select(func.count()).select_from(IngestJobRow))).scalar_one() == 0
+
+
+@pytest.mark.anyio
+async def test_ingest_job_site_control_failure(ingest_client: AsyncClient, pg_base_config):
+    """A chunk that can't be applied should fail the job (with an error) and discard the staged rows"""
+    job = await create_job(
+        ingest_client, IngestJobRequest(job_type=IngestJobType.SITE_CONTROL, site_control_group_id=1)
+    )
+    controls = [
+        SiteControlRequest(
+            site_id=site_id,
+            calculation_log_id=None,
+            duration_seconds=300,
+            start_time=datetime(2030, 1, 1, tzinfo=UTC),
+            import_limit_watts=Decimal("1.23"),
+        )
+        for site_id in [1, 2, 99]  # site 99 doesn't exist
+    ]
+    response = await ingest_client.post(
+        IngestJobRowsUri.format(ingest_job_id=job.ingest_job_id),
+        content=to_ndjson(controls),
+        headers={"Content-Type": NDJSON_CONTENT_TYPE},
+    )
+    assert response.status_code == HTTPStatus.OK
+    response = await ingest_client.post(IngestJobSubmitUri.format(ingest_job_id=job.ingest_job_id))
+    assert response.status_code == HTTPStatus.ACCEPTED
+
+    job = await wait_for_job(ingest_client, job.ingest_job_id)
+    assert job.status == IngestJobStatus.FAILED
+    assert job.error
+    assert job.applied_rows < 3
+
+    async with generate_async_session(pg_base_config) as session:
+        assert (await session.execute(select(func.count()).select_from(IngestJobRow))).scalar_one() == 0
+        applied_count = (
+            await session.execute(
+                select(func.count())
+                .select_from(DynamicOperatingEnvelope)
+                .where(DynamicOperatingEnvelope.start_time == datetime(2030, 1, 1, tzinfo=UTC))
+            )
+        ).scalar_one()
+        assert applied_count == job.applied_rows
+
+
+@pytest.mark.anyio
+async def test_ingest_job_invalid_upload(ingest_client: AsyncClient, pg_base_config):
+    """An invalid line should reject the whole upload (identifying the line)"""
+    job = await create_job(ingest_client, IngestJobRequest(job_type=IngestJobType.TARIFF_GENERATED_RATE))
+    rows_uri = IngestJobRowsUri.format(ingest_job_id=job.ingest_job_id)
+
+    response = await ingest_client.post(rows_uri, content=to_ndjson([rate(1, 1, "1.1")]) + b'{"site_id": 1}\n')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "Line 2" in response.text
+
+    response = await ingest_client.get(IngestJobUri.format(ingest_job_id=job.ingest_job_id))
+    assert response.status_code == HTTPStatus.OK
+    assert IngestJobResponse.model_validate_json(response.text).staged_rows == 0
+    async with generate_async_session(pg_base_config) as session:
+        assert (await session.execute(select(func.count()).select_from(IngestJobRow))).scalar_one() == 0
+
+
+@pytest.mark.parametrize(
+    "request_body, expected_status",
+    [
+        (IngestJobRequest(job_type=IngestJobType.SITE_CONTROL), HTTPStatus.BAD_REQUEST),
+        (IngestJobRequest(job_type=IngestJobType.SITE_CONTROL, site_control_group_id=999), HTTPStatus.BAD_REQUEST),
+        (
+            IngestJobRequest(job_type=IngestJobType.TARIFF_GENERATED_RATE, site_control_group_id=1),
+            HTTPStatus.BAD_REQUEST,
+        ),
+        (IngestJobRequest(job_type=IngestJobType.DYNAMIC_OPERATING_ENVELOPE), HTTPStatus.CREATED),
+    ],
+)
+@pytest.mark.anyio
+async def test_create_ingest_job_validation(
+    ingest_client: AsyncClient, request_body: IngestJobRequest, expected_status: HTTPStatus
+):
+    response = await ingest_client.post(IngestJobListUri, content=request_body.model_dump_json())
+    assert response.status_code == expected_status
+
+
+@pytest.mark.anyio
+async def test_ingest_job_not_found(ingest_client: AsyncClient):
+    assert (await ingest_client.get(IngestJobUri.format(ingest_job_id=999))).status_code == HTTPStatus.NOT_FOUND
+    response = await ingest_client.post(IngestJobRowsUri.format(ingest_job_id=999), content=b"")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    response = await ingest_client.post(IngestJobSubmitUri.format(ingest_job_id=999))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_ingest_jobs_disabled(admin_client_auth: AsyncClient):
+    response = await admin_client_auth.get(IngestJobUri.format(ingest_job_id=1))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    response = await admin_client_auth.post(IngestJobListUri, content=b"{}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_apply_ingest_job_lease_lost(pg_base_config):
+    """A (stale) worker whose job has been reclaimed by another worker must not apply any more rows or change the
+    job's status"""
+    engine = create_async_engine(generate_settings().db_middleware_kwargs["db_url"])
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    claimed_time = datetime(2030, 1, 1, tzinfo=UTC)
+    try:
+        async with session_maker() as session:
+            stale_job = IngestJob(
+                job_type=IngestJobType.TARIFF_GENERATED_RATE,
+                site_control_group_id=None,
+                status=IngestJobStatus.APPLYING,
+                changed_time=claimed_time,
+                claimed_time=claimed_time,
+                staged_rows=2,
+                applied_rows=0,
+                applied_chunks=0,
+            )
+            session.add(stale_job)
+            await session.flush()
+            await insert_ingest_job_rows(
+                session,
+                stale_job.ingest_job_id,
+                1,
+                [(1, rate(1, 1, "1.1").model_dump_json()), (2, rate(2, 1, "2.1").model_dump_json())],
+            )
+            await session.commit()
+
+        # Another worker reclaims the job
+        reclaimed_time = datetime(2030, 1, 2, tzinfo=UTC)
+        async with session_maker() as session:
+            await session.execute(
+                update(IngestJob)
+                .where(IngestJob.ingest_job_id == stale_job.ingest_job_id)
+                .values(claimed_time=reclaimed_time, changed_time=reclaimed_time)
+            )
+            await session.commit()
+
+        await apply_ingest_job(session_maker, stale_job, 1, 1, asyncio.Event())
+
+        async with session_maker() as session:
+            job = await select_ingest_job(session, stale_job.ingest_job_id)
+            assert job is not None
+            assert job.status == IngestJobStatus.APPLYING
+            assert job.claimed_time == reclaimed_time
+            assert job.applied_rows == 0
+            assert await count_ingest_job_rows(session, stale_job.ingest_job_id) == 2, "Chunk was rolled back"
+            rate_count = (
+                await session.execute(
+                    select(func.count())
+                    .select_from(TariffGeneratedRate)
+                    .where(TariffGeneratedRate.start_time >= datetime(2030, 1, 1, tzinfo=UTC))
+                )
+            ).scalar_one()
+            assert rate_count == 0
+    finally:
+        await engine.dispose()
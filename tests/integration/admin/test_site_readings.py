@@ -4,6 +4,7 @@ from decimal import Decimal
 from http import HTTPStatus
 
 import pytest
+from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.admin.schema.site_reading import (
     CSIPAusSiteReading,
     CSIPAusSiteReadingPageResponse,
@@ -13,6 +14,8 @@ from envoy_schema.admin.schema.site_reading import (
 from envoy_schema.admin.schema.uri import CSIPAusSiteReadingUri
 from httpx import AsyncClient
 
+from envoy.server.crud.site_reading import recalculate_site_reading_rollups
+from envoy.server.model.site_reading import SiteReadingRollupResolution
 from tests.integration.response import read_response_body_string
 
 
@@ -338,3 +341,55 @@ async def test_get_csip_aus_site_readings_response_format(admin_client_auth: Asy
         reading_fields = ["reading_start_time", "duration_seconds", "phase", "value", "csip_aus_unit"]
         for field in reading_fields:
             assert hasattr(reading, field), f"Reading missing required field: {field}"
+
+
+@pytest.mark.parametrize(
+    "resolution, expected_readings",
+    [
+        (
+            SiteReadingRollupResolution.HOUR,
+            [
+                (datetime(2022, 6, 6, 15, tzinfo=UTC), Decimal("11000")),
+                (datetime(2022, 6, 6, 16, tzinfo=UTC), Decimal("12000")),
+            ],
+        ),
+        (SiteReadingRollupResolution.DAY, [(datetime(2022, 6, 6, tzinfo=UTC), Decimal("11500"))]),
+    ],
+)
+@pytest.mark.anyio
+async def test_get_csip_aus_site_readings_resolution(
+    admin_client_auth: AsyncClient,
+    pg_base_config,
+    resolution: SiteReadingRollupResolution,
+    expected_readings: list[tuple[datetime, Decimal]],
+):
+    """Requesting a resolution should serve bucket averages from the pre-aggregated rollups"""
+    async with generate_async_session(pg_base_config) as session:
+        await recalculate_site_reading_rollups(session, datetime(2024, 1, 1, tzinfo=UTC), [1, 5])
+        await session.commit()
+
+    uri = CSIPAusSiteReadingUri.format(
+        site_id=1,
+        unit_enum=CSIPAusSiteReadingUnit.ACTIVEPOWER.value,
+        period_start=datetime(2022, 6, 1, 0, 0, 0, tzinfo=UTC).isoformat(),
+        period_end=datetime(2022, 6, 30, 0, 0, 0, tzinfo=UTC).isoformat(),
+    )
+    response = await admin_client_auth.get(uri + f"?resolution={resolution.value}")
+    assert response.status_code == HTTPStatus.OK
+
+    reading_page = CSIPAusSiteReadingPageResponse(**json.loads(read_response_body_string(response)))
+    assert reading_page.total_count == len(expected_readings)
+    assert [(r.reading_start_time, r.value) for r in reading_page.readings] == expected_readings
+    assert all(r.duration_seconds == resolution.value for r in reading_page.readings)
+
+
+@pytest.mark.anyio
+async def test_get_csip_aus_site_readings_invalid_resolution(admin_client_auth: AsyncClient):
+    uri = CSIPAusSiteReadingUri.format(
+        site_id=1,
+        unit_enum=CSIPAusSiteReadingUnit.ACTIVEPOWER.value,
+        period_start=datetime(2022, 6, 1, 0, 0, 0, tzinfo=UTC).isoformat(),
+        period_end=datetime(2022, 6, 30, 0, 0, 0, tzinfo=UTC).isoformat(),
+    )
+    response = await admin_client_auth.get(uri + "?resolution=60")
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,137 @@
+from http import HTTPStatus
+
+import pytest
+from assertical.fixtures.postgres import generate_async_session
+from envoy_schema.server.schema.sep2.pub_sub import ConditionAttributeIdentifier
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from envoy.admin.schema.subscription import (
+    AggregatorSubscriptionListUri,
+    SubscriptionBulkResponse,
+    SubscriptionConditionRequest,
+    SubscriptionRequest,
+)
+from envoy.server.crud.subscription import select_subscription_by_id
+from envoy.server.model.archive.subscription import ArchiveSubscription
+from envoy.server.model.subscription import Subscription, SubscriptionResource
+
+
+@pytest.mark.anyio
+async def test_upsert_aggregator_subscriptions(admin_client_auth: AsyncClient, pg_base_config):
+    requests = [
+        SubscriptionRequest(
+            subscribed_resource="/edev", notification_uri="https://example.com/renewed", entity_limit=11
+        ),  # Renews sub 1
+        SubscriptionRequest(
+            subscribed_resource="/edev/1/derp/1/derc",
+            notification_uri="https://another.example.com/new",
+            entity_limit=22,
+            conditions=[
+                SubscriptionConditionRequest(
+                    attribute=ConditionAttributeIdentifier.READING_VALUE, lower_threshold=1, upper_threshold=2
+                )
+            ],
+        ),
+        SubscriptionRequest(
+            subscribed_resource="/edev/2/der/1/ders", notification_uri="https://example.com/new", entity_limit=33
+        ),
+    ]
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_before = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+
+    res = await admin_client_auth.put(
+        AggregatorSubscriptionListUri.format(aggregator_id=1),
+        content="[" + ",".join(r.model_dump_json() for r in requests) + "]",
+    )
+    assert res.status_code == HTTPStatus.OK
+    body = SubscriptionBulkResponse.model_validate_json(res.content)
+    assert len(body.subscription_ids) == 3
+    assert body.subscription_ids[0] == 1
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_after = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+        assert sub_count_before + 2 == sub_count_after
+
+        renewed = await select_subscription_by_id(session, 1, 1)
+        assert renewed is not None
+        assert renewed.notification_uri == "https://example.com/renewed"
+
+        doe_sub = await select_subscription_by_id(session, 1, body.subscription_ids[1])
+        assert doe_sub is not None
+        assert doe_sub.resource_type == SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE
+        assert doe_sub.scoped_site_id == 1
+        assert doe_sub.resource_id == 1
+        assert [(c.lower_threshold, c.upper_threshold) for c in doe_sub.conditions] == [(1, 2)]
+
+        der_sub = await select_subscription_by_id(session, 1, body.subscription_ids[2])
+        assert der_sub is not None
+        assert der_sub.resource_type == SubscriptionResource.SITE_DER_STATUS
+        assert der_sub.scoped_site_id == 2
+
+        archived_ids = (await session.execute(select(ArchiveSubscription.subscription_id))).scalars().all()
+        assert archived_ids == [1]
+
+
+@pytest.mark.parametrize(
+    "aggregator_id, request_body, expected_status",
+    [
+        (
+            99,
+            SubscriptionRequest(subscribed_resource="/edev", notification_uri="https://example.com/", entity_limit=1),
+            HTTPStatus.NOT_FOUND,
+        ),
+        (
+            1,
+            SubscriptionRequest(subscribed_resource="/edev", notification_uri="https://bad.domain/", entity_limit=1),
+            HTTPStatus.BAD_REQUEST,
+        ),
+        (
+            1,
+            SubscriptionRequest(
+                subscribed_resource="/edev/3/derp/1/derc", notification_uri="https://example.com/", entity_limit=1
+            ),
+            HTTPStatus.BAD_REQUEST,
+        ),  # Site 3 belongs to aggregator 2
+        (
+            1,
+            SubscriptionRequest(
+                subscribed_resource="/edev/1/derp/99/derc", notification_uri="https://example.com/", entity_limit=1
+            ),
+            HTTPStatus.BAD_REQUEST,
+        ),  # Bad site control group
+        (
+            1,
+            SubscriptionRequest(
+                subscribed_resource="/not/a/resource", notification_uri="https://example.com/", entity_limit=1
+            ),
+            HTTPStatus.BAD_REQUEST,
+        ),
+    ],
+)
+@pytest.mark.anyio
+async def test_upsert_aggregator_subscriptions_errors(
+    admin_client_auth: AsyncClient,
+    pg_base_config,
+    aggregator_id: int,
+    request_body: SubscriptionRequest,
+    expected_status: HTTPStatus,
+):
+    """Invalid batches are rejected without writing anything"""
+    valid_request = SubscriptionRequest(
+        subscribed_resource="/edev/1", notification_uri="https://example.com/", entity_limit=1
+    )
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_before = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+
+    res = await admin_client_auth.put(
+        AggregatorSubscriptionListUri.format(aggregator_id=aggregator_id),
+        content=f"[{valid_request.model_dump_json()},{request_body.model_dump_json()}]",
+    )
+    assert res.status_code == expected_status
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_after = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+        assert sub_count_before == sub_count_after
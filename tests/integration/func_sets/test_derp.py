@@ -1,4 +1,5 @@
 import asyncio
+import os
 import urllib.parse
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
@@ -10,6 +11,7 @@ import envoy_schema.server.schema.uri as uri
 import pytest
 from assertical.asserts.time import assert_datetime_equal
 from assertical.fake.generator import generate_class_instance
+from assertical.fixtures.fastapi import start_app_with_client
 from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.server.schema.sep2.der import (
     DefaultDERControl,
@@ -23,12 +25,14 @@ from httpx import AsyncClient
 from sqlalchemy import select
 
 from envoy.server.crud.site import VIRTUAL_END_DEVICE_SITE_ID
+from envoy.server.main import generate_app
 from envoy.server.manager.time import utc_now
 from envoy.server.mapper.csip_aus.doe import DERControlMapper
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.doe import DynamicOperatingEnvelope, SiteControlGroup
 from envoy.server.model.server import RuntimeServerConfig as DbRuntimeServerConfig
 from envoy.server.model.site import Site
+from envoy.server.settings import generate_settings
 from tests.conftest import (
     DEFAULT_DOE_EXPORT_ACTIVE_WATTS,
     DEFAULT_DOE_IMPORT_ACTIVE_WATTS,
@@ -438,6 +442,44 @@ async def test_get_dercontrol_list(
             assert_datetime_equal(expected_start, control.interval.start)
 
 
+@pytest.mark.parametrize(
+    "site_id, cert",
+    [(1, AGG_1_VALID_CERT), (2, AGG_1_VALID_CERT), (1, AGG_2_VALID_CERT), (5, AGG_1_VALID_CERT)],
+)
+@pytest.mark.anyio
+@freeze_time("2010-01-01")  # This endpoint is sensitive to "now" and won't report on "old" DOEs
+async def test_get_dercontrol_list_streamed(client: AsyncClient, uri_derc_list_format: str, site_id: int, cert: str):
+    """Streamed DERControlList responses should be indistinguishable from the regular (buffered) responses"""
+    os.environ["LIST_STREAMING_MIN_LIMIT"] = "1"
+    paging_params = [
+        (None, 99, None),
+        (0, 1, None),
+        (1, 1, None),
+        (2, 99, None),
+        (99, 5, None),
+        (0, 0, None),  # limit 0 is never streamed
+        (0, 99, datetime(2022, 5, 6, 12, 22, 32, tzinfo=UTC)),
+        (1, 99, datetime(2099, 1, 1, tzinfo=UTC)),
+    ]
+
+    headers = generate_headers(cert)
+    streaming_app = generate_app(generate_settings())
+    async with start_app_with_client(streaming_app) as streaming_client:
+        for start, limit, after in paging_params:
+            path = uri_derc_list_format.format(site_id=site_id, der_program_id=1) + build_paging_params(
+                start, limit, after
+            )
+            expected_response = await client.get(path, headers=headers)
+            streamed_response = await streaming_client.get(path, headers=headers)
+
+            assert_response_header(expected_response, HTTPStatus.OK)
+            assert_response_header(streamed_response, HTTPStatus.OK)
+            assert ("content-length" in streamed_response.headers) == (limit == 0), "Only limit > 0 is streamed"
+            expected = DERControlListResponse.from_xml(read_response_body_string(expected_response))
+            streamed = DERControlListResponse.from_xml(read_response_body_string(streamed_response))
+            assert streamed == expected, f"{path}: {streamed} != {expected}"
+
+
 @pytest.mark.anyio
 async def test_get_dercontrol_list_intersecting_some(
     client: AsyncClient,
@@ -6,6 +6,7 @@ from http import HTTPStatus
 import pytest
 from assertical.asserts.time import assert_nowish
 from assertical.fake.generator import generate_class_instance
+from assertical.fixtures.fastapi import start_app_with_client
 from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.server.schema.sep2.end_device import (
     EndDeviceListResponse,
@@ -14,11 +15,16 @@ from envoy_schema.server.schema.sep2.end_device import (
     RegistrationResponse,
 )
 from envoy_schema.server.schema.sep2.types import DeviceCategory
+from freezegun import freeze_time
 from httpx import AsyncClient
 from sqlalchemy import func, select
 
 from envoy.admin.crud.site import count_all_sites
+from envoy.server.crud.site import delete_site_for_aggregator
+from envoy.server.main import generate_app
 from envoy.server.model.archive.site import ArchiveSite
+from envoy.server.model.site import Site
+from envoy.server.settings import generate_settings
 from tests.data.certificates.certificate1 import TEST_CERTIFICATE_FINGERPRINT as AGG_1_VALID_CERT
 from tests.data.certificates.certificate1 import TEST_CERTIFICATE_LFDI as AGG_1_LFDI_FROM_VALID_CERT
 from tests.data.certificates.certificate1 import TEST_CERTIFICATE_SFDI as AGG_1_SFDI_FROM_VALID_CERT
@@ -98,6 +104,80 @@ async def test_get_end_device_list_by_aggregator(
         assert [ed.sFDI for ed in parsed_response.EndDevice] == site_sfdis
 
 
+@pytest.mark.parametrize("cert", [AGG_1_VALID_CERT, AGG_3_VALID_CERT, REGISTERED_CERT_LFDI, UNREGISTERED_CERT_LFDI])
+@pytest.mark.anyio
+@freeze_time("2024-01-02T03:04:05Z")  # The virtual EndDevice changedTime is "now"
+async def test_get_end_device_list_streamed(client: AsyncClient, edev_base_uri: str, cert: str):
+    """Streamed EndDeviceList responses should be indistinguishable from the regular (buffered) responses"""
+    os.environ["LIST_STREAMING_MIN_LIMIT"] = "1"
+    paging_params = [
+        (None, 100, None),
+        (0, 1, None),
+        (1, 2, None),
+        (3, 100, None),
+        (99, 5, None),
+        (0, 0, None),  # limit 0 is never streamed
+        (0, 100, datetime(2022, 2, 3, 6, 0, 0, tzinfo=UTC)),
+        (1, 100, datetime(2099, 1, 1, tzinfo=UTC)),
+    ]
+
+    headers = {cert_header: urllib.parse.quote(cert)}
+    streaming_app = generate_app(generate_settings())
+    async with start_app_with_client(streaming_app) as streaming_client:
+        for start, limit, after in paging_params:
+            uri = edev_base_uri + build_paging_params(start, limit, after)
+            expected_response = await client.get(uri, headers=headers)
+            streamed_response = await streaming_client.get(uri, headers=headers)
+
+            assert_response_header(expected_response, HTTPStatus.OK)
+            assert_response_header(streamed_response, HTTPStatus.OK)
+            assert ("content-length" in streamed_response.headers) == (limit == 0), "Only limit > 0 is streamed"
+            expected = EndDeviceListResponse.from_xml(read_response_body_string(expected_response))
+            streamed = EndDeviceListResponse.from_xml(read_response_body_string(streamed_response))
+            assert streamed == expected, f"{uri}: {streamed} != {expected}"
+
+
+@pytest.mark.anyio
+async def test_get_end_device_list_header_cache(pg_base_config, edev_base_uri: str):
+    """Cached EndDeviceList headers should reflect Site writes made by another process on the very next request"""
+    os.environ["EDEV_LIST_HEADER_CACHE_TTL_SECONDS"] = "300"
+    headers = {cert_header: urllib.parse.quote(AGG_1_VALID_CERT)}
+    uri = edev_base_uri + build_paging_params(limit=1)
+
+    async def fetch_all(client: AsyncClient) -> int:
+        response = await client.get(uri, headers=headers)
+        assert_response_header(response, HTTPStatus.OK)
+        return EndDeviceListResponse.from_xml(read_response_body_string(response)).all_
+
+    app = generate_app(generate_settings())
+    async with start_app_with_client(app) as client:
+        original_all = await fetch_all(client)
+        assert await fetch_all(client) == original_all
+
+        # Register a site directly in the DB (eg from the admin server or another server replica)
+        async with generate_async_session(pg_base_config) as session:
+            session.add(
+                Site(
+                    aggregator_id=1,
+                    nmi=None,
+                    timezone_id="Australia/Brisbane",
+                    changed_time=datetime(2024, 1, 2, tzinfo=UTC),
+                    lfdi="1234567890abcdef1234567890abcdef12345678",
+                    sfdi=1234567890,
+                    device_category=DeviceCategory(0),
+                    registration_pin=12345,
+                )
+            )
+            await session.commit()
+        assert await fetch_all(client) == original_all + 1
+
+        # And remove one
+        async with generate_async_session(pg_base_config) as session:
+            assert await delete_site_for_aggregator(session, 1, 1, datetime(2024, 1, 3, tzinfo=UTC))
+            await session.commit()
+        assert await fetch_all(client) == original_all
+
+
 @pytest.mark.parametrize(
     "query_string, cert",
     [
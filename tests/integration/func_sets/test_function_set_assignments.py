@@ -1,8 +1,12 @@
+import os
 from datetime import UTC, datetime
 from http import HTTPStatus
 
 import pytest
+from assertical.fixtures.fastapi import start_app_with_client
 from assertical.fixtures.postgres import generate_async_session
+from envoy_schema.admin.schema.site_control import SiteControlGroupRequest
+from envoy_schema.admin.schema.uri import SiteControlGroupListUri
 from envoy_schema.server.schema import uri
 from envoy_schema.server.schema.sep2.function_set_assignments import (
     FunctionSetAssignmentsListResponse,
@@ -11,7 +15,10 @@ from envoy_schema.server.schema.sep2.function_set_assignments import (
 from httpx import AsyncClient
 from sqlalchemy import update
 
+from envoy.server.main import generate_app
 from envoy.server.model.doe import SiteControlGroup
+from envoy.server.model.tariff import Tariff
+from envoy.server.settings import generate_settings
 from tests.integration.request import build_paging_params
 from tests.integration.response import assert_error_response, assert_response_header, read_response_body_string
 
@@ -199,3 +206,53 @@ async def test_get_404_Error_for_invalid_site_in_function_set_assignment(client:
 
     # Assert
     assert_response_header(response, HTTPStatus.NOT_FOUND)
+
+
+@pytest.mark.anyio
+async def test_function_set_assignments_catalogue_cache(pg_base_config, admin_client_auth: AsyncClient, valid_headers):
+    """Checks that the cached FSA catalogue is served to the FSA List + EndDevice and is reloaded as soon as a write
+    (from any process) changes the underlying Tariff/SiteControlGroup version"""
+    os.environ["FSA_CATALOGUE_CACHE_TTL_SECONDS"] = "300"
+    fsal_url = uri.FunctionSetAssignmentsListUri.format(site_id=1) + build_paging_params(0, 99)
+    edev_url = uri.EndDeviceUri.format(site_id=1)
+
+    async def fetch_fsa_ids(client: AsyncClient) -> list[int]:
+        response = await client.get(fsal_url, headers=valid_headers)
+        assert_response_header(response, HTTPStatus.OK)
+        fsal = FunctionSetAssignmentsListResponse.from_xml(read_response_body_string(response))
+        return [int(str(fsa.href).split("/")[-1]) for fsa in fsal.FunctionSetAssignments or []]
+
+    app = generate_app(generate_settings())
+    async with start_app_with_client(app) as client:
+        original_fsa_ids = await fetch_fsa_ids(client)
+        assert len(original_fsa_ids) > 0
+
+        # Changes that don't update changed_time can't be detected - they aren't visible until the catalogue expires
+        async with generate_async_session(pg_base_config) as session:
+            await session.execute(update(SiteControlGroup).values(fsa_id=None))
+            await session.commit()
+        assert (await fetch_fsa_ids(client)) == original_fsa_ids
+
+        # Admin writes (from another process) change the version - forcing a reload
+        response = await admin_client_auth.post(
+            SiteControlGroupListUri,
+            content=SiteControlGroupRequest(
+                description="new fsa", primacy=9, fsa_id=987, display_id=None
+            ).model_dump_json(),
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        fsa_ids = await fetch_fsa_ids(client)
+        assert 987 in fsa_ids
+        assert fsa_ids != original_fsa_ids
+
+        response = await client.get(edev_url, headers=valid_headers)
+        assert_response_header(response, HTTPStatus.OK)
+        assert f'all="{len(fsa_ids)}"' in read_response_body_string(response)
+
+        # As are direct DB writes that set changed_time (eg made by another server replica)
+        async with generate_async_session(pg_base_config) as session:
+            await session.execute(
+                update(Tariff).where(Tariff.tariff_id == 1).values(fsa_id=12345, changed_time=datetime.now(tz=UTC))
+            )
+            await session.commit()
+        assert 12345 in (await fetch_fsa_ids(client))
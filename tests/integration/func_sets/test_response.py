@@ -1,3 +1,5 @@
+import asyncio
+import os
 import urllib.parse
 from datetime import UTC, datetime
 from http import HTTPStatus
@@ -6,6 +8,7 @@ from zoneinfo import ZoneInfo
 import pytest
 from assertical.asserts.time import assert_nowish
 from assertical.fake.generator import generate_class_instance
+from assertical.fixtures.fastapi import start_app_with_client
 from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.server.schema.sep2.response import (
     DERControlResponse,
@@ -19,6 +22,7 @@ from envoy_schema.server.schema.sep2.response import (
 from httpx import AsyncClient
 from sqlalchemy import func, insert, select, update
 
+from envoy.server.main import generate_app
 from envoy.server.mapper.constants import PricingReadingType, ResponseSetType
 from envoy.server.mapper.sep2.mrid import MridMapper
 from envoy.server.mapper.sep2.response import response_set_type_to_href
@@ -27,6 +31,7 @@ from envoy.server.model.doe import DynamicOperatingEnvelope
 from envoy.server.model.response import DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse
 from envoy.server.model.tariff import TariffGeneratedRate
 from envoy.server.request_scope import BaseRequestScope
+from envoy.server.settings import generate_settings
 from tests.conftest import TEST_IANA_PEN
 from tests.data.certificates.certificate1 import TEST_CERTIFICATE_FINGERPRINT as AGG_1_VALID_CERT
 from tests.data.certificates.certificate4 import TEST_CERTIFICATE_FINGERPRINT as AGG_2_VALID_CERT
@@ -781,3 +786,49 @@ async def test_create_response_for_doe_with_display_id(
         assert_response_header(response, expected_http_status)
         assert_error_response(response)
         assert (doe_count_before) == (doe_count_after), "No new responses"
+
+
+@pytest.fixture
+async def batching_client(pg_base_config):
+    """Server client with response batching enabled"""
+    os.environ["ENABLE_RESPONSE_BATCHING"] = "true"
+    os.environ["RESPONSE_BATCH_MAX_DELAY_MS"] = "20"
+    app = generate_app(generate_settings())
+    async with start_app_with_client(app) as c:
+        yield c
+
+
+@pytest.mark.anyio
+async def test_create_response_batching(pg_base_config, batching_client: AsyncClient, response_list_uri_format: str):
+    """Tests that concurrently created responses are written (via the batch writer) before they are acknowledged"""
+    subjects_by_set = {
+        DOE_HREF: MridMapper.encode_doe_mrid(TEST_SCOPE, False, 1),
+        RATE_HREF: MridMapper.encode_time_tariff_interval_mrid(
+            TEST_SCOPE, 1, PricingReadingType.IMPORT_ACTIVE_POWER_KWH
+        ),
+    }
+    async with generate_async_session(pg_base_config) as session:
+        site = await session.get(Site, 1)
+        assert site is not None
+        site_lfdi = site.lfdi
+
+    async def post_response(response_set_id: str):
+        request_body = generate_class_instance(Response, subject=subjects_by_set[response_set_id], status=1)
+        request_body.endDeviceLFDI = site_lfdi
+        return await batching_client.post(
+            response_list_uri_format.format(site_id=1, response_list_id=response_set_id),
+            content=request_body.to_xml(),
+            headers={cert_header: urllib.parse.quote(AGG_1_VALID_CERT)},
+        )
+
+    responses = await asyncio.gather(*[post_response(DOE_HREF if i % 2 else RATE_HREF) for i in range(10)])
+
+    created_hrefs = []
+    for response in responses:
+        assert_response_header(response, HTTPStatus.CREATED, expected_content_type=None)
+        created_hrefs.append(read_location_header(response))
+    assert len(set(created_hrefs)) == 10
+
+    for created_href in created_hrefs:
+        response = await batching_client.get(created_href, headers={cert_header: urllib.parse.quote(AGG_1_VALID_CERT)})
+        assert_response_header(response, HTTPStatus.OK)
@@ -5,12 +5,18 @@ from http import HTTPStatus
 import pytest
 from httpx import AsyncClient
 
+from envoy.admin.api.archive import ARCHIVE_EXPORT_URI
+from envoy.admin.api.export import EXPORT_URI
 from envoy.admin.api.health import HEALTH_URI
+from envoy.admin.schema.ingest import NDJSON_CONTENT_TYPE
 from tests.integration.http import HTTPMethod
 from tests.integration.response import assert_response_header
 
 NO_AUTH_ROUTES = ["/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc", HEALTH_URI]
 
+# Routes whose successful GET response is NOT json encoded
+NON_JSON_ROUTES = {EXPORT_URI: "text/csv; charset=utf-8", ARCHIVE_EXPORT_URI: NDJSON_CONTENT_TYPE}
+
 
 @pytest.mark.anyio
 async def test_get_resource_unauthorised(
@@ -56,6 +62,8 @@ def infill_path_format_variables(path_format: str) -> str:
                 infill_value = "Group-1"
         elif "start" in format_var_name or "end" in format_var_name:
             infill_value = "2024-01-02T03:04:05Z"
+        elif "entity" in format_var_name:
+            infill_value = "site"
 
         kvps[format_var_name] = infill_value
 
@@ -76,7 +84,8 @@ async def test_readonly_client_can_only_access_get(
         for method in [m for m in HTTPMethod if m.name in methods]:
             resp = await admin_client_readonly_auth.request(method=method.name, url=infill_path_format_variables(path))
             if method == HTTPMethod.GET:
-                assert_response_header(resp, HTTPStatus.OK, expected_content_type="application/json")
+                expected_content_type = NON_JSON_ROUTES.get(path, "application/json")
+                assert_response_header(resp, HTTPStatus.OK, expected_content_type=expected_content_type)
             else:
                 assert_response_header(resp, HTTPStatus.FORBIDDEN, expected_content_type="application/json")
 
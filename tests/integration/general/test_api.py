@@ -1,6 +1,6 @@
 import re
 import unittest.mock as mock
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
 from itertools import chain
 
@@ -8,8 +8,11 @@ import pytest
 from assertical.fake.http import MockedAsyncClient
 from assertical.fixtures.postgres import generate_async_session
 from httpx import AsyncClient, Response
+from sqlalchemy import delete
 
 from envoy.server.crud.site import select_single_site_with_site_id
+from envoy.server.model import AggregatorCertificateAssignment, Certificate
+from envoy.server.settings import settings
 from tests.integration.http import HTTPMethod
 from tests.integration.response import (
     assert_error_response,
@@ -124,6 +127,34 @@ async def test_get_resource_unauthorised_no_device_certs(
         await run_basic_unauthorised_tests(client, uri, method=method.name, body=body, test_unrecognised_cert=True)
 
 
+@pytest.mark.parametrize("delete_certificate", [False, True])
+@pytest.mark.anyio
+@pytest.mark.disable_device_registration
+async def test_revoked_aggregator_cert_rejected_after_cache_ttl(
+    pg_base_config, client: AsyncClient, valid_headers: dict, delete_certificate: bool
+):
+    """A cached aggregator certificate that's unassigned/deleted (out of process - eg via the admin server) must be
+    rejected once the auth cache ttl has elapsed (and not be served from the cache until the certificate expires)"""
+    response = await client.get("/edev/1", headers=valid_headers)
+    assert_response_header(response, HTTPStatus.OK)
+
+    async with generate_async_session(pg_base_config) as session:
+        await session.execute(
+            delete(AggregatorCertificateAssignment).where(AggregatorCertificateAssignment.certificate_id == 1)
+        )
+        if delete_certificate:
+            await session.execute(delete(Certificate).where(Certificate.certificate_id == 1))
+        await session.commit()
+
+    ttl_seconds = settings.lfdi_auth_cache_ttl_seconds
+    assert ttl_seconds is not None, "The auth cache ttl should be enabled by default"
+    ttl_elapsed = datetime.now(tz=UTC) + timedelta(seconds=ttl_seconds + 1)
+    with mock.patch("envoy.server.cache.utc_now") as mock_utc_now:
+        mock_utc_now.return_value = ttl_elapsed
+        response = await client.get("/edev/1", headers=valid_headers)
+    assert_response_header(response, HTTPStatus.FORBIDDEN)
+
+
 @pytest.mark.parametrize("valid_methods,uri", ALL_ENDPOINTS_WITH_SUPPORTED_METHODS)
 @pytest.mark.azure_ad_auth
 @pytest.mark.anyio
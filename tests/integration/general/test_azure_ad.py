@@ -179,3 +179,24 @@ async def test_refresh_seconds_updating_cache(
 
     finally:
         event.remove(Pool, "connect", on_db_connect)
+
+
+@pytest.mark.azure_ad_auth
+@pytest.mark.azure_ad_db
+@pytest.mark.anyio
+async def test_health_monitor_starts_after_dynamic_database_credentials(pg_empty_config, monkeypatch):
+    """The background health checks connect to the DB so they must only start once the dynamic credentials are in
+    place"""
+    monkeypatch.setenv("HEALTH_CHECK_INTERVAL_SECONDS", "60")
+
+    credentials_manager = mock.Mock()
+    health_monitor_manager = mock.Mock()
+    with (
+        mock.patch("envoy.server.main.enable_dynamic_azure_ad_database_credentials", return_value=credentials_manager),
+        mock.patch("envoy.server.main.enable_health_monitor", return_value=(mock.Mock(), health_monitor_manager)),
+        mock.patch("envoy.server.main.generate_combined_lifespan_manager", return_value=None) as mock_combine,
+    ):
+        generate_app(generate_settings())
+
+    lifespan_managers = mock_combine.call_args_list[0].args[0]
+    assert lifespan_managers.index(credentials_manager) < lifespan_managers.index(health_monitor_manager)
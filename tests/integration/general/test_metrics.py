@@ -0,0 +1,78 @@
+import os
+from http import HTTPStatus
+
+import pytest
+from assertical.fixtures.fastapi import start_app_with_client
+from envoy_schema.server.schema import uri
+from envoy_schema.server.schema.sep2.metering_mirror import MirrorMeterReading
+from psycopg import Connection
+
+from envoy.server.api.unsecured.metrics import METRICS_URI, PROMETHEUS_TEXT_CONTENT_TYPE
+from envoy.server.main import generate_app
+from envoy.server.settings import generate_settings
+from tests.integration.response import assert_response_header
+
+
+@pytest.fixture
+async def metrics_client(pg_base_config: Connection):
+    """Server client with metrics enabled"""
+    os.environ["ENABLE_METRICS"] = "true"
+    app = generate_app(generate_settings())
+    async with start_app_with_client(app) as c:
+        yield c
+
+
+@pytest.mark.anyio
+async def test_metrics(metrics_client, valid_headers: dict):
+    response = await metrics_client.get(uri.EndDeviceListUri, headers=valid_headers)
+    assert_response_header(response, HTTPStatus.OK)
+
+    response = await metrics_client.get(METRICS_URI)
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["Content-Type"] == PROMETHEUS_TEXT_CONTENT_TYPE
+
+    body = response.text
+    assert f'envoy_http_requests_total{{method="GET",route="{uri.EndDeviceListUri}",status="200"}}' in body
+    assert f'envoy_db_queries_total{{method="GET",route="{uri.EndDeviceListUri}"}}' in body
+    assert 'envoy_xml_render_duration_seconds_count{model="EndDeviceListResponse"}' in body
+    assert 'envoy_notification_queue_depth{queue="notification_check"} 0' in body
+    assert 'envoy_notification_queue_depth{queue="notification_transmit"} 0' in body
+
+
+@pytest.mark.anyio
+async def test_metrics_reading_ingest(metrics_client, valid_headers: dict):
+    mmr = MirrorMeterReading.model_validate(
+        {
+            "mRID": "10000000000000000000000000000abc",
+            "mirrorReadingSets": [
+                {
+                    "mRID": "1234abcdef123456",
+                    "timePeriod": {"duration": 600, "start": 1341579365},
+                    "readings": [
+                        {"value": 1, "timePeriod": {"duration": 300, "start": 1341579365}},
+                        {"value": 2, "timePeriod": {"duration": 300, "start": 1341579665}},
+                    ],
+                }
+            ],
+        }
+    )
+    response = await metrics_client.post(
+        uri.MirrorUsagePointUri.format(mup_id=1),
+        content=MirrorMeterReading.to_xml(mmr, skip_empty=False, exclude_none=True, exclude_unset=True),
+        headers=valid_headers,
+    )
+    assert_response_header(response, HTTPStatus.CREATED, expected_content_type=None)
+
+    response = await metrics_client.get(METRICS_URI)
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.text
+    assert "envoy_readings_ingested_total 2" in body
+    for stage in ["reading_types", "map", "upsert", "commit"]:
+        assert f'envoy_reading_ingest_stage_duration_seconds_count{{stage="{stage}"}} 1' in body
+
+
+@pytest.mark.anyio
+async def test_metrics_disabled(client):
+    response = await client.get(METRICS_URI)
+    assert response.status_code == HTTPStatus.NOT_FOUND
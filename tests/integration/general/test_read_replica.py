@@ -0,0 +1,91 @@
+import asyncio
+import os
+import unittest.mock as mock
+from http import HTTPStatus
+
+import pytest
+from assertical.fixtures.fastapi import start_app_with_client
+from envoy_schema.server.schema import uri
+from psycopg import Connection
+from sqlalchemy import event
+
+from envoy.admin.main import generate_app as admin_gen_app
+from envoy.admin.settings import generate_settings as admin_gen_settings
+from envoy.server.main import generate_app
+from envoy.server.read_replica import READ_PRIMARY_HEADER, REPLICA_LAG_SQL, ReadReplica
+from envoy.server.settings import generate_settings
+from tests.integration.response import assert_response_header
+
+
+class RecordingReadReplica(ReadReplica):
+    """ReadReplica that counts the statements executed against the replica engine (excluding the lag monitor)"""
+
+    instances: list["RecordingReadReplica"] = []
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.statement_count = 0
+        RecordingReadReplica.instances.append(self)
+
+        def on_execute(conn, cursor, statement: str, *args, **kwargs) -> None:
+            if statement != REPLICA_LAG_SQL:
+                self.statement_count += 1
+
+        event.listen(self.engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+async def wait_for_replica_available(replica: ReadReplica) -> None:
+    for _ in range(100):
+        if replica.status.replica_available:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("Replica never became available")
+
+
+@pytest.fixture
+async def read_replica_client(pg_base_config: Connection):
+    """Server client whose "read replica" is the same database as the primary"""
+    os.environ["READ_DATABASE_URL"] = os.environ["DATABASE_URL"]
+    os.environ["READ_DATABASE_LAG_CHECK_SECS"] = "0.1"
+    RecordingReadReplica.instances.clear()
+    with mock.patch("envoy.server.main.ReadReplica", RecordingReadReplica):
+        app = generate_app(generate_settings())
+
+    async with start_app_with_client(app) as c:
+        replica = RecordingReadReplica.instances[0]
+        await wait_for_replica_available(replica)
+        yield (c, replica)
+
+
+@pytest.mark.anyio
+async def test_read_replica_routing(read_replica_client, valid_headers: dict):
+    client, replica = read_replica_client
+
+    # GET requests are served from the replica
+    response = await client.get(uri.EndDeviceListUri, headers=valid_headers)
+    assert_response_header(response, HTTPStatus.OK)
+    assert replica.statement_count > 0
+
+    # Unless explicitly opted out
+    count_before = replica.statement_count
+    response = await client.get(uri.EndDeviceListUri, headers={**valid_headers, READ_PRIMARY_HEADER: "1"})
+    assert_response_header(response, HTTPStatus.OK)
+    assert replica.statement_count == count_before
+
+    # Writes go to the primary and the client continues reading from the primary afterwards (read your writes)
+    response = await client.post(uri.EndDeviceListUri, headers=valid_headers, content="not xml")
+    assert response.status_code != HTTPStatus.OK
+    response = await client.get(uri.EndDeviceListUri, headers=valid_headers)
+    assert_response_header(response, HTTPStatus.OK)
+    assert replica.statement_count == count_before
+
+
+@pytest.mark.anyio
+async def test_read_replica_disabled_by_default(pg_base_config: Connection):
+    with mock.patch("envoy.server.main.ReadReplica") as mock_ReadReplica:
+        generate_app(generate_settings())
+    with mock.patch("envoy.admin.main.ReadReplica") as mock_admin_ReadReplica:
+        admin_gen_app(admin_gen_settings())
+
+    mock_ReadReplica.assert_not_called()
+    mock_admin_ReadReplica.assert_not_called()
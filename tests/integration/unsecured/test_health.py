@@ -1,14 +1,28 @@
+import asyncio
+import os
 from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
+from time import monotonic
 
 import pytest
+from assertical.fixtures.fastapi import start_app_with_client
 from assertical.fixtures.postgres import generate_async_session
 from httpx import AsyncClient
 from sqlalchemy import select
 
-from envoy.server.api.unsecured.health import HEALTH_DOE_URI, HEALTH_DYNAMIC_PRICE_URI, HEALTH_URI
+from envoy.server.api.depends.health_monitor import HEALTH_MONITOR_ATTR
+from envoy.server.api.unsecured.health import (
+    HEALTH_DOE_URI,
+    HEALTH_DYNAMIC_PRICE_URI,
+    HEALTH_LIVENESS_URI,
+    HEALTH_URI,
+)
+from envoy.server.crud.health import HealthCheck
+from envoy.server.health_monitor import HealthMonitor, HealthSnapshot
+from envoy.server.main import generate_app
 from envoy.server.model.doe import DynamicOperatingEnvelope
 from envoy.server.model.tariff import TariffGeneratedRate
+from envoy.server.settings import generate_settings
 from tests.integration.response import read_response_body_string
 
 
@@ -111,3 +125,75 @@ async def test_get_doe_health_works_for_any_auth(client: AsyncClient, pg_base_co
     response = await client.request(method="GET", url=HEALTH_DOE_URI, headers=valid_headers)
     assert response.status_code == HTTPStatus.OK
     assert read_response_body_string(response), "Expected a response with some content"
+
+
+@pytest.mark.anyio
+async def test_get_liveness(client_empty_db: AsyncClient):
+    """Checks HEALTH_LIVENESS_URI returns HTTP 200 without needing any data (or auth)"""
+
+    response = await client_empty_db.request(method="GET", url=HEALTH_LIVENESS_URI)
+    assert response.status_code == HTTPStatus.OK
+    assert read_response_body_string(response) == "OK"
+
+    response = await client_empty_db.request(method="HEAD", url=HEALTH_LIVENESS_URI)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.anyio
+async def test_get_health_background_snapshots(pg_base_config):
+    """Checks that enabling background health checks serves the cached snapshots (with their age)"""
+    os.environ["HEALTH_CHECK_INTERVAL_SECONDS"] = "0.1"
+    app = generate_app(generate_settings())
+    async with start_app_with_client(app) as client:
+        await asyncio.sleep(0.3)
+
+        response = await client.request(method="GET", url=HEALTH_URI)
+        assert response.status_code == HTTPStatus.OK
+        assert int(response.headers["Age"]) >= 0
+        assert read_response_body_string(response)
+
+        # No future DOEs/prices in pg_base_config
+        for url in [HEALTH_DOE_URI, HEALTH_DYNAMIC_PRICE_URI]:
+            response = await client.request(method="GET", url=url)
+            assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+            assert "Age" in response.headers
+
+        # Add a future DOE - it will be visible once the background check has run again
+        async with generate_async_session(pg_base_config) as session:
+            doe = (
+                await session.execute(
+                    select(DynamicOperatingEnvelope).where(DynamicOperatingEnvelope.dynamic_operating_envelope_id == 1)
+                )
+            ).scalar_one()
+            doe.start_time = datetime.now(tz=UTC) + timedelta(hours=1)
+            await session.commit()
+        await asyncio.sleep(0.3)
+
+        response = await client.request(method="GET", url=HEALTH_DOE_URI)
+        assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.anyio
+async def test_get_health_background_snapshots_missing(pg_base_config):
+    """Checks that the absence of a recent background snapshot is reported as a failure"""
+    monitor = HealthMonitor(10)
+    app = generate_app(generate_settings())
+    setattr(app.state, HEALTH_MONITOR_ATTR, monitor)
+    async with start_app_with_client(app) as client:
+        for url in [HEALTH_URI, HEALTH_DOE_URI, HEALTH_DYNAMIC_PRICE_URI]:
+            response = await client.request(method="GET", url=url)
+            assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+            assert "Age" not in response.headers
+
+        # A stale snapshot is no better than a missing snapshot
+        monitor.health = HealthSnapshot(
+            check=HealthCheck(database_connectivity=True, database_has_data=True),
+            checked_at=monotonic() - monitor.max_age_seconds - 1,
+        )
+        response = await client.request(method="GET", url=HEALTH_URI)
+        assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+        monitor.health = HealthSnapshot(check=monitor.health.check, checked_at=monotonic())
+        response = await client.request(method="GET", url=HEALTH_URI)
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["Age"] == "0"
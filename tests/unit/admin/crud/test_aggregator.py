@@ -95,6 +95,35 @@ async def test_assign_many_certificates_already_assigned(pg_base_config: psycopg
             await crud.aggregator.assign_many_certificates(session, 1, [3])
 
 
+@pytest.mark.parametrize(
+    "agg_id, certificate_ids, lfdis, expected_assigned_ids, expected_agg_cert_ids",
+    [
+        (1, [], [], [], [1, 2, 3]),
+        (1, [4, 5], [], [4, 5], [1, 2, 3, 4, 5]),
+        (1, [], ["8ad1d4ce1d3b353ebee21230a89e4172b18f520e"], [4], [1, 2, 3, 4]),
+        (1, [5], ["8ad1d4ce1d3b353ebee21230a89e4172b18f520e"], [4, 5], [1, 2, 3, 4, 5]),
+        (1, [1, 4], ["854d10a201ca99e5e90d3c3e1f9bc1c3bd075f3b"], [4], [1, 2, 3, 4]),  # 1 is already assigned
+        (1, [4, 999], ["DNE"], [4], [1, 2, 3, 4]),  # missing ids/lfdis are ignored
+        (2, [4], ["8ad1d4ce1d3b353ebee21230a89e4172b18f520e"], [], [4]),  # Already assigned (both id and lfdi)
+    ],
+)
+@pytest.mark.anyio
+async def test_assign_certificates_by_id_or_lfdi(
+    pg_base_config: psycopg.Connection,
+    agg_id: int,
+    certificate_ids: list[int],
+    lfdis: list[str],
+    expected_assigned_ids: list[int],
+    expected_agg_cert_ids: list[int],
+) -> None:
+    async with generate_async_session(pg_base_config) as session:
+        assigned_ids = await crud.aggregator.assign_certificates_by_id_or_lfdi(session, agg_id, certificate_ids, lfdis)
+        assert sorted(assigned_ids) == expected_assigned_ids
+
+        resp = await select_all_certificates_for_aggregator(session, agg_id, 0, 5000)
+        assert [c.certificate_id for c in resp] == expected_agg_cert_ids
+
+
 @pytest.mark.parametrize(
     "agg_id,certificate_ids,expected_ids",
     [
@@ -10,9 +10,11 @@ from envoy.admin.crud.archive import (
     count_archive_rates_for_period,
     count_archive_sites_for_period,
     select_archive_does_for_period,
+    select_archive_for_period,
     select_archive_rates_for_period,
     select_archive_sites_for_period,
 )
+from envoy.server.model.archive.base import ArchiveBase
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.archive.site import ArchiveSite
 from envoy.server.model.archive.tariff import ArchiveTariffGeneratedRate
@@ -239,3 +241,37 @@ async def test_archive_rates_for_period(
 
         count = await count_archive_rates_for_period(session, period_start, period_end, only_deletes)
         assert count == expected_count
+
+
+@pytest.mark.parametrize(
+    "archive_type, after_archive_id, limit, only_deletes, expected_archive_ids",
+    [
+        (ArchiveSite, None, 999, False, [1, 3, 7, 8, 9, 10, 12]),
+        (ArchiveSite, 3, 999, False, [7, 8, 9, 10, 12]),
+        (ArchiveSite, 3, 2, False, [7, 8]),
+        (ArchiveSite, 8, 2, False, [9, 10]),
+        (ArchiveSite, 12, 2, False, []),
+        (ArchiveDynamicOperatingEnvelope, 1, 2, True, [2, 7]),
+        (ArchiveDynamicOperatingEnvelope, 7, 999, True, [8, 9]),
+        (ArchiveTariffGeneratedRate, 0, 3, True, [1, 2, 7]),
+        (ArchiveTariffGeneratedRate, 9, 3, True, []),
+    ],
+)
+@pytest.mark.anyio
+async def test_select_archive_for_period_keyset(
+    pg_base_config,
+    archive_type: type[ArchiveBase],
+    after_archive_id: int | None,
+    limit: int,
+    only_deletes: bool,
+    expected_archive_ids: list[int],
+):
+    """Tests that keyset pagination (after_archive_id) interacts correctly with the period filtering"""
+    await populate_archive_with_type(pg_base_config, archive_type)
+
+    async with generate_async_session(pg_base_config) as session:
+        records = await select_archive_for_period(
+            session, archive_type, 0, limit, DT1, DT3, only_deletes, after_archive_id=after_archive_id
+        )
+        assert_list_type(archive_type, records, len(expected_archive_ids))
+        assert expected_archive_ids == [r.archive_id for r in records]
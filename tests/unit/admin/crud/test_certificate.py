@@ -36,22 +36,42 @@ async def test_select_all_certificates_for_aggregator(
 
 
 @pytest.mark.parametrize(
-    "certs,expected",
+    "certificate_ids,expected",
     [
-        ([(1, None), (2, None), (3, None), (4, None), (5, None), (6, None)], [1, 2, 3, 4, 5]),
-        ([(1, None), (None, "403ba02aa36fa072c47eb3299daaafe94399adad"), (1, None)], [1, 2]),
-        ([(654664, "NOT_AN_LFDIarstoianerstoien")], []),
+        ([], []),
+        ([1, 2, 3, 4, 5], []),
+        ([6, 1, 654664, 5], [6, 654664]),
+        ([1, 1, 7], [7]),
     ],
 )
 @pytest.mark.anyio
-async def test_bulk_retrieve_certificates_by_id_or_lfdi(
-    pg_base_config: psycopg.Connection, certs: list[tuple[int | None, str | None]], expected: list[int]
+async def test_select_missing_certificate_ids(
+    pg_base_config: psycopg.Connection, certificate_ids: list[int], expected: list[int]
 ) -> None:
     async with pg_fixtures.generate_async_session(pg_base_config) as session:
-        cert_ass_reqs = [base.Certificate(certificate_id=cert[0], lfdi=cert[1]) for cert in certs]
-        actual = await crud.certificate.select_many_certificates_by_id_or_lfdi(session, cert_ass_reqs)
-        assert all([isinstance(a, base.Certificate) for a in actual])
-        assert expected == [a.certificate_id for a in actual]
+        actual = await crud.certificate.select_missing_certificate_ids(session, certificate_ids)
+        assert expected == list(actual)
+
+
+@pytest.mark.parametrize(
+    "lfdis,expected",
+    [
+        ([], []),
+        (["403ba02aa36fa072c47eb3299daaafe94399adad", "ec08e4c9d68a0669c3673708186fde317f7c67a2"], []),
+        (
+            ["NOT_AN_LFDI", "403ba02aa36fa072c47eb3299daaafe94399adad", "ALSO_NOT_AN_LFDI"],
+            ["ALSO_NOT_AN_LFDI", "NOT_AN_LFDI"],
+        ),
+        (["403BA02AA36FA072C47EB3299DAAAFE94399ADAD"], ["403BA02AA36FA072C47EB3299DAAAFE94399ADAD"]),  # case sensitive
+    ],
+)
+@pytest.mark.anyio
+async def test_select_missing_certificate_lfdis(
+    pg_base_config: psycopg.Connection, lfdis: list[str], expected: list[str]
+) -> None:
+    async with pg_fixtures.generate_async_session(pg_base_config) as session:
+        actual = await crud.certificate.select_missing_certificate_lfdis(session, lfdis)
+        assert expected == list(actual)
 
 
 @pytest.mark.parametrize(
@@ -0,0 +1,161 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from assertical.fixtures.postgres import generate_async_session
+from sqlalchemy import select
+
+from envoy.admin.crud.ingest import (
+    claim_next_ingest_job,
+    count_ingest_job_rows,
+    delete_ingest_job_rows,
+    insert_ingest_job_rows,
+    record_ingest_job_chunk,
+    select_ingest_job,
+    select_ingest_job_row_chunk,
+    update_ingest_job_status,
+)
+from envoy.server.model.ingest import IngestJob, IngestJobRow, IngestJobStatus, IngestJobType
+
+NOW = datetime(2030, 1, 2, 3, 4, 5, tzinfo=UTC)
+LEASE = timedelta(minutes=5)
+
+
+def job(status: IngestJobStatus, changed_time: datetime) -> IngestJob:
+    return IngestJob(
+        job_type=IngestJobType.TARIFF_GENERATED_RATE,
+        site_control_group_id=None,
+        status=status,
+        changed_time=changed_time,
+        claimed_time=changed_time if status == IngestJobStatus.APPLYING else None,
+        staged_rows=0,
+        applied_rows=0,
+        applied_chunks=0,
+    )
+
+
+@pytest.mark.anyio
+async def test_claim_next_ingest_job(pg_base_config):
+    async with generate_async_session(pg_base_config) as session:
+        session.add_all(
+            [
+                job(IngestJobStatus.RECEIVING, NOW),  # 1 - Not submitted
+                job(IngestJobStatus.APPLYING, NOW - timedelta(minutes=1)),  # 2 - Applying (within lease)
+                job(IngestJobStatus.COMPLETE, NOW - timedelta(days=1)),  # 3 - Finished
+                job(IngestJobStatus.PENDING, NOW),  # 4
+                job(IngestJobStatus.APPLYING, NOW - timedelta(minutes=6)),  # 5 - Applying (lease expired)
+            ]
+        )
+        await session.commit()
+
+    claimed_ids: list[int] = []
+    for _ in range(3):
+        async with generate_async_session(pg_base_config) as session:
+            claimed = await claim_next_ingest_job(session, NOW, LEASE)
+            if claimed is not None:
+                claimed_ids.append(claimed.ingest_job_id)
+            await session.commit()
+    assert claimed_ids == [4, 5]
+
+    async with generate_async_session(pg_base_config) as session:
+        claimed_job = await select_ingest_job(session, 4)
+        assert claimed_job is not None
+        assert claimed_job.status == IngestJobStatus.APPLYING
+        assert claimed_job.changed_time == NOW
+        assert claimed_job.claimed_time == NOW
+
+
+@pytest.mark.anyio
+async def test_ingest_job_rows(pg_base_config):
+    async with generate_async_session(pg_base_config) as session:
+        session.add(job(IngestJobStatus.APPLYING, NOW))
+        await session.flush()
+
+        # Two uploads - numbered sequentially
+        await insert_ingest_job_rows(session, 1, 1, [(1, "p1"), (2, "p2"), (3, "p3")])
+        await insert_ingest_job_rows(session, 1, 4, [(4, "p4"), (1, "p5")])
+        await insert_ingest_job_rows(session, 1, 6, [])
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        # Site 1/3 fall into partition 1 (of 2), sites 2/4 into partition 0
+        partition_1 = await select_ingest_job_row_chunk(session, 1, 2, 1, 10)
+        assert [(r.row_number, r.site_id, r.payload) for r in partition_1] == [
+            (1, 1, "p1"),
+            (3, 3, "p3"),
+            (5, 1, "p5"),
+        ]
+        assert [r.row_number for r in await select_ingest_job_row_chunk(session, 1, 2, 0, 10)] == [2, 4]
+        assert [r.row_number for r in await select_ingest_job_row_chunk(session, 1, 2, 1, 2)] == [1, 3]
+        assert [r.row_number for r in await select_ingest_job_row_chunk(session, 1, 1, 0, 10)] == [1, 2, 3, 4, 5]
+
+        await delete_ingest_job_rows(session, 1, [1, 3])
+        assert await record_ingest_job_chunk(session, 1, NOW, 2, NOW + timedelta(seconds=1))
+        assert await record_ingest_job_chunk(session, 1, NOW, 3, NOW + timedelta(seconds=2))
+        assert not await record_ingest_job_chunk(session, 1, NOW - LEASE, 4, NOW), "Not our lease"
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        assert [r.row_number for r in await select_ingest_job_row_chunk(session, 1, 1, 0, 10)] == [2, 4, 5]
+        updated_job = await select_ingest_job(session, 1)
+        assert updated_job is not None
+        assert updated_job.applied_rows == 5
+        assert updated_job.applied_chunks == 2
+        assert updated_job.changed_time == NOW + timedelta(seconds=2)
+        assert await count_ingest_job_rows(session, 1) == 3
+
+        await delete_ingest_job_rows(session, 1, None)
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        assert (await session.execute(select(IngestJobRow))).scalars().all() == []
+
+
+@pytest.mark.anyio
+async def test_select_ingest_job_row_chunk_skips_locked(pg_base_config):
+    """Rows locked by another (uncommitted) chunk should never be returned a second time"""
+    async with generate_async_session(pg_base_config) as session:
+        session.add(job(IngestJobStatus.APPLYING, NOW))
+        await session.flush()
+        await insert_ingest_job_rows(session, 1, 1, [(1, "p1"), (1, "p2"), (1, "p3")])
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session_1:
+        assert [r.row_number for r in await select_ingest_job_row_chunk(session_1, 1, 1, 0, 2)] == [1, 2]
+
+        async with generate_async_session(pg_base_config) as session_2:
+            assert [r.row_number for r in await select_ingest_job_row_chunk(session_2, 1, 1, 0, 10)] == [3]
+
+        await session_1.rollback()
+
+    async with generate_async_session(pg_base_config) as session:
+        assert [r.row_number for r in await select_ingest_job_row_chunk(session, 1, 1, 0, 10)] == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_update_ingest_job_status(pg_base_config):
+    """Status updates should only apply to jobs that are still APPLYING under the specified lease"""
+    async with generate_async_session(pg_base_config) as session:
+        session.add_all(
+            [
+                job(IngestJobStatus.APPLYING, NOW),  # 1
+                job(IngestJobStatus.PENDING, NOW),  # 2
+            ]
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        assert not await update_ingest_job_status(session, 1, NOW - LEASE, IngestJobStatus.COMPLETE, NOW)
+        assert not await update_ingest_job_status(session, 2, NOW, IngestJobStatus.COMPLETE, NOW)
+        assert await update_ingest_job_status(session, 1, NOW, IngestJobStatus.FAILED, NOW + LEASE, "my error")
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        job_1 = await select_ingest_job(session, 1)
+        assert job_1 is not None
+        assert job_1.status == IngestJobStatus.FAILED
+        assert job_1.error == "my error"
+        assert job_1.changed_time == NOW + LEASE
+
+        job_2 = await select_ingest_job(session, 2)
+        assert job_2 is not None
+        assert job_2.status == IngestJobStatus.PENDING
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import UTC, datetime
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -6,10 +6,14 @@ from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.server.schema.sep2.types import UomType
 
 from envoy.admin.crud.site_reading import (
+    count_site_reading_rollups_for_site_and_time,
     count_site_readings_for_site_and_time,
     select_csip_aus_site_type_ids,
+    select_site_reading_rollups_for_site_and_time,
     select_site_readings_for_site_and_time,
 )
+from envoy.server.crud.site_reading import recalculate_site_reading_rollups
+from envoy.server.model.site_reading import SiteReadingRollupResolution
 
 TZ = ZoneInfo("Australia/Brisbane")
 
@@ -162,3 +166,96 @@ async def test_empty_database(pg_empty_config):
             session, [1], datetime(2022, 1, 1, tzinfo=TZ), datetime(2022, 12, 31, tzinfo=TZ)
         )
         assert len(readings) == 0
+
+
+@pytest.mark.parametrize(
+    "site_type_ids, resolution, start_time, end_time, start, limit, expected_buckets",
+    [
+        (
+            [1, 2],
+            SiteReadingRollupResolution.HOUR,
+            datetime(2022, 6, 1, tzinfo=TZ),
+            datetime(2022, 6, 30, tzinfo=TZ),
+            0,
+            500,
+            [
+                (datetime(2022, 6, 6, 15, tzinfo=UTC), 1),
+                (datetime(2022, 6, 6, 15, tzinfo=UTC), 2),
+                (datetime(2022, 6, 6, 16, tzinfo=UTC), 1),
+            ],
+        ),
+        (
+            [1, 2],
+            SiteReadingRollupResolution.HOUR,
+            datetime(2022, 6, 1, tzinfo=TZ),
+            datetime(2022, 6, 30, tzinfo=TZ),
+            1,
+            1,
+            [(datetime(2022, 6, 6, 15, tzinfo=UTC), 2)],
+        ),
+        (
+            [1],
+            SiteReadingRollupResolution.DAY,
+            datetime(2022, 6, 1, tzinfo=TZ),
+            datetime(2022, 6, 30, tzinfo=TZ),
+            0,
+            500,
+            [(datetime(2022, 6, 6, tzinfo=UTC), 1)],
+        ),
+        (
+            [1],
+            SiteReadingRollupResolution.FIFTEEN_MINUTES,
+            datetime(2022, 6, 6, 16, tzinfo=UTC),
+            datetime(2022, 6, 30, tzinfo=TZ),
+            0,
+            500,
+            [(datetime(2022, 6, 6, 16, tzinfo=UTC), 1)],
+        ),
+        (
+            [4],
+            SiteReadingRollupResolution.HOUR,
+            datetime(2022, 6, 1, tzinfo=TZ),
+            datetime(2022, 6, 30, tzinfo=TZ),
+            0,
+            500,
+            [],
+        ),  # Not rolled up
+        (
+            [],
+            SiteReadingRollupResolution.HOUR,
+            datetime(2022, 6, 1, tzinfo=TZ),
+            datetime(2022, 6, 30, tzinfo=TZ),
+            0,
+            500,
+            [],
+        ),
+    ],
+)
+@pytest.mark.anyio
+async def test_count_and_select_site_reading_rollups_for_site_and_time(
+    pg_base_config,
+    site_type_ids: list[int],
+    resolution: SiteReadingRollupResolution,
+    start_time: datetime,
+    end_time: datetime,
+    start: int,
+    limit: int,
+    expected_buckets: list[tuple[datetime, int]],
+):
+    async with generate_async_session(pg_base_config) as session:
+        await recalculate_site_reading_rollups(session, datetime(2024, 1, 1, tzinfo=UTC), [1, 2])
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        rollups = await select_site_reading_rollups_for_site_and_time(
+            session, site_type_ids, resolution, start_time, end_time, start, limit
+        )
+        assert [(r.bucket_start, r.site_reading_type_id) for r in rollups] == expected_buckets
+        assert all(r.resolution_seconds == resolution for r in rollups)
+        assert all(r.site_reading_type.site_reading_type_id == r.site_reading_type_id for r in rollups)
+
+        count = await count_site_reading_rollups_for_site_and_time(
+            session, site_type_ids, resolution, start_time, end_time
+        )
+        if start == 0:
+            assert count == len(expected_buckets)
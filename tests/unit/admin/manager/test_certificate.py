@@ -1,4 +1,5 @@
 import datetime as dt
+from collections.abc import AsyncIterator
 
 import psycopg
 import pytest
@@ -8,6 +9,7 @@ from assertical.fixtures import postgres
 from envoy_schema.admin.schema.certificate import CertificateAssignmentRequest, CertificateRequest
 
 from envoy.admin import crud, manager
+from envoy.admin.schema.certificate import CertificateProvisionResponse
 from envoy.server import exception
 from envoy.server.model.aggregator import AggregatorCertificateAssignment
 
@@ -23,26 +25,27 @@ def mock_mapper(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
 
 
 @pytest.mark.anyio
-async def test_add_many_certficates_for_aggregator_assign_many_mocked(
+async def test_add_many_certficates_for_aggregator_assign_mocked(
     pg_base_config: psycopg.Connection, mocker: pytest_mock.MockerFixture
 ) -> None:
-    """Testing to make sure final call to assign_many_certificates expected are being made."""
+    """Testing to make sure the (single) call to assign_certificates_by_id_or_lfdi is being made as expected."""
     async with postgres.generate_async_session(pg_base_config) as session:
-        assign_many_mock = mocker.patch("envoy.admin.crud.aggregator.assign_many_certificates")
+        assign_mock = mocker.patch("envoy.admin.crud.aggregator.assign_certificates_by_id_or_lfdi")
+        assign_mock.return_value = [4, 5, 7]
 
         certs: list[CertificateAssignmentRequest] = [
             CertificateAssignmentRequest(certificate_id=4),
             CertificateAssignmentRequest(lfdi="SOMEFAKELFDI", expiry=dt.datetime.now() + dt.timedelta(365)),
             CertificateAssignmentRequest(lfdi="ec08e4c9d68a0669c3673708186fde317f7c67a2"),
+            CertificateAssignmentRequest(certificate_id=4),
         ]
         await manager.CertificateManager.add_many_certificates_for_aggregator(session, 1, certs)
-        assign_many_mock.assert_called_once()
+        assign_mock.assert_called_once()
 
-        args, _ = assign_many_mock.call_args
+        args, _ = assign_mock.call_args
         assert args[1] == 1, "Aggregator ID doesn't match"
-
-        # Make sure the expected new assignment certificate IDs are being passed in
-        assert [a for a in args[2]] == [7, 4, 5], "Certificate IDs doesn't match"
+        assert args[2] == [4], "Certificate IDs should be deduplicated"
+        assert args[3] == ["SOMEFAKELFDI", "ec08e4c9d68a0669c3673708186fde317f7c67a2"]
 
 
 @pytest.mark.anyio
@@ -52,7 +55,7 @@ async def test_add_many_certficates_for_aggregator_create_many_mocked(
 ) -> None:
     """Testing to make sure call to create_many_certificates_on_conflict_do_nothing are being made"""
     async with postgres.generate_async_session(pg_base_config) as session:
-        mocker.patch("envoy.admin.crud.aggregator.assign_many_certificates")
+        mocker.patch("envoy.admin.crud.aggregator.assign_certificates_by_id_or_lfdi").return_value = []
         create_many_mock = mocker.patch("envoy.admin.crud.certificate.create_many_certificates_on_conflict_do_nothing")
         create_many_mock.return_value = []
 
@@ -65,11 +68,94 @@ async def test_add_many_certficates_for_aggregator_create_many_mocked(
         create_many_mock.assert_called_once()
 
         args, _ = create_many_mock.call_args
-        certs_to_create = args[1]
+        certs_to_create = list(args[1])
         assert len(certs_to_create) == 1
         assert certs_to_create[0].lfdi == "SOMEFAKELFDI"
 
 
+@pytest.mark.parametrize(
+    "certs, expected_error",
+    [
+        ([CertificateAssignmentRequest(certificate_id=4), CertificateAssignmentRequest(certificate_id=4444)], "4444"),
+        ([CertificateAssignmentRequest(lfdi="SOMEFAKELFDI")], "SOMEFAKELFDI"),  # New lfdi needs an expiry
+    ],
+)
+@pytest.mark.anyio
+async def test_add_many_certficates_for_aggregator_invalid(
+    pg_base_config: psycopg.Connection, certs: list[CertificateAssignmentRequest], expected_error: str
+) -> None:
+    async with postgres.generate_async_session(pg_base_config) as session:
+        with pytest.raises(exception.InvalidIdError, match=expected_error):
+            await manager.CertificateManager.add_many_certificates_for_aggregator(session, 1, certs)
+
+
+async def _as_chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.anyio
+async def test_provision_certificates_for_aggregator(
+    pg_base_config: psycopg.Connection, mocker: pytest_mock.MockerFixture
+) -> None:
+    """Streams NDJSON (split across arbitrary chunks and batches) and checks the outcome is committed"""
+    mocker.patch("envoy.admin.manager.certificate.PROVISION_BATCH_SIZE", 2)
+    expiry = dt.datetime(2040, 1, 2, 3, 4, 5, tzinfo=dt.UTC)
+    lines = [
+        CertificateAssignmentRequest(certificate_id=4).model_dump_json(),
+        CertificateAssignmentRequest(certificate_id=1).model_dump_json(),  # Already assigned
+        CertificateAssignmentRequest(lfdi="NEWLFDI1", expiry=expiry).model_dump_json(),
+        "",
+        CertificateAssignmentRequest(lfdi="NEWLFDI2", expiry=expiry).model_dump_json(),
+        CertificateAssignmentRequest(lfdi="ec08e4c9d68a0669c3673708186fde317f7c67a2", expiry=expiry).model_dump_json(),
+    ]
+    body = "\n".join(lines).encode()
+
+    async with postgres.generate_async_session(pg_base_config) as session:
+        result = await manager.CertificateManager.provision_certificates_for_aggregator(
+            session, 1, _as_chunks(body[:17], body[17:200], body[200:])
+        )
+    assert result == CertificateProvisionResponse(received_count=5, created_count=2, assigned_count=4)
+
+    async with postgres.generate_async_session(pg_base_config) as session:
+        agg_certs = await crud.certificate.select_all_certificates_for_aggregator(session, 1, 0, 500)
+        assert [c.lfdi for c in agg_certs][-2:] == ["NEWLFDI1", "NEWLFDI2"]
+        assert [c.certificate_id for c in agg_certs][:5] == [1, 2, 3, 4, 5]
+        assert all(c.expiry == expiry for c in agg_certs[-2:])
+
+        # The existing cert expiry is NOT updated
+        existing = await crud.certificate.select_certificate(session, 5)
+        assert existing is not None and existing.expiry != expiry
+
+
+@pytest.mark.parametrize(
+    "aggregator_id, body, expected_error",
+    [
+        (1111, b'{"certificate_id": 4}', exception.NotFoundError),
+        (1, b'{"certificate_id": 4}\n{"lfdi": "abc", "certificate_id": 1}', exception.BadRequestError),
+        (
+            1,
+            b'{"lfdi": "NEWLFDI1", "expiry": "2040-01-01T00:00:00Z"}\n{"certificate_id": 4444}',
+            exception.InvalidIdError,
+        ),
+    ],
+)
+@pytest.mark.anyio
+async def test_provision_certificates_for_aggregator_errors(
+    pg_base_config: psycopg.Connection, aggregator_id: int, body: bytes, expected_error: type[Exception]
+) -> None:
+    """Errors abort the whole request (nothing is committed)"""
+    async with postgres.generate_async_session(pg_base_config) as session:
+        with pytest.raises(expected_error):
+            await manager.CertificateManager.provision_certificates_for_aggregator(
+                session, aggregator_id, _as_chunks(body)
+            )
+
+    async with postgres.generate_async_session(pg_base_config) as session:
+        assert await crud.certificate.count_all_certificates(session) == 5
+        assert await crud.certificate.count_certificates_for_aggregator(session, 1) == 3
+
+
 @pytest.mark.anyio
 async def test_add_many_certficates_for_aggregator_existing_cert(pg_base_config: psycopg.Connection) -> None:
     """Proper test, no mocks"""
@@ -0,0 +1,26 @@
+from collections.abc import AsyncIterator
+
+import pytest
+
+from envoy.admin.manager.ingest import split_ndjson_lines
+
+
+async def chunks_of(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        ([], []),
+        ([b""], []),
+        ([b"a\nb\n"], [b"a", b"b"]),
+        ([b"a\nb"], [b"a", b"b"]),
+        ([b"a", b"b\nc", b"d\n", b"\ne"], [b"ab", b"cd", b"", b"e"]),
+        ([b"abc\n", b"\n"], [b"abc", b""]),
+    ],
+)
+@pytest.mark.anyio
+async def test_split_ndjson_lines(chunks: list[bytes], expected: list[bytes]):
+    assert [line async for line in split_ndjson_lines(chunks_of(*chunks))] == expected
@@ -13,7 +13,12 @@ from envoy_schema.admin.schema.site_reading import (
 from envoy_schema.server.schema.sep2.types import FlowDirectionType, UomType
 
 from envoy.admin.mapper.site_reading import AdminSiteReadingMapper
-from envoy.server.model.site_reading import SiteReading, SiteReadingType
+from envoy.server.model.site_reading import (
+    SiteReading,
+    SiteReadingRollup,
+    SiteReadingRollupResolution,
+    SiteReadingType,
+)
 
 TZ = ZoneInfo("Australia/Brisbane")
 
@@ -205,6 +210,37 @@ def test_map_to_csip_aus_reading_all_units(requested_unit: CSIPAusSiteReadingUni
     assert result.phase == PhaseEnum.CN
 
 
+@pytest.mark.parametrize(
+    "flow_direction, expected_value",
+    [
+        (FlowDirectionType.FORWARD, Decimal("1200")),  # (11 + 20 + 5) / 3 * 10^2
+        (FlowDirectionType.REVERSE, Decimal("-1200")),
+    ],
+)
+def test_map_rollup_to_csip_aus_reading(flow_direction: FlowDirectionType, expected_value: Decimal):
+    rollup = generate_class_instance(
+        SiteReadingRollup,
+        resolution_seconds=SiteReadingRollupResolution.HOUR,
+        bucket_start=datetime(2022, 6, 7, 1, 0, tzinfo=TZ),
+        reading_count=3,
+        value_sum=36,
+        value_min=5,
+        value_max=20,
+        site_reading_type=generate_class_instance(
+            SiteReadingType, power_of_ten_multiplier=2, flow_direction=flow_direction, phase=129
+        ),
+    )
+
+    result = AdminSiteReadingMapper.map_rollup_to_csip_aus_reading(rollup, CSIPAusSiteReadingUnit.ACTIVEPOWER)
+
+    assert isinstance(result, CSIPAusSiteReading)
+    assert result.reading_start_time == datetime(2022, 6, 7, 1, 0, tzinfo=TZ)
+    assert result.duration_seconds == 3600
+    assert result.phase == PhaseEnum.AN
+    assert result.value == expected_value
+    assert result.csip_aus_unit == CSIPAusSiteReadingUnit.ACTIVEPOWER
+
+
 def test_map_to_csip_aus_reading_page_response_basic():
     # Create mock readings
     readings = [
@@ -8,14 +8,17 @@ from assertical.fixtures.postgres import generate_async_session
 from envoy.notification.crud.archive import (
     extract_source_archive_changed_deleted_columns,
     extract_source_archive_pk_columns,
+    fetch_entities_with_archive_and_parent_by_datetime,
     fetch_entities_with_archive_by_datetime,
     fetch_entities_with_archive_by_id,
 )
 from envoy.server.model.archive.base import ArchiveBase
 from envoy.server.model.archive.site import ArchiveSite
+from envoy.server.model.archive.tariff import ArchiveTariffGeneratedRate
 from envoy.server.model.base import Base
 from envoy.server.model.site import Site
 from envoy.server.model.subscription import SubscriptionCondition
+from envoy.server.model.tariff import TariffGeneratedRate
 from tests.unit.server.model.archive.test_archive_models import find_paired_archive_classes
 
 
@@ -244,3 +247,147 @@ async def test_fetch_entities_with_archive_by_datetime(pg_base_config, cd_time:
             assert e.nmi == str(e.site_id) * 10, "This is just the convention for pg_base_config"
         for e in archive_entities:
             assert e.nmi == f"archive_{e.site_id}", "This is just a convention for this test thats setup above"
+
+
+@pytest.mark.anyio
+async def test_fetch_entities_with_archive_by_datetime_duplicate_deletes(pg_base_config):
+    """If the same entity has multiple archive records sharing the same deleted_time - only the most recently
+    archived one should be returned"""
+    deleted_time = datetime(2024, 3, 4, 5, 6, 7, tzinfo=UTC)
+    async with generate_async_session(pg_base_config) as session:
+        session.add(
+            generate_class_instance(ArchiveSite, seed=101, archive_id=None, deleted_time=deleted_time, site_id=11)
+        )
+        session.add(
+            generate_class_instance(
+                ArchiveSite, seed=202, archive_id=None, deleted_time=deleted_time, site_id=11, nmi="archive_11"
+            )
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        source_entities, archive_entities = await fetch_entities_with_archive_by_datetime(
+            session, Site, ArchiveSite, deleted_time
+        )
+
+        assert_list_type(Site, source_entities, count=0)
+        assert_list_type(ArchiveSite, archive_entities, count=1)
+        assert archive_entities[0].site_id == 11
+        assert archive_entities[0].nmi == "archive_11"
+
+
+@pytest.mark.anyio
+async def test_fetch_entities_with_archive_and_parent_by_datetime(pg_base_config):
+    """Tests that parent columns are joined from the live parent (preferred) or the most recently deleted archive
+    parent - for both the source and archive entities"""
+    cd_time = datetime(2022, 3, 4, 11, 22, 33, 500000, tzinfo=UTC)  # Matches tariff_generated_rate 1 (site 1)
+
+    async with generate_async_session(pg_base_config) as session:
+        # Site 1 has a deleted archive record - the live site should still be preferred
+        session.add(
+            generate_class_instance(
+                ArchiveSite, seed=1, archive_id=None, site_id=1, deleted_time=cd_time, timezone_id="a"
+            )
+        )
+
+        # Site 11 DNE in the main table (it was deleted multiple times) - the latest delete should be used
+        session.add(
+            generate_class_instance(
+                ArchiveSite, seed=2, archive_id=None, site_id=11, aggregator_id=2, deleted_time=None
+            )
+        )
+        session.add(
+            generate_class_instance(
+                ArchiveSite,
+                seed=3,
+                archive_id=None,
+                site_id=11,
+                aggregator_id=2,
+                deleted_time=cd_time,
+                timezone_id="latest",
+            )
+        )
+        session.add(
+            generate_class_instance(
+                ArchiveSite,
+                seed=4,
+                archive_id=None,
+                site_id=11,
+                aggregator_id=2,
+                deleted_time=cd_time - timedelta(seconds=1),
+            )
+        )
+
+        session.add(
+            generate_class_instance(
+                ArchiveTariffGeneratedRate,
+                seed=5,
+                archive_id=None,
+                site_id=11,
+                tariff_generated_rate_id=21,
+                deleted_time=cd_time,
+            )
+        )
+        session.add(
+            generate_class_instance(
+                ArchiveTariffGeneratedRate,
+                seed=6,
+                archive_id=None,
+                site_id=1,
+                tariff_generated_rate_id=22,
+                deleted_time=cd_time,
+            )
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        source_rows, archive_rows = await fetch_entities_with_archive_and_parent_by_datetime(
+            session,
+            TariffGeneratedRate,
+            ArchiveTariffGeneratedRate,
+            Site,
+            ArchiveSite,
+            ["aggregator_id", "timezone_id"],
+            cd_time,
+        )
+
+        assert [(e.tariff_generated_rate_id, agg_id, tz) for e, agg_id, tz in source_rows] == [
+            (1, 1, "Australia/Brisbane")
+        ]
+        assert sorted([(e.tariff_generated_rate_id, agg_id, tz) for e, agg_id, tz in archive_rows]) == [
+            (21, 2, "latest"),
+            (22, 1, "Australia/Brisbane"),
+        ]
+        assert_list_type(TariffGeneratedRate, [row[0] for row in source_rows], count=1)
+        assert_list_type(ArchiveTariffGeneratedRate, [row[0] for row in archive_rows], count=2)
+
+
+@pytest.mark.anyio
+async def test_fetch_entities_with_archive_and_parent_by_datetime_missing_parent(pg_base_config):
+    """Entities whose parent can't be found in the source/archive tables should raise a ValueError"""
+    cd_time = datetime(2023, 1, 2, tzinfo=UTC)
+
+    async with generate_async_session(pg_base_config) as session:
+        session.add(
+            generate_class_instance(
+                ArchiveTariffGeneratedRate,
+                seed=1,
+                archive_id=None,
+                site_id=999,
+                tariff_generated_rate_id=21,
+                deleted_time=cd_time,
+            )
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        with pytest.raises(ValueError):
+            await fetch_entities_with_archive_and_parent_by_datetime(
+                session,
+                TariffGeneratedRate,
+                ArchiveTariffGeneratedRate,
+                Site,
+                ArchiveSite,
+                ["aggregator_id", "timezone_id"],
+                cd_time,
+            )
@@ -2,6 +2,7 @@ import unittest.mock as mock
 from collections.abc import Sequence
 from datetime import UTC, date, datetime, timedelta, timezone
 from decimal import Decimal
+from itertools import chain
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -29,15 +30,18 @@ from envoy.notification.crud.batch import (
     get_batch_key,
     get_site_id,
     get_subscription_filter_id,
-    select_subscriptions_for_resource,
+    select_subscription_ids_deleted_after,
+    select_subscriptions_changed_after,
 )
 from envoy.notification.crud.common import (
     ArchiveSiteScopedFunctionSetAssignment,
     ArchiveSiteScopedSiteControlGroup,
     ArchiveSiteScopedSiteControlGroupDefault,
+    SiteScopedEntity,
     SiteScopedFunctionSetAssignment,
     SiteScopedSiteControlGroup,
     SiteScopedSiteControlGroupDefault,
+    SiteScopedSiteReading,
     TResourceModel,
 )
 from envoy.notification.exception import NotificationError
@@ -58,15 +62,23 @@ from envoy.server.model.archive.site import (
     ArchiveSiteDERStatus,
 )
 from envoy.server.model.archive.site_reading import ArchiveSiteReading, ArchiveSiteReadingType
+from envoy.server.model.archive.subscription import ArchiveSubscription
 from envoy.server.model.archive.tariff import ArchiveTariffGeneratedRate
 from envoy.server.model.base import Base
 from envoy.server.model.doe import DynamicOperatingEnvelope, SiteControlGroupDefault
 from envoy.server.model.site import SiteDERAvailability, SiteDERRating, SiteDERSetting, SiteDERStatus
-from envoy.server.model.site_reading import SiteReading, SiteReadingType
+from envoy.server.model.site_reading import SiteReading
 from envoy.server.model.subscription import Subscription, SubscriptionCondition, SubscriptionResource
 from envoy.server.model.tariff import TariffGeneratedRate
 
 
+def unwrap_site_scoped(e):
+    """SiteScopedEntity / SiteScopedSiteReading are asserted by the type of the entity they wrap"""
+    if isinstance(e, SiteScopedEntity) or isinstance(e, SiteScopedSiteReading):
+        return e.original
+    return e
+
+
 def assert_batched_entities(
     batch: AggregatorBatchedEntities,
     expected_model_type: type[Base],
@@ -79,9 +91,9 @@ def assert_batched_entities(
     assert_dict_type(tuple, list, batch.models_by_batch_key)
     assert_dict_type(tuple, list, batch.deleted_by_batch_key)
     for v in batch.models_by_batch_key.values():
-        assert_list_type(expected_model_type, v)
+        assert_list_type(expected_model_type, [unwrap_site_scoped(e) for e in v])
     for v in batch.deleted_by_batch_key.values():
-        assert_list_type(expected_deleted_type, v)
+        assert_list_type(expected_deleted_type, [unwrap_site_scoped(e) for e in v])
 
     assert sum(len(v) for v in batch.models_by_batch_key.values()) == expected_model_count
     assert sum(len(v) for v in batch.deleted_by_batch_key.values()) == expected_deleted_count
@@ -186,79 +198,64 @@ def test_get_batch_key_invalid():
         (SubscriptionResource.SITE, Site(aggregator_id=1, site_id=2), (1, 2)),
         (
             SubscriptionResource.READING,
-            SiteReading(
-                site_reading_id=99,
-                site_reading_type=SiteReadingType(aggregator_id=1, site_id=2, site_reading_type_id=3, group_id=4),
-                site_reading_type_id=3,
-            ),
+            SiteScopedSiteReading(1, 2, 4, SiteReading(site_reading_id=99, site_reading_type_id=3)),
             (1, 2, 4),
         ),
         (
             SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
-            DynamicOperatingEnvelope(
-                dynamic_operating_envelope_id=99,
-                site_id=2,
-                site_control_group_id=3,
-                site=Site(site_id=2, aggregator_id=1),
+            SiteScopedEntity(
+                1,
+                2,
+                "Australia/Brisbane",
+                DynamicOperatingEnvelope(dynamic_operating_envelope_id=99, site_id=2, site_control_group_id=3),
             ),
             (1, 2, 3),
         ),
         (
             SubscriptionResource.TARIFF_GENERATED_RATE,
-            TariffGeneratedRate(
-                tariff_generated_rate_id=99,
-                site_id=3,
-                tariff_id=2,
-                start_time=datetime(2023, 2, 3, 4, 5, 6),
-                site=Site(site_id=3, aggregator_id=1),
+            SiteScopedEntity(
+                1,
+                3,
+                "Australia/Brisbane",
+                TariffGeneratedRate(
+                    tariff_generated_rate_id=99, site_id=3, tariff_id=2, start_time=datetime(2023, 2, 3, 4, 5, 6)
+                ),
             ),
             (1, 2, 3, date(2023, 2, 3)),
         ),
         (
             SubscriptionResource.TARIFF_GENERATED_RATE,
-            TariffGeneratedRate(
-                tariff_generated_rate_id=99,
-                site_id=3,
-                tariff_id=2,
-                start_time=datetime(2023, 2, 3, 4, 5, 6, tzinfo=UTC),
-                site=Site(site_id=3, aggregator_id=1),
+            SiteScopedEntity(
+                1,
+                3,
+                "Australia/Brisbane",
+                TariffGeneratedRate(
+                    tariff_generated_rate_id=99,
+                    site_id=3,
+                    tariff_id=2,
+                    start_time=datetime(2023, 2, 3, 4, 5, 6, tzinfo=UTC),
+                ),
             ),
             (1, 2, 3, date(2023, 2, 3)),
         ),
         (
             SubscriptionResource.SITE_DER_AVAILABILITY,
-            SiteDERAvailability(
-                site_id=3,
-                site_der_availability_id=22,
-                site=Site(site_id=3, aggregator_id=1),
-            ),
+            SiteScopedEntity(1, 3, "Australia/Brisbane", SiteDERAvailability(site_id=3, site_der_availability_id=22)),
             (1, 3, PUBLIC_SITE_DER_ID),
         ),
         (
             SubscriptionResource.SITE_DER_RATING,
-            SiteDERRating(
-                site_id=3,
-                site_der_rating_id=22,
-                site=Site(site_id=3, aggregator_id=1),
-            ),
+            SiteScopedEntity(1, 3, "Australia/Brisbane", SiteDERRating(site_id=3, site_der_rating_id=22)),
             (1, 3, PUBLIC_SITE_DER_ID),
         ),
         (
             SubscriptionResource.SITE_DER_SETTING,
-            SiteDERSetting(
-                site_id=3,
-                site_der_setting_id=22,
-                site=Site(site_id=3, aggregator_id=1),
-            ),
+            SiteScopedEntity(1, 3, "Australia/Brisbane", SiteDERSetting(site_id=3, site_der_setting_id=22)),
             (1, 3, PUBLIC_SITE_DER_ID),
         ),
         (
             SubscriptionResource.SITE_DER_STATUS,
-            SiteDERStatus(
-                site_id=3,
-                site_der_status_id=22,
-                site=Site(site_id=3, aggregator_id=1),
-            ),
+            SiteScopedEntity(1, 3, "Australia/Brisbane", SiteDERStatus(site_id=3, site_der_status_id=22)),
             (1, 3, PUBLIC_SITE_DER_ID),
         ),
         (
@@ -309,29 +306,28 @@ def test_get_subscription_filter_id_invalid():
         (SubscriptionResource.SITE, Site(aggregator_id=1, site_id=99), 99),
         (
             SubscriptionResource.READING,
-            SiteReading(
-                site_reading_id=99,
-                site_reading_type_id=3,
-                site_reading_type=SiteReadingType(site_reading_type_id=3, group_id=4),
-            ),
+            SiteScopedSiteReading(1, 2, 4, SiteReading(site_reading_id=99, site_reading_type_id=3)),
             4,
         ),
         (
             SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
-            DynamicOperatingEnvelope(
-                dynamic_operating_envelope_id=99,
-                site_id=2,
-                site_control_group_id=3,
+            SiteScopedEntity(
+                1,
+                2,
+                "Australia/Brisbane",
+                DynamicOperatingEnvelope(dynamic_operating_envelope_id=99, site_id=2, site_control_group_id=3),
             ),
             3,
         ),
         (
             SubscriptionResource.TARIFF_GENERATED_RATE,
-            TariffGeneratedRate(
-                tariff_generated_rate_id=999,
-                site_id=3,
-                tariff_id=2,
-                start_time=datetime(2023, 2, 3, 4, 5, 6),
+            SiteScopedEntity(
+                1,
+                3,
+                "Australia/Brisbane",
+                TariffGeneratedRate(
+                    tariff_generated_rate_id=999, site_id=3, tariff_id=2, start_time=datetime(2023, 2, 3, 4, 5, 6)
+                ),
             ),
             2,
         ),
@@ -363,28 +359,25 @@ def test_get_site_id_invalid():
         (SubscriptionResource.SITE, Site(aggregator_id=1, site_id=2), 2),
         (
             SubscriptionResource.READING,
-            SiteReading(
-                site_reading_id=99,
-                site_reading_type=SiteReadingType(aggregator_id=1, site_id=2, site_reading_type_id=3),
-                site_reading_type_id=3,
-            ),
+            SiteScopedSiteReading(1, 2, 4, SiteReading(site_reading_id=99, site_reading_type_id=3)),
             2,
         ),
         (
             SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
-            DynamicOperatingEnvelope(
-                dynamic_operating_envelope_id=99,
-                site_id=2,
+            SiteScopedEntity(
+                1, 2, "Australia/Brisbane", DynamicOperatingEnvelope(dynamic_operating_envelope_id=99, site_id=2)
             ),
             2,
         ),
         (
             SubscriptionResource.TARIFF_GENERATED_RATE,
-            TariffGeneratedRate(
-                tariff_generated_rate_id=99,
-                site_id=3,
-                tariff_id=2,
-                start_time=datetime(2023, 2, 3, 4, 5, 6),
+            SiteScopedEntity(
+                1,
+                3,
+                "Australia/Brisbane",
+                TariffGeneratedRate(
+                    tariff_generated_rate_id=99, site_id=3, tariff_id=2, start_time=datetime(2023, 2, 3, 4, 5, 6)
+                ),
             ),
             3,
         ),
@@ -412,71 +405,102 @@ def test_get_site_id(resource: SubscriptionResource, entity: TResourceModel, exp
 
 
 @pytest.mark.parametrize(
-    "aggregator_id,resource,expected_sub_ids",
+    "changed_after,expected_sub_ids",
     [
-        (1, SubscriptionResource.SITE, [1, 4]),
-        (1, SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE, [2]),
-        (1, SubscriptionResource.READING, [5]),
-        (2, SubscriptionResource.TARIFF_GENERATED_RATE, [3]),
-        (1, SubscriptionResource.TARIFF_GENERATED_RATE, []),
-        (99, SubscriptionResource.SITE, []),
-        (2, SubscriptionResource.READING, []),
+        (None, [1, 2, 3, 4, 5]),
+        (datetime(2024, 1, 2, 12, 22, 33, 500000, tzinfo=UTC), [2, 3, 4, 5]),
+        (datetime(2024, 1, 2, 12, 22, 33, 500001, tzinfo=UTC), [3, 4, 5]),
+        (datetime(2099, 1, 1, tzinfo=UTC), []),
     ],
 )
 @pytest.mark.anyio
-async def test_select_subscriptions_for_resource_filtering(
-    pg_base_config, aggregator_id: int, resource: SubscriptionResource, expected_sub_ids: list[int]
+async def test_select_subscriptions_changed_after_filtering(
+    pg_base_config, changed_after: datetime | None, expected_sub_ids: list[int]
 ):
-    """Tests the filtering on select_subscriptions_for_resource"""
+    """Tests the filtering on select_subscriptions_changed_after"""
     async with generate_async_session(pg_base_config) as session:
-        actual_entities = await select_subscriptions_for_resource(session, aggregator_id, resource)
+        actual_entities = await select_subscriptions_changed_after(session, changed_after)
         assert all([isinstance(e, Subscription) for e in actual_entities])
-        assert [e.subscription_id for e in actual_entities] == expected_sub_ids
+        assert sorted([e.subscription_id for e in actual_entities]) == expected_sub_ids
 
 
-@pytest.mark.parametrize(
-    "aggregator_id,resource,expected_conditions",
-    [
-        (
-            1,
-            SubscriptionResource.READING,
-            [
-                SubscriptionCondition(
-                    subscription_condition_id=1,
-                    subscription_id=5,
-                    attribute=ConditionAttributeIdentifier.READING_VALUE,
-                    lower_threshold=1,
-                    upper_threshold=11,
-                ),
-                SubscriptionCondition(
-                    subscription_condition_id=2,
-                    subscription_id=5,
-                    attribute=ConditionAttributeIdentifier.READING_VALUE,
-                    lower_threshold=2,
-                    upper_threshold=12,
-                ),
-            ],
-        ),
-        (1, SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE, []),
-    ],
-)
 @pytest.mark.anyio
-async def test_select_subscriptions_for_resource_conditions(
-    pg_base_config, aggregator_id: int, resource: SubscriptionResource, expected_conditions: list[SubscriptionCondition]
-):
+async def test_select_subscriptions_changed_after_conditions(pg_base_config):
     """Tests that conditions are returned with the subscription"""
+    expected_conditions = [
+        SubscriptionCondition(
+            subscription_condition_id=1,
+            subscription_id=5,
+            attribute=ConditionAttributeIdentifier.READING_VALUE,
+            lower_threshold=1,
+            upper_threshold=11,
+        ),
+        SubscriptionCondition(
+            subscription_condition_id=2,
+            subscription_id=5,
+            attribute=ConditionAttributeIdentifier.READING_VALUE,
+            lower_threshold=2,
+            upper_threshold=12,
+        ),
+    ]
+
     async with generate_async_session(pg_base_config) as session:
-        actual_entities = await select_subscriptions_for_resource(session, aggregator_id, resource)
-        assert len(actual_entities) == 1
+        subs_by_id = {s.subscription_id: s for s in await select_subscriptions_changed_after(session, None)}
 
-        assert all([isinstance(e, Subscription) for e in actual_entities])
-        assert all([isinstance(c, SubscriptionCondition) for e in actual_entities for c in e.conditions])
-        assert len(actual_entities[0].conditions) == len(expected_conditions)
+        assert subs_by_id[2].conditions == []
+        actual_conditions = sorted(subs_by_id[5].conditions, key=lambda c: c.subscription_condition_id)
+        assert len(actual_conditions) == len(expected_conditions)
+        for expected, actual in zip(expected_conditions, actual_conditions, strict=True):
+            assert_class_instance_equality(SubscriptionCondition, expected, actual)
 
-        for i in range(len(expected_conditions)):
-            assert_class_instance_equality(
-                SubscriptionCondition, expected_conditions[i], actual_entities[0].conditions[i]
-            )
+
+@pytest.mark.anyio
+async def test_select_subscription_ids_deleted_after(pg_base_config):
+    """Only deleted archive rows (not update snapshots) at/after deleted_after are returned"""
+    async with generate_async_session(pg_base_config) as session:
+        session.add_all(
+            [
+                ArchiveSubscription(
+                    subscription_id=11,
+                    aggregator_id=1,
+                    created_time=datetime(2020, 1, 1, tzinfo=UTC),
+                    changed_time=datetime(2020, 1, 1, tzinfo=UTC),
+                    resource_type=SubscriptionResource.SITE,
+                    notification_uri="http://a",
+                    entity_limit=1,
+                    deleted_time=datetime(2024, 1, 1, tzinfo=UTC),
+                ),
+                ArchiveSubscription(
+                    subscription_id=12,
+                    aggregator_id=1,
+                    created_time=datetime(2020, 1, 1, tzinfo=UTC),
+                    changed_time=datetime(2020, 1, 1, tzinfo=UTC),
+                    resource_type=SubscriptionResource.SITE,
+                    notification_uri="http://b",
+                    entity_limit=1,
+                    deleted_time=datetime(2024, 2, 1, tzinfo=UTC),
+                ),
+                ArchiveSubscription(
+                    subscription_id=13,
+                    aggregator_id=1,
+                    created_time=datetime(2020, 1, 1, tzinfo=UTC),
+                    changed_time=datetime(2020, 1, 1, tzinfo=UTC),
+                    resource_type=SubscriptionResource.SITE,
+                    notification_uri="http://c",
+                    entity_limit=1,
+                    deleted_time=None,
+                ),  # Update snapshot
+            ]
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        assert sorted(await select_subscription_ids_deleted_after(session, datetime(2024, 1, 1, tzinfo=UTC))) == [
+            11,
+            12,
+        ]
+        assert await select_subscription_ids_deleted_after(session, datetime(2024, 1, 2, tzinfo=UTC)) == [12]
+        assert await select_subscription_ids_deleted_after(session, datetime(2025, 1, 1, tzinfo=UTC)) == []
 
 
 @pytest.mark.parametrize(
@@ -637,16 +661,16 @@ async def test_fetch_rates_by_timestamp(pg_base_config, timestamp: datetime, exp
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_rates_by_changed_at(session, timestamp)
         assert_batched_entities(batch, TariffGeneratedRate, ArchiveTariffGeneratedRate, len(expected_rates), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda rate: rate.tariff_generated_rate_id)
 
         for i in range(len(expected_rates)):
             assert_class_instance_equality(TariffGeneratedRate, expected_rates[i], list_entities[i])
 
-        assert all([isinstance(e.site, Site) for e in list_entities]), "site relationship populated"
-        assert all([e.site.site_id == e.site_id for e in list_entities]), "site relationship populated"
-        assert all([e.start_time.tzinfo == ZoneInfo(e.site.timezone_id) for e in list_entities]), (
-            "start_time should be localized to the zone identified by the linked site"
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([r.site_id == r.original.site_id for r in list_records]), "parent site values populated"
+        assert all([r.original.start_time.tzinfo == ZoneInfo(r.timezone_id) for r in list_records]), (
+            "start_time should be localized to the zone identified by the parent site"
         )
 
 
@@ -671,12 +695,12 @@ async def test_fetch_rates_by_timestamp_multiple_aggs(pg_base_config):
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_rates_by_changed_at(session, timestamp)
         assert_batched_entities(batch, TariffGeneratedRate, ArchiveTariffGeneratedRate, len(all_entities), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda rate: rate.tariff_generated_rate_id)
 
         assert len(list_entities) == len(all_entities)
         assert set([1, 2, 3, 4]) == set([e.tariff_generated_rate_id for e in list_entities])
-        assert set([1, 2]) == set([e.site.aggregator_id for e in list_entities]), (
+        assert set([1, 2]) == set([r.aggregator_id for v_list in batch.models_by_batch_key.values() for r in v_list]), (
             "All aggregator IDs should be represented"
         )
 
@@ -812,34 +836,32 @@ async def test_fetch_rates_by_timestamp_with_archive(pg_base_config):
             len(expected_active_rate_ids),
             len(expected_deleted_rate_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.tariff_generated_rate_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.tariff_generated_rate_id)
 
         assert set(expected_active_rate_ids) == set([e.tariff_generated_rate_id for e in active_list_entities])
         assert set(expected_deleted_rate_ids) == set([e.tariff_generated_rate_id for e in deleted_list_entities])
 
-        # Ensure the parent ORM relationship is populated for deleted/active instances
-        assert all([isinstance(e.site, Site) for v_list in batch.models_by_batch_key.values() for e in v_list])
-        assert all(
-            [
-                hasattr(e, "site") and (isinstance(e.site, Site) or isinstance(e.site, ArchiveSite))
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent Site values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert all([r.site_id == r.original.site_id for r in all_records])
+        assert {r.site_id: (r.aggregator_id, r.timezone_id) for r in all_records} == {
+            1: (1, "Australia/Brisbane"),
+            2: (1, "Australia/Brisbane"),
+            3: (2, "Australia/Brisbane"),
+            70: (1, "Australia/Brisbane"),  # From the most recently deleted ArchiveSite
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all(
-            [
-                e.duration_seconds == e.tariff_generated_rate_id
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        assert all([e.duration_seconds == e.tariff_generated_rate_id for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_sites_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -890,16 +912,16 @@ async def test_fetch_does_by_timestamp(
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_does_by_changed_at(session, timestamp)
         assert_batched_entities(batch, DynamicOperatingEnvelope, ArchiveDynamicOperatingEnvelope, len(expected_does), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda doe: doe.dynamic_operating_envelope_id)
 
         for i in range(len(expected_does)):
             assert_class_instance_equality(DynamicOperatingEnvelope, expected_does[i], list_entities[i])
 
-        assert all([isinstance(e.site, Site) for e in list_entities]), "site relationship populated"
-        assert all([e.site.site_id == e.site_id for e in list_entities]), "site relationship populated"
-        assert all([e.start_time.tzinfo == ZoneInfo(e.site.timezone_id) for e in list_entities]), (
-            "start_time should be localized to the zone identified by the linked site"
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([r.site_id == r.original.site_id for r in list_records]), "parent site values populated"
+        assert all([r.original.start_time.tzinfo == ZoneInfo(r.timezone_id) for r in list_records]), (
+            "start_time should be localized to the zone identified by the parent site"
         )
 
 
@@ -924,12 +946,12 @@ async def test_fetch_does_by_timestamp_multiple_aggs(pg_base_config):
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_does_by_changed_at(session, timestamp)
         assert_batched_entities(batch, DynamicOperatingEnvelope, ArchiveDynamicOperatingEnvelope, len(all_entities), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda rate: rate.dynamic_operating_envelope_id)
 
         assert len(list_entities) == len(all_entities)
         assert set([1, 2, 3, 4]) == set([e.dynamic_operating_envelope_id for e in list_entities])
-        assert set([1, 2]) == set([e.site.aggregator_id for e in list_entities]), (
+        assert set([1, 2]) == set([r.aggregator_id for v_list in batch.models_by_batch_key.values() for r in v_list]), (
             "All aggregator IDs should be represented"
         )
 
@@ -1066,34 +1088,32 @@ async def test_fetch_does_by_timestamp_with_archive(pg_base_config):
             len(expected_active_doe_ids),
             len(expected_deleted_doe_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.dynamic_operating_envelope_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.dynamic_operating_envelope_id)
 
         assert set(expected_active_doe_ids) == set([e.dynamic_operating_envelope_id for e in active_list_entities])
         assert set(expected_deleted_doe_ids) == set([e.dynamic_operating_envelope_id for e in deleted_list_entities])
 
-        # Ensure the parent ORM relationship is populated for deleted/active instances
-        assert all([isinstance(e.site, Site) for v_list in batch.models_by_batch_key.values() for e in v_list])
-        assert all(
-            [
-                hasattr(e, "site") and (isinstance(e.site, Site) or isinstance(e.site, ArchiveSite))
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent Site values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert all([r.site_id == r.original.site_id for r in all_records])
+        assert {r.site_id: (r.aggregator_id, r.timezone_id) for r in all_records} == {
+            1: (1, "Australia/Brisbane"),
+            2: (1, "Australia/Brisbane"),
+            3: (2, "Australia/Brisbane"),
+            70: (1, "Australia/Brisbane"),  # From the most recently deleted ArchiveSite
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all(
-            [
-                e.duration_seconds == e.dynamic_operating_envelope_id
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        assert all([e.duration_seconds == e.dynamic_operating_envelope_id for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_sites_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -1135,19 +1155,16 @@ async def test_fetch_readings_by_timestamp(pg_base_config, timestamp: datetime,
         batch = await fetch_readings_by_changed_at(session, timestamp)
         assert_batched_entities(batch, SiteReading, ArchiveSiteReading, len(expected_readings), 0)
         assert len(batch.deleted_by_batch_key) == 0
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda reading: reading.site_reading_id)
 
         assert all([isinstance(e, SiteReading) for e in list_entities])
         for i in range(len(expected_readings)):
             assert_class_instance_equality(SiteReading, expected_readings[i], list_entities[i])
 
-        assert all([isinstance(e.site_reading_type, SiteReadingType) for e in list_entities]), (
-            "site_reading_type relationship populated"
-        )
-        assert all([e.site_reading_type.site_reading_type_id == e.site_reading_type_id for e in list_entities]), (
-            "site_reading_type relationship populated"
-        )
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([isinstance(r, SiteScopedSiteReading) for r in list_records])
+        assert all([isinstance(r.group_id, int) for r in list_records]), "parent site_reading_type values populated"
 
 
 @pytest.mark.anyio
@@ -1171,12 +1188,12 @@ async def test_fetch_readings_by_timestamp_multiple_aggs(pg_base_config):
         batch = await fetch_readings_by_changed_at(session, timestamp)
         assert_batched_entities(batch, SiteReading, ArchiveSiteReading, len(all_entities), 0)
         assert len(batch.deleted_by_batch_key) == 0
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda reading: reading.site_reading_id)
 
         assert len(list_entities) == len(all_entities)
         assert set([1, 2, 3, 4]) == set([e.site_reading_id for e in list_entities])
-        assert set([1, 3]) == set([e.site_reading_type.aggregator_id for e in list_entities]), (
+        assert set([1, 3]) == set([r.aggregator_id for v_list in batch.models_by_batch_key.values() for r in v_list]), (
             "All aggregator IDs should be represented"
         )
 
@@ -1299,38 +1316,31 @@ async def test_fetch_readings_by_timestamp_with_archive(pg_base_config):
             len(expected_active_reading_ids),
             len(expected_deleted_reading_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.site_reading_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.site_reading_id)
 
         assert set(expected_active_reading_ids) == set([e.site_reading_id for e in active_list_entities])
         assert set(expected_deleted_reading_ids) == set([e.site_reading_id for e in deleted_list_entities])
 
-        # Ensure the parent ORM relationship is populated for deleted/active instances
-        assert all(
-            [
-                isinstance(e.site_reading_type, SiteReadingType)
-                for v_list in batch.models_by_batch_key.values()
-                for e in v_list
-            ]
-        )
-        assert all(
-            [
-                hasattr(e, "site_reading_type")
-                and (
-                    isinstance(e.site_reading_type, SiteReadingType)
-                    or isinstance(e.site_reading_type, ArchiveSiteReadingType)
-                )
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent SiteReadingType values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert {r.original.site_reading_type_id: (r.aggregator_id, r.site_id, r.group_id) for r in all_records} == {
+            1: (1, 1, 1),
+            2: (3, 1, 2),
+            3: (1, 1, 3),
+            70: (1, 53, 44),  # From the most recently deleted ArchiveSiteReadingType (seed 33)
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all([e.value == e.site_reading_id for v_list in batch.deleted_by_batch_key.values() for e in v_list])
+        assert all([e.value == e.site_reading_id for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_sites_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -1359,13 +1369,14 @@ async def test_fetch_der_availability_by_timestamp(pg_base_config, timestamp: da
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_der_availability_by_changed_at(session, timestamp)
         assert_batched_entities(batch, SiteDERAvailability, ArchiveSiteDERAvailability, len(expected_ids), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda doe: doe.site_der_availability_id)
 
         for i in range(len(expected_ids)):
             assert list_entities[i].site_der_availability_id == expected_ids[i]
 
-        assert all([isinstance(e.site, Site) for e in list_entities]), "Site relationship populated"
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([r.site_id == r.original.site_id for r in list_records]), "parent site values populated"
 
 
 @pytest.mark.anyio
@@ -1485,34 +1496,31 @@ async def test_fetch_der_availability_by_timestamp_with_archive(pg_base_config):
             len(expected_active_avail_ids),
             len(expected_deleted_avail_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.site_der_availability_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.site_der_availability_id)
 
         assert set(expected_active_avail_ids) == set([e.site_der_availability_id for e in active_list_entities])
         assert set(expected_deleted_avail_ids) == set([e.site_der_availability_id for e in deleted_list_entities])
 
-        # Ensure the site ORM relationship is populated for deleted/active instances
-        assert all([isinstance(e.site, Site) for v_list in batch.models_by_batch_key.values() for e in v_list])
-        assert all(
-            [
-                isinstance(e.site, Site) or isinstance(e.site, ArchiveSite)  # ty:ignore[unresolved-attribute]
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent Site values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert all([r.site_id == r.original.site_id for r in all_records])
+        assert {r.site_id: (r.aggregator_id, r.timezone_id) for r in all_records} == {
+            1: (1, "Australia/Brisbane"),
+            2: (1, "Australia/Brisbane"),
+            70: (1, "43-str"),  # From the most recently deleted ArchiveSite (seed 33)
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all(
-            [
-                e.max_charge_duration_sec == e.site_der_availability_id
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        assert all([e.max_charge_duration_sec == e.site_der_availability_id for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_der_availability_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -1541,13 +1549,14 @@ async def test_fetch_der_rating_by_timestamp(pg_base_config, timestamp: datetime
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_der_rating_by_changed_at(session, timestamp)
         assert_batched_entities(batch, SiteDERRating, ArchiveSiteDERRating, len(expected_ids), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda doe: doe.site_der_rating_id)
 
         for i in range(len(expected_ids)):
             assert list_entities[i].site_der_rating_id == expected_ids[i]
 
-        assert all([isinstance(e.site, Site) for e in list_entities]), "Site relationship populated"
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([r.site_id == r.original.site_id for r in list_records]), "parent site values populated"
 
 
 @pytest.mark.anyio
@@ -1663,30 +1672,31 @@ async def test_fetch_der_rating_by_timestamp_with_archive(pg_base_config):
             len(expected_active_rating_ids),
             len(expected_deleted_rating_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.site_der_rating_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.site_der_rating_id)
 
         assert set(expected_active_rating_ids) == set([e.site_der_rating_id for e in active_list_entities])
         assert set(expected_deleted_rating_ids) == set([e.site_der_rating_id for e in deleted_list_entities])
 
-        # Ensure the parent ORM relationship is populated for deleted/active instances
-        assert all([isinstance(e.site, Site) for v_list in batch.models_by_batch_key.values() for e in v_list])
-        assert all(
-            [
-                isinstance(e.site, Site) or isinstance(e.site, ArchiveSite)  # ty:ignore[unresolved-attribute]
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent Site values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert all([r.site_id == r.original.site_id for r in all_records])
+        assert {r.site_id: (r.aggregator_id, r.timezone_id) for r in all_records} == {
+            1: (1, "Australia/Brisbane"),
+            2: (1, "Australia/Brisbane"),
+            70: (1, "43-str"),  # From the most recently deleted ArchiveSite (seed 33)
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all(
-            [e.max_w_value == e.site_der_rating_id for v_list in batch.deleted_by_batch_key.values() for e in v_list]
-        )
+        assert all([e.max_w_value == e.site_der_rating_id for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_der_availability_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -1715,13 +1725,14 @@ async def test_fetch_der_setting_by_timestamp(pg_base_config, timestamp: datetim
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_der_setting_by_changed_at(session, timestamp)
         assert_batched_entities(batch, SiteDERSetting, ArchiveSiteDERSetting, len(expected_ids), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda doe: doe.site_der_setting_id)
 
         for i in range(len(expected_ids)):
             assert list_entities[i].site_der_setting_id == expected_ids[i]
 
-        assert all([isinstance(e.site, Site) for e in list_entities]), "Site relationship populated"
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([r.site_id == r.original.site_id for r in list_records]), "parent site values populated"
 
 
 @pytest.mark.anyio
@@ -1837,30 +1848,31 @@ async def test_fetch_der_setting_by_timestamp_with_archive(pg_base_config):
             len(expected_active_setting_ids),
             len(expected_deleted_setting_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.site_der_setting_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.site_der_setting_id)
 
         assert set(expected_active_setting_ids) == set([e.site_der_setting_id for e in active_list_entities])
         assert set(expected_deleted_setting_ids) == set([e.site_der_setting_id for e in deleted_list_entities])
 
-        # Ensure the parent ORM relationship is populated for deleted/active instances
-        assert all([isinstance(e.site, Site) for v_list in batch.models_by_batch_key.values() for e in v_list])
-        assert all(
-            [
-                isinstance(e.site, Site) or isinstance(e.site, ArchiveSite)  # ty:ignore[unresolved-attribute]
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent Site values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert all([r.site_id == r.original.site_id for r in all_records])
+        assert {r.site_id: (r.aggregator_id, r.timezone_id) for r in all_records} == {
+            1: (1, "Australia/Brisbane"),
+            2: (1, "Australia/Brisbane"),
+            70: (1, "43-str"),  # From the most recently deleted ArchiveSite (seed 33)
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all(
-            [e.max_w_value == e.site_der_setting_id for v_list in batch.deleted_by_batch_key.values() for e in v_list]
-        )
+        assert all([e.max_w_value == e.site_der_setting_id for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_der_availability_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -1889,14 +1901,15 @@ async def test_fetch_der_status_by_timestamp(pg_base_config, timestamp: datetime
         # Need to unroll the batching into a single list (batching is tested elsewhere)
         batch = await fetch_der_status_by_changed_at(session, timestamp)
         assert_batched_entities(batch, SiteDERStatus, ArchiveSiteDERStatus, len(expected_ids), 0)
-        list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         list_entities.sort(key=lambda doe: doe.site_der_status_id)
 
         assert all([isinstance(e, SiteDERStatus) for e in list_entities])
         for i in range(len(expected_ids)):
             assert list_entities[i].site_der_status_id == expected_ids[i]
 
-        assert all([isinstance(e.site, Site) for e in list_entities]), "Site relationship populated"
+        list_records = [r for v_list in batch.models_by_batch_key.values() for r in v_list]
+        assert all([r.site_id == r.original.site_id for r in list_records]), "parent site values populated"
 
 
 @pytest.mark.anyio
@@ -2022,34 +2035,31 @@ async def test_fetch_der_status_by_timestamp_with_archive(pg_base_config):
             len(expected_active_status_ids),
             len(expected_deleted_status_ids),
         )
-        active_list_entities = [e for _, entities in batch.models_by_batch_key.items() for e in entities]
+        active_list_entities = [e.original for _, entities in batch.models_by_batch_key.items() for e in entities]
         active_list_entities.sort(key=lambda e: e.site_der_status_id)
 
-        deleted_list_entities = [e for _, entities in batch.deleted_by_batch_key.items() for e in entities]
+        deleted_list_entities = [e.original for _, entities in batch.deleted_by_batch_key.items() for e in entities]
         deleted_list_entities.sort(key=lambda e: e.site_der_status_id)
 
         assert set(expected_active_status_ids) == set([e.site_der_status_id for e in active_list_entities])
         assert set(expected_deleted_status_ids) == set([e.site_der_status_id for e in deleted_list_entities])
 
-        # Ensure the parent ORM relationship is populated for deleted/active instances
-        assert all([isinstance(e.site, Site) for v_list in batch.models_by_batch_key.values() for e in v_list])
-        assert all(
-            [
-                isinstance(e.site, Site) or isinstance(e.site, ArchiveSite)  # ty:ignore[unresolved-attribute]
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        # Ensure the parent Site values are populated for deleted/active instances
+        all_records = [
+            r
+            for v_list in chain(batch.models_by_batch_key.values(), batch.deleted_by_batch_key.values())
+            for r in v_list
+        ]
+        assert all([r.site_id == r.original.site_id for r in all_records])
+        assert {r.site_id: (r.aggregator_id, r.timezone_id) for r in all_records} == {
+            1: (1, "Australia/Brisbane"),
+            2: (1, "Australia/Brisbane"),
+            70: (1, "43-str"),  # From the most recently deleted ArchiveSite (seed 33)
+        }
 
         # Validate the deleted entities are the ones we expect (lean on the fact we setup a property on the
         # archive type in a particular way for the expected matches)
-        assert all(
-            [
-                e.manufacturer_status == f"ms{e.site_der_status_id}"
-                for v_list in batch.deleted_by_batch_key.values()
-                for e in v_list
-            ]
-        )
+        assert all([e.manufacturer_status == f"ms{e.site_der_status_id}" for e in deleted_list_entities])
 
         # Sanity check that a different timestamp yields nothing
         empty_batch = await fetch_der_availability_by_changed_at(session, timestamp - timedelta(milliseconds=50))
@@ -1,6 +1,6 @@
 import unittest.mock as mock
 from datetime import UTC, datetime
-from typing import cast
+from typing import Any, cast
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -17,12 +17,15 @@ from sqlalchemy import func, select, text
 
 from envoy.notification.crud.batch import AggregatorBatchedEntities, get_batch_key
 from envoy.notification.crud.common import (
+    SiteScopedEntity,
     SiteScopedFunctionSetAssignment,
     SiteScopedSiteControlGroup,
     SiteScopedSiteControlGroupDefault,
+    SiteScopedSiteReading,
     TResourceModel,
 )
 from envoy.notification.exception import NotificationError
+from envoy.notification.registry import SubscriptionRegistry
 from envoy.notification.task.check import (
     MAX_CHECK_ATTEMPTS,
     NON_LIST_RESOURCES,
@@ -44,7 +47,7 @@ from envoy.server.mapper.sep2.pub_sub import NotificationType, SubscriptionMappe
 from envoy.server.model.config.server import RuntimeServerConfig
 from envoy.server.model.doe import DynamicOperatingEnvelope
 from envoy.server.model.site import Site, SiteDERAvailability, SiteDERRating, SiteDERSetting, SiteDERStatus
-from envoy.server.model.site_reading import SiteReading, SiteReadingType
+from envoy.server.model.site_reading import SiteReading
 from envoy.server.model.subscription import (
     NotificationCheck,
     NotificationTransmit,
@@ -253,18 +256,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             Subscription(resource_type=SubscriptionResource.READING, scoped_site_id=2, conditions=[]),
             SubscriptionResource.READING,
             [
-                SiteReading(
-                    site_reading_id=1, site_reading_type_id=2, site_reading_type=SiteReadingType(site_id=2, group_id=11)
-                ),
-                SiteReading(
-                    site_reading_id=2, site_reading_type_id=1, site_reading_type=SiteReadingType(site_id=2, group_id=22)
-                ),
-                SiteReading(
-                    site_reading_id=3, site_reading_type_id=2, site_reading_type=SiteReadingType(site_id=1, group_id=11)
-                ),
-                SiteReading(
-                    site_reading_id=4, site_reading_type_id=3, site_reading_type=SiteReadingType(site_id=1, group_id=44)
-                ),
+                SiteScopedSiteReading(1, 2, 11, SiteReading(site_reading_id=1, site_reading_type_id=2)),
+                SiteScopedSiteReading(1, 2, 22, SiteReading(site_reading_id=2, site_reading_type_id=1)),
+                SiteScopedSiteReading(1, 1, 11, SiteReading(site_reading_id=3, site_reading_type_id=2)),
+                SiteScopedSiteReading(1, 1, 44, SiteReading(site_reading_id=4, site_reading_type_id=3)),
             ],
             [0, 1],
         ),
@@ -281,9 +276,24 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             Subscription(resource_type=SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE, resource_id=1, conditions=[]),
             SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
             [
-                DynamicOperatingEnvelope(dynamic_operating_envelope_id=1, site_id=1, site_control_group_id=1),
-                DynamicOperatingEnvelope(dynamic_operating_envelope_id=2, site_id=2, site_control_group_id=1),
-                DynamicOperatingEnvelope(dynamic_operating_envelope_id=3, site_id=1, site_control_group_id=2),
+                SiteScopedEntity(
+                    1,
+                    1,
+                    "Australia/Brisbane",
+                    DynamicOperatingEnvelope(dynamic_operating_envelope_id=1, site_id=1, site_control_group_id=1),
+                ),
+                SiteScopedEntity(
+                    1,
+                    2,
+                    "Australia/Brisbane",
+                    DynamicOperatingEnvelope(dynamic_operating_envelope_id=2, site_id=2, site_control_group_id=1),
+                ),
+                SiteScopedEntity(
+                    1,
+                    1,
+                    "Australia/Brisbane",
+                    DynamicOperatingEnvelope(dynamic_operating_envelope_id=3, site_id=1, site_control_group_id=2),
+                ),
             ],
             [0, 1],
         ),
@@ -291,10 +301,18 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             Subscription(resource_type=SubscriptionResource.TARIFF_GENERATED_RATE, resource_id=2, conditions=[]),
             SubscriptionResource.TARIFF_GENERATED_RATE,
             [
-                TariffGeneratedRate(tariff_generated_rate_id=1, site_id=2, tariff_id=2),
-                TariffGeneratedRate(tariff_generated_rate_id=2, site_id=2, tariff_id=1),
-                TariffGeneratedRate(tariff_generated_rate_id=3, site_id=1, tariff_id=2),
-                TariffGeneratedRate(tariff_generated_rate_id=4, site_id=1, tariff_id=1),
+                SiteScopedEntity(
+                    1, 2, "Australia/Brisbane", TariffGeneratedRate(tariff_generated_rate_id=1, site_id=2, tariff_id=2)
+                ),
+                SiteScopedEntity(
+                    1, 2, "Australia/Brisbane", TariffGeneratedRate(tariff_generated_rate_id=2, site_id=2, tariff_id=1)
+                ),
+                SiteScopedEntity(
+                    1, 1, "Australia/Brisbane", TariffGeneratedRate(tariff_generated_rate_id=3, site_id=1, tariff_id=2)
+                ),
+                SiteScopedEntity(
+                    1, 1, "Australia/Brisbane", TariffGeneratedRate(tariff_generated_rate_id=4, site_id=1, tariff_id=1)
+                ),
             ],
             [0, 2],
         ),
@@ -302,18 +320,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             Subscription(resource_type=SubscriptionResource.READING, resource_id=11, conditions=[]),
             SubscriptionResource.READING,
             [
-                SiteReading(
-                    site_reading_id=1, site_reading_type_id=2, site_reading_type=SiteReadingType(site_id=2, group_id=11)
-                ),
-                SiteReading(
-                    site_reading_id=2, site_reading_type_id=1, site_reading_type=SiteReadingType(site_id=2, group_id=22)
-                ),
-                SiteReading(
-                    site_reading_id=3, site_reading_type_id=2, site_reading_type=SiteReadingType(site_id=1, group_id=11)
-                ),
-                SiteReading(
-                    site_reading_id=4, site_reading_type_id=3, site_reading_type=SiteReadingType(site_id=1, group_id=44)
-                ),
+                SiteScopedSiteReading(1, 2, 11, SiteReading(site_reading_id=1, site_reading_type_id=2)),
+                SiteScopedSiteReading(1, 2, 22, SiteReading(site_reading_id=2, site_reading_type_id=1)),
+                SiteScopedSiteReading(1, 1, 11, SiteReading(site_reading_id=3, site_reading_type_id=2)),
+                SiteScopedSiteReading(1, 1, 44, SiteReading(site_reading_id=4, site_reading_type_id=3)),
             ],
             [0, 2],
         ),
@@ -322,7 +332,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
                 resource_type=SubscriptionResource.SITE_DER_STATUS, resource_id=PUBLIC_SITE_DER_ID, conditions=[]
             ),
             SubscriptionResource.SITE_DER_STATUS,
-            [SiteDERStatus(site_der_status_id=3), SiteDERStatus(site_der_status_id=4)],
+            [
+                SiteScopedEntity(1, 1, "Australia/Brisbane", SiteDERStatus(site_der_status_id=3)),
+                SiteScopedEntity(1, 1, "Australia/Brisbane", SiteDERStatus(site_der_status_id=4)),
+            ],
             [0, 1],  # DER uses a fixed site_der_id value
         ),
         (
@@ -330,7 +343,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
                 resource_type=SubscriptionResource.SITE_DER_STATUS, resource_id=PUBLIC_SITE_DER_ID + 1, conditions=[]
             ),
             SubscriptionResource.SITE_DER_STATUS,
-            [SiteDERStatus(site_der_status_id=3), SiteDERStatus(site_der_status_id=4)],
+            [
+                SiteScopedEntity(1, 1, "Australia/Brisbane", SiteDERStatus(site_der_status_id=3)),
+                SiteScopedEntity(1, 1, "Australia/Brisbane", SiteDERStatus(site_der_status_id=4)),
+            ],
             [],  # DER uses a fixed site_der_id value
         ),
         #
@@ -340,18 +356,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             Subscription(resource_type=SubscriptionResource.READING, resource_id=11, scoped_site_id=2, conditions=[]),
             SubscriptionResource.READING,
             [
-                SiteReading(
-                    site_reading_id=1, site_reading_type_id=2, site_reading_type=SiteReadingType(site_id=2, group_id=11)
-                ),
-                SiteReading(
-                    site_reading_id=2, site_reading_type_id=1, site_reading_type=SiteReadingType(site_id=2, group_id=22)
-                ),
-                SiteReading(
-                    site_reading_id=3, site_reading_type_id=2, site_reading_type=SiteReadingType(site_id=1, group_id=11)
-                ),
-                SiteReading(
-                    site_reading_id=4, site_reading_type_id=3, site_reading_type=SiteReadingType(site_id=1, group_id=44)
-                ),
+                SiteScopedSiteReading(1, 2, 11, SiteReading(site_reading_id=1, site_reading_type_id=2)),
+                SiteScopedSiteReading(1, 2, 22, SiteReading(site_reading_id=2, site_reading_type_id=1)),
+                SiteScopedSiteReading(1, 1, 11, SiteReading(site_reading_id=3, site_reading_type_id=2)),
+                SiteScopedSiteReading(1, 1, 44, SiteReading(site_reading_id=4, site_reading_type_id=3)),
             ],
             [0],
         ),
@@ -365,10 +373,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             ),
             SubscriptionResource.READING,
             [
-                SiteReading(site_reading_id=1, value=-10, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=2, value=-15, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=3, value=20, site_reading_type=SiteReadingType(site_id=1)),
-                SiteReading(site_reading_id=4, value=25, site_reading_type=SiteReadingType(site_id=1)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=1, value=-10)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=2, value=-15)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=3, value=20)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=4, value=25)),
             ],
             [0, 1, 2, 3],
         ),
@@ -381,10 +389,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             ),
             SubscriptionResource.READING,
             [
-                SiteReading(site_reading_id=1, value=-10, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=2, value=-15, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=3, value=20, site_reading_type=SiteReadingType(site_id=1)),
-                SiteReading(site_reading_id=4, value=25, site_reading_type=SiteReadingType(site_id=1)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=1, value=-10)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=2, value=-15)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=3, value=20)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=4, value=25)),
             ],
             [0, 1],
         ),
@@ -397,10 +405,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             ),
             SubscriptionResource.READING,
             [
-                SiteReading(site_reading_id=1, value=-10, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=2, value=-15, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=3, value=20, site_reading_type=SiteReadingType(site_id=1)),
-                SiteReading(site_reading_id=4, value=25, site_reading_type=SiteReadingType(site_id=1)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=1, value=-10)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=2, value=-15)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=3, value=20)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=4, value=25)),
             ],
             [3],
         ),
@@ -415,10 +423,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             ),
             SubscriptionResource.READING,
             [
-                SiteReading(site_reading_id=1, value=-10, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=2, value=-15, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=3, value=20, site_reading_type=SiteReadingType(site_id=1)),
-                SiteReading(site_reading_id=4, value=25, site_reading_type=SiteReadingType(site_id=1)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=1, value=-10)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=2, value=-15)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=3, value=20)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=4, value=25)),
             ],
             [1, 3],
         ),
@@ -434,10 +442,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             ),
             SubscriptionResource.READING,
             [
-                SiteReading(site_reading_id=1, value=-10, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=2, value=-15, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=3, value=20, site_reading_type=SiteReadingType(site_id=1)),
-                SiteReading(site_reading_id=4, value=25, site_reading_type=SiteReadingType(site_id=1)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=1, value=-10)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=2, value=-15)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=3, value=20)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=4, value=25)),
             ],
             [],
         ),
@@ -456,10 +464,10 @@ def test_get_entity_pages_der(resource: SubscriptionResource, notification_type:
             ),
             SubscriptionResource.READING,
             [
-                SiteReading(site_reading_id=1, value=-10, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=2, value=-15, site_reading_type=SiteReadingType(site_id=2)),
-                SiteReading(site_reading_id=3, value=20, site_reading_type=SiteReadingType(site_id=1)),
-                SiteReading(site_reading_id=4, value=25, site_reading_type=SiteReadingType(site_id=1)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=1, value=-10)),
+                SiteScopedSiteReading(1, 2, 1, SiteReading(site_reading_id=2, value=-15)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=3, value=20)),
+                SiteScopedSiteReading(1, 1, 1, SiteReading(site_reading_id=4, value=25)),
             ],
             [1, 3],
         ),
@@ -572,6 +580,31 @@ def test_all_entity_batches(input_changed: dict[tuple, list], input_deleted: dic
         assert matches[0][3] == NotificationType.ENTITY_DELETED
 
 
+def generate_notification_entity(resource: SubscriptionResource, entity_class: type, seed: int):
+    """Generates an instance of entity_class - wrapped in the same record that the batch fetchers use for resource"""
+
+    # Generate test instances - tweaking them if the generated values fall foul of pydantic range validation
+    e: Any = generate_class_instance(entity_class, seed=seed, generate_relationships=True)
+    if isinstance(e, SiteDERStatus):
+        cast(SiteDERStatus, e).state_of_charge_status = seed
+
+    if resource == SubscriptionResource.READING:
+        return SiteScopedSiteReading(seed + 1, seed + 2, seed + 3, e)
+    elif resource in SITE_SCOPED_ENTITY_RESOURCES:
+        return SiteScopedEntity(seed + 1, e.site_id, "Australia/Brisbane", e)
+    return e
+
+
+SITE_SCOPED_ENTITY_RESOURCES = {
+    SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
+    SubscriptionResource.TARIFF_GENERATED_RATE,
+    SubscriptionResource.SITE_DER_AVAILABILITY,
+    SubscriptionResource.SITE_DER_RATING,
+    SubscriptionResource.SITE_DER_SETTING,
+    SubscriptionResource.SITE_DER_STATUS,
+}
+
+
 @pytest.mark.parametrize(
     "resource, entity_class, sub_site_id_scope",
     [
@@ -613,7 +646,7 @@ def test_entities_to_notification_sites(  # noqa: C901
     pricing_reading_type = (
         PricingReadingType.EXPORT_ACTIVE_POWER_KWH if resource == SubscriptionResource.TARIFF_GENERATED_RATE else None
     )
-    batch_key = get_batch_key(resource, generate_class_instance(entity_class, generate_relationships=True))
+    batch_key = get_batch_key(resource, generate_notification_entity(resource, entity_class, 0))
     config = RuntimeServerConfig()
 
     # Try for various lengths (empty, singular, many)
@@ -621,11 +654,7 @@ def test_entities_to_notification_sites(  # noqa: C901
         for notification_type in [NotificationType.ENTITY_CHANGED, NotificationType.ENTITY_DELETED]:
             entities = []
             for i in range(entity_length):
-                # Generate test instances - tweaking them if the generated values fall foul of pydantic range validation
-                e = generate_class_instance(entity_class, seed=i, generate_relationships=True)
-                if isinstance(e, SiteDERStatus):
-                    cast(SiteDERStatus, e).state_of_charge_status = i
-                entities.append(e)
+                entities.append(generate_notification_entity(resource, entity_class, i))
 
             notification = entities_to_notification(
                 resource, sub, batch_key, href_prefix, notification_type, entities, pricing_reading_type, config
@@ -698,23 +727,27 @@ def test_entities_to_notification_sites(  # noqa: C901
             elif resource == SubscriptionResource.SITE_DER_AVAILABILITY and entity_length:
                 assert notification.resource is not None
                 assert notification.resource.statWAvail is not None
-                assert notification.resource.statWAvail.value == entities[0].estimated_w_avail_value
+                assert notification.resource.statWAvail.value == entities[0].original.estimated_w_avail_value
                 assert expected_sub_resource_href_snippet is not None
                 assert expected_sub_resource_href_snippet in notification.subscribedResource
             elif resource == SubscriptionResource.SITE_DER_RATING and entity_length:
                 assert notification.resource is not None
-                assert_hex_binary_enum_matches(notification.resource.doeModesSupported, entities[0].doe_modes_supported)
+                assert_hex_binary_enum_matches(
+                    notification.resource.doeModesSupported, entities[0].original.doe_modes_supported
+                )
                 assert expected_sub_resource_href_snippet is not None
                 assert expected_sub_resource_href_snippet in notification.subscribedResource
             elif resource == SubscriptionResource.SITE_DER_SETTING and entity_length:
                 assert notification.resource is not None
-                assert_hex_binary_enum_matches(notification.resource.doeModesEnabled, entities[0].doe_modes_enabled)
+                assert_hex_binary_enum_matches(
+                    notification.resource.doeModesEnabled, entities[0].original.doe_modes_enabled
+                )
                 assert expected_sub_resource_href_snippet is not None
                 assert expected_sub_resource_href_snippet in notification.subscribedResource
             elif resource == SubscriptionResource.SITE_DER_STATUS and entity_length:
                 assert notification.resource is not None
                 assert notification.resource.inverterStatus is not None
-                assert notification.resource.inverterStatus.value == entities[0].inverter_status
+                assert notification.resource.inverterStatus.value == entities[0].original.inverter_status
                 assert expected_sub_resource_href_snippet is not None
                 assert expected_sub_resource_href_snippet in notification.subscribedResource
             elif resource == SubscriptionResource.FUNCTION_SET_ASSIGNMENTS and entity_length:
@@ -756,11 +789,9 @@ def find_transmit(transmits: list[NotificationTransmit], remote_uri: str) -> Not
 
 @pytest.mark.anyio
 @mock.patch("envoy.notification.task.check.entities_serviced_by_subscription")
-@mock.patch("envoy.notification.task.check.select_subscriptions_for_resource")
 @mock.patch("envoy.notification.task.check.fetch_batched_entities")
 async def test_check_db_change_or_delete(
     mock_fetch_batched_entities: mock.MagicMock,
-    mock_select_subscriptions_for_resource: mock.MagicMock,
     mock_entities_serviced_by_subscription: mock.MagicMock,
 ):
     """Runs through the bulk of check_db_change_or_delete to ensure that the expected notifications are raised"""
@@ -787,16 +818,34 @@ async def test_check_db_change_or_delete(
     batch1_entity2.site_id = batch1_entity1.site_id
     batch1_entity2.site.site_id = batch1_entity1.site.site_id
     batch1_entity2.site.aggregator_id = batch1_entity1.site.aggregator_id
-    entities = AggregatorBatchedEntities(timestamp, resource, [batch1_entity1, batch1_entity2, batch2_entity1], [])
+    entities = AggregatorBatchedEntities(
+        timestamp,
+        resource,
+        [
+            SiteScopedEntity(e.site.aggregator_id, e.site_id, "Australia/Brisbane", e)
+            for e in [batch1_entity1, batch1_entity2, batch2_entity1]
+        ],  # ty:ignore[invalid-argument-type]
+        [],
+    )
     mock_fetch_batched_entities.return_value = entities
 
     # Create some subscriptions for the two aggregators we implied above
     agg1_sub1: Subscription = generate_class_instance(Subscription, seed=11)  # Matches nothing
     agg1_sub2: Subscription = generate_class_instance(Subscription, seed=22, optional_is_none=True)
-    agg2_sub1: Subscription = generate_class_instance(Subscription, seed=33)
-    mock_select_subscriptions_for_resource.side_effect = lambda session, agg_id, resource: (
-        [agg1_sub1, agg1_sub2] if agg_id == batch1_entity1.site.aggregator_id else [agg2_sub1]
+    agg2_sub1: Subscription = generate_class_instance(Subscription, seed=33, scoped_site_id=None, resource_id=None)
+    agg1_other_resource: Subscription = generate_class_instance(
+        Subscription, seed=44, scoped_site_id=None, resource_id=None, resource_type=SubscriptionResource.READING
+    )  # Different resource type - will never be considered
+    agg1_sub1.aggregator_id = agg1_sub2.aggregator_id = agg1_other_resource.aggregator_id = (
+        batch1_entity1.site.aggregator_id
     )
+    agg1_sub1.scoped_site_id = batch1_entity1.site_id
+    agg1_sub1.resource_id = None
+    agg2_sub1.aggregator_id = batch2_entity1.site.aggregator_id
+    agg1_sub1.resource_type = agg1_sub2.resource_type = agg2_sub1.resource_type = resource
+    registry = SubscriptionRegistry()
+    for sub in [agg1_sub1, agg1_sub2, agg2_sub1, agg1_other_resource]:
+        registry.add(sub)
 
     # Configure what entities are serviced by what subscription
     # agg1_sub1 will match nothing but all other subs will match every entity
@@ -820,6 +869,7 @@ async def test_check_db_change_or_delete(
         timestamp=timestamp,
         href_prefix=href_prefix,
         config=config,
+        registry=registry,
     )
 
     #
@@ -846,14 +896,10 @@ async def test_check_db_change_or_delete(
 
     mock_fetch_batched_entities.assert_called_once_with(mock_session, resource, timestamp)
 
-    # Subscriptions should only be fetched ONCE for each aggregator
-    assert mock_select_subscriptions_for_resource.call_count == 2
-    assert (mock_session, batch1_entity1.site.aggregator_id, resource) in [
-        ca.args for ca in mock_select_subscriptions_for_resource.call_args_list
-    ]
-    assert (mock_session, batch2_entity1.site.aggregator_id, resource) in [
-        ca.args for ca in mock_select_subscriptions_for_resource.call_args_list
-    ]
+    # Only the candidate subscriptions (for the batch aggregator/resource) should have been considered
+    considered_subs = [ca.args[0] for ca in mock_entities_serviced_by_subscription.call_args_list]
+    assert len(considered_subs) == 3
+    assert agg1_other_resource not in considered_subs
 
     # check_db_change_or_delete must NOT commit - the caller (process_check_batch) owns the transaction
     assert_mock_session(mock_session, committed=False)
@@ -881,11 +927,9 @@ async def test_check_db_change_or_delete(
 
 @pytest.mark.anyio
 @mock.patch("envoy.notification.task.check.entities_serviced_by_subscription")
-@mock.patch("envoy.notification.task.check.select_subscriptions_for_resource")
 @mock.patch("envoy.notification.task.check.fetch_batched_entities")
 async def test_check_db_change_or_delete_rates(
     mock_fetch_batched_entities: mock.MagicMock,
-    mock_select_subscriptions_for_resource: mock.MagicMock,
     mock_entities_serviced_by_subscription: mock.MagicMock,
 ):
     """Runs through the bulk of check_db_change_or_delete to ensure that the expected notifications are raised"""
@@ -909,15 +953,24 @@ async def test_check_db_change_or_delete_rates(
 
     rate1.start_time = datetime(2022, 4, 6, 14, 0, 0, tzinfo=ZoneInfo("Australia/Brisbane"))
     rate2.start_time = datetime(2022, 4, 6, 14, 5, 0, tzinfo=ZoneInfo("Australia/Brisbane"))
-    entities = AggregatorBatchedEntities(timestamp, resource, [rate1, rate2], [])
+    scoped_rates = [SiteScopedEntity(e.site.aggregator_id, e.site_id, "Australia/Brisbane", e) for e in [rate1, rate2]]
+    entities = AggregatorBatchedEntities(timestamp, resource, scoped_rates, [])  # ty:ignore[invalid-argument-type]
     mock_fetch_batched_entities.return_value = entities
 
     # Create a single sub
-    sub1: Subscription = generate_class_instance(Subscription, seed=11)
-    mock_select_subscriptions_for_resource.return_value = [sub1]
+    sub1: Subscription = generate_class_instance(
+        Subscription,
+        seed=11,
+        aggregator_id=rate1.site.aggregator_id,
+        resource_type=resource,
+        scoped_site_id=None,
+        resource_id=None,
+    )
+    registry = SubscriptionRegistry()
+    registry.add(sub1)
 
     # Configure what entities are serviced by what subscription
-    mock_entities_serviced_by_subscription.return_value = (e for e in [rate1, rate2])
+    mock_entities_serviced_by_subscription.return_value = (e for e in scoped_rates)
 
     # Create runtime server config
     config: RuntimeServerConfig = generate_class_instance(RuntimeServerConfig)
@@ -931,6 +984,7 @@ async def test_check_db_change_or_delete_rates(
         timestamp=timestamp,
         href_prefix=href_prefix,
         config=config,
+        registry=registry,
     )
 
     #
@@ -945,8 +999,7 @@ async def test_check_db_change_or_delete_rates(
 
     mock_fetch_batched_entities.assert_called_once_with(mock_session, resource, timestamp)
 
-    # Subscriptions should only be fetched ONCE for each aggregator
-    mock_select_subscriptions_for_resource.assert_called_once_with(mock_session, rate1.site.aggregator_id, resource)
+    mock_entities_serviced_by_subscription.assert_called_once()
 
     # check_db_change_or_delete must NOT commit - the caller (process_check_batch) owns the transaction
     assert_mock_session(mock_session, committed=False)
@@ -1044,7 +1097,7 @@ async def test_process_check_batch_isolates_failure_and_retries(pg_empty_config)
         session.add(NotificationCheck(resource_type=SubscriptionResource.READING, changed_time=datetime.now(tz=UTC)))
         await session.commit()
 
-    async def fake_check(session, resource, timestamp, href_prefix, config):
+    async def fake_check(session, resource, timestamp, href_prefix, config, registry):
         if resource == SubscriptionResource.READING:
             await session.execute(text("SELECT * FROM table_that_does_not_exist"))
 
@@ -1078,7 +1131,7 @@ async def test_process_check_batch_drops_after_max_attempts(pg_empty_config):
         )
         await session.commit()
 
-    async def fake_check(session, resource, timestamp, href_prefix, config):
+    async def fake_check(session, resource, timestamp, href_prefix, config, registry):
         raise RuntimeError("boom")
 
     engine_state = SingleAsyncEngineState(pg_empty_config)
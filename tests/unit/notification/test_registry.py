@@ -0,0 +1,161 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+from assertical.fixtures.postgres import generate_async_session
+from sqlalchemy import delete, update
+
+from envoy.notification.registry import FULL_RELOAD_INTERVAL, SubscriptionRegistry
+from envoy.server.crud.subscription import delete_subscription_for_site, upsert_subscription
+from envoy.server.model.subscription import Subscription, SubscriptionCondition, SubscriptionResource
+
+
+def sub(
+    subscription_id: int,
+    aggregator_id: int,
+    resource_type: SubscriptionResource,
+    scoped_site_id: int | None,
+    resource_id: int | None,
+) -> Subscription:
+    return generate_class_instance(
+        Subscription,
+        seed=subscription_id,
+        subscription_id=subscription_id,
+        aggregator_id=aggregator_id,
+        resource_type=resource_type,
+        scoped_site_id=scoped_site_id,
+        resource_id=resource_id,
+    )
+
+
+def test_subscription_registry_candidates():
+    doe = SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE
+    registry = SubscriptionRegistry()
+    for s in [
+        sub(1, 1, doe, None, None),  # Everything for agg 1
+        sub(2, 1, doe, 11, None),  # Site 11 for agg 1
+        sub(3, 1, doe, 11, 101),  # Site 11 group 101 for agg 1
+        sub(4, 1, doe, None, 102),  # Group 102 for agg 1
+        sub(5, 1, doe, 12, None),  # Site 12 for agg 1
+        sub(6, 1, SubscriptionResource.READING, None, None),  # Different resource
+        sub(7, 2, doe, None, None),  # Different aggregator
+    ]:
+        registry.add(s)
+
+    def candidate_ids(agg_id: int, scopes) -> list[int]:
+        return [s.subscription_id for s in registry.candidates(agg_id, doe, scopes)]
+
+    assert len(registry) == 7
+    assert candidate_ids(1, None) == [1, 2, 3, 4, 5]
+    assert candidate_ids(1, {(11, 101)}) == [1, 2, 3]
+    assert candidate_ids(1, {(11, 102)}) == [1, 2, 4]
+    assert candidate_ids(1, {(12, 101), (13, 102)}) == [1, 4, 5]
+    assert candidate_ids(1, {(99, 999)}) == [1]
+    assert candidate_ids(2, {(11, 101)}) == [7]
+    assert candidate_ids(3, None) == []
+
+    # Replacing / removing updates the index
+    registry.add(sub(3, 1, doe, 12, 101))
+    assert candidate_ids(1, {(11, 101)}) == [1, 2]
+    assert candidate_ids(1, {(12, 101)}) == [1, 3, 5]
+
+    assert registry.remove(1)
+    assert not registry.remove(1)
+    assert registry.remove(7)
+    assert candidate_ids(1, None) == [2, 3, 4, 5]
+    assert candidate_ids(2, None) == []
+    assert len(registry) == 5
+
+
+@pytest.mark.anyio
+async def test_subscription_registry_refresh(pg_base_config):
+    """Tests that refresh picks up inserts, renewals and deletes incrementally"""
+    registry = SubscriptionRegistry()
+
+    async with generate_async_session(pg_base_config) as session:
+        await registry.refresh(session)
+    assert len(registry) == 5
+    assert registry.version == 1
+    reading_subs = registry.candidates(1, SubscriptionResource.READING, None)
+    assert [s.subscription_id for s in reading_subs] == [5]
+    assert len(reading_subs[0].conditions) == 2, "Conditions are loaded (and remain usable once detached)"
+
+    # Nothing has changed - version should be stable
+    async with generate_async_session(pg_base_config) as session:
+        await registry.refresh(session)
+    assert registry.version == 1
+
+    # Now make some changes: insert a new sub, renew sub 5 (dropping conditions) and delete sub 2
+    now = datetime.now(tz=UTC)
+    async with generate_async_session(pg_base_config) as session:
+        new_sub_id = await upsert_subscription(
+            session,
+            Subscription(
+                aggregator_id=2,
+                changed_time=now,
+                resource_type=SubscriptionResource.SITE,
+                scoped_site_id=None,
+                resource_id=None,
+                notification_uri="https://new.example/",
+                entity_limit=10,
+                conditions=[],
+            ),
+        )
+        await upsert_subscription(
+            session,
+            Subscription(
+                aggregator_id=1,
+                changed_time=now,
+                resource_type=SubscriptionResource.READING,
+                scoped_site_id=None,
+                resource_id=1,
+                notification_uri="https://renewed.example/",
+                entity_limit=10,
+                conditions=[],
+            ),
+        )
+        assert await delete_subscription_for_site(session, 1, None, 2, now)
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        await registry.refresh(session)
+    assert registry.version == 2
+    assert len(registry) == 5
+    assert [s.subscription_id for s in registry.candidates(2, SubscriptionResource.SITE, None)] == [new_sub_id]
+    assert registry.candidates(1, SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE, None) == []
+    reading_subs = registry.candidates(1, SubscriptionResource.READING, None)
+    assert [s.subscription_id for s in reading_subs] == [5]
+    assert reading_subs[0].notification_uri == "https://renewed.example/"
+    assert reading_subs[0].conditions == []
+
+
+@pytest.mark.anyio
+async def test_subscription_registry_full_reload(pg_base_config):
+    """Changes that sneak past the incremental refresh are picked up by the periodic full reload"""
+    registry = SubscriptionRegistry()
+    async with generate_async_session(pg_base_config) as session:
+        await registry.refresh(session)
+    assert len(registry) == 5
+
+    # Out of band changes (not visible to the incremental refresh) - backdated changed_time / no archive
+    async with generate_async_session(pg_base_config) as session:
+        await session.execute(delete(SubscriptionCondition))
+        await session.execute(delete(Subscription).where(Subscription.subscription_id == 1))
+        await session.execute(
+            update(Subscription)
+            .where(Subscription.subscription_id == 3)
+            .values(changed_time=datetime(2000, 1, 1, tzinfo=UTC))
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        await registry.refresh(session)
+    assert len(registry) == 5
+
+    with mock.patch("envoy.notification.registry.utc_now") as mock_utc_now:
+        mock_utc_now.return_value = datetime.now(tz=UTC) + FULL_RELOAD_INTERVAL + timedelta(seconds=1)
+        async with generate_async_session(pg_base_config) as session:
+            await registry.refresh(session)
+    assert len(registry) == 4
+    assert [s.subscription_id for s in registry.candidates(1, SubscriptionResource.SITE, None)] == [4]
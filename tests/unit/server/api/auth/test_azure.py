@@ -17,6 +17,7 @@ from envoy.server.api.auth.azure import (
     AzureADResourceTokenConfig,
     AzureADToken,
     UnableToContactAzureServicesError,
+    ValidatedTokenCache,
     parse_from_jwks_json,
     request_azure_ad_token,
     update_azure_ad_token_cache,
@@ -26,6 +27,7 @@ from envoy.server.api.auth.azure import (
 from envoy.server.api.auth.jwks import JWK
 from envoy.server.cache import ExpiringValue
 from envoy.server.exception import UnauthorizedError
+from envoy.server.metrics import MetricsRegistry
 from tests.unit.jwt import (
     DEFAULT_CLIENT_ID,
     DEFAULT_ISSUER,
@@ -253,12 +255,117 @@ async def test_validate_azure_ad_token(
         with pytest.raises(expected_error):
             await validate_azure_ad_token(cfg, mock_cache, token.token)
     else:
-        await validate_azure_ad_token(cfg, mock_cache, token.token)
+        claims = await validate_azure_ad_token(cfg, mock_cache, token.token)
+        assert isinstance(claims, dict)
+        assert claims["aud"] == DEFAULT_CLIENT_ID
+        assert claims["iss"] == DEFAULT_ISSUER
+        assert isinstance(claims["exp"], int)
 
     # Assert
     mock_cache.get_value.assert_called_once_with(cfg, expected_kid)
 
 
+def test_validated_token_cache_hits_and_misses():
+    """Tests the basic put/get behaviour of ValidatedTokenCache (and that the metrics are tracked)"""
+    cache = ValidatedTokenCache(max_size=10, expiry_buffer_seconds=30)
+    exp = int((datetime.now(tz=UTC) + timedelta(hours=1)).timestamp())
+    claims = {"aud": "abc", "exp": exp}
+
+    assert cache.hit_rate == 0.0
+    assert cache.get("token-1") is None
+    cache.put("token-1", claims)
+    assert len(cache) == 1
+    assert cache.get("token-1") == claims
+    assert cache.get("token-1") == claims
+    assert cache.get("token-2") is None
+
+    assert cache.hits == 2
+    assert cache.misses == 2
+    assert cache.hit_rate == 0.5
+    assert cache.evictions == 0
+
+    assert all([k != b"token-1" for k in cache._cache.keys()]), "Raw tokens should not be retained"
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("token-1") is None
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {},
+        {"exp": "not-a-number"},
+        {"exp": True},
+        {"exp": int((datetime.now(tz=UTC) + timedelta(seconds=-5)).timestamp())},  # Already expired
+        {"exp": int((datetime.now(tz=UTC) + timedelta(seconds=10)).timestamp())},  # Expires within buffer
+    ],
+)
+def test_validated_token_cache_unsafe_expiry(claims: dict):
+    """Tokens without a usable expiry should never be cached"""
+    cache = ValidatedTokenCache(max_size=10, expiry_buffer_seconds=30)
+    cache.put("token-1", claims)
+    assert len(cache) == 0
+    assert cache.get("token-1") is None
+
+
+def test_validated_token_cache_expiry_buffer():
+    """Cached tokens expire expiry_buffer_seconds before their exp claim"""
+    cache = ValidatedTokenCache(max_size=10, expiry_buffer_seconds=30)
+    now = datetime.now(tz=UTC)
+    cache.put("token-1", {"exp": int((now + timedelta(seconds=60)).timestamp())})
+    assert cache.get("token-1") is not None
+
+    with mock.patch("envoy.server.api.auth.azure.utc_now") as mock_utc_now:
+        mock_utc_now.return_value = now + timedelta(seconds=45)
+        with mock.patch("envoy.server.cache.utc_now", mock_utc_now):
+            assert cache.get("token-1") is None
+    assert len(cache) == 0, "Expired tokens are removed on access"
+
+
+def test_validated_token_cache_bounded():
+    """The least recently used tokens should be evicted once max_size is reached"""
+    cache = ValidatedTokenCache(max_size=2, expiry_buffer_seconds=0)
+    exp = int((datetime.now(tz=UTC) + timedelta(hours=1)).timestamp())
+
+    cache.put("token-1", {"exp": exp, "id": 1})
+    cache.put("token-2", {"exp": exp, "id": 2})
+    assert cache.get("token-1") is not None  # token-2 is now the least recently used
+    cache.put("token-3", {"exp": exp, "id": 3})
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get("token-2") is None
+    assert cache.get("token-1") == {"exp": exp, "id": 1}
+    assert cache.get("token-3") == {"exp": exp, "id": 3}
+
+
+def test_validated_token_cache_exports_metrics():
+    """Lookups and evictions are exported through the metrics registry (when metrics are enabled)"""
+    registry = MetricsRegistry()
+    cache = ValidatedTokenCache(max_size=1, expiry_buffer_seconds=0)
+    exp = int((datetime.now(tz=UTC) + timedelta(hours=1)).timestamp())
+
+    with mock.patch("envoy.server.api.auth.azure.get_metrics_registry", return_value=registry):
+        assert cache.get("token-1") is None
+        cache.put("token-1", {"exp": exp})
+        assert cache.get("token-1") is not None
+        assert cache.get("token-1") is not None
+        cache.put("token-2", {"exp": exp})
+
+    assert registry.azure_ad_token_cache_lookups.values == {("hit",): 2, ("miss",): 1}
+    assert registry.azure_ad_token_cache_evictions.values == {(): 1}
+    rendered = registry.render()
+    assert 'envoy_azure_ad_token_cache_lookups_total{result="hit"} 2' in rendered
+    assert "envoy_azure_ad_token_cache_evictions_total 1" in rendered
+
+    # Without metrics enabled - only the cache's own counters are updated
+    with mock.patch("envoy.server.api.auth.azure.get_metrics_registry", return_value=None):
+        assert cache.get("token-2") is not None
+    assert cache.hits == 3
+    assert registry.azure_ad_token_cache_lookups.values == {("hit",): 2, ("miss",): 1}
+
+
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.auth.azure.AsyncClient")
 async def test_request_azure_ad_token(mock_AsyncClient: mock.MagicMock):
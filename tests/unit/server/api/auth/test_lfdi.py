@@ -1,5 +1,5 @@
 import unittest.mock as mock
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 
 import pytest
 from assertical.asserts.type import assert_dict_type
@@ -7,7 +7,11 @@ from assertical.fake.asyncio import create_async_result
 from assertical.fake.generator import generate_class_instance
 from assertical.fake.sqlalchemy import assert_mock_session, create_mock_session
 
-from envoy.server.api.depends.lfdi_auth import update_client_id_details_cache
+from envoy.server.api.depends.lfdi_auth import (
+    client_id_details_cache_expiry,
+    update_client_id_details_cache,
+    update_client_id_details_cache_entry,
+)
 from envoy.server.cache import ExpiringValue
 from envoy.server.crud.auth import ClientIdDetails
 
@@ -67,3 +71,79 @@ async def test_update_client_id_details_cache(
     assert_mock_session(mock_session)
     mock_db.return_value.__aenter__.assert_called_once()
     mock_db.return_value.__aexit__.assert_called_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "client_details, expected",
+    [
+        (None, None),
+        (cid(1), ExpiringValue(dt(1), cid(1))),
+    ],
+)
+@mock.patch("envoy.server.api.depends.lfdi_auth.db")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
+async def test_update_client_id_details_cache_entry(
+    mock_select_client_id_details: mock.MagicMock,
+    mock_db: mock.MagicMock,
+    client_details: ClientIdDetails | None,
+    expected: ExpiringValue[ClientIdDetails] | None,
+):
+    """Similar to test_update_client_id_details_cache but only a single lfdi is being fetched"""
+    # arrange
+    mock_session = create_mock_session()
+    mock_db.session = mock_session
+    mock_db.return_value = mock.Mock()
+    mock_db.return_value.__aenter__ = mock.Mock(return_value=create_async_result(None))
+    mock_db.return_value.__aexit__ = mock.Mock(return_value=create_async_result(None))
+
+    mock_select_client_id_details.return_value = client_details
+
+    # act
+    result = await update_client_id_details_cache_entry(None, "abc123")
+
+    # assert
+    assert expected == result
+
+    mock_select_client_id_details.assert_called_once_with(mock_session, "abc123")
+    assert_mock_session(mock_session)
+    mock_db.return_value.__aenter__.assert_called_once()
+    mock_db.return_value.__aexit__.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "cert_expiry, cache_ttl_seconds, expected",
+    [
+        (datetime(2037, 1, 1, tzinfo=UTC), None, datetime(2037, 1, 1, tzinfo=UTC)),  # No ttl - cert expiry
+        (datetime(2037, 1, 1, tzinfo=UTC), 60, datetime(2024, 1, 2, 3, 5, 5, tzinfo=UTC)),  # Capped by the ttl
+        (datetime(2024, 1, 2, 3, 4, 30, tzinfo=UTC), 60, datetime(2024, 1, 2, 3, 4, 30, tzinfo=UTC)),  # Cert first
+        (datetime(2023, 1, 1, tzinfo=UTC), 60, datetime(2023, 1, 1, tzinfo=UTC)),  # Already expired
+    ],
+)
+@mock.patch("envoy.server.api.depends.lfdi_auth.utc_now")
+def test_client_id_details_cache_expiry(
+    mock_utc_now: mock.MagicMock, cert_expiry: datetime, cache_ttl_seconds: float | None, expected: datetime
+):
+    mock_utc_now.return_value = datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+    cid = generate_class_instance(ClientIdDetails, expiry=cert_expiry)
+    assert client_id_details_cache_expiry(cid, cache_ttl_seconds) == expected
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.api.depends.lfdi_auth.db")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
+async def test_update_client_id_details_cache_entry_ttl(
+    mock_select_client_id_details: mock.MagicMock, mock_db: mock.MagicMock
+):
+    """Cache entries should be reloaded after the cache ttl - even if the certificate hasn't expired"""
+    mock_db.return_value = mock.Mock()
+    mock_db.return_value.__aenter__ = mock.Mock(return_value=create_async_result(None))
+    mock_db.return_value.__aexit__ = mock.Mock(return_value=create_async_result(None))
+    details = generate_class_instance(ClientIdDetails, expiry=datetime(2037, 1, 1, tzinfo=UTC))
+    mock_select_client_id_details.return_value = details
+
+    before = datetime.now(tz=UTC)
+    result = await update_client_id_details_cache_entry(30, "abc123")
+    assert result is not None and result.expiry is not None
+    assert result.value is details
+    assert before + timedelta(seconds=30) <= result.expiry <= datetime.now(tz=UTC) + timedelta(seconds=30)
@@ -1,4 +1,5 @@
 import unittest.mock as mock
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
 
 import jwt
@@ -34,6 +35,59 @@ async def test_valid_auth(mock_validate_azure_ad_token: mock.MagicMock):
     mock_validate_azure_ad_token.assert_called_once_with(expected_cfg, depends.cache, raw_token)
 
 
+@pytest.mark.anyio
+@mock.patch("envoy.server.api.depends.azure_ad_auth.validate_azure_ad_token")
+async def test_valid_auth_cached(mock_validate_azure_ad_token: mock.MagicMock):
+    """Makes sure that once a token is validated - subsequent requests with the same token are served from cache"""
+    raw_token = "abc123-DEF=="
+    other_token = "def456-GHI=="
+    tenant_id = "tenant-id-123"
+    client_id = "client-id-132"
+    valid_issuer = "valid-issuer-12456"
+    expected_cfg = AzureADManagedIdentityConfig(tenant_id=tenant_id, client_id=client_id, valid_issuer=valid_issuer)
+
+    mock_validate_azure_ad_token.return_value = {
+        "aud": client_id,
+        "exp": int((datetime.now(tz=UTC) + timedelta(hours=1)).timestamp()),
+    }
+
+    def make_request(token: str) -> Request:
+        return Request({"type": "http", "headers": Headers({"Authorization": f"Bearer {token}"}).raw})
+
+    depends = AzureADAuthDepends(tenant_id, client_id, valid_issuer)
+
+    await depends(make_request(raw_token))
+    await depends(make_request(raw_token))
+    await depends(make_request(raw_token))
+    mock_validate_azure_ad_token.assert_called_once_with(expected_cfg, depends.cache, raw_token)
+
+    await depends(make_request(other_token))
+    assert mock_validate_azure_ad_token.call_count == 2
+    mock_validate_azure_ad_token.assert_called_with(expected_cfg, depends.cache, other_token)
+
+    assert depends.token_cache.hits == 2
+    assert depends.token_cache.misses == 2
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.api.depends.azure_ad_auth.validate_azure_ad_token")
+async def test_invalid_auth_not_cached(mock_validate_azure_ad_token: mock.MagicMock):
+    """Failed validations should never be cached"""
+    raw_token = "abc123-DEF=="
+    req = Request({"type": "http", "headers": Headers({"Authorization": f"Bearer {raw_token}"}).raw})
+    mock_validate_azure_ad_token.side_effect = jwt.InvalidSignatureError("mock exception")
+
+    depends = AzureADAuthDepends("tenant-id-123", "client-id-132", "valid-issuer-12456")
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as ex:
+            await depends(req)
+        assert ex.value.status_code == HTTPStatus.FORBIDDEN
+
+    assert mock_validate_azure_ad_token.call_count == 2
+    assert len(depends.token_cache) == 0
+
+
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.azure_ad_auth.validate_azure_ad_token")
 async def test_missing_auth(mock_validate_azure_ad_token: mock.MagicMock):
@@ -62,7 +62,7 @@ async def test_lfdiauthdepends_request_with_no_certpemheader_expect_500_response
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.lfdi_auth.select_single_site_with_sfdi")
-@mock.patch("envoy.server.api.depends.lfdi_auth.select_all_client_id_details")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
 @mock.patch("envoy.server.api.depends.lfdi_auth.db")
 @pytest.mark.parametrize(
     "bad_cert_header",
@@ -70,7 +70,7 @@ async def test_lfdiauthdepends_request_with_no_certpemheader_expect_500_response
 )
 async def test_lfdiauthdepends_malformed_cert_fails_with_internal_server_error(
     mock_db: mock.MagicMock,
-    mock_select_all_client_id_details: mock.MagicMock,
+    mock_select_client_id_details: mock.MagicMock,
     mock_select_single_site_with_sfdi: mock.MagicMock,
     bad_cert_header: str,
 ):
@@ -93,21 +93,21 @@ async def test_lfdiauthdepends_malformed_cert_fails_with_internal_server_error(
 
     # Assert
     assert exc.value.status_code == 500
-    mock_select_all_client_id_details.assert_not_called()
+    mock_select_client_id_details.assert_not_called()
     mock_select_single_site_with_sfdi.assert_not_called()
 
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.lfdi_auth.select_single_site_with_sfdi")
-@mock.patch("envoy.server.api.depends.lfdi_auth.select_all_client_id_details")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
 @mock.patch("envoy.server.api.depends.lfdi_auth.db")
 async def test_lfdiauthdepends_unregistered_cert_no_device_registration(
     mock_db: mock.MagicMock,
-    mock_select_all_client_id_details: mock.MagicMock,
+    mock_select_client_id_details: mock.MagicMock,
     mock_select_single_site_with_sfdi: mock.MagicMock,
 ):
     # Arrange
-    mock_select_all_client_id_details.return_value = []
+    mock_select_client_id_details.return_value = None
     mock_select_single_site_with_sfdi.return_value = None
     req = Request(
         {
@@ -124,21 +124,21 @@ async def test_lfdiauthdepends_unregistered_cert_no_device_registration(
 
     # Assert
     assert exc.value.status_code == 403
-    mock_select_all_client_id_details.assert_called_once()
+    mock_select_client_id_details.assert_called_once()
     mock_select_single_site_with_sfdi.assert_not_called()
 
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.lfdi_auth.select_single_site_with_sfdi")
-@mock.patch("envoy.server.api.depends.lfdi_auth.select_all_client_id_details")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
 @mock.patch("envoy.server.api.depends.lfdi_auth.db")
 async def test_lfdiauthdepends_unregistered_cert_with_device_registration(
     mock_db: mock.MagicMock,
-    mock_select_all_client_id_details: mock.MagicMock,
+    mock_select_client_id_details: mock.MagicMock,
     mock_select_single_site_with_sfdi: mock.MagicMock,
 ):
     # Arrange
-    mock_select_all_client_id_details.return_value = []
+    mock_select_client_id_details.return_value = None
     mock_select_single_site_with_sfdi.return_value = None
     req = Request(
         {
@@ -159,23 +159,23 @@ async def test_lfdiauthdepends_unregistered_cert_with_device_registration(
     assert req.state.lfdi == TEST_CERTIFICATE_LFDI_1
     assert req.state.sfdi == int(TEST_CERTIFICATE_SFDI_1)
 
-    mock_select_all_client_id_details.assert_called_once()
+    mock_select_client_id_details.assert_called_once()
     mock_select_single_site_with_sfdi.assert_called_once()
 
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.lfdi_auth.select_single_site_with_sfdi")
-@mock.patch("envoy.server.api.depends.lfdi_auth.select_all_client_id_details")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
 @mock.patch("envoy.server.api.depends.lfdi_auth.db")
 async def test_lfdiauthdepends_site_specific_cert(
     mock_db: mock.MagicMock,
-    mock_select_all_client_id_details: mock.MagicMock,
+    mock_select_client_id_details: mock.MagicMock,
     mock_select_single_site_with_sfdi: mock.MagicMock,
 ):
     SITE_ID = 154125
 
     # Arrange
-    mock_select_all_client_id_details.return_value = []
+    mock_select_client_id_details.return_value = None
     mock_select_single_site_with_sfdi.return_value = generate_class_instance(Site, site_id=SITE_ID)
     req = Request(
         {
@@ -196,7 +196,7 @@ async def test_lfdiauthdepends_site_specific_cert(
     assert req.state.lfdi == TEST_CERTIFICATE_LFDI_1
     assert req.state.sfdi == int(TEST_CERTIFICATE_SFDI_1)
 
-    mock_select_all_client_id_details.assert_called_once()
+    mock_select_client_id_details.assert_called_once()
     mock_select_single_site_with_sfdi.assert_called_once()
     assert mock_select_single_site_with_sfdi.call_args_list[0].kwargs["sfdi"] == convert_lfdi_to_sfdi(
         TEST_CERTIFICATE_LFDI_1
@@ -206,19 +206,18 @@ async def test_lfdiauthdepends_site_specific_cert(
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.lfdi_auth.select_single_site_with_sfdi")
-@mock.patch("envoy.server.api.depends.lfdi_auth.select_all_client_id_details")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
 @mock.patch("envoy.server.api.depends.lfdi_auth.db")
 async def test_lfdiauthdepends_aggregator_specific_cert(
     mock_db: mock.MagicMock,
-    mock_select_all_client_id_details: mock.MagicMock,
+    mock_select_client_id_details: mock.MagicMock,
     mock_select_single_site_with_sfdi: mock.MagicMock,
 ):
     AGG_ID = 51412
     # Arrange
-    mock_select_all_client_id_details.return_value = [
-        ClientIdDetails("doesnotexist", 1, datetime.now(UTC) + timedelta(hours=1)),
-        ClientIdDetails(TEST_CERTIFICATE_LFDI_1, AGG_ID, datetime.now(UTC) + timedelta(hours=1)),
-    ]
+    mock_select_client_id_details.return_value = ClientIdDetails(
+        TEST_CERTIFICATE_LFDI_1, AGG_ID, datetime.now(UTC) + timedelta(hours=1)
+    )
     mock_select_single_site_with_sfdi.return_value = None
     req = Request(
         {
@@ -239,27 +238,31 @@ async def test_lfdiauthdepends_aggregator_specific_cert(
     assert req.state.lfdi == TEST_CERTIFICATE_LFDI_1
     assert req.state.sfdi == int(TEST_CERTIFICATE_SFDI_1)
 
-    mock_select_all_client_id_details.assert_called_once()
+    mock_select_client_id_details.assert_called_once_with(mock_db.session, TEST_CERTIFICATE_LFDI_1)
     mock_select_single_site_with_sfdi.assert_not_called()
 
+    # Subsequent requests are served from the cache
+    await lfdi_dep(req)
+    assert req.state.aggregator_id == AGG_ID
+    mock_select_client_id_details.assert_called_once()
+
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.api.depends.lfdi_auth.select_single_site_with_sfdi")
-@mock.patch("envoy.server.api.depends.lfdi_auth.select_all_client_id_details")
+@mock.patch("envoy.server.api.depends.lfdi_auth.select_client_id_details")
 @mock.patch("envoy.server.api.depends.lfdi_auth.db")
 async def test_lfdiauthdepends_aggregator_specific_cert_thats_expired(
     mock_db: mock.MagicMock,
-    mock_select_all_client_id_details: mock.MagicMock,
+    mock_select_client_id_details: mock.MagicMock,
     mock_select_single_site_with_sfdi: mock.MagicMock,
 ):
     """Tests that if the DB is reporting that an aggregator cert is expired that it doesn't accidently
     get classified as a new device cert"""
     AGG_ID = 51412
     # Arrange
-    mock_select_all_client_id_details.return_value = [
-        ClientIdDetails("doesnotexist", 1, datetime.now(UTC) + timedelta(hours=1)),
-        ClientIdDetails(TEST_CERTIFICATE_LFDI_1, AGG_ID, datetime.now(UTC) - timedelta(hours=1)),
-    ]
+    mock_select_client_id_details.return_value = ClientIdDetails(
+        TEST_CERTIFICATE_LFDI_1, AGG_ID, datetime.now(UTC) - timedelta(hours=1)
+    )
     mock_select_single_site_with_sfdi.return_value = None
     req = Request(
         {
@@ -274,7 +277,7 @@ async def test_lfdiauthdepends_aggregator_specific_cert_thats_expired(
     with pytest.raises(HTTPException):
         await lfdi_dep(req)
 
-    mock_select_all_client_id_details.assert_called_once()
+    mock_select_client_id_details.assert_called_once()
     mock_select_single_site_with_sfdi.assert_not_called()
 
 
@@ -0,0 +1,235 @@
+import unittest.mock as mock
+from http import HTTPStatus
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+from envoy_schema.server.schema.sep2.der import DERControlListResponse
+from envoy_schema.server.schema.sep2.end_device import EndDeviceListResponse, EndDeviceRequest, EndDeviceResponse
+from envoy_schema.server.schema.sep2.metering_mirror import MirrorMeterReadingListRequest, MirrorMeterReadingRequest
+from envoy_schema.server.schema.sep2.response import DERControlResponse, PriceResponse, Response
+from fastapi import HTTPException, Request
+from lxml.etree import XMLSyntaxError
+from pydantic_xml import BaseXmlModel
+
+from envoy.server.api.depends.xml_request_limits import (
+    XML_REQUEST_MAX_BODY_BYTES_ATTR,
+    XML_REQUEST_MAX_ELEMENTS_ATTR,
+)
+from envoy.server.api.response import (
+    XmlRequest,
+    parse_xml_body,
+    render_xml,
+    render_xml_list_stream,
+    split_xml_list_envelope,
+    xml_element_name,
+)
+
+
+def build_request(
+    body: bytes | str, chunk_size: int = 1024, content_length: bool = True, app_state: dict | None = None
+) -> Request:
+    """Builds a starlette Request whose body will be received in chunks of chunk_size"""
+    if isinstance(body, str):
+        body = body.encode()
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1} for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    headers = [(b"content-length", str(len(body)).encode())] if content_length else []
+    app = SimpleNamespace(state=SimpleNamespace(**(app_state or {})))
+    return Request({"type": "http", "method": "POST", "headers": headers, "app": app}, receive)
+
+
+def build_model(t: type[BaseXmlModel]) -> Any:
+    """Generates a fully populated instance of t that will pass validation"""
+    if t is MirrorMeterReadingListRequest:
+        return generate_class_instance(
+            t, mirrorMeterReadings=[build_model(MirrorMeterReadingRequest), build_model(MirrorMeterReadingRequest)]
+        )
+    elif t is MirrorMeterReadingRequest:
+        return generate_class_instance(t, mRID="abc123")
+    elif t is EndDeviceRequest:
+        return generate_class_instance(t, deviceCategory="0")
+    else:
+        return generate_class_instance(t, subject="abc123", endDeviceLFDI="abcdef")
+
+
+def test_xml_element_name():
+    assert xml_element_name(MirrorMeterReadingRequest) == "{urn:ieee:std:2030.5:ns}MirrorMeterReading"
+    assert xml_element_name(MirrorMeterReadingListRequest) == "{urn:ieee:std:2030.5:ns}MirrorMeterReadingList"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024 * 1024])
+@pytest.mark.anyio
+async def test_parse_xml_body(chunk_size: int):
+    body = build_model(MirrorMeterReadingListRequest).to_xml()
+    root = await parse_xml_body(build_request(body, chunk_size=chunk_size), 1024 * 1024, 1000)
+    assert root.tag == "{urn:ieee:std:2030.5:ns}MirrorMeterReadingList"
+    assert MirrorMeterReadingListRequest.from_xml_tree(root) == MirrorMeterReadingListRequest.from_xml(body)
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+@pytest.mark.anyio
+async def test_parse_xml_body_too_large(content_length: bool):
+    body = build_model(EndDeviceRequest).to_xml()
+    await parse_xml_body(build_request(body, content_length=content_length), len(body), 1000)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await parse_xml_body(build_request(body, chunk_size=16, content_length=content_length), len(body) - 1, 1000)
+    assert exc_info.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.anyio
+async def test_parse_xml_body_too_many_elements():
+    body = b"<a>" + (b"<b/>" * 100) + b"</a>"
+    root = await parse_xml_body(build_request(body), 1024, 101)
+    assert len(root) == 100
+
+    with pytest.raises(HTTPException) as exc_info:
+        await parse_xml_body(build_request(body, chunk_size=32), 1024, 100)
+    assert exc_info.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.parametrize("body", [b"", b"<a>", b"not xml", b"<a></b>"])
+@pytest.mark.anyio
+async def test_parse_xml_body_malformed(body: bytes):
+    with pytest.raises(XMLSyntaxError):
+        await parse_xml_body(build_request(body), 1024, 100)
+
+
+@pytest.mark.anyio
+async def test_parse_xml_body_entities_not_expanded():
+    body = b'<!DOCTYPE a [<!ENTITY e "expanded">]><a>&e;</a>'
+    root = await parse_xml_body(build_request(body), 1024, 100)
+    assert "expanded" not in (root.text or "")
+
+
+@pytest.mark.parametrize(
+    "model_classes, body_type",
+    [
+        ((MirrorMeterReadingRequest, MirrorMeterReadingListRequest), MirrorMeterReadingRequest),
+        ((MirrorMeterReadingRequest, MirrorMeterReadingListRequest), MirrorMeterReadingListRequest),
+        ((DERControlResponse, PriceResponse, Response), DERControlResponse),
+        ((DERControlResponse, PriceResponse, Response), PriceResponse),
+        ((DERControlResponse, PriceResponse, Response), Response),
+        ((EndDeviceRequest,), EndDeviceRequest),
+    ],
+)
+@pytest.mark.anyio
+async def test_XmlRequest_dispatch(model_classes, body_type):
+    """Checks that only the model class matching the root element is used to validate the body"""
+    body = build_model(body_type).to_xml()
+    expected = body_type.from_xml(body)
+    request = build_request(body)
+
+    spies = [mock.patch.object(c, "from_xml_tree", wraps=c.from_xml_tree) for c in model_classes]
+    mocks = [s.start() for s in spies]
+    try:
+        actual = await XmlRequest(*model_classes)(request)
+    finally:
+        for s in spies:
+            s.stop()
+
+    assert type(actual) is body_type
+    assert actual == expected
+    for model_class, from_xml_tree in zip(model_classes, mocks, strict=True):
+        if model_class is body_type:
+            from_xml_tree.assert_called_once()
+        else:
+            from_xml_tree.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        build_model(EndDeviceRequest).to_xml(),
+        b'<MirrorMeterReading xmlns="urn:some:other:ns"></MirrorMeterReading>',
+    ],
+)
+@pytest.mark.anyio
+async def test_XmlRequest_unmatched_root(body: bytes):
+    with pytest.raises(HTTPException) as exc_info:
+        await XmlRequest(MirrorMeterReadingRequest, MirrorMeterReadingListRequest)(build_request(body))
+    assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_XmlRequest_limits_from_app_state():
+    body = build_model(EndDeviceRequest).to_xml()
+    assert await XmlRequest(EndDeviceRequest)(build_request(body))  # Defaults are generous
+
+    with pytest.raises(HTTPException) as exc_info:
+        await XmlRequest(EndDeviceRequest)(build_request(body, app_state={XML_REQUEST_MAX_BODY_BYTES_ATTR: 10}))
+    assert exc_info.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    with pytest.raises(HTTPException) as exc_info:
+        await XmlRequest(EndDeviceRequest)(build_request(body, app_state={XML_REQUEST_MAX_ELEMENTS_ATTR: 1}))
+    assert exc_info.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.parametrize(
+    "envelope",
+    [
+        EndDeviceListResponse(href="/edev", all_=0, results=0),
+        EndDeviceListResponse(href="/edev", all_=5, results=2, pollRate=60),
+        DERControlListResponse(href="/derp/1/derc", all_=3, results=3, subscribable=1),
+    ],
+)
+def test_split_xml_list_envelope(envelope: BaseXmlModel):
+    opening, closing, ns_decls = split_xml_list_envelope(envelope)
+    assert opening.startswith(b"<") and opening.endswith(b">") and not opening.endswith(b"/>")
+    assert closing == b"</" + xml_element_name(type(envelope)).split("}")[1].encode() + b">"
+    assert b"xmlns" in ns_decls
+    assert type(envelope).from_xml(opening + closing) == type(envelope).from_xml(render_xml(envelope))
+
+
+@pytest.mark.parametrize("item_count", [0, 1, 3, 500])
+@pytest.mark.anyio
+async def test_render_xml_list_stream(item_count: int):
+    """The streamed (chunked) rendering should parse to the same list as rendering the entire list at once"""
+    items = [
+        generate_class_instance(EndDeviceResponse, seed=i * 101, optional_is_none=True, deviceCategory="0")
+        for i in range(item_count)
+    ]
+    envelope = EndDeviceListResponse(href="/edev", all_=item_count + 10, results=item_count, pollRate=60)
+    aclose_called = False
+
+    async def models():
+        nonlocal aclose_called
+        try:
+            yield envelope
+            for item in items:
+                yield item
+        finally:
+            aclose_called = True
+
+    chunks = [chunk async for chunk in render_xml_list_stream(models())]
+    assert len(chunks) >= 1
+    assert aclose_called
+
+    streamed = EndDeviceListResponse.from_xml(b"".join(chunks))
+    expected = EndDeviceListResponse.from_xml(
+        render_xml(
+            EndDeviceListResponse(
+                href="/edev", all_=item_count + 10, results=item_count, pollRate=60, EndDevice=items or None
+            )
+        )
+    )
+    assert streamed == expected
+    assert len(streamed.EndDevice or []) == item_count
+
+
+@pytest.mark.anyio
+async def test_render_xml_list_stream_no_envelope():
+    async def models():
+        return
+        yield
+
+    with pytest.raises(ValueError):
+        [chunk async for chunk in render_xml_list_stream(models())]
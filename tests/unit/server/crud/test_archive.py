@@ -4,18 +4,25 @@ from typing import Any
 
 import pytest
 from assertical.asserts.time import assert_nowish
+from assertical.fake.generator import generate_class_instance
 from assertical.fixtures.postgres import generate_async_session
-from sqlalchemy import func, or_, select
+from sqlalchemy import func, inspect, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from envoy.server.crud.archive import copy_rows_into_archive, delete_rows_into_archive
+from envoy.server.crud.archive import (
+    copy_rows_into_archive,
+    delete_rows_into_archive,
+    extract_archive_source_pk_column,
+    find_archive_types,
+    purge_archive_rows,
+)
 from envoy.server.model import Base
 from envoy.server.model.archive import ArchiveBase
 from envoy.server.model.archive.base import ARCHIVE_BASE_COLUMNS
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
 from envoy.server.model.archive.site import ArchiveSite
 from envoy.server.model.archive.site_reading import ArchiveSiteReading, ArchiveSiteReadingType
-from envoy.server.model.archive.tariff import ArchiveTariffGeneratedRate
+from envoy.server.model.archive.tariff import ArchiveTariff, ArchiveTariffGeneratedRate
 from envoy.server.model.doe import DynamicOperatingEnvelope, SiteControlGroup
 from envoy.server.model.site import Site
 from envoy.server.model.site_reading import SiteReading, SiteReadingType
@@ -428,3 +435,70 @@ async def test_delete_after_copy(pg_base_config):
         assert [None, deleted_time] == deleted_time_vals
         for archive_time in await fetch_single_column(session, ArchiveTariffGeneratedRate, "archive_time"):
             assert_nowish(archive_time)
+
+
+def test_find_archive_types():
+    archive_types = find_archive_types()
+    assert set(archive_types) == {at for _, at in find_paired_archive_classes()}
+    assert archive_types == sorted(archive_types, key=lambda t: t.__tablename__)
+
+
+@pytest.mark.parametrize("original_type, archive_type", find_paired_archive_classes())
+def test_extract_archive_source_pk_column(original_type: type[Base], archive_type: type[ArchiveBase]):
+    col = extract_archive_source_pk_column(archive_type)
+    assert col.class_ is archive_type
+    assert col.key == inspect(original_type).primary_key[0].name
+
+
+@pytest.mark.parametrize(
+    "archived_before, deleted_before, limit, expected_remaining_archive_ids",
+    [
+        (datetime(2019, 1, 1, tzinfo=UTC), None, 100, [1, 2, 3, 4, 5]),  # Nothing old enough
+        (datetime(2021, 1, 1, tzinfo=UTC), None, 100, [3, 4, 5]),  # Keeps the latest deletions
+        (datetime(2021, 1, 1, tzinfo=UTC), None, 1, [2, 3, 4, 5]),  # Oldest first
+        (datetime(2021, 1, 1, tzinfo=UTC), datetime(2020, 1, 2, 12, tzinfo=UTC), 100, [3, 4]),
+        (datetime(2021, 1, 1, tzinfo=UTC), datetime(2025, 1, 1, tzinfo=UTC), 100, [4]),
+    ],
+)
+@pytest.mark.anyio
+async def test_purge_archive_rows(
+    pg_empty_config,
+    archived_before: datetime,
+    deleted_before: datetime | None,
+    limit: int,
+    expected_remaining_archive_ids: list[int],
+):
+    # (archive_id, tariff_id, archive_time, deleted_time)
+    archive_rows = [
+        (1, 1, datetime(2020, 1, 1, tzinfo=UTC), None),  # Old update snapshot
+        (2, 1, datetime(2020, 1, 2, tzinfo=UTC), datetime(2020, 1, 2, tzinfo=UTC)),  # Superseded by archive_id 3
+        (3, 1, datetime(2020, 1, 3, tzinfo=UTC), datetime(2020, 1, 3, tzinfo=UTC)),  # Latest deletion of tariff 1
+        (4, 1, datetime(2024, 1, 1, tzinfo=UTC), None),  # Recent update snapshot
+        (5, 2, datetime(2020, 1, 1, 1, tzinfo=UTC), datetime(2020, 1, 1, tzinfo=UTC)),  # Latest deletion of tariff 2
+    ]
+    async with generate_async_session(pg_empty_config) as session:
+        session.add_all(
+            [
+                generate_class_instance(
+                    ArchiveTariff,
+                    seed=archive_id,
+                    archive_id=archive_id,
+                    tariff_id=tariff_id,
+                    archive_time=at,
+                    deleted_time=dt,
+                )
+                for archive_id, tariff_id, at, dt in archive_rows
+            ]
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_empty_config) as session:
+        purged = await purge_archive_rows(session, ArchiveTariff, archived_before, deleted_before, limit)
+        await session.commit()
+
+    assert purged == len(archive_rows) - len(expected_remaining_archive_ids)
+    async with generate_async_session(pg_empty_config) as session:
+        remaining = (
+            await session.execute(select(ArchiveTariff.archive_id).order_by(ArchiveTariff.archive_id))
+        ).scalars()
+        assert list(remaining) == expected_remaining_archive_ids
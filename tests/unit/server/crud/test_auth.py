@@ -4,7 +4,8 @@ import pytest
 from assertical.asserts.type import assert_list_type
 from assertical.fixtures.postgres import generate_async_session
 
-from envoy.server.crud.auth import ClientIdDetails, select_all_client_id_details
+from envoy.server.crud.auth import ClientIdDetails, select_all_client_id_details, select_client_id_details
+from envoy.server.model.aggregator import AggregatorCertificateAssignment
 from tests.data.certificates.certificate1 import TEST_CERTIFICATE_LFDI as CERT1_LFDI
 from tests.data.certificates.certificate2 import TEST_CERTIFICATE_LFDI as CERT2_LFDI
 from tests.data.certificates.certificate3 import TEST_CERTIFICATE_LFDI as CERT3_LFDI
@@ -30,3 +31,40 @@ async def test_select_all_client_id_details(pg_base_config):
         datetime(2037, 1, 1, 1, 2, 3, tzinfo=UTC),
         datetime(2037, 1, 1, 1, 2, 3, tzinfo=UTC),
     ] == [r.expiry for r in result]
+
+
+@pytest.mark.parametrize(
+    "lfdi, expected",
+    [
+        (CERT1_LFDI, ClientIdDetails(CERT1_LFDI, 1, datetime(2037, 1, 1, 1, 2, 3, tzinfo=UTC))),
+        (CERT3_LFDI, ClientIdDetails(CERT3_LFDI, 1, datetime(2023, 1, 1, 1, 2, 4, tzinfo=UTC))),  # expired
+        (CERT4_LFDI, ClientIdDetails(CERT4_LFDI, 2, datetime(2037, 1, 1, 1, 2, 3, tzinfo=UTC))),
+        (CERT5_LFDI, ClientIdDetails(CERT5_LFDI, 3, datetime(2037, 1, 1, 1, 2, 3, tzinfo=UTC))),
+        ("abc123", None),  # DNE
+        (CERT1_LFDI.upper(), None),  # Case sensitive (matching the cache)
+    ],
+)
+@pytest.mark.anyio
+async def test_select_client_id_details(pg_base_config, lfdi: str, expected: ClientIdDetails | None):
+    async with generate_async_session(pg_base_config) as session:
+        result = await select_client_id_details(session, lfdi)
+
+    assert result == expected
+
+
+@pytest.mark.anyio
+async def test_client_id_details_multiple_assignments(pg_base_config):
+    """A certificate assigned to multiple aggregators should resolve to the same (most recent) assignment via both
+    select_all_client_id_details (when the last row wins) and select_client_id_details"""
+    async with generate_async_session(pg_base_config) as session:
+        session.add(AggregatorCertificateAssignment(assignment_id=6, certificate_id=1, aggregator_id=2))
+        session.add(AggregatorCertificateAssignment(assignment_id=7, certificate_id=4, aggregator_id=3))
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        all_details = {cid.lfdi: cid for cid in await select_all_client_id_details(session)}
+        for lfdi, expected_aggregator_id in [(CERT1_LFDI, 2), (CERT4_LFDI, 3), (CERT2_LFDI, 1)]:
+            single = await select_client_id_details(session, lfdi)
+            assert single is not None
+            assert single.aggregator_id == expected_aggregator_id
+            assert all_details[lfdi] == single
@@ -1,6 +1,21 @@
+from datetime import UTC, date, datetime
+from zoneinfo import ZoneInfo
+
 import pytest
+from assertical.fixtures.postgres import generate_async_session
+from sqlalchemy import literal, select
 
-from envoy.server.crud.common import convert_lfdi_to_sfdi, sum_digits
+from envoy.server.crud.common import (
+    convert_lfdi_to_sfdi,
+    local_date_expr,
+    localize_start_time,
+    localize_start_time_rows,
+    localize_start_times,
+    sum_digits,
+)
+from envoy.server.model.doe import DynamicOperatingEnvelope
+from envoy.server.model.site import Site
+from envoy.server.model.tariff import TariffGeneratedRate
 from tests.data.certificates import certificate1, certificate2, certificate3, certificate4, certificate5
 
 
@@ -36,3 +51,54 @@ def test_convert_lfdi_to_sfdi(lfdi: str, expected_sfdi: int):
 def test_convert_lfdi_to_sfdi__raises_exception(invalid_lfdi: str):
     with pytest.raises(ValueError):
         _ = convert_lfdi_to_sfdi(invalid_lfdi)
+
+
+def test_localize_start_times():
+    rates = [
+        TariffGeneratedRate(tariff_generated_rate_id=i, start_time=datetime(2023, 1, 2, i, tzinfo=UTC))
+        for i in range(3)
+    ]
+    localized = localize_start_times((r for r in rates), "Australia/Brisbane")
+    assert localized == rates
+    for i, rate in enumerate(localized):
+        assert rate.start_time.tzinfo == ZoneInfo("Australia/Brisbane")
+        assert rate.start_time == datetime(2023, 1, 2, i, tzinfo=UTC)
+        assert rate.start_time.hour == i + 10
+
+    assert localize_start_times([], "Australia/Brisbane") == []
+
+
+@pytest.mark.anyio
+async def test_localize_start_time_rows(pg_base_config):
+    """Checks localize_start_time_rows against localize_start_time"""
+    stmt = (
+        select(DynamicOperatingEnvelope, Site.timezone_id)
+        .join(DynamicOperatingEnvelope.site)
+        .order_by(DynamicOperatingEnvelope.dynamic_operating_envelope_id)
+    )
+    async with generate_async_session(pg_base_config) as session:
+        expected = [localize_start_time(row) for row in (await session.execute(stmt)).all()]
+        expected_start_times = [(e.dynamic_operating_envelope_id, e.start_time, e.start_time.tzinfo) for e in expected]
+
+    async with generate_async_session(pg_base_config) as session:
+        actual = localize_start_time_rows((await session.execute(stmt)).tuples())
+        assert len(actual) > 0
+        assert [(e.dynamic_operating_envelope_id, e.start_time, e.start_time.tzinfo) for e in actual] == (
+            expected_start_times
+        )
+
+
+@pytest.mark.parametrize(
+    "tz_name, timestamp, expected",
+    [
+        ("Australia/Brisbane", datetime(2023, 1, 2, 13, 59, tzinfo=UTC), date(2023, 1, 2)),
+        ("Australia/Brisbane", datetime(2023, 1, 2, 14, 0, tzinfo=UTC), date(2023, 1, 3)),
+        ("UTC", datetime(2023, 1, 2, 23, 59, tzinfo=UTC), date(2023, 1, 2)),
+        ("America/New_York", datetime(2023, 1, 2, 3, 0, tzinfo=UTC), date(2023, 1, 1)),
+    ],
+)
+@pytest.mark.anyio
+async def test_local_date_expr(pg_empty_config, tz_name: str, timestamp: datetime, expected: date):
+    async with generate_async_session(pg_empty_config) as session:
+        actual = (await session.execute(select(local_date_expr(tz_name, literal(timestamp))))).scalar_one()
+    assert actual == expected
@@ -5,7 +5,7 @@ from zoneinfo import ZoneInfo
 import pytest
 from assertical.asserts.generator import assert_class_instance_equality
 from assertical.asserts.time import assert_datetime_equal
-from assertical.asserts.type import assert_dict_type, assert_list_type
+from assertical.asserts.type import assert_list_type
 from assertical.fake.generator import clone_class_instance, generate_class_instance
 from assertical.fixtures.postgres import generate_async_session
 from sqlalchemy import select, update
@@ -16,7 +16,6 @@ from envoy.server.crud.doe import (
     count_active_does_include_deleted,
     count_does_at_timestamp,
     count_site_control_groups,
-    count_site_control_groups_by_fsa_id,
     select_active_does_include_deleted,
     select_doe_by_display_id_include_deleted,
     select_doe_include_deleted,
@@ -24,6 +23,7 @@ from envoy.server.crud.doe import (
     select_site_control_group_by_id,
     select_site_control_group_fsa_ids,
     select_site_control_groups,
+    stream_active_does_include_deleted,
 )
 from envoy.server.crud.site import select_single_site_with_site_id
 from envoy.server.manager.time import utc_now
@@ -117,6 +117,7 @@ def assert_doe_for_id(
         (1, 1, 18, datetime(2023, 5, 7, 1, 0, 0)),  # Archive record
         (1, 1, 19, datetime(2023, 5, 7, 1, 5, 0)),  # Archive record
         (1, 1, 21, None),  # Archive record (but not deleted)
+        (1, 2, 18, None),  # Archive record (but wrong site id)
         (1, 3, 15, None),
         (0, 1, 1, None),
         (2, 1, 15, None),
@@ -141,6 +142,33 @@ async def test_select_doe_include_deleted(
         assert_doe_for_id(expected_id, site_id, expected_dt, "Australia/Brisbane", actual, check_duration_seconds=False)
 
 
+@pytest.mark.anyio
+async def test_select_doe_include_deleted_multiple_deletes(pg_additional_does):
+    """If a DOE has been deleted multiple times (eg deleted, restored with the same id and deleted again) - the most
+    recent deletion should be returned"""
+    async with generate_async_session(pg_additional_does) as session:
+        session.add(
+            generate_class_instance(
+                ArchiveDOE,
+                seed=101,
+                archive_id=None,
+                dynamic_operating_envelope_id=18,
+                site_control_group_id=1,
+                site_id=1,
+                calculation_log_id=None,
+                deleted_time=datetime(2030, 1, 1, tzinfo=UTC),
+                start_time=datetime(2030, 1, 2, tzinfo=UTC),
+            )
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_additional_does) as session:
+        actual = await select_doe_include_deleted(session, 1, 1, 18)
+        assert isinstance(actual, ArchiveDOE)
+        assert_datetime_equal(actual.deleted_time, datetime(2030, 1, 1, tzinfo=UTC))
+        assert_datetime_equal(actual.start_time, datetime(2030, 1, 2, tzinfo=UTC))
+
+
 @pytest.mark.parametrize(
     "agg_id, site_id, display_id, expected_dt",
     [
@@ -381,6 +409,50 @@ async def test_select_and_count_doe_filters_la_time(
             assert_doe_for_id(id, site_id, expected_datetime, "America/Los_Angeles", doe)
 
 
+@pytest.mark.parametrize(
+    "site_id, start, changed_after, limit",
+    [
+        (1, 0, datetime.min, 99),
+        (1, 1, datetime.min, 1),
+        (1, 2, datetime.min, 99),
+        (1, 99, datetime.min, 99),  # Empty page
+        (1, 0, datetime.min, 0),
+        (1, 0, datetime(2022, 5, 6, 12, 22, 32, tzinfo=UTC), 99),
+        (2, 0, datetime.min, 99),
+        (4, 0, datetime.min, 99),
+    ],
+)
+@pytest.mark.anyio
+async def test_stream_active_does_include_deleted(
+    pg_base_config, site_id: int, start: int, changed_after: datetime, limit: int
+):
+    """Streamed DOEs should match select_active_does_include_deleted with every row carrying the total count"""
+    now = datetime(1970, 1, 1, 0, 0, 0, tzinfo=UTC)  # This is sufficiently in this past to allow everything to pass
+    site_control_group_id = 1
+    async with generate_async_session(pg_base_config) as session:
+        site = await select_single_site_with_site_id(session, site_id=site_id, aggregator_id=1)
+        assert site
+
+        expected_does = await select_active_does_include_deleted(
+            session, site_control_group_id, site, now, start, changed_after, limit
+        )
+        expected_count = await count_active_does_include_deleted(
+            session, site_control_group_id, site, now, changed_after
+        )
+
+        streamed = [
+            r
+            async for r in stream_active_does_include_deleted(
+                session, site_control_group_id, site, now, start, changed_after, limit
+            )
+        ]
+        assert [(type(d), d.dynamic_operating_envelope_id) for d, _ in streamed] == [
+            (type(d), d.dynamic_operating_envelope_id) for d in expected_does
+        ]
+        assert [d.start_time for d, _ in streamed] == [d.start_time for d in expected_does]
+        assert all(count == expected_count for _, count in streamed)
+
+
 @pytest.mark.anyio
 async def test_select_active_does_include_deleted_via_roundtrip(pg_base_config):
     """Tests that DOEs selected via select_active_does_include_deleted match the values inserted via the admin
@@ -812,34 +884,6 @@ async def test_select_and_count_site_control_groups(
                         g.site_control_group_default.created_time  # noqa: B018
 
 
-@pytest.mark.anyio
-async def test_count_site_control_groups_by_fsa_id(extra_site_control_groups):
-    async with generate_async_session(extra_site_control_groups) as session:
-        result = await count_site_control_groups_by_fsa_id(session)
-        assert_dict_type(int, int, result, 2)
-        assert result == {1: 3, 3: 1}
-
-
-@pytest.mark.anyio
-async def test_count_site_control_groups_by_fsa_id_with_nones(extra_site_control_groups):
-    async with generate_async_session(extra_site_control_groups) as session:
-        await session.execute(
-            update(SiteControlGroup).values(fsa_id=None).where(SiteControlGroup.site_control_group_id.in_([1, 3]))
-        )
-        await session.commit()
-    async with generate_async_session(extra_site_control_groups) as session:
-        result = await count_site_control_groups_by_fsa_id(session)
-        assert_dict_type(int, int, result, 2)
-        assert result == {1: 1, 3: 1}
-
-
-@pytest.mark.anyio
-async def test_count_site_control_groups_by_fsa_id_empty_db(pg_empty_config):
-    async with generate_async_session(pg_empty_config) as session:
-        result = await count_site_control_groups_by_fsa_id(session)
-        assert_dict_type(int, int, result, 0)
-
-
 @pytest.mark.parametrize(
     "changed_after, expected_fsa_ids",
     [
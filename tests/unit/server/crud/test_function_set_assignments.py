@@ -0,0 +1,76 @@
+from datetime import UTC, datetime
+from itertools import chain
+
+import pytest
+from assertical.fixtures.postgres import generate_async_session
+from sqlalchemy import delete, select, update
+
+from envoy.server.crud.function_set_assignments import (
+    select_function_set_assignments_summary,
+    select_function_set_assignments_version,
+)
+from envoy.server.model.doe import SiteControlGroup
+from envoy.server.model.tariff import Tariff
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("null_site_control_group_fsa_ids", [True, False])
+async def test_select_function_set_assignments_summary(pg_base_config, null_site_control_group_fsa_ids: bool):
+    """The single query summary should agree with the individual Tariff/SiteControlGroup records"""
+    async with generate_async_session(pg_base_config) as session:
+        if null_site_control_group_fsa_ids:
+            await session.execute(update(SiteControlGroup).values(fsa_id=None))
+
+        summary = await select_function_set_assignments_summary(session)
+
+        tariffs = (await session.execute(select(Tariff))).scalars().all()
+        groups = (await session.execute(select(SiteControlGroup))).scalars().all()
+        expected: dict[int, tuple[int, datetime]] = {}  # fsa_id: (derp_count, max_changed_time)
+        for fsa_id, derp_count, changed_time in chain(
+            ((t.fsa_id, 0, t.changed_time) for t in tariffs),
+            ((g.fsa_id, 1, g.changed_time) for g in groups if g.fsa_id is not None),
+        ):
+            existing_count, existing_changed_time = expected.get(fsa_id, (0, changed_time))
+            expected[fsa_id] = (existing_count + derp_count, max(existing_changed_time, changed_time))
+
+        assert len(expected) > 0
+        assert summary == [(fsa_id, *expected[fsa_id]) for fsa_id in sorted(expected.keys())]
+
+
+@pytest.mark.anyio
+async def test_select_function_set_assignments_summary_empty(pg_empty_config):
+    async with generate_async_session(pg_empty_config) as session:
+        assert await select_function_set_assignments_summary(session) == []
+
+
+@pytest.mark.anyio
+async def test_select_function_set_assignments_version(pg_base_config):
+    """The version should be stable until a Tariff/SiteControlGroup is inserted/deleted/changed"""
+    async with generate_async_session(pg_base_config) as session:
+        original_version = await select_function_set_assignments_version(session)
+        assert await select_function_set_assignments_version(session) == original_version
+
+        # Updating a changed_time changes the version
+        await session.execute(
+            update(Tariff).where(Tariff.tariff_id == 1).values(changed_time=datetime(2030, 1, 1, tzinfo=UTC))
+        )
+        updated_version = await select_function_set_assignments_version(session)
+        assert updated_version != original_version
+
+        # Inserting changes the version
+        session.add(
+            SiteControlGroup(description="new", primacy=1, fsa_id=1, changed_time=datetime(2000, 1, 1, tzinfo=UTC))
+        )
+        await session.flush()
+        inserted_version = await select_function_set_assignments_version(session)
+        assert inserted_version != updated_version
+
+        # Deleting changes the version
+        await session.execute(delete(SiteControlGroup).where(SiteControlGroup.description == "new"))
+        assert await select_function_set_assignments_version(session) not in {inserted_version, original_version}
+
+
+@pytest.mark.anyio
+async def test_select_function_set_assignments_version_empty(pg_empty_config):
+    async with generate_async_session(pg_empty_config) as session:
+        assert await select_function_set_assignments_version(session) == (0, None, None, 0, None, None)
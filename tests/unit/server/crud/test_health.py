@@ -12,8 +12,10 @@ from envoy.server.crud.health import (
     check_database,
     check_dynamic_operating_envelopes,
     check_dynamic_prices,
+    select_notification_queue_stats,
 )
 from envoy.server.model.doe import DynamicOperatingEnvelope
+from envoy.server.model.subscription import NotificationCheck, NotificationTransmit, SubscriptionResource
 from envoy.server.model.tariff import TariffGeneratedRate
 
 
@@ -133,3 +135,41 @@ async def test_health_price_check_with_future_prices(pg_base_config):
         await check_dynamic_prices(session, check)
         assert check.has_dynamic_prices
         assert check.has_future_prices
+
+
+@pytest.mark.anyio
+async def test_select_notification_queue_stats(pg_empty_config):
+    async with generate_async_session(pg_empty_config) as session:
+        stats = await select_notification_queue_stats(session)
+        assert stats["notification_check"].depth == 0
+        assert stats["notification_check"].oldest_created_time is None
+        assert stats["notification_transmit"].depth == 0
+        assert stats["notification_transmit"].oldest_created_time is None
+
+        oldest = datetime(2022, 3, 4, 5, 6, tzinfo=UTC)
+        for offset in range(3):
+            session.add(
+                NotificationCheck(
+                    resource_type=SubscriptionResource.SITE,
+                    changed_time=oldest,
+                    created_time=oldest + timedelta(minutes=offset),
+                )
+            )
+        session.add(
+            NotificationTransmit(
+                subscription_id=1,
+                subscription_href="/sub/1",
+                notification_id="abc",
+                remote_uri="https://example.com",
+                content="",
+                execute_after=oldest,
+            )
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_empty_config) as session:
+        stats = await select_notification_queue_stats(session)
+        assert stats["notification_check"].depth == 3
+        assert stats["notification_check"].oldest_created_time == oldest
+        assert stats["notification_transmit"].depth == 1
+        assert stats["notification_transmit"].oldest_created_time is not None
@@ -0,0 +1,139 @@
+from datetime import UTC, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from assertical.fixtures.postgres import generate_async_session
+from envoy_schema.server.schema.sep2.types import QualityFlagsType
+from sqlalchemy import select, text
+
+from envoy.server.crud.partition import (
+    create_month_partition,
+    drop_month_partitions_before,
+    ensure_month_partitions,
+    fetch_month_partitions,
+    month_partition_name,
+    start_of_month,
+)
+from envoy.server.model.archive.site_reading import ArchiveSiteReading
+from envoy.server.model.site_reading import SiteReading
+
+
+async def fetch_partition_for_reading(session, site_reading_id: int) -> str:
+    return (
+        await session.execute(
+            text("SELECT tableoid::regclass::text FROM site_reading WHERE site_reading_id = :id"),
+            {"id": site_reading_id},
+        )
+    ).scalar_one()
+
+
+@pytest.mark.parametrize(
+    "dt, expected",
+    [
+        (datetime(2022, 6, 7, 8, 9, 10, tzinfo=UTC), datetime(2022, 6, 1, tzinfo=UTC)),
+        (datetime(2022, 6, 1, tzinfo=UTC), datetime(2022, 6, 1, tzinfo=UTC)),
+        (datetime(2022, 7, 1, 5, tzinfo=ZoneInfo("Australia/Brisbane")), datetime(2022, 6, 1, tzinfo=UTC)),
+        (datetime(2022, 12, 31, 23, 59, 59), datetime(2022, 12, 1, tzinfo=UTC)),
+    ],
+)
+def test_start_of_month(dt: datetime, expected: datetime):
+    assert start_of_month(dt) == expected
+
+
+def test_month_partition_name():
+    assert month_partition_name("site_reading", datetime(2022, 6, 1, tzinfo=UTC)) == "site_reading_p202206"
+    assert month_partition_name("archive_site_reading", datetime(2023, 11, 1, tzinfo=UTC)) == (
+        "archive_site_reading_p202311"
+    )
+
+
+@pytest.mark.anyio
+async def test_create_month_partition_moves_default_rows(pg_base_config):
+    """The base config readings are for 2022-06 (which won't have a partition) - creating one should move them out of
+    the default partition"""
+
+    async with generate_async_session(pg_base_config) as session:
+        assert (await fetch_partition_for_reading(session, 1)) == "site_reading_default"
+        assert (await fetch_month_partitions(session, SiteReading.__tablename__)) != []
+        assert datetime(2022, 6, 1, tzinfo=UTC) not in [
+            p.month_start for p in await fetch_month_partitions(session, SiteReading.__tablename__)
+        ]
+
+        assert await create_month_partition(session, SiteReading.__tablename__, datetime(2022, 6, 15, tzinfo=UTC))
+        assert not await create_month_partition(session, SiteReading.__tablename__, datetime(2022, 6, 1, tzinfo=UTC))
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        for site_reading_id in [1, 2, 3, 4]:
+            assert (await fetch_partition_for_reading(session, site_reading_id)) == "site_reading_p202206"
+
+        partitions = await fetch_month_partitions(session, SiteReading.__tablename__)
+        p202206 = [p for p in partitions if p.partition_table == "site_reading_p202206"]
+        assert len(p202206) == 1
+        assert p202206[0].month_start == datetime(2022, 6, 1, tzinfo=UTC)
+        assert p202206[0].month_end == datetime(2022, 7, 1, tzinfo=UTC)
+
+        # Readings remain accessible (and writable) via the parent table
+        readings = (
+            (
+                await session.execute(
+                    select(SiteReading).where(
+                        (SiteReading.time_period_start >= datetime(2022, 6, 1, tzinfo=UTC))
+                        & (SiteReading.time_period_start < datetime(2022, 7, 1, tzinfo=UTC))
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert sorted([r.site_reading_id for r in readings]) == [1, 2, 3, 4]
+
+        session.add(
+            SiteReading(
+                site_reading_type_id=1,
+                changed_time=datetime(2022, 6, 20, tzinfo=UTC),
+                local_id=None,
+                quality_flags=QualityFlagsType.VALID,
+                time_period_start=datetime(2022, 6, 20, tzinfo=UTC),
+                time_period_seconds=300,
+                value=123,
+            )
+        )
+        await session.flush()
+        new_id = (await session.execute(select(SiteReading.site_reading_id).where(SiteReading.value == 123))).scalar()
+        assert new_id == 6, "Sequence continues from the base config"
+        assert (await fetch_partition_for_reading(session, new_id)) == "site_reading_p202206"
+
+
+@pytest.mark.anyio
+async def test_ensure_and_drop_month_partitions(pg_base_config):
+    async with generate_async_session(pg_base_config) as session:
+        created = await ensure_month_partitions(
+            session, ArchiveSiteReading.__tablename__, datetime(2030, 11, 5, tzinfo=UTC), 2
+        )
+        assert created == [
+            "archive_site_reading_p203011",
+            "archive_site_reading_p203012",
+            "archive_site_reading_p203101",
+        ]
+        assert [] == await ensure_month_partitions(
+            session, ArchiveSiteReading.__tablename__, datetime(2030, 12, 5, tzinfo=UTC), 1
+        )
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        before = [p.partition_table for p in await fetch_month_partitions(session, ArchiveSiteReading.__tablename__)]
+        assert "archive_site_reading_p203011" in before
+
+        dropped = await drop_month_partitions_before(
+            session, ArchiveSiteReading.__tablename__, datetime(2031, 1, 1, tzinfo=UTC)
+        )
+        assert "archive_site_reading_p203011" in dropped
+        assert "archive_site_reading_p203012" in dropped
+        assert "archive_site_reading_p203101" not in dropped
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        after = [p.partition_table for p in await fetch_month_partitions(session, ArchiveSiteReading.__tablename__)]
+        assert after == ["archive_site_reading_p203101"]
+        assert (await session.execute(text("SELECT to_regclass('archive_site_reading_default')"))).scalar_one()
@@ -13,7 +13,6 @@ from envoy.server.crud.pricing import (
     select_all_tariffs,
     select_single_tariff,
     select_tariff_count,
-    select_tariff_fsa_ids,
     select_tariff_generated_rate_for_scope,
     select_tariff_rate_for_day_time,
     select_tariff_rates_for_day,
@@ -22,23 +21,6 @@ from envoy.server.crud.pricing import (
 from envoy.server.model.tariff import Tariff, TariffGeneratedRate
 
 
-@pytest.mark.parametrize(
-    "changed_after, expected_fsa_ids",
-    [
-        (datetime.min, [1, 2]),
-        (datetime(2023, 1, 2, 12, 1, 0, tzinfo=UTC), [1, 2]),
-        (datetime(2023, 1, 2, 12, 2, 0, tzinfo=UTC), [2]),
-        (datetime(2023, 1, 2, 13, 2, 0, tzinfo=UTC), []),
-    ],
-)
-@pytest.mark.anyio
-async def test_select_tariff_fsa_ids(pg_base_config, changed_after: datetime, expected_fsa_ids: list[int]):
-    async with generate_async_session(pg_base_config) as session:
-        actual_ids = await select_tariff_fsa_ids(session, changed_after)
-        assert_list_type(int, actual_ids, len(expected_fsa_ids))
-        assert set(expected_fsa_ids) == set(actual_ids)
-
-
 @pytest.mark.anyio
 async def test_select_tariff_count(pg_base_config):
     """Simple tests to ensure the counts work"""
@@ -5,10 +5,13 @@ import pytest
 from assertical.asserts.type import assert_list_type
 from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.server.schema.sep2.response import ResponseType
+from sqlalchemy import func, select
 
 from envoy.server.crud.response import (
+    allocate_response_ids,
     count_doe_responses,
     count_tariff_generated_rate_responses,
+    insert_responses,
     select_doe_response_for_scope,
     select_doe_responses,
     select_rate_response_for_scope,
@@ -219,3 +222,59 @@ async def test_select_rate_response_for_scope(
             assert actual.tariff_generated_rate_response_id == pk_id
             assert actual.site_id == expected_site_id
             assert actual.response_type == expected_response_type
+
+
+@pytest.mark.parametrize("response_type", [DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse])
+@pytest.mark.anyio
+async def test_allocate_response_ids(pg_base_config, response_type):
+    async with generate_async_session(pg_base_config) as session:
+        assert await allocate_response_ids(session, response_type, 0) == []
+
+        ids = await allocate_response_ids(session, response_type, 5)
+        assert len(ids) == 5
+        assert len(set(ids)) == 5
+        assert all(id > 3 for id in ids), "Shouldn't overlap with the existing base config rows"
+
+        more_ids = await allocate_response_ids(session, response_type, 2)
+        assert len(more_ids) == 2
+        assert not set(ids).intersection(more_ids), "Ids are never reallocated"
+
+
+@pytest.mark.anyio
+async def test_insert_responses(pg_base_config):
+    async with generate_async_session(pg_base_config) as session:
+        ids = await allocate_response_ids(session, DynamicOperatingEnvelopeResponse, 2)
+        await insert_responses(
+            session,
+            [
+                DynamicOperatingEnvelopeResponse(
+                    dynamic_operating_envelope_response_id=ids[0],
+                    dynamic_operating_envelope_id_snapshot=1,
+                    site_id=1,
+                    response_type=ResponseType.EVENT_RECEIVED,
+                ),
+                DynamicOperatingEnvelopeResponse(
+                    dynamic_operating_envelope_response_id=ids[1],
+                    dynamic_operating_envelope_id_snapshot=2,
+                    site_id=2,
+                    response_type=None,
+                ),
+            ],
+        )
+        await insert_responses(session, [])  # Should be a no-op
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        assert (
+            await session.execute(select(func.count()).select_from(DynamicOperatingEnvelopeResponse))
+        ).scalar_one() == 5
+        first = await session.get(DynamicOperatingEnvelopeResponse, ids[0])
+        assert first is not None
+        assert first.dynamic_operating_envelope_id_snapshot == 1
+        assert first.site_id == 1
+        assert first.response_type == ResponseType.EVENT_RECEIVED
+        assert first.created_time is not None
+        second = await session.get(DynamicOperatingEnvelopeResponse, ids[1])
+        assert second is not None
+        assert second.site_id == 2
+        assert second.response_type is None
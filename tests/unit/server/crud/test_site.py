@@ -15,17 +15,22 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from envoy.server.crud.site import (
+    AggregatorSiteSummary,
     delete_site_for_aggregator,
     get_virtual_site_for_aggregator,
     insert_site_for_aggregator,
     select_aggregator_site_count,
+    select_aggregator_site_summary,
+    select_aggregator_site_summary_version,
     select_all_sites_with_aggregator_id,
     select_first_site_under_aggregator,
     select_single_site_with_lfdi,
     select_single_site_with_sfdi,
     select_single_site_with_site_id,
+    stream_all_sites_with_aggregator_id,
     upsert_site_for_aggregator,
 )
+from envoy.server.crud.subscription import delete_subscription_for_site
 from envoy.server.manager.time import utc_now
 from envoy.server.model.archive.base import ArchiveBase
 from envoy.server.model.archive.doe import ArchiveDynamicOperatingEnvelope
@@ -73,6 +78,84 @@ async def test_select_aggregator_site_count(
         assert await select_aggregator_site_count(session, aggregator_id, changed_after) == expected_count
 
 
+@pytest.mark.parametrize(
+    "aggregator_id, expected",
+    [
+        (1, AggregatorSiteSummary(True, "Australia/Brisbane", 3, 4)),
+        (2, AggregatorSiteSummary(True, "Australia/Brisbane", 1, 1)),
+        (3, AggregatorSiteSummary(True, None, 0, 0)),  # No sites / subscriptions
+        (99, AggregatorSiteSummary(False, None, 0, 0)),  # Aggregator DNE
+    ],
+)
+@pytest.mark.anyio
+async def test_select_aggregator_site_summary(pg_base_config, aggregator_id: int, expected: AggregatorSiteSummary):
+    async with generate_async_session(pg_base_config) as session:
+        assert await select_aggregator_site_summary(session, aggregator_id) == expected
+
+
+@pytest.mark.anyio
+async def test_select_aggregator_site_summary_version(pg_base_config):
+    """The version should be stable until a Site/Subscription is inserted/deleted/changed"""
+    async with generate_async_session(pg_base_config) as session:
+        original_version = await select_aggregator_site_summary_version(session)
+        assert await select_aggregator_site_summary_version(session) == original_version
+
+        # Updating a site changed_time changes the version
+        site = await select_single_site_with_site_id(session, 1, 1)
+        assert site is not None
+        site.changed_time = datetime(2030, 1, 1, tzinfo=UTC)
+        await session.flush()
+        updated_version = await select_aggregator_site_summary_version(session)
+        assert updated_version != original_version
+
+        # Deleting a site changes the version
+        assert await delete_site_for_aggregator(session, 1, 2, datetime(2031, 1, 1, tzinfo=UTC))
+        deleted_version = await select_aggregator_site_summary_version(session)
+        assert deleted_version not in {original_version, updated_version}
+
+        # Deleting a subscription changes the version
+        assert await delete_subscription_for_site(session, 1, None, 1, datetime(2032, 1, 1, tzinfo=UTC))
+        assert await select_aggregator_site_summary_version(session) not in {
+            original_version,
+            updated_version,
+            deleted_version,
+        }
+
+
+@pytest.mark.anyio
+async def test_select_aggregator_site_summary_version_empty(pg_empty_config):
+    async with generate_async_session(pg_empty_config) as session:
+        assert await select_aggregator_site_summary_version(session) == (0, None, None, None, None, None, None)
+
+
+@pytest.mark.parametrize(
+    "aggregator_id, start, after, limit",
+    [
+        (1, 0, datetime.min, 100),
+        (1, 1, datetime.min, 1),
+        (1, 2, datetime.min, 100),
+        (1, 3, datetime.min, 100),  # Empty page
+        (1, 0, datetime.min, 0),
+        (1, 0, datetime(2022, 2, 3, 6, 0, 0, tzinfo=UTC), 100),
+        (2, 0, datetime.min, 100),
+        (3, 0, datetime.min, 100),  # No sites
+        (99, 0, datetime.min, 100),  # Aggregator DNE
+    ],
+)
+@pytest.mark.anyio
+async def test_stream_all_sites_with_aggregator_id(
+    pg_base_config, aggregator_id: int, start: int, after: datetime, limit: int
+):
+    """Streamed sites should match select_all_sites_with_aggregator_id with every row carrying the total count"""
+    async with generate_async_session(pg_base_config) as session:
+        expected_sites = await select_all_sites_with_aggregator_id(session, aggregator_id, start, after, limit)
+        expected_count = await select_aggregator_site_count(session, aggregator_id, after)
+
+        streamed = [r async for r in stream_all_sites_with_aggregator_id(session, aggregator_id, start, after, limit)]
+        assert [site.site_id for site, _ in streamed] == [site.site_id for site in expected_sites]
+        assert all(count == expected_count for _, count in streamed)
+
+
 @pytest.mark.anyio
 async def test_select_all_sites_with_aggregator_id_contents(pg_base_config):
     """Tests that the returned sites match what's in the DB"""
@@ -1,5 +1,6 @@
+import math
 from collections.abc import Sequence
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from itertools import product
 from zoneinfo import ZoneInfo
 
@@ -9,23 +10,31 @@ from assertical.asserts.time import assert_datetime_equal, assert_nowish
 from assertical.asserts.type import assert_iterable_type, assert_list_type
 from assertical.fixtures.postgres import generate_async_session
 from envoy_schema.server.schema.sep2.types import QualityFlagsType
-from sqlalchemy import or_, select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from envoy.server.crud import site_reading as site_reading_crud
 from envoy.server.crud.site_reading import (
     GroupedSiteReadingTypeDetails,
     count_grouped_site_reading_details,
     delete_site_reading_type_group,
     fetch_grouped_site_reading_details,
-    fetch_site_reading_type_for_mrid,
     fetch_site_reading_types_for_group,
     fetch_site_reading_types_for_group_mrid,
+    fetch_site_reading_types_for_mrids,
     generate_site_reading_type_group_id,
+    recalculate_site_reading_rollups,
+    site_reading_rollup_bucket_start,
     upsert_site_readings,
 )
 from envoy.server.manager.time import utc_now
 from envoy.server.model.archive.site_reading import ArchiveSiteReading, ArchiveSiteReadingType
-from envoy.server.model.site_reading import SiteReading, SiteReadingType
+from envoy.server.model.site_reading import (
+    SiteReading,
+    SiteReadingRollup,
+    SiteReadingRollupResolution,
+    SiteReadingType,
+)
 from tests.unit.server.crud.test_site import SnapshotTableCount, count_table_rows
 
 
@@ -330,28 +339,24 @@ async def test_fetch_count_grouped_site_reading_details(
 
 
 @pytest.mark.parametrize(
-    "agg_id, site_id, mrid, expected_srt_id",
+    "agg_id, mrids, expected_srt_ids",
     [
-        (1, 1, "10000000000000000000000000000abc", 1),
-        (3, 1, "20000000000000000000000000000abc", 2),
-        (1, 2, "40000000000000000000000000000abc", 4),
-        (2, 1, "10000000000000000000000000000abc", None),
-        (1, 2, "10000000000000000000000000000abc", None),
-        (1, 1, "20000000000000000000000000000abc", None),
-        (1, 1, "200", None),
+        (1, [], []),
+        (1, ["10000000000000000000000000000abc"], [1]),
+        (1, ["10000000000000000000000000000abc", "40000000000000000000000000000abc", "dne"], [1, 4]),  # Mixed sites
+        (1, ["20000000000000000000000000000abc"], []),  # Wrong aggregator
+        (3, ["20000000000000000000000000000abc", "10000000000000000000000000000abc"], [2]),
+        (2, ["10000000000000000000000000000abc"], []),
     ],
 )
 @pytest.mark.anyio
-async def test_fetch_site_reading_type_for_mrid(
-    pg_base_config, agg_id: int, site_id: int, mrid: str, expected_srt_id: int | None
+async def test_fetch_site_reading_types_for_mrids(
+    pg_base_config, agg_id: int, mrids: list[str], expected_srt_ids: list[int]
 ):
     async with generate_async_session(pg_base_config) as session:
-        actual = await fetch_site_reading_type_for_mrid(session, agg_id, site_id, mrid)
-        if expected_srt_id is not None:
-            assert isinstance(actual, SiteReadingType)
-            assert expected_srt_id == actual.site_reading_type_id
-        else:
-            assert actual is None
+        actual = await fetch_site_reading_types_for_mrids(session, agg_id, mrids)
+        assert_list_type(SiteReadingType, actual, count=len(expected_srt_ids))
+        assert sorted(srt.site_reading_type_id for srt in actual) == expected_srt_ids
 
 
 ########
@@ -493,6 +498,276 @@ async def test_upsert_site_readings_mixed_insert_update(pg_base_config):
         assert_nowish(archive_records[0].archive_time)
 
 
+@pytest.mark.anyio
+async def test_upsert_site_readings_batched(pg_base_config, monkeypatch):
+    """Tests that readings spanning multiple batches (including duplicates within/across batches) are upserted with
+    the last duplicate winning"""
+    monkeypatch.setattr(site_reading_crud, "SITE_READING_UPSERT_BATCH_SIZE", 2)
+    now = datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+    # Track the readings that each rollup refresh is asked to cover
+    rollup_batch_sizes: list[int] = []
+    original_upsert_site_reading_rollups = site_reading_crud.upsert_site_reading_rollups
+
+    async def tracking_upsert_site_reading_rollups(session, now, site_readings):
+        site_readings = list(site_readings)
+        rollup_batch_sizes.append(len(site_readings))
+        await original_upsert_site_reading_rollups(session, now, site_readings)
+
+    monkeypatch.setattr(site_reading_crud, "upsert_site_reading_rollups", tracking_upsert_site_reading_rollups)
+
+    def reading(hour: int, value: int) -> SiteReading:
+        return SiteReading(
+            site_reading_type_id=3,
+            changed_time=now,
+            local_id=None,
+            quality_flags=QualityFlagsType.NONE,
+            time_period_start=datetime(2024, 1, 1, hour, tzinfo=UTC),
+            time_period_seconds=3600,
+            value=value,
+        )
+
+    site_readings = [
+        reading(1, 1),
+        reading(1, 2),  # Duplicate within the batch
+        reading(2, 3),
+        reading(3, 4),
+        reading(2, 5),  # Duplicate across batches
+    ]
+    async with generate_async_session(pg_base_config) as session:
+        await upsert_site_readings(session, now, site_readings)
+        await session.commit()
+
+    assert rollup_batch_sizes == [2, 1], "Rollups are refreshed per (deduplicated) batch"
+
+    async with generate_async_session(pg_base_config) as session:
+        actual = (
+            (
+                await session.execute(
+                    select(SiteReading)
+                    .where(SiteReading.site_reading_type_id == 3)
+                    .where(SiteReading.time_period_start >= datetime(2024, 1, 1, tzinfo=UTC))
+                    .order_by(SiteReading.time_period_start)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert [(sr.time_period_start.hour, sr.value) for sr in actual] == [(1, 2), (2, 5), (3, 4)]
+
+        # Duplicates (even across batches) are never written - so nothing should have been archived
+        archive_records = (await session.execute(select(ArchiveSiteReading))).scalars().all()
+        assert archive_records == []
+
+        # The rollups reflect the final values
+        rollups = await fetch_rollup_tuples(session, 3)
+        assert (
+            SiteReadingRollupResolution.DAY,
+            datetime(2024, 1, 1, tzinfo=UTC),
+            3,
+            11,
+            2,
+            5,
+        ) in rollups
+
+
+async def fetch_rollup_tuples(
+    session: AsyncSession, site_reading_type_id: int
+) -> list[tuple[int, datetime, int, int, int, int]]:
+    """Fetches (resolution_seconds, bucket_start, reading_count, value_sum, value_min, value_max) for every rollup
+    of site_reading_type_id (ordered by resolution, bucket_start)"""
+    rollups = (
+        (
+            await session.execute(
+                select(SiteReadingRollup)
+                .where(SiteReadingRollup.site_reading_type_id == site_reading_type_id)
+                .order_by(SiteReadingRollup.resolution_seconds, SiteReadingRollup.bucket_start)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    return [
+        (r.resolution_seconds, r.bucket_start, r.reading_count, r.value_sum, r.value_min, r.value_max) for r in rollups
+    ]
+
+
+@pytest.mark.parametrize(
+    "dt, resolution, expected",
+    [
+        (
+            datetime(2022, 6, 7, 1, 14, 59, tzinfo=UTC),
+            SiteReadingRollupResolution.FIFTEEN_MINUTES,
+            datetime(2022, 6, 7, 1, 0, tzinfo=UTC),
+        ),
+        (
+            datetime(2022, 6, 7, 1, 15, 0, tzinfo=UTC),
+            SiteReadingRollupResolution.FIFTEEN_MINUTES,
+            datetime(2022, 6, 7, 1, 15, tzinfo=UTC),
+        ),
+        (
+            datetime(2022, 6, 7, 1, 59, tzinfo=UTC),
+            SiteReadingRollupResolution.HOUR,
+            datetime(2022, 6, 7, 1, tzinfo=UTC),
+        ),
+        (
+            datetime(2022, 6, 7, 1, 0, tzinfo=ZoneInfo("Australia/Brisbane")),
+            SiteReadingRollupResolution.DAY,
+            datetime(2022, 6, 6, tzinfo=UTC),
+        ),
+    ],
+)
+def test_site_reading_rollup_bucket_start(dt: datetime, resolution: SiteReadingRollupResolution, expected: datetime):
+    actual = site_reading_rollup_bucket_start(dt, resolution)
+    assert actual == expected
+    assert actual.tzinfo == UTC
+
+
+@pytest.mark.anyio
+async def test_recalculate_site_reading_rollups(pg_base_config):
+    """Tests that rollups are generated for all existing readings at every resolution"""
+    now = datetime(2024, 1, 2, tzinfo=UTC)
+    async with generate_async_session(pg_base_config) as session:
+        await recalculate_site_reading_rollups(session, now, [1, 2, 99])
+        await session.commit()
+
+    fifteen = SiteReadingRollupResolution.FIFTEEN_MINUTES
+    hour = SiteReadingRollupResolution.HOUR
+    day = SiteReadingRollupResolution.DAY
+    async with generate_async_session(pg_base_config) as session:
+        assert await fetch_rollup_tuples(session, 1) == [
+            (fifteen, datetime(2022, 6, 6, 15, tzinfo=UTC), 1, 11, 11, 11),
+            (fifteen, datetime(2022, 6, 6, 16, tzinfo=UTC), 1, 12, 12, 12),
+            (hour, datetime(2022, 6, 6, 15, tzinfo=UTC), 1, 11, 11, 11),
+            (hour, datetime(2022, 6, 6, 16, tzinfo=UTC), 1, 12, 12, 12),
+            (day, datetime(2022, 6, 6, tzinfo=UTC), 2, 23, 11, 12),
+        ]
+        assert await fetch_rollup_tuples(session, 2) == [
+            (fifteen, datetime(2022, 6, 6, 15, tzinfo=UTC), 1, 13, 13, 13),
+            (hour, datetime(2022, 6, 6, 15, tzinfo=UTC), 1, 13, 13, 13),
+            (day, datetime(2022, 6, 6, tzinfo=UTC), 1, 13, 13, 13),
+        ]
+        assert await fetch_rollup_tuples(session, 4) == [], "Not requested"
+
+        changed_times = (await session.execute(select(SiteReadingRollup.changed_time))).scalars().all()
+        assert all(t == now for t in changed_times)
+
+
+@pytest.mark.anyio
+async def test_upsert_site_readings_updates_rollups(pg_base_config):
+    """Tests that upserting readings only recalculates the rollup buckets that were touched"""
+    backfill_time = datetime(2024, 1, 2, tzinfo=UTC)
+    upsert_time = datetime(2024, 3, 4, tzinfo=UTC)
+    async with generate_async_session(pg_base_config) as session:
+        await recalculate_site_reading_rollups(session, backfill_time, [1])
+        await session.commit()
+
+    site_readings = [
+        # Insert into the same 15 minute bucket as the existing 16:00 reading
+        SiteReading(
+            site_reading_type_id=1,
+            changed_time=upsert_time,
+            local_id=None,
+            quality_flags=QualityFlagsType.VALID,
+            time_period_start=datetime(2022, 6, 6, 16, 5, tzinfo=UTC),
+            time_period_seconds=300,
+            value=20,
+        ),
+        # Update the existing 16:00 reading
+        SiteReading(
+            site_reading_type_id=1,
+            changed_time=upsert_time,
+            local_id=None,
+            quality_flags=QualityFlagsType.VALID,
+            time_period_start=datetime(2022, 6, 6, 16, 0, tzinfo=UTC),
+            time_period_seconds=300,
+            value=30,
+        ),
+        # Insert into a new day
+        SiteReading(
+            site_reading_type_id=1,
+            changed_time=upsert_time,
+            local_id=None,
+            quality_flags=QualityFlagsType.VALID,
+            time_period_start=datetime(2022, 6, 7, 0, 10, tzinfo=UTC),
+            time_period_seconds=300,
+            value=5,
+        ),
+    ]
+    async with generate_async_session(pg_base_config) as session:
+        await upsert_site_readings(session, upsert_time, site_readings)
+        await session.commit()
+
+    fifteen = SiteReadingRollupResolution.FIFTEEN_MINUTES
+    hour = SiteReadingRollupResolution.HOUR
+    day = SiteReadingRollupResolution.DAY
+    async with generate_async_session(pg_base_config) as session:
+        assert await fetch_rollup_tuples(session, 1) == [
+            (fifteen, datetime(2022, 6, 6, 15, tzinfo=UTC), 1, 11, 11, 11),
+            (fifteen, datetime(2022, 6, 6, 16, tzinfo=UTC), 2, 50, 20, 30),
+            (fifteen, datetime(2022, 6, 7, 0, tzinfo=UTC), 1, 5, 5, 5),
+            (hour, datetime(2022, 6, 6, 15, tzinfo=UTC), 1, 11, 11, 11),
+            (hour, datetime(2022, 6, 6, 16, tzinfo=UTC), 2, 50, 20, 30),
+            (hour, datetime(2022, 6, 7, 0, tzinfo=UTC), 1, 5, 5, 5),
+            (day, datetime(2022, 6, 6, tzinfo=UTC), 3, 61, 11, 30),
+            (day, datetime(2022, 6, 7, tzinfo=UTC), 1, 5, 5, 5),
+        ]
+
+        # Only the touched buckets should've been recalculated
+        untouched = (
+            (
+                await session.execute(
+                    select(SiteReadingRollup.changed_time).where(
+                        SiteReadingRollup.bucket_start == datetime(2022, 6, 6, 15, tzinfo=UTC)
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert untouched == [backfill_time, backfill_time]
+
+
+@pytest.mark.anyio
+async def test_upsert_site_readings_rollups_many_buckets(pg_base_config, monkeypatch):
+    """Tests that recalculating more rollup buckets than asyncpg's bind parameter limit (32767) would allow (at 2 per
+    bucket) still succeeds"""
+    monkeypatch.setattr(site_reading_crud, "SITE_READING_UPSERT_BATCH_SIZE", 20000)
+    now = datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+    total_readings = 17000
+    first_start = datetime(2024, 1, 1, tzinfo=UTC)
+    site_readings = [
+        SiteReading(
+            site_reading_type_id=3,
+            changed_time=now,
+            local_id=None,
+            quality_flags=QualityFlagsType.NONE,
+            time_period_start=first_start + timedelta(minutes=15 * i),
+            time_period_seconds=900,
+            value=i,
+        )
+        for i in range(total_readings)
+    ]
+    async with generate_async_session(pg_base_config) as session:
+        await upsert_site_readings(session, now, site_readings)
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        rollup_counts = (
+            await session.execute(
+                select(SiteReadingRollup.resolution_seconds, func.count(), func.sum(SiteReadingRollup.reading_count))
+                .where(SiteReadingRollup.site_reading_type_id == 3)
+                .where(SiteReadingRollup.bucket_start >= first_start)
+                .group_by(SiteReadingRollup.resolution_seconds)
+            )
+        ).all()
+        assert {tuple(r) for r in rollup_counts} == {
+            (SiteReadingRollupResolution.FIFTEEN_MINUTES, total_readings, total_readings),
+            (SiteReadingRollupResolution.HOUR, total_readings // 4, total_readings),
+            (SiteReadingRollupResolution.DAY, math.ceil(total_readings / 96), total_readings),
+        }
+
+
 async def snapshot_all_srt_tables(
     session: AsyncSession, agg_id: int, site_id: int | None, srt_ids: list[int]
 ) -> list[SnapshotTableCount]:
@@ -18,6 +18,7 @@ from envoy.server.crud.subscription import (
     select_subscriptions_for_aggregator,
     select_subscriptions_for_site,
     upsert_subscription,
+    upsert_subscriptions,
 )
 from envoy.server.model.archive.subscription import ArchiveSubscription, ArchiveSubscriptionCondition
 from envoy.server.model.subscription import Subscription, SubscriptionCondition, SubscriptionResource
@@ -732,3 +733,175 @@ async def test_delete_subscription_for_site_with_conditions(pg_base_config):
             ),
             archived_conds[1],
         )
+
+
+@pytest.mark.anyio
+async def test_upsert_subscriptions_empty(pg_base_config):
+    async with generate_async_session(pg_base_config) as session:
+        assert await upsert_subscriptions(session, []) == []
+
+
+@pytest.mark.anyio
+async def test_upsert_subscriptions_mixed_batch(pg_base_config):
+    """Checks that a batch of inserts / renewals / duplicate keys are all handled as if upsert_subscription was called
+    for each subscription in turn"""
+
+    def cond(lower: int) -> SubscriptionCondition:
+        return SubscriptionCondition(
+            attribute=ConditionAttributeIdentifier.READING_VALUE, lower_threshold=lower, upper_threshold=lower + 1
+        )
+
+    changed_time = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+    subs = [
+        Subscription(
+            aggregator_id=1,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.SITE,
+            scoped_site_id=None,
+            resource_id=None,
+            notification_uri="http://renew.1/",
+            entity_limit=101,
+            conditions=[cond(1), cond(2)],
+        ),  # Will renew sub 1 (NULL scoped_site_id / resource_id)
+        Subscription(
+            aggregator_id=1,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.DYNAMIC_OPERATING_ENVELOPE,
+            scoped_site_id=2,
+            resource_id=1,
+            notification_uri="http://renew.2/",
+            entity_limit=102,
+            conditions=[],
+        ),  # Will renew sub 2
+        Subscription(
+            aggregator_id=1,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.SITE,
+            scoped_site_id=3,
+            resource_id=None,
+            notification_uri="http://insert.1/",
+            entity_limit=103,
+            conditions=[cond(3)],
+        ),  # New sub (near miss on sub 1)
+        Subscription(
+            aggregator_id=2,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.TARIFF_GENERATED_RATE,
+            scoped_site_id=None,
+            resource_id=None,
+            notification_uri="http://insert.2/",
+            entity_limit=104,
+            conditions=[],
+        ),  # New sub
+        Subscription(
+            aggregator_id=1,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.SITE,
+            scoped_site_id=3,
+            resource_id=None,
+            notification_uri="http://insert.1.dupe/",
+            entity_limit=105,
+            conditions=[cond(4)],
+        ),  # Duplicate of the new sub - last entry wins
+    ]
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_before = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+        cond_count_for_renewals = (
+            await session.execute(
+                select(func.count())
+                .select_from(SubscriptionCondition)
+                .where(SubscriptionCondition.subscription_id.in_([1, 2]))
+            )
+        ).scalar_one()
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_ids = await upsert_subscriptions(session, subs)
+        await session.commit()
+
+    assert len(sub_ids) == len(subs)
+    assert sub_ids[0] == 1
+    assert sub_ids[1] == 2
+    assert sub_ids[2] == sub_ids[4], "Duplicate keys resolve to the same subscription"
+    assert len(set(sub_ids)) == 4
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_after = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+        assert sub_count_before + 2 == sub_count_after
+
+        for sub_id, expected_uri, expected_limit, expected_lowers in [
+            (sub_ids[0], "http://renew.1/", 101, [1, 2]),
+            (sub_ids[1], "http://renew.2/", 102, []),
+            (sub_ids[2], "http://insert.1.dupe/", 105, [4]),
+            (sub_ids[3], "http://insert.2/", 104, []),
+        ]:
+            db_sub = await select_subscription_by_id(session, 2 if sub_id == sub_ids[3] else 1, sub_id)
+            assert db_sub is not None
+            assert db_sub.notification_uri == expected_uri
+            assert db_sub.entity_limit == expected_limit
+            assert_datetime_equal(db_sub.changed_time, changed_time)
+            assert sorted(c.lower_threshold for c in db_sub.conditions) == expected_lowers
+
+        renewed_sub = await select_subscription_by_id(session, 1, 1)
+        assert renewed_sub is not None
+        assert renewed_sub.created_time == datetime(2000, 1, 1, tzinfo=UTC), "Renewals don't change created_time"
+
+        # Only the renewed subscriptions are archived
+        archive_subs = (await session.execute(select(ArchiveSubscription))).scalars().all()
+        archive_conds = (await session.execute(select(ArchiveSubscriptionCondition))).scalars().all()
+        assert sorted(a.subscription_id for a in archive_subs) == [1, 2]
+        assert len(archive_conds) == cond_count_for_renewals
+        assert all(a.subscription_id in [1, 2] for a in archive_conds)
+
+
+@pytest.mark.anyio
+async def test_upsert_subscriptions_many_keys(pg_base_config):
+    """Checks that upserting more subscriptions than asyncpg's bind parameter limit (32767) would allow (at 4 per
+    key) still succeeds"""
+    changed_time = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+    total_new = 11000
+    subs = [
+        Subscription(
+            aggregator_id=1,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.SITE,
+            scoped_site_id=None,
+            resource_id=None,
+            notification_uri="http://renew.1/",
+            entity_limit=101,
+            conditions=[],
+        )  # Will renew sub 1
+    ] + [
+        Subscription(
+            aggregator_id=1,
+            changed_time=changed_time,
+            resource_type=SubscriptionResource.READING,
+            scoped_site_id=None,
+            resource_id=1000000 + i,
+            notification_uri=f"http://insert.{i}/",
+            entity_limit=i,
+            conditions=[],
+        )
+        for i in range(total_new)
+    ]
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_before = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_ids = await upsert_subscriptions(session, subs)
+        await session.commit()
+
+    assert sub_ids[0] == 1
+    assert len(set(sub_ids)) == len(subs)
+
+    async with generate_async_session(pg_base_config) as session:
+        sub_count_after = (await session.execute(select(func.count()).select_from(Subscription))).scalar_one()
+        assert sub_count_before + total_new == sub_count_after
+
+        renewed_sub = await select_subscription_by_id(session, 1, 1)
+        assert renewed_sub is not None
+        assert renewed_sub.notification_uri == "http://renew.1/"
+
+        archive_subs = (await session.execute(select(ArchiveSubscription))).scalars().all()
+        assert [a.subscription_id for a in archive_subs] == [1]
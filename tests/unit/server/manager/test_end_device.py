@@ -1,6 +1,7 @@
 import os
 import unittest.mock as mock
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
 import pytest
 from assertical.asserts.generator import assert_class_instance_equality
@@ -17,6 +18,8 @@ from envoy_schema.server.schema.sep2.end_device import (
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from envoy.server.api.request import extract_datetime_from_paging_param
+from envoy.server.end_device_list_header import EndDeviceListHeader
 from envoy.server.exception import (
     ConflictError,
     ForbiddenError,
@@ -28,6 +31,7 @@ from envoy.server.manager.end_device import (
     EndDeviceManager,
     RegistrationManager,
     fetch_sites_and_count_for_claims,
+    is_unfiltered_changed_after,
 )
 from envoy.server.model.aggregator import NULL_AGGREGATOR_ID
 from envoy.server.model.config.server import RuntimeServerConfig
@@ -190,6 +194,59 @@ async def test_fetch_sites_and_count_for_claims(
         mock_select_aggregator_site_count.assert_called_once_with(session, scope.aggregator_id, AFTER_TIME)
 
 
+@pytest.mark.parametrize(
+    "after, expected",
+    [
+        (extract_datetime_from_paging_param([0]), True),  # API default
+        (extract_datetime_from_paging_param(None), True),
+        (datetime.min, True),
+        (datetime(1970, 1, 1), True),
+        (datetime(1970, 1, 1, 10, 0, 0, tzinfo=ZoneInfo("Australia/Brisbane")), True),  # Before the epoch (in UTC)
+        (extract_datetime_from_paging_param([1]), False),
+        (AFTER_TIME, False),
+    ],
+)
+def test_is_unfiltered_changed_after(after: datetime, expected: bool):
+    assert is_unfiltered_changed_after(after) == expected
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "after, aggregator_site_count, expected_count, expect_count_query",
+    [
+        (extract_datetime_from_paging_param([0]), 55, 55, False),  # Unfiltered (API default) - the count is known
+        (datetime.min, 55, 55, False),  # Unfiltered - the count is already known
+        (extract_datetime_from_paging_param([0]), None, 789, True),  # Unfiltered but no known count
+        (AFTER_TIME, 55, 789, True),  # Filtered - the known (total) count doesn't apply
+    ],
+)
+@mock.patch("envoy.server.manager.end_device.select_all_sites_with_aggregator_id")
+@mock.patch("envoy.server.manager.end_device.select_aggregator_site_count")
+async def test_fetch_sites_and_count_for_claims_aggregator_site_count(
+    mock_select_aggregator_site_count: mock.MagicMock,
+    mock_select_all_sites_with_aggregator_id: mock.MagicMock,
+    after: datetime,
+    aggregator_site_count: int | None,
+    expected_count: int,
+    expect_count_query: bool,
+):
+    """A known aggregator_site_count should only be used (instead of counting) if after isn't filtering anything"""
+    session = create_mock_session()
+    scope = generate_class_instance(UnregisteredRequestScope, source=CertificateType.AGGREGATOR_CERTIFICATE)
+    sites = [generate_class_instance(Site, seed=4321)]
+    mock_select_all_sites_with_aggregator_id.return_value = sites
+    mock_select_aggregator_site_count.return_value = 789
+
+    result = await fetch_sites_and_count_for_claims(session, scope, 1, after, 2, aggregator_site_count)
+
+    assert result == (sites, expected_count)
+    mock_select_all_sites_with_aggregator_id.assert_called_once_with(session, scope.aggregator_id, 1, after, 2)
+    if expect_count_query:
+        mock_select_aggregator_site_count.assert_called_once_with(session, scope.aggregator_id, after)
+    else:
+        mock_select_aggregator_site_count.assert_not_called()
+
+
 @pytest.mark.anyio
 @mock.patch("envoy.server.manager.end_device.select_single_site_with_sfdi")
 async def test_end_device_manager_generate_unique_device_id_bounded_attempts(
@@ -634,9 +691,9 @@ async def test_add_enddevice_for_scope_device_lfdi_case_insensitive(
 @mock.patch("envoy.server.manager.end_device.EndDeviceListMapper")
 @mock.patch("envoy.server.manager.end_device.RuntimeServerConfigManager.fetch_current_config")
 @mock.patch("envoy.server.manager.end_device.FunctionSetAssignmentsManager.fetch_distinct_function_set_assignment_ids")
-@mock.patch("envoy.server.manager.end_device.count_subscriptions_for_site")
+@mock.patch("envoy.server.manager.end_device.fetch_end_device_list_header")
 async def test_fetch_enddevicelist_for_scope_aggregator_skipping_virtual_edev(
-    mock_count_subscriptions_for_site: mock.Mock,
+    mock_fetch_end_device_list_header: mock.Mock,
     mock_fetch_distinct_function_set_assignment_ids: mock.Mock,
     mock_fetch_current_config: mock.Mock,
     mock_EndDeviceListMapper: mock.MagicMock,
@@ -667,6 +724,11 @@ async def test_fetch_enddevicelist_for_scope_aggregator_skipping_virtual_edev(
     config = RuntimeServerConfig()
     mock_fetch_current_config.return_value = config
 
+    header = EndDeviceListHeader(
+        aggregator_exists=True, virtual_site_timezone_id="Australia/Brisbane", site_count=456, subscription_count=789
+    )
+    mock_fetch_end_device_list_header.return_value = header
+
     # Act
     result: EndDeviceListResponse = await EndDeviceManager.fetch_enddevicelist_for_scope(
         mock_session, scope, start, after, limit
@@ -686,35 +748,46 @@ async def test_fetch_enddevicelist_for_scope_aggregator_skipping_virtual_edev(
         total_fsa_links=len(fsa_ids),
         total_subscription_links=0,
     )
-    mock_fetch_sites_and_count_for_claims.assert_called_once_with(mock_session, scope, start - 1, after, limit)
-    mock_count_subscriptions_for_site.assert_not_called()  # Don't need sub count if we are missing aggregator EndDevice
+    mock_fetch_sites_and_count_for_claims.assert_called_once_with(
+        mock_session, scope, start - 1, after, limit, header.site_count
+    )
+    mock_fetch_end_device_list_header.assert_called_once_with(mock_session, scope.aggregator_id)
     mock_fetch_distinct_function_set_assignment_ids.assert_called_once_with(mock_session, datetime.min)
 
 
 @pytest.mark.parametrize(
-    "input_limit, expected_query_limit, includes_virtual_edev",
-    [(0, 0, False), (1, 0, True), (5, 4, True), (9999, 9998, True), (-1, 0, False)],
+    "input_limit, aggregator_exists, expected_query_limit, includes_virtual_edev",
+    [
+        (0, True, 0, False),
+        (1, True, 0, True),
+        (5, True, 4, True),
+        (9999, True, 9998, True),
+        (-1, True, 0, False),
+        (5, False, 4, False),
+    ],
 )
 @pytest.mark.anyio
 @mock.patch("envoy.server.manager.end_device.fetch_sites_and_count_for_claims")
 @mock.patch("envoy.server.manager.end_device.EndDeviceListMapper")
-@mock.patch("envoy.server.manager.end_device.get_virtual_site_for_aggregator")
+@mock.patch("envoy.server.manager.end_device.build_virtual_site")
 @mock.patch("envoy.server.manager.end_device.RuntimeServerConfigManager.fetch_current_config")
 @mock.patch("envoy.server.manager.end_device.FunctionSetAssignmentsManager.fetch_distinct_function_set_assignment_ids")
-@mock.patch("envoy.server.manager.end_device.count_subscriptions_for_site")
+@mock.patch("envoy.server.manager.end_device.fetch_end_device_list_header")
 async def test_fetch_enddevicelist_for_scope_aggregator(
-    mock_count_subscriptions_for_site: mock.Mock,
+    mock_fetch_end_device_list_header: mock.Mock,
     mock_fetch_distinct_function_set_assignment_ids: mock.Mock,
     mock_fetch_current_config: mock.Mock,
-    mock_get_virtual_site_for_aggregator: mock.MagicMock,
+    mock_build_virtual_site: mock.MagicMock,
     mock_EndDeviceListMapper: mock.MagicMock,
     mock_fetch_sites_and_count_for_claims: mock.MagicMock,
     input_limit: int,
+    aggregator_exists: bool,
     expected_query_limit: int,
     includes_virtual_edev: bool,
 ):
-    """Checks that fetching the enddevice list just passes through to the relevant CRUD. Also validates that the virtual
-    end device behaves when limit is 0 or below"""
+    """Checks that fetching the enddevice list sources the virtual end device / counts from the EndDeviceList header
+    and only queries for the page of sites. Also validates that the virtual end device behaves when limit is 0 or
+    below"""
     # Arrange
     mock_session = create_mock_session()
     start = 0
@@ -725,12 +798,19 @@ async def test_fetch_enddevicelist_for_scope_aggregator(
         generate_class_instance(Site, seed=101, optional_is_none=False),
         generate_class_instance(Site, seed=202, optional_is_none=True),
     ]
-    returned_virtual_site = (generate_class_instance(Site, seed=303, optional_is_none=True),)
+    returned_virtual_site = generate_class_instance(Site, seed=303, optional_is_none=True)
     scope: UnregisteredRequestScope = generate_class_instance(
         UnregisteredRequestScope, source=CertificateType.AGGREGATOR_CERTIFICATE
     )
 
-    mock_get_virtual_site_for_aggregator.return_value = returned_virtual_site
+    header = EndDeviceListHeader(
+        aggregator_exists=aggregator_exists,
+        virtual_site_timezone_id="Australia/Brisbane",
+        site_count=456,
+        subscription_count=5432,
+    )
+    mock_fetch_end_device_list_header.return_value = header
+    mock_build_virtual_site.return_value = returned_virtual_site
     mock_EndDeviceListMapper.map_to_response = mock.Mock(return_value=mapped_ed_list)
     mock_fetch_sites_and_count_for_claims.return_value = (returned_sites, returned_site_count)
 
@@ -740,9 +820,6 @@ async def test_fetch_enddevicelist_for_scope_aggregator(
     fsa_ids = [1, 3, 16, 100, 101]
     mock_fetch_distinct_function_set_assignment_ids.return_value = fsa_ids
 
-    sub_count = 5432
-    mock_count_subscriptions_for_site.return_value = sub_count
-
     # Act
     result: EndDeviceListResponse = await EndDeviceManager.fetch_enddevicelist_for_scope(
         mock_session, scope, start, after, input_limit
@@ -753,7 +830,7 @@ async def test_fetch_enddevicelist_for_scope_aggregator(
     assert_mock_session(mock_session, committed=False)
 
     expected_virtual_site = returned_virtual_site if includes_virtual_edev else None
-    expected_sub_count = sub_count if includes_virtual_edev else 0
+    expected_sub_count = header.subscription_count if input_limit > 0 else 0
     mock_EndDeviceListMapper.map_to_response.assert_called_once_with(
         scope=scope,
         site_list=returned_sites,
@@ -765,17 +842,19 @@ async def test_fetch_enddevicelist_for_scope_aggregator(
         total_subscription_links=expected_sub_count,
     )
     mock_fetch_sites_and_count_for_claims.assert_called_once_with(
-        mock_session, scope, start, after, expected_query_limit
+        mock_session, scope, start, after, expected_query_limit, header.site_count
     )
+    mock_fetch_end_device_list_header.assert_called_once_with(mock_session, scope.aggregator_id)
 
     if includes_virtual_edev:
-        mock_get_virtual_site_for_aggregator.assert_called_once_with(
-            session=mock_session, aggregator_id=scope.aggregator_id, aggregator_lfdi=scope.lfdi, post_rate_seconds=None
+        mock_build_virtual_site.assert_called_once_with(
+            aggregator_id=scope.aggregator_id,
+            aggregator_lfdi=scope.lfdi,
+            timezone_id=header.virtual_site_timezone_id,
+            post_rate_seconds=None,
         )
-        mock_count_subscriptions_for_site.assert_called_once_with(mock_session, scope.aggregator_id, None, None)
     else:
-        mock_get_virtual_site_for_aggregator.assert_not_called()
-        mock_count_subscriptions_for_site.assert_not_called()  # Don't need sub count if we are missing agg EndDevice
+        mock_build_virtual_site.assert_not_called()
 
     mock_fetch_distinct_function_set_assignment_ids.assert_called_once_with(mock_session, datetime.min)
 
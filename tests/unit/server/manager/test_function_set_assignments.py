@@ -9,55 +9,59 @@ from envoy_schema.server.schema.sep2.function_set_assignments import (
     FunctionSetAssignmentsResponse,
 )
 
+from envoy.server.fsa_catalogue import FunctionSetAssignmentsCatalogue
 from envoy.server.manager.function_set_assignments import FunctionSetAssignmentsManager
 from envoy.server.model.config.server import RuntimeServerConfig
 from envoy.server.model.site import Site
 from envoy.server.request_scope import SiteRequestScope
 
 
+def catalogue_for(changed_times_by_fsa_id: dict[int, datetime], derp_counts_by_fsa_id: dict[int, int]):
+    return FunctionSetAssignmentsCatalogue(
+        fsa_ids=sorted(changed_times_by_fsa_id.keys()),
+        derp_counts_by_fsa_id=derp_counts_by_fsa_id,
+        changed_times_by_fsa_id=changed_times_by_fsa_id,
+    )
+
+
 @pytest.mark.anyio
 @mock.patch("envoy.server.manager.function_set_assignments.FunctionSetAssignmentsMapper.map_to_response")
 @mock.patch("envoy.server.manager.function_set_assignments.select_single_site_with_site_id")
-@mock.patch("envoy.server.manager.function_set_assignments.select_site_control_group_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.select_tariff_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.count_site_control_groups_by_fsa_id")
+@mock.patch("envoy.server.manager.function_set_assignments.fetch_function_set_assignments_catalogue")
 @pytest.mark.parametrize(
-    "scg_fsa_ids, tariff_fsa_ids, fsa_id, expected_null",
+    "fsa_ids, derp_counts_by_fsa_id, fsa_id, expected_null, expected_derp_links",
     [
-        ([], [], 1, True),
-        ([1], [], 1, False),
-        ([], [1], 1, False),
-        ([1], [1], 1, False),
-        ([3], [2], 1, True),
-        ([5, 1, 6], [2, 5, 1, 6], 6, False),
-        ([5, 1, 6], [2, 5, 1, 6], 3, True),
+        ([], {}, 1, True, None),
+        ([1], {}, 1, False, None),
+        ([1], {1: 3}, 1, False, 3),
+        ([3, 2], {3: 1}, 1, True, None),
+        ([5, 1, 2, 6], {5: 1, 6: 2}, 6, False, 2),
+        ([5, 1, 2, 6], {5: 1, 6: 2}, 3, True, None),
     ],
 )
 async def test_fetch_function_set_assignments_for_scope(
-    mock_count_site_control_groups_by_fsa_id: mock.MagicMock,
-    mock_select_tariff_fsa_ids: mock.MagicMock,
-    mock_select_site_control_group_fsa_ids: mock.MagicMock,
+    mock_fetch_function_set_assignments_catalogue: mock.MagicMock,
     mock_select_single_site_with_site_id: mock.MagicMock,
     mock_map_to_response: mock.MagicMock,
-    scg_fsa_ids: list[int],
-    tariff_fsa_ids: list[int],
+    fsa_ids: list[int],
+    derp_counts_by_fsa_id: dict[int, int],
     fsa_id: int,
     expected_null: bool,
+    expected_derp_links: int | None,
 ):
-    """Check the manager will check for the existence of FSAs with the ID before returning"""
+    """Check the manager will check for the existence of FSAs with the ID (in the catalogue) before returning"""
 
     # Arrange
     mock_session = create_mock_session()  # The session should not be interacted with directly
     mapped_fsa = generate_class_instance(FunctionSetAssignmentsResponse)
     site = generate_class_instance(Site)
     scope = generate_class_instance(SiteRequestScope)
-    derp_counts_by_fsa_id = {}
 
     mock_select_single_site_with_site_id.return_value = site
     mock_map_to_response.return_value = mapped_fsa
-    mock_select_tariff_fsa_ids.return_value = tariff_fsa_ids
-    mock_select_site_control_group_fsa_ids.return_value = scg_fsa_ids
-    mock_count_site_control_groups_by_fsa_id.return_value = derp_counts_by_fsa_id
+    mock_fetch_function_set_assignments_catalogue.return_value = catalogue_for(
+        {i: datetime(2022, 1, 1, tzinfo=UTC) for i in fsa_ids}, derp_counts_by_fsa_id
+    )
 
     # Act
     result = await FunctionSetAssignmentsManager.fetch_function_set_assignments_for_scope(
@@ -71,31 +75,22 @@ async def test_fetch_function_set_assignments_for_scope(
     else:
         assert result is mapped_fsa
         mock_map_to_response.assert_called_once_with(
-            scope=scope, fsa_id=fsa_id, total_tp_links=None, total_derp_links=None
+            scope=scope, fsa_id=fsa_id, total_tp_links=None, total_derp_links=expected_derp_links
         )
 
     assert_mock_session(mock_session)
     mock_select_single_site_with_site_id.assert_called_once_with(
         session=mock_session, site_id=scope.site_id, aggregator_id=scope.aggregator_id
     )
-
-    # These may or may not be called - depending on whether the FSA ID is found in one or the other
-    if mock_select_site_control_group_fsa_ids.call_count:
-        mock_select_site_control_group_fsa_ids.assert_called_once_with(mock_session, datetime.min)
-    if mock_select_tariff_fsa_ids.call_count:
-        mock_select_tariff_fsa_ids.assert_called_once_with(mock_session, datetime.min)
+    mock_fetch_function_set_assignments_catalogue.assert_called_once_with(mock_session)
 
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.manager.function_set_assignments.FunctionSetAssignmentsMapper.map_to_response")
 @mock.patch("envoy.server.manager.function_set_assignments.select_single_site_with_site_id")
-@mock.patch("envoy.server.manager.function_set_assignments.select_site_control_group_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.select_tariff_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.count_site_control_groups_by_fsa_id")
+@mock.patch("envoy.server.manager.function_set_assignments.fetch_function_set_assignments_catalogue")
 async def test_fetch_function_set_assignments_for_scope_no_site(
-    mock_count_site_control_groups_by_fsa_id: mock.MagicMock,
-    mock_select_tariff_fsa_ids: mock.MagicMock,
-    mock_select_site_control_group_fsa_ids: mock.MagicMock,
+    mock_fetch_function_set_assignments_catalogue: mock.MagicMock,
     mock_select_single_site_with_site_id: mock.MagicMock,
     mock_map_to_response: mock.MagicMock,
 ):
@@ -119,45 +114,41 @@ async def test_fetch_function_set_assignments_for_scope_no_site(
     mock_select_single_site_with_site_id.assert_called_once_with(
         session=mock_session, site_id=scope.site_id, aggregator_id=scope.aggregator_id
     )
-    mock_select_site_control_group_fsa_ids.assert_not_called()
-    mock_select_tariff_fsa_ids.assert_not_called()
-    mock_count_site_control_groups_by_fsa_id.assert_not_called()
+    mock_fetch_function_set_assignments_catalogue.assert_not_called()
 
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.manager.function_set_assignments.FunctionSetAssignmentsMapper.map_to_list_response")
 @mock.patch("envoy.server.manager.function_set_assignments.RuntimeServerConfigManager.fetch_current_config")
 @mock.patch("envoy.server.manager.function_set_assignments.select_single_site_with_site_id")
-@mock.patch("envoy.server.manager.function_set_assignments.select_site_control_group_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.select_tariff_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.count_site_control_groups_by_fsa_id")
+@mock.patch("envoy.server.manager.function_set_assignments.fetch_function_set_assignments_catalogue")
 @pytest.mark.parametrize(
-    "scg_fsa_ids, tariff_fsa_ids, start, limit, expected_fsa_ids, expected_count",
+    "changed_times_by_fsa_id, changed_after, start, limit, expected_fsa_ids, expected_count",
     [
-        ([], [], 0, 10, [], 0),
-        ([], [], 3, 10, [], 0),
-        ([1, 2], [5, 6, 1, 2], 0, 10, [1, 2, 5, 6], 4),
-        ([1, 2], [5, 6, 1, 2], 1, 2, [2, 5], 4),
-        ([1, 2], [], 0, 0, [], 2),
-        ([2, 1], [], 0, 99, [1, 2], 2),
-        ([2, 1], [2, 1, 2, 1, 1], 0, 99, [1, 2], 2),
+        ({}, datetime.min, 0, 10, [], 0),
+        ({}, datetime.min, 3, 10, [], 0),
+        ({1: 1, 2: 1, 5: 1, 6: 1}, datetime.min, 0, 10, [1, 2, 5, 6], 4),
+        ({1: 1, 2: 1, 5: 1, 6: 1}, datetime.min, 1, 2, [2, 5], 4),
+        ({1: 1, 2: 1}, datetime.min, 0, 0, [], 2),
+        ({1: 1, 2: 3, 5: 2, 6: 4}, datetime(2022, 1, 2, tzinfo=UTC), 0, 10, [2, 5, 6], 3),
+        ({1: 1, 2: 3, 5: 2, 6: 4}, datetime(2022, 1, 3, tzinfo=UTC), 1, 10, [6], 2),
+        ({1: 1, 2: 3}, datetime(2022, 1, 5, tzinfo=UTC), 0, 10, [], 0),
     ],
 )
 async def test_fetch_function_set_assignments_list_for_scope(
-    mock_count_site_control_groups_by_fsa_id: mock.MagicMock,
-    mock_select_tariff_fsa_ids: mock.MagicMock,
-    mock_select_site_control_group_fsa_ids: mock.MagicMock,
+    mock_fetch_function_set_assignments_catalogue: mock.MagicMock,
     mock_select_single_site_with_site_id: mock.MagicMock,
     mock_fetch_current_config: mock.MagicMock,
     mock_map_to_list_response: mock.MagicMock,
-    scg_fsa_ids: list[int],
-    tariff_fsa_ids: list[int],
+    changed_times_by_fsa_id: dict[int, int],
+    changed_after: datetime,
     start: int,
     limit: int,
     expected_fsa_ids: list[int],
     expected_count: int,
 ):
-    """Check that existing FSA IDs are properly combined and paginated"""
+    """Check that catalogue FSA IDs are properly filtered (by changed_after) and paginated. changed_times_by_fsa_id
+    values are the day of Jan 2022"""
 
     # Arrange
     mock_session = create_mock_session()  # The session should not be interacted with directly
@@ -167,14 +158,15 @@ async def test_fetch_function_set_assignments_list_for_scope(
     config = RuntimeServerConfig()
 
     derp_count_by_fsa_id = {1: 44, 5: 66}
+    catalogue = catalogue_for(
+        {fsa_id: datetime(2022, 1, day, tzinfo=UTC) for fsa_id, day in changed_times_by_fsa_id.items()},
+        derp_count_by_fsa_id,
+    )
 
-    changed_after = datetime(2022, 11, 14, tzinfo=UTC)
     mock_select_single_site_with_site_id.return_value = site
     mock_map_to_list_response.return_value = mapped_fsal
     mock_fetch_current_config.return_value = config
-    mock_select_tariff_fsa_ids.return_value = tariff_fsa_ids
-    mock_select_site_control_group_fsa_ids.return_value = scg_fsa_ids
-    mock_count_site_control_groups_by_fsa_id.return_value = derp_count_by_fsa_id
+    mock_fetch_function_set_assignments_catalogue.return_value = catalogue
 
     # Act
     result = await FunctionSetAssignmentsManager.fetch_function_set_assignments_list_for_scope(
@@ -194,21 +186,17 @@ async def test_fetch_function_set_assignments_list_for_scope(
         pollrate_seconds=config.fsal_pollrate_seconds,
         derp_counts_by_fsa_id=derp_count_by_fsa_id,
     )
-    mock_select_site_control_group_fsa_ids.assert_called_once_with(mock_session, changed_after)
-    mock_select_tariff_fsa_ids.assert_called_once_with(mock_session, changed_after)
+    mock_fetch_function_set_assignments_catalogue.assert_called_once_with(mock_session)
     mock_fetch_current_config.assert_called_once()
-    mock_count_site_control_groups_by_fsa_id.assert_called_once_with(mock_session)
 
 
 @pytest.mark.anyio
 @mock.patch("envoy.server.manager.function_set_assignments.FunctionSetAssignmentsMapper.map_to_list_response")
 @mock.patch("envoy.server.manager.function_set_assignments.RuntimeServerConfigManager.fetch_current_config")
 @mock.patch("envoy.server.manager.function_set_assignments.select_single_site_with_site_id")
-@mock.patch("envoy.server.manager.function_set_assignments.select_site_control_group_fsa_ids")
-@mock.patch("envoy.server.manager.function_set_assignments.select_tariff_fsa_ids")
+@mock.patch("envoy.server.manager.function_set_assignments.fetch_function_set_assignments_catalogue")
 async def test_fetch_function_set_assignments_list_for_scope_no_site(
-    mock_select_tariff_fsa_ids: mock.MagicMock,
-    mock_select_site_control_group_fsa_ids: mock.MagicMock,
+    mock_fetch_function_set_assignments_catalogue: mock.MagicMock,
     mock_select_single_site_with_site_id: mock.MagicMock,
     mock_fetch_current_config: mock.MagicMock,
     mock_map_to_list_response: mock.MagicMock,
@@ -233,6 +221,5 @@ async def test_fetch_function_set_assignments_list_for_scope_no_site(
         session=mock_session, site_id=scope.site_id, aggregator_id=scope.aggregator_id
     )
     mock_map_to_list_response.assert_not_called()
-    mock_select_site_control_group_fsa_ids.assert_not_called()
-    mock_select_tariff_fsa_ids.assert_not_called()
+    mock_fetch_function_set_assignments_catalogue.assert_not_called()
     mock_fetch_current_config.assert_not_called()
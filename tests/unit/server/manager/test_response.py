@@ -1,5 +1,5 @@
 import unittest.mock as mock
-from datetime import datetime
+from datetime import UTC, datetime
 
 import pytest
 from assertical.asserts.time import assert_nowish
@@ -11,7 +11,7 @@ from envoy_schema.server.schema.sep2.response import Response, ResponseListRespo
 from sqlalchemy import func, select
 
 from envoy.server.exception import BadRequestError, NotFoundError
-from envoy.server.manager.response import ResponseManager
+from envoy.server.manager.response import ResponseManager, ResponseSubject, ResponseSubjectCache
 from envoy.server.mapper.constants import MridType, PricingReadingType, ResponseSetType
 from envoy.server.mapper.sep2.mrid import MridMapper
 from envoy.server.mapper.sep2.response import response_set_type_to_href
@@ -1034,3 +1034,126 @@ async def test_create_response_for_scope_price_created_normally(
         assert db_response.tariff_generated_rate_id_snapshot == decoded_rate_id, "This is double checking the mapper"
         assert_nowish(db_response.created_time)
         assert db_response.response_type == response.status, "This is double checking the mapper"
+
+
+def test_ResponseSubjectCache():
+    cache = ResponseSubjectCache(max_size=2, ttl_seconds=60)
+    key1 = (ResponseSetType.SITE_CONTROLS, 1, 2, "abc")
+    key2 = (ResponseSetType.SITE_CONTROLS, 1, 3, "abc")
+    key3 = (ResponseSetType.TARIFF_GENERATED_RATES, 1, 2, "abc")
+    subject1 = ResponseSubject(subject_id=11, site_id=2)
+    subject2 = ResponseSubject(subject_id=22, site_id=3)
+    subject3 = ResponseSubject(
+        subject_id=33, site_id=2, pricing_reading_type=PricingReadingType.IMPORT_ACTIVE_POWER_KWH
+    )
+
+    assert cache.get(key1) is None
+    cache.put(key1, subject1)
+    cache.put(key2, subject2)
+    assert cache.get(key1) == subject1
+    assert cache.get(key2) == subject2
+
+    # key1 is the least recently used - it will be evicted
+    cache.put(key3, subject3)
+    assert len(cache) == 2
+    assert cache.get(key1) is None
+    assert cache.get(key2) == subject2
+    assert cache.get(key3) == subject3
+
+    # Expired values aren't returned
+    with mock.patch("envoy.server.manager.response.utc_now") as mock_utc_now:
+        mock_utc_now.return_value = datetime(2000, 1, 1, tzinfo=UTC)
+        cache.put(key1, subject1)
+    assert cache.get(key1) is None
+
+    disabled_cache = ResponseSubjectCache(max_size=0)
+    disabled_cache.put(key1, subject1)
+    assert disabled_cache.get(key1) is None
+
+
+@mock.patch("envoy.server.manager.response.select_single_site_with_lfdi")
+@mock.patch("envoy.server.manager.response.MridMapper.decode_and_validate_mrid_type")
+@mock.patch("envoy.server.manager.response.MridMapper.decode_doe_mrid")
+@mock.patch("envoy.server.manager.response.select_doe_include_deleted")
+@pytest.mark.anyio
+async def test_create_response_for_scope_subject_cache(
+    mock_select_doe_include_deleted: mock.MagicMock,
+    mock_decode_doe_mrid: mock.MagicMock,
+    mock_decode_and_validate_mrid_type: mock.MagicMock,
+    mock_select_single_site_with_lfdi: mock.MagicMock,
+    pg_base_config,
+):
+    """Tests that repeated responses to the same subject only look up the subject once"""
+    site_id = 1
+    decoded_doe_id = 2
+    scope = generate_class_instance(SiteRequestScope, seed=101, site_id=site_id, href_prefix="/my_prefix/")
+    mock_decode_and_validate_mrid_type.return_value = MridType.DYNAMIC_OPERATING_ENVELOPE
+    mock_decode_doe_mrid.return_value = (False, decoded_doe_id)
+    mock_select_doe_include_deleted.return_value = generate_class_instance(
+        DynamicOperatingEnvelope, seed=303, dynamic_operating_envelope_id=decoded_doe_id, site_id=site_id
+    )
+    mock_select_single_site_with_lfdi.return_value = generate_class_instance(Site, seed=404, site_id=site_id)
+    cache = ResponseSubjectCache()
+
+    hrefs: list[str] = []
+    for seed in [202, 303, 404]:
+        response = generate_class_instance(Response, seed=seed, subject="abc123")
+        async with generate_async_session(pg_base_config) as session:
+            hrefs.append(
+                await ResponseManager.create_response_for_scope(
+                    session, scope, ResponseSetType.SITE_CONTROLS, response, subject_cache=cache
+                )
+            )
+
+    assert len(set(hrefs)) == 3, "Each response is unique"
+    mock_select_doe_include_deleted.assert_called_once()
+    assert mock_select_single_site_with_lfdi.call_count == 3, "LFDI is still checked for every response"
+    assert len(cache) == 1
+
+    async with generate_async_session(pg_base_config) as session:
+        for href in hrefs:
+            db_response = await session.get(DynamicOperatingEnvelopeResponse, int(href.split("/")[-1]))
+            assert db_response is not None
+            assert db_response.dynamic_operating_envelope_id_snapshot == decoded_doe_id
+
+
+@mock.patch("envoy.server.manager.response.select_single_site_with_lfdi")
+@mock.patch("envoy.server.manager.response.MridMapper.decode_and_validate_mrid_type")
+@mock.patch("envoy.server.manager.response.MridMapper.decode_time_tariff_interval_mrid")
+@mock.patch("envoy.server.manager.response.select_tariff_generated_rate_for_scope")
+@pytest.mark.anyio
+async def test_create_response_for_scope_batch_writer(
+    mock_select_tariff_generated_rate_for_scope: mock.MagicMock,
+    mock_decode_time_tariff_interval_mrid: mock.MagicMock,
+    mock_decode_and_validate_mrid_type: mock.MagicMock,
+    mock_select_single_site_with_lfdi: mock.MagicMock,
+):
+    """Tests that a batch writer (if specified) is responsible for writing the response"""
+    site_id = 1
+    scope = generate_class_instance(SiteRequestScope, seed=101, site_id=site_id, href_prefix="/my_prefix/")
+    response = generate_class_instance(Response, seed=202)
+    mock_decode_and_validate_mrid_type.return_value = MridType.TIME_TARIFF_INTERVAL
+    mock_decode_time_tariff_interval_mrid.return_value = (PricingReadingType.EXPORT_ACTIVE_POWER_KWH, 3)
+    mock_select_tariff_generated_rate_for_scope.return_value = generate_class_instance(
+        TariffGeneratedRate, seed=303, tariff_generated_rate_id=3, site_id=site_id
+    )
+    mock_select_single_site_with_lfdi.return_value = generate_class_instance(Site, seed=404, site_id=site_id)
+    mock_session = create_mock_session()
+
+    async def submit(r: TariffGeneratedRateResponse) -> None:
+        r.tariff_generated_rate_response_id = 98765
+
+    mock_batch_writer = mock.Mock()
+    mock_batch_writer.submit = mock.AsyncMock(side_effect=submit)
+
+    href = await ResponseManager.create_response_for_scope(
+        mock_session, scope, ResponseSetType.TARIFF_GENERATED_RATES, response, batch_writer=mock_batch_writer
+    )
+
+    assert href.endswith("/98765")
+    mock_batch_writer.submit.assert_called_once()
+    submitted: TariffGeneratedRateResponse = mock_batch_writer.submit.call_args[0][0]
+    assert submitted.tariff_generated_rate_id_snapshot == 3
+    assert submitted.site_id == site_id
+    assert submitted.pricing_reading_type == PricingReadingType.EXPORT_ACTIVE_POWER_KWH
+    assert_mock_session(mock_session, committed=False)
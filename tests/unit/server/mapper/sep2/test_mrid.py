@@ -121,6 +121,13 @@ def test_encode_mrid_unique_values():
     assert len(all_generated_mrids) == len(set(all_generated_mrids)), "All values should be unique"
 
 
+@no_type_check
+def test_encode_mrid_known_value():
+    assert encode_mrid(MridType.TARIFF, 0xABC, 0x1234) == f"{int(MridType.TARIFF):x}{'abc':0>23}00001234"
+    assert encode_mrid(0, 0, 0) == "0" * 32
+    assert encode_mrid(MAX_MRID_TYPE, MAX_MRID_ID, MAX_IANA_PEN) == "f" * 32
+
+
 @no_type_check
 def test_encode_mrid_out_of_range_values():
     """Check encode_mrid raises ValueError on invalid values"""
@@ -139,6 +146,10 @@ def test_encode_mrid_out_of_range_values():
     with pytest.raises(ValueError):
         encode_mrid(0, 0, MAX_IANA_PEN + 1)
 
+    # Repeated calls (ie cached encodings) still validate
+    with pytest.raises(ValueError):
+        encode_mrid(0, 0, MAX_IANA_PEN + 1)
+
     with pytest.raises(ValueError):
         encode_mrid(0, MAX_MRID_ID + 1, 0)
 
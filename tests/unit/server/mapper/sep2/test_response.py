@@ -91,7 +91,9 @@ def test_ResponseMapper_map_from_price_request(optional_is_none: bool, response_
     price_response = generate_class_instance(response_type, seed=101, optional_is_none=optional_is_none)
     tariff_generated_rate = generate_class_instance(TariffGeneratedRate, seed=202, optional_is_none=optional_is_none)
     for prt in PricingReadingType:
-        result = ResponseMapper.map_from_price_request(price_response, tariff_generated_rate, prt)
+        result = ResponseMapper.map_from_price_request(
+            price_response, tariff_generated_rate.tariff_generated_rate_id, tariff_generated_rate.site_id, prt
+        )
         assert isinstance(result, TariffGeneratedRateResponse)
         assert result.tariff_generated_rate_response_id is None, "Assigned by the database"
         assert result.created_time is None, "Assigned by the database"
@@ -161,7 +163,7 @@ def test_ResponseMapper_map_from_doe_request(
     response = generate_class_instance(response_type, seed=101, optional_is_none=optional_is_none)
     doe = generate_class_instance(doe_type, seed=202, optional_is_none=optional_is_none)
 
-    result = ResponseMapper.map_from_doe_request(response, doe)
+    result = ResponseMapper.map_from_doe_request(response, doe.dynamic_operating_envelope_id, doe.site_id)
     assert isinstance(result, DynamicOperatingEnvelopeResponse)
     assert result.dynamic_operating_envelope_response_id is None, "Assigned by the database"
     assert result.created_time is None, "Assigned by the database"
@@ -7,6 +7,7 @@ from envoy_schema.server.schema.sep2.types import DeviceCategory
 from envoy.server.exception import InvalidMappingError
 from envoy.server.mapper.common import (
     CaseInsensitiveDict,
+    compile_href_template,
     generate_href,
     parse_device_category,
     pow10_to_decimal_value,
@@ -81,6 +82,33 @@ def test_generate_href(uri_format: str, prefix: str | None, args: Any, kwargs: A
         assert generate_href(uri_format, request_state_parameters) == expected
 
 
+@pytest.mark.parametrize(
+    "uri_format, prefix, args, expected",
+    [
+        ("/abc/{0}/def", "/prefix/", ["1"], "/prefix/abc/1/def"),
+        ("/abc/{0}/def", "/prefix/", [""], "/prefix/abc/def"),  # Empty parts are collapsed
+        ("/abc/{0}/def", "/prefix/", ["/"], "/prefix/abc/def"),
+        ("/abc/{0}/def", "/prefix/", ["x//y/"], "/prefix/abc/x/y/def"),
+        ("abc/{0}", "prefix", ["x/"], "prefix/abc/x"),  # Trailing slash removed
+        ("{0}/abc", "", ["/x"], "x/abc"),  # Leading slash still mirrors uri_format
+        ("/{0}", "/", [""], "/"),
+        ("{0}", "", [""], ""),
+        ("/abc/{0}", "//a//b//", [2], "/a/b/abc/2"),
+        ("/abc//{0}/", None, [""], "/abc///"),  # No prefix means no normalisation
+    ],
+)
+def test_generate_href_normalisation(uri_format: str, prefix: str | None, args: list, expected: str):
+    """Tests that formatted values that introduce empty/leading/trailing parts are normalised consistently"""
+    assert generate_href(uri_format, BaseRequestScope("lfdi-val", 1234, prefix, 5678), *args) == expected
+
+
+def test_compile_href_template_cached():
+    assert compile_href_template("/abc/{0}", "/prefix") is compile_href_template("/abc/{0}", "/prefix")
+    assert compile_href_template("/abc/{0}", "/prefix") is not compile_href_template("/abc/{0}", "/other")
+    assert compile_href_template("/abc/{0}", "/prefix")(123) == "/prefix/abc/123"
+    assert compile_href_template("/abc/{0}", "/other")(123) == "/other/abc/123"
+
+
 @pytest.mark.parametrize(
     "uri, prefix, expected",
     [
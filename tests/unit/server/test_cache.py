@@ -135,6 +135,44 @@ async def test_update_result_cached():
     assert mock_update_fn.call_count == 3, "Call count shouldn't have changed from before"
 
 
+@pytest.mark.anyio
+async def test_update_key_fn():
+    """Tests that an update_key_fn is used (instead of update_fn) for cache misses - only touching the missed key"""
+    values = {
+        "key1": ExpiringValue(make_delta_now(timedelta(hours=5)), "val1"),
+        "key2": ExpiringValue(make_delta_now(None), "val2"),
+        "key3": ExpiringValue(make_delta_now(timedelta(hours=-1)), "val3"),  # Expired
+    }
+    update_arg = MyCustomArgument("abc123", 456)
+    mock_update_fn = mock.Mock()
+    mock_update_key_fn = mock.Mock(side_effect=lambda arg, key: create_async_result(values.get(key, None)))
+    c = AsyncCache(mock_update_fn, update_key_fn=mock_update_key_fn)
+
+    # Fetching key1/key2 loads each key once
+    assert (await c.get_value(update_arg, "key1")) == "val1"
+    assert (await c.get_value(update_arg, "key1")) == "val1"
+    assert (await c.get_value(update_arg, "key2")) == "val2"
+    assert mock_update_key_fn.call_count == 2
+    mock_update_key_fn.assert_called_with(update_arg, "key2")
+
+    # Expired / DNE keys are reloaded on every request
+    assert (await c.get_value(update_arg, "key3")) is None
+    assert (await c.get_value(update_arg, "key3")) is None
+    assert (await c.get_value(update_arg, "key4")) is None
+    assert mock_update_key_fn.call_count == 5
+    assert (await c.get_value_ignore_expiry(update_arg, "key3")) == values["key3"]
+
+    # A key being removed will only remove that key
+    values.pop("key1")
+    c._cache["key1"] = ExpiringValue(make_delta_now(timedelta(hours=-1)), "val1")
+    assert (await c.get_value(update_arg, "key1")) is None
+    assert "key1" not in c._cache
+    assert (await c.get_value(update_arg, "key2")) == "val2"
+    assert mock_update_key_fn.call_count == 7
+
+    mock_update_fn.assert_not_called()
+
+
 @pytest.mark.anyio
 async def test_update_raise_error():
     """Tests that updates that raise an error dont invalidate the old cache"""
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import UTC, datetime
+from unittest import mock
+
+import pytest
+from assertical.fake.sqlalchemy import create_mock_session
+from fastapi import FastAPI
+
+from envoy.server import end_device_list_header
+from envoy.server.crud.site import AggregatorSiteSummary
+from envoy.server.end_device_list_header import (
+    EndDeviceListHeader,
+    EndDeviceListHeaderCache,
+    enable_end_device_list_header_cache,
+    fetch_end_device_list_header,
+    load_end_device_list_header,
+)
+
+
+def generate_header(site_count: int) -> EndDeviceListHeader:
+    return EndDeviceListHeader(
+        aggregator_exists=True,
+        virtual_site_timezone_id="Australia/Brisbane",
+        site_count=site_count,
+        subscription_count=0,
+    )
+
+
+@pytest.mark.parametrize(
+    "summary, expected",
+    [
+        (
+            AggregatorSiteSummary(True, "Australia/Sydney", 3, 4),
+            EndDeviceListHeader(True, "Australia/Sydney", 3, 4),
+        ),
+        (
+            AggregatorSiteSummary(True, None, 0, 2),
+            EndDeviceListHeader(True, "Australia/Brisbane", 0, 2),
+        ),  # No sites - default timezone
+        (
+            AggregatorSiteSummary(False, None, 0, 0),
+            EndDeviceListHeader(False, "Australia/Brisbane", 0, 0),
+        ),
+    ],
+)
+@pytest.mark.anyio
+@mock.patch("envoy.server.end_device_list_header.settings")
+@mock.patch("envoy.server.end_device_list_header.select_aggregator_site_summary")
+async def test_load_end_device_list_header(
+    mock_select_aggregator_site_summary: mock.MagicMock,
+    mock_settings: mock.MagicMock,
+    summary: AggregatorSiteSummary,
+    expected: EndDeviceListHeader,
+):
+    mock_session = create_mock_session()
+    mock_settings.default_timezone = "Australia/Brisbane"
+    mock_select_aggregator_site_summary.return_value = summary
+
+    assert await load_end_device_list_header(mock_session, 123) == expected
+    mock_select_aggregator_site_summary.assert_called_once_with(mock_session, 123)
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.end_device_list_header.select_aggregator_site_summary_version")
+@mock.patch("envoy.server.end_device_list_header.load_end_device_list_header")
+async def test_header_cache_get_version_changed(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    mock_session = create_mock_session()
+    mock_load.side_effect = lambda session, aggregator_id: generate_header(aggregator_id)
+    mock_select_version.return_value = (1, 2, 3)
+    cache = EndDeviceListHeaderCache(300)
+
+    agg1 = await cache.get(mock_session, 1)
+    agg2 = await cache.get(mock_session, 2)
+    assert agg1.site_count == 1 and agg2.site_count == 2, "Headers are cached per aggregator"
+    assert await cache.get(mock_session, 1) is agg1
+    assert await cache.get(mock_session, 2) is agg2
+    assert mock_load.call_count == 2
+    assert mock_select_version.call_count == 4
+
+    # A change in version (eg a write from another process) reloads every aggregator (once)
+    mock_select_version.return_value = (1, 2, 4)
+    new_agg1 = await cache.get(mock_session, 1)
+    assert new_agg1 is not agg1
+    assert await cache.get(mock_session, 1) is new_agg1
+    assert mock_load.call_count == 3
+    new_agg2 = await cache.get(mock_session, 2)
+    assert new_agg2 is not agg2
+    assert await cache.get(mock_session, 2) is new_agg2
+    assert mock_load.call_count == 4
+
+    # Expired headers are reloaded
+    with mock.patch("envoy.server.cache.utc_now") as mock_utc_now:
+        mock_utc_now.return_value = datetime(2999, 1, 1, tzinfo=UTC)
+        await cache.get(mock_session, 2)
+    assert mock_load.call_count == 5
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.end_device_list_header.select_aggregator_site_summary_version")
+@mock.patch("envoy.server.end_device_list_header.load_end_device_list_header")
+async def test_header_cache_version_changed_during_load(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    """A write that races a header load should cause the next get to reload"""
+    mock_session = create_mock_session()
+    cache = EndDeviceListHeaderCache(300)
+    headers = [generate_header(i) for i in range(2)]
+    mock_select_version.return_value = (1,)
+
+    async def load_during_write(session, aggregator_id):
+        mock_select_version.return_value = (2,)
+        return headers[0]
+
+    mock_load.side_effect = load_during_write
+    assert await cache.get(mock_session, 1) is headers[0]
+
+    mock_load.side_effect = None
+    mock_load.return_value = headers[1]
+    assert await cache.get(mock_session, 1) is headers[1]
+    assert await cache.get(mock_session, 1) is headers[1]
+    assert mock_load.call_count == 2
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.end_device_list_header.select_aggregator_site_summary_version")
+@mock.patch("envoy.server.end_device_list_header.load_end_device_list_header")
+async def test_header_cache_concurrent_get(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    """Concurrent cache misses (for the same aggregator) should only load the header once"""
+    mock_session = create_mock_session()
+    header = generate_header(1)
+    mock_select_version.return_value = (1,)
+
+    async def slow_load(session, aggregator_id):
+        await asyncio.sleep(0.05)
+        return header
+
+    mock_load.side_effect = slow_load
+    cache = EndDeviceListHeaderCache(300)
+    results = await asyncio.gather(*[cache.get(mock_session, 1) for _ in range(5)])
+    assert all(r is header for r in results)
+    assert mock_load.call_count == 1
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.end_device_list_header.select_aggregator_site_summary_version")
+@mock.patch("envoy.server.end_device_list_header.load_end_device_list_header")
+async def test_header_cache_concurrent_get_different_aggregators(
+    mock_load: mock.MagicMock, mock_select_version: mock.MagicMock
+):
+    """A slow load for one aggregator shouldn't block loading another aggregator's header"""
+    mock_session = create_mock_session()
+    mock_select_version.return_value = (1,)
+    slow_load_started = asyncio.Event()
+    release_slow_load = asyncio.Event()
+
+    async def load(session, aggregator_id):
+        if aggregator_id == 1:
+            slow_load_started.set()
+            await release_slow_load.wait()
+        return generate_header(aggregator_id)
+
+    mock_load.side_effect = load
+    cache = EndDeviceListHeaderCache(300)
+    slow_get = asyncio.create_task(cache.get(mock_session, 1))
+    await slow_load_started.wait()
+
+    # Aggregator 2 can be loaded while aggregator 1 is still loading
+    assert (await asyncio.wait_for(cache.get(mock_session, 2), timeout=5)).site_count == 2
+
+    release_slow_load.set()
+    assert (await slow_get).site_count == 1
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.end_device_list_header.select_aggregator_site_summary_version")
+@mock.patch("envoy.server.end_device_list_header.load_end_device_list_header")
+async def test_fetch_end_device_list_header(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    """The process wide cache is only used while enabled"""
+    mock_session = create_mock_session()
+    mock_load.side_effect = lambda session, aggregator_id: generate_header(aggregator_id)
+    mock_select_version.return_value = (1,)
+
+    # Without the cache - every fetch is a load (with no version probe)
+    await fetch_end_device_list_header(mock_session, 1)
+    await fetch_end_device_list_header(mock_session, 1)
+    assert mock_load.call_count == 2
+    mock_select_version.assert_not_called()
+
+    async with enable_end_device_list_header_cache(300)(FastAPI()):
+        first = await fetch_end_device_list_header(mock_session, 1)
+        assert await fetch_end_device_list_header(mock_session, 1) is first
+        assert mock_load.call_count == 3
+
+    assert end_device_list_header._header_cache is None
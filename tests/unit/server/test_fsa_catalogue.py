@@ -0,0 +1,145 @@
+import asyncio
+from datetime import UTC, datetime
+from unittest import mock
+
+import pytest
+from assertical.fake.sqlalchemy import create_mock_session
+from fastapi import FastAPI
+
+from envoy.server import fsa_catalogue
+from envoy.server.fsa_catalogue import (
+    FunctionSetAssignmentsCatalogue,
+    FunctionSetAssignmentsCatalogueCache,
+    enable_function_set_assignments_catalogue_cache,
+    fetch_function_set_assignments_catalogue,
+    load_function_set_assignments_catalogue,
+)
+
+
+def test_fsa_ids_changed_after():
+    catalogue = FunctionSetAssignmentsCatalogue(
+        fsa_ids=[1, 2, 3],
+        derp_counts_by_fsa_id={},
+        changed_times_by_fsa_id={
+            1: datetime(2022, 1, 1, tzinfo=UTC),
+            2: datetime(2022, 1, 3, tzinfo=UTC),
+            3: datetime(2022, 1, 2, tzinfo=UTC),
+        },
+    )
+    assert catalogue.fsa_ids_changed_after(datetime.min) == [1, 2, 3]
+    assert catalogue.fsa_ids_changed_after(datetime(2022, 1, 2, tzinfo=UTC)) == [2, 3]
+    assert catalogue.fsa_ids_changed_after(datetime(2022, 1, 3, tzinfo=UTC)) == [2]
+    assert catalogue.fsa_ids_changed_after(datetime(2022, 1, 4, tzinfo=UTC)) == []
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.fsa_catalogue.select_function_set_assignments_summary")
+async def test_load_function_set_assignments_catalogue(mock_select_function_set_assignments_summary: mock.MagicMock):
+    mock_session = create_mock_session()
+    t1 = datetime(2022, 1, 1, tzinfo=UTC)
+    t2 = datetime(2022, 1, 2, tzinfo=UTC)
+    mock_select_function_set_assignments_summary.return_value = [(1, 0, t1), (4, 2, t2)]
+
+    catalogue = await load_function_set_assignments_catalogue(mock_session)
+
+    assert catalogue.fsa_ids == [1, 4]
+    assert catalogue.derp_counts_by_fsa_id == {4: 2}, "FSAs without DERPrograms aren't counted"
+    assert catalogue.changed_times_by_fsa_id == {1: t1, 4: t2}
+    mock_select_function_set_assignments_summary.assert_called_once_with(mock_session)
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.fsa_catalogue.select_function_set_assignments_version")
+@mock.patch("envoy.server.fsa_catalogue.load_function_set_assignments_catalogue")
+async def test_catalogue_cache_get_version_changed(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    mock_session = create_mock_session()
+    catalogues = [FunctionSetAssignmentsCatalogue([i], {}, {}) for i in range(3)]
+    mock_load.side_effect = catalogues
+    mock_select_version.return_value = (1, 2, 3)
+    cache = FunctionSetAssignmentsCatalogueCache(300)
+
+    assert await cache.get(mock_session) is catalogues[0]
+    assert await cache.get(mock_session) is catalogues[0]
+    assert mock_load.call_count == 1
+    assert mock_select_version.call_count == 2
+
+    # A change in version (eg a write from another process) forces a reload
+    mock_select_version.return_value = (1, 2, 4)
+    assert await cache.get(mock_session) is catalogues[1]
+    assert await cache.get(mock_session) is catalogues[1]
+    assert mock_load.call_count == 2
+
+    # Expired catalogues are reloaded
+    with mock.patch("envoy.server.cache.utc_now") as mock_utc_now:
+        mock_utc_now.return_value = datetime(2999, 1, 1, tzinfo=UTC)
+        assert await cache.get(mock_session) is catalogues[2]
+    assert mock_load.call_count == 3
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.fsa_catalogue.select_function_set_assignments_version")
+@mock.patch("envoy.server.fsa_catalogue.load_function_set_assignments_catalogue")
+async def test_catalogue_cache_version_changed_during_load(
+    mock_load: mock.MagicMock, mock_select_version: mock.MagicMock
+):
+    """A write that races a catalogue load should cause the next get to reload"""
+    mock_session = create_mock_session()
+    cache = FunctionSetAssignmentsCatalogueCache(300)
+    catalogues = [FunctionSetAssignmentsCatalogue([i], {}, {}) for i in range(2)]
+    mock_select_version.return_value = (1,)
+
+    async def load_during_write(session):
+        mock_select_version.return_value = (2,)
+        return catalogues[0]
+
+    mock_load.side_effect = load_during_write
+    assert await cache.get(mock_session) is catalogues[0]
+
+    mock_load.side_effect = None
+    mock_load.return_value = catalogues[1]
+    assert await cache.get(mock_session) is catalogues[1]
+    assert await cache.get(mock_session) is catalogues[1]
+    assert mock_load.call_count == 2
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.fsa_catalogue.select_function_set_assignments_version")
+@mock.patch("envoy.server.fsa_catalogue.load_function_set_assignments_catalogue")
+async def test_catalogue_cache_concurrent_get(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    """Concurrent cache misses should only load the catalogue once"""
+    mock_session = create_mock_session()
+    catalogue = FunctionSetAssignmentsCatalogue([1], {}, {})
+    mock_select_version.return_value = (1,)
+
+    async def slow_load(session):
+        await asyncio.sleep(0.05)
+        return catalogue
+
+    mock_load.side_effect = slow_load
+    cache = FunctionSetAssignmentsCatalogueCache(300)
+    results = await asyncio.gather(*[cache.get(mock_session) for _ in range(5)])
+    assert all(r is catalogue for r in results)
+    assert mock_load.call_count == 1
+
+
+@pytest.mark.anyio
+@mock.patch("envoy.server.fsa_catalogue.select_function_set_assignments_version")
+@mock.patch("envoy.server.fsa_catalogue.load_function_set_assignments_catalogue")
+async def test_fetch_function_set_assignments_catalogue(mock_load: mock.MagicMock, mock_select_version: mock.MagicMock):
+    """The process wide cache is only used while enabled"""
+    mock_session = create_mock_session()
+    mock_load.side_effect = lambda session: FunctionSetAssignmentsCatalogue([], {}, {})
+    mock_select_version.return_value = (1,)
+
+    # Without the cache - every fetch is a load (with no version probe)
+    await fetch_function_set_assignments_catalogue(mock_session)
+    await fetch_function_set_assignments_catalogue(mock_session)
+    assert mock_load.call_count == 2
+    mock_select_version.assert_not_called()
+
+    async with enable_function_set_assignments_catalogue_cache(300)(FastAPI()):
+        first = await fetch_function_set_assignments_catalogue(mock_session)
+        assert await fetch_function_set_assignments_catalogue(mock_session) is first
+        assert mock_load.call_count == 3
+
+    assert fsa_catalogue._catalogue_cache is None
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from assertical.fixtures.postgres import SingleAsyncEngineState
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from envoy.server.crud.health import HealthCheck
+from envoy.server.health_monitor import (
+    MAX_SNAPSHOT_AGE_INTERVALS,
+    HealthMonitor,
+    HealthSnapshot,
+    run_health_checks,
+    run_health_monitor,
+)
+
+
+def test_health_snapshot_age_seconds():
+    snapshot = HealthSnapshot(check=HealthCheck(), checked_at=100.0)
+    assert snapshot.age_seconds(100.0) == 0.0
+    assert snapshot.age_seconds(112.5) == 12.5
+    assert snapshot.age_seconds(99.0) == 0.0, "Never negative"
+
+
+def test_health_monitor_fresh():
+    monitor = HealthMonitor(10)
+    assert monitor.max_age_seconds == 10 * MAX_SNAPSHOT_AGE_INTERVALS
+    assert monitor.fresh(None, 100.0) is None
+
+    snapshot = HealthSnapshot(check=HealthCheck(), checked_at=100.0)
+    assert monitor.fresh(snapshot, 100.0) is snapshot
+    assert monitor.fresh(snapshot, 100.0 + monitor.max_age_seconds) is snapshot
+    assert monitor.fresh(snapshot, 100.1 + monitor.max_age_seconds) is None
+
+
+@pytest.mark.anyio
+async def test_run_health_checks(pg_base_config):
+    monitor = HealthMonitor(10)
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    try:
+        await run_health_checks(async_sessionmaker(engine_state.engine), monitor)
+    finally:
+        await engine_state.dispose()
+
+    assert monitor.health is not None
+    assert monitor.health.check.database_connectivity
+    assert monitor.health.check.database_has_data
+
+    assert monitor.dynamic_price is not None
+    assert monitor.dynamic_price.check.has_dynamic_prices
+    assert not monitor.dynamic_price.check.has_future_prices
+
+    assert monitor.dynamic_operating_envelope is not None
+    assert monitor.dynamic_operating_envelope.check.has_does
+    assert not monitor.dynamic_operating_envelope.check.has_future_does
+
+
+@pytest.mark.anyio
+async def test_run_health_monitor_unreachable():
+    """An unreachable database should still produce (failing) snapshots - and the monitor should stop on request"""
+    monitor = HealthMonitor(0.01)
+    stop_event = asyncio.Event()
+    engine = create_async_engine("postgresql+asyncpg://u:p@127.0.0.1:1/db")
+    task = asyncio.create_task(run_health_monitor(async_sessionmaker(engine), monitor, stop_event))
+    await asyncio.sleep(0.2)
+
+    assert monitor.health is not None
+    assert not monitor.health.check.database_connectivity
+    assert monitor.dynamic_price is not None
+    assert not monitor.dynamic_price.check.has_dynamic_prices
+    assert monitor.dynamic_operating_envelope is not None
+    assert not monitor.dynamic_operating_envelope.check.has_does
+
+    stop_event.set()
+    await asyncio.wait_for(task, 2)
+    await engine.dispose()
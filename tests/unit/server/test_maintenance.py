@@ -0,0 +1,160 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+from assertical.fixtures.postgres import SingleAsyncEngineState, generate_async_session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from envoy.server.crud.partition import fetch_month_partitions
+from envoy.server.maintenance import (
+    PARTITIONED_TABLES,
+    RESPONSE_PARTITIONED_TABLES,
+    SITE_LOG_EVENT_PARTITIONED_TABLES,
+    SITE_READING_PARTITIONED_TABLES,
+    ArchiveRetentionPolicy,
+    parse_archive_retention_policies,
+    partition_retention_months,
+    purge_archive_table,
+    run_partition_maintenance,
+    run_site_reading_rollup_backfill,
+)
+from envoy.server.model.archive.site import ArchiveSite
+from envoy.server.model.archive.tariff import ArchiveTariff
+from envoy.server.model.site_reading import SiteReadingRollup
+
+
+@pytest.mark.parametrize(
+    "retention_months",
+    [
+        {},
+        partition_retention_months(2, None, None),
+        partition_retention_months(None, 2, 2),
+        partition_retention_months(2, 2, 2),
+    ],
+)
+@pytest.mark.anyio
+async def test_run_partition_maintenance(pg_base_config, retention_months: dict[str, int]):
+    now = datetime(2040, 3, 15, tzinfo=UTC)
+
+    async with generate_async_session(pg_base_config) as session:
+        await run_partition_maintenance(session, now, 1, retention_months)
+        await session.commit()
+
+    async with generate_async_session(pg_base_config) as session:
+        for table in PARTITIONED_TABLES:
+            month_starts = [p.month_start for p in await fetch_month_partitions(session, table)]
+            assert datetime(2040, 3, 1, tzinfo=UTC) in month_starts
+            assert datetime(2040, 4, 1, tzinfo=UTC) in month_starts
+            assert datetime(2040, 5, 1, tzinfo=UTC) not in month_starts
+
+            if table not in retention_months:
+                assert len(month_starts) > 2, "The partitions created by the migration remain"
+            else:
+                assert month_starts == [datetime(2040, 3, 1, tzinfo=UTC), datetime(2040, 4, 1, tzinfo=UTC)]
+
+
+def test_partition_retention_months():
+    assert partition_retention_months(None, None, None) == {}
+    assert set(PARTITIONED_TABLES) == set(
+        SITE_READING_PARTITIONED_TABLES + RESPONSE_PARTITIONED_TABLES + SITE_LOG_EVENT_PARTITIONED_TABLES
+    )
+
+    actual = partition_retention_months(1, 2, 3)
+    assert actual.keys() == set(PARTITIONED_TABLES)
+    assert all(actual[t] == 1 for t in SITE_READING_PARTITIONED_TABLES)
+    assert all(actual[t] == 2 for t in RESPONSE_PARTITIONED_TABLES)
+    assert all(actual[t] == 3 for t in SITE_LOG_EVENT_PARTITIONED_TABLES)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+@pytest.mark.anyio
+async def test_run_site_reading_rollup_backfill(pg_base_config, batch_size: int):
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    try:
+        processed = await run_site_reading_rollup_backfill(
+            async_sessionmaker(engine_state.engine), batch_size, asyncio.Event()
+        )
+    finally:
+        await engine_state.dispose()
+    assert processed == 5, "Every site reading type is processed"
+
+    async with generate_async_session(pg_base_config) as session:
+        rollup_srt_ids = (
+            (await session.execute(select(SiteReadingRollup.site_reading_type_id).distinct())).scalars().all()
+        )
+        assert sorted(rollup_srt_ids) == [1, 2, 4], "Only reading types with readings have rollups"
+        assert (await session.execute(select(func.count()).select_from(SiteReadingRollup))).scalar_one() == 11
+
+
+@pytest.mark.anyio
+async def test_run_site_reading_rollup_backfill_stopped(pg_base_config):
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    stop_event = asyncio.Event()
+    stop_event.set()
+    try:
+        assert await run_site_reading_rollup_backfill(async_sessionmaker(engine_state.engine), 1, stop_event) == 0
+    finally:
+        await engine_state.dispose()
+
+
+def test_parse_archive_retention_policies():
+    assert parse_archive_retention_policies({}, {}) == []
+    assert parse_archive_retention_policies({"archive_tariff": 30, "archive_site": 7}, {"archive_site": 90}) == [
+        ArchiveRetentionPolicy(ArchiveSite, timedelta(days=7), timedelta(days=90)),
+        ArchiveRetentionPolicy(ArchiveTariff, timedelta(days=30), None),
+    ]
+
+
+@pytest.mark.parametrize(
+    "retention_days, deleted_retention_days",
+    [
+        ({"site": 7}, {}),  # Not an archive table
+        ({"archive_site": 7}, {"archive_foo": 7}),  # Not an archive table
+        ({"archive_site": 7}, {"archive_tariff": 7}),  # No retention for archive_tariff
+    ],
+)
+def test_parse_archive_retention_policies_errors(
+    retention_days: dict[str, int], deleted_retention_days: dict[str, int]
+):
+    with pytest.raises(ValueError):
+        parse_archive_retention_policies(retention_days, deleted_retention_days)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 100])
+@pytest.mark.anyio
+async def test_purge_archive_table(pg_base_config, batch_size: int):
+    """Tests that purging works through every batch until there is nothing left to purge"""
+    now = datetime(2024, 1, 10, tzinfo=UTC)
+    async with generate_async_session(pg_base_config) as session:
+        session.add_all(
+            [
+                generate_class_instance(
+                    ArchiveTariff,
+                    seed=i,
+                    archive_id=i,
+                    tariff_id=1,
+                    archive_time=now - timedelta(days=i),
+                    deleted_time=None,
+                )
+                for i in range(1, 8)
+            ]
+        )
+        await session.commit()
+
+    policy = ArchiveRetentionPolicy(ArchiveTariff, timedelta(days=2, hours=12), None)
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    try:
+        purged = await purge_archive_table(
+            async_sessionmaker(engine_state.engine), policy, now, batch_size, 1000, 0, asyncio.Event()
+        )
+    finally:
+        await engine_state.dispose()
+
+    assert purged == 5
+    async with generate_async_session(pg_base_config) as session:
+        remaining = (
+            await session.execute(select(ArchiveTariff.archive_id).order_by(ArchiveTariff.archive_id))
+        ).scalars()
+        assert list(remaining) == [1, 2]
@@ -0,0 +1,150 @@
+import pytest
+from assertical.fixtures.postgres import SingleAsyncEngineState
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from starlette.types import Receive, Scope, Send
+
+from envoy.server.metrics import (
+    QUERY_START_TIME_KEY,
+    UNMATCHED_ROUTE,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+    RequestMetrics,
+    _request_metrics,
+    enable_metrics,
+    get_metrics_registry,
+)
+
+
+def test_counter_and_gauge_samples():
+    c = Counter("my_counter", "docs", ("a", "b"))
+    c.inc(("x", "y"))
+    c.inc(("x", "y"), 2.5)
+    c.inc(("x", 'quote"d'))
+    assert list(c.samples()) == ['my_counter{a="x",b="quote\\"d"} 1', 'my_counter{a="x",b="y"} 3.5']
+
+    g = Gauge("my_gauge", "docs")
+    g.set(5)
+    g.set(3)
+    assert list(g.samples()) == ["my_gauge 3"]
+
+
+def test_histogram_samples():
+    h = Histogram("my_hist", "docs", ("route",), (0.1, 1.0))
+    h.observe(0.05, ("/a",))
+    h.observe(0.5, ("/a",))
+    h.observe(5, ("/a",))
+    assert list(h.samples()) == [
+        'my_hist_bucket{route="/a",le="0.1"} 1',
+        'my_hist_bucket{route="/a",le="1"} 2',
+        'my_hist_bucket{route="/a",le="+Inf"} 3',
+        'my_hist_sum{route="/a"} 5.55',
+        'my_hist_count{route="/a"} 3',
+    ]
+
+
+def test_registry_render():
+    registry = MetricsRegistry()
+    registry.notification_queue_depth.set(4, ("notification_check",))
+    rendered = registry.render()
+    assert rendered.endswith("\n")
+    assert "# TYPE envoy_http_requests_total counter" in rendered
+    assert "# TYPE envoy_http_request_duration_seconds histogram" in rendered
+    assert "# TYPE envoy_notification_queue_depth gauge" in rendered
+    assert 'envoy_notification_queue_depth{queue="notification_check"} 4' in rendered
+
+
+def test_enable_metrics_idempotent():
+    registry = enable_metrics()
+    assert enable_metrics() is registry
+    assert get_metrics_registry() is registry
+
+
+@pytest.mark.anyio
+async def test_query_hooks(pg_empty_config):
+    """Queries are only attributed when there is a request being tracked"""
+    enable_metrics()
+    engine_state = SingleAsyncEngineState(pg_empty_config)
+    try:
+        async with engine_state.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))  # Not tracked
+
+            request_metrics = RequestMetrics()
+            token = _request_metrics.set(request_metrics)
+            try:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT pg_sleep(0.01)"))
+            finally:
+                _request_metrics.reset(token)
+
+            await conn.execute(text("SELECT 1"))  # Not tracked
+
+        assert request_metrics.query_count == 2
+        assert request_metrics.query_seconds >= 0.01
+    finally:
+        await engine_state.dispose()
+
+
+@pytest.mark.anyio
+async def test_query_hooks_error(pg_empty_config):
+    """A failing query doesn't leave its start time behind on the connection"""
+    enable_metrics()
+    engine_state = SingleAsyncEngineState(pg_empty_config)
+    try:
+        async with engine_state.engine.connect() as conn:
+            request_metrics = RequestMetrics()
+            token = _request_metrics.set(request_metrics)
+            try:
+                with pytest.raises(ProgrammingError):
+                    await conn.execute(text("SELECT * FROM table_that_does_not_exist"))
+                sync_conn = conn.sync_connection
+                assert sync_conn is not None
+                assert QUERY_START_TIME_KEY not in sync_conn.info
+                await conn.rollback()
+
+                await conn.execute(text("SELECT 1"))
+            finally:
+                _request_metrics.reset(token)
+
+            assert QUERY_START_TIME_KEY not in sync_conn.info
+
+        assert request_metrics.query_count == 1
+    finally:
+        await engine_state.dispose()
+
+
+class DummyRoute:
+    path = "/edev/{site_id}"
+
+
+@pytest.mark.parametrize("matched", [True, False])
+@pytest.mark.anyio
+async def test_MetricsMiddleware(matched: bool):
+    registry = MetricsRegistry()
+    sent = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        if matched:
+            scope["route"] = DummyRoute()
+        request_metrics = _request_metrics.get()
+        assert request_metrics is not None
+        request_metrics.query_count += 3
+        request_metrics.query_seconds += 0.5
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message) -> None:
+        sent.append(message)
+
+    await MetricsMiddleware(app, registry)({"type": "http", "method": "POST"}, None, send)  # ty:ignore[invalid-argument-type]
+
+    assert len(sent) == 2
+    assert _request_metrics.get() is None
+    route = "/edev/{site_id}" if matched else UNMATCHED_ROUTE
+    assert registry.http_requests.values == {("POST", route, "201"): 1}
+    assert registry.db_queries.values == {("POST", route): 3}
+    assert registry.db_query_duration.values == {("POST", route): 0.5}
+    assert registry.http_request_duration.counts == {("POST", route): 1}
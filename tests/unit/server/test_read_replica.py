@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from assertical.fixtures.postgres import SingleAsyncEngineState, generate_async_session
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.types import Receive, Scope, Send
+
+from envoy.server.model.site import Site
+from envoy.server.read_replica import (
+    READ_PRIMARY_HEADER,
+    ReadReplica,
+    ReadReplicaRoutingMiddleware,
+    ReadReplicaStatus,
+    _read_replica_enabled,
+    fetch_replica_lag_seconds,
+    generate_read_replica_session_class,
+    run_replica_lag_monitor,
+)
+
+PRIMARY_URL = "postgresql+asyncpg://u:p@primary:5432/db"
+REPLICA_URL = "postgresql+asyncpg://u:p@replica:5432/db"
+
+
+@pytest.mark.parametrize(
+    "lag, max_staleness, expected",
+    [(None, 5.0, False), (0.0, 5.0, True), (5.0, 5.0, True), (5.1, 5.0, False), (0.0, 0.0, True)],
+)
+def test_read_replica_status_replica_available(lag: float | None, max_staleness: float, expected: bool):
+    status = ReadReplicaStatus(max_staleness)
+    status.replica_lag_seconds = lag
+    assert status.replica_available is expected
+
+
+def test_read_replica_status_recently_wrote():
+    status = ReadReplicaStatus(10, max_tracked_clients=2)
+    assert not status.recently_wrote("c1", 100)
+
+    status.record_write("c1", 100)
+    assert status.recently_wrote("c1", 100)
+    assert status.recently_wrote("c1", 110)
+    assert not status.recently_wrote("c2", 110)
+    assert not status.recently_wrote("c1", 110.1)
+    assert not status.recently_wrote("c1", 100), "Expired writes are forgotten"
+
+    # Oldest clients are evicted once max_tracked_clients is exceeded
+    status.record_write("c1", 200)
+    status.record_write("c2", 201)
+    status.record_write("c1", 202)
+    status.record_write("c3", 203)
+    assert status.recently_wrote("c1", 205)
+    assert not status.recently_wrote("c2", 205)
+    assert status.recently_wrote("c3", 205)
+
+
+@pytest.mark.parametrize("read_replica_enabled", [True, False])
+def test_generate_read_replica_session_class(read_replica_enabled: bool):
+    primary_engine = create_async_engine(PRIMARY_URL)
+    replica_engine = create_async_engine(REPLICA_URL)
+    session = generate_read_replica_session_class(replica_engine)(bind=primary_engine.sync_engine)
+    expected_read_engine = replica_engine.sync_engine if read_replica_enabled else primary_engine.sync_engine
+
+    token = _read_replica_enabled.set(read_replica_enabled)
+    try:
+        assert session.get_bind(clause=select(Site)) is expected_read_engine
+        assert session.get_bind(clause=select(Site).with_for_update()) is primary_engine.sync_engine
+        assert session.get_bind(clause=insert(Site)) is primary_engine.sync_engine
+        assert session.get_bind(clause=text("SELECT 1")) is primary_engine.sync_engine
+        assert session.get_bind() is primary_engine.sync_engine
+    finally:
+        _read_replica_enabled.reset(token)
+
+    assert session.get_bind(clause=select(Site)) is primary_engine.sync_engine, "Outside of a request"
+
+
+def test_read_replica_routing_middleware_kwargs():
+    replica = ReadReplica(REPLICA_URL, {"pool_size": 3}, 5)
+    db_kwargs = {"db_url": PRIMARY_URL, "commit_on_exit": False, "engine_args": {"pool_size": 3}}
+
+    routing_kwargs = replica.routing_middleware_kwargs(db_kwargs)
+    assert routing_kwargs["db_url"] == PRIMARY_URL
+    assert routing_kwargs["engine_args"] == {"pool_size": 3}
+    assert "sync_session_class" in routing_kwargs["session_args"]
+    assert "session_args" not in db_kwargs, "Original kwargs are unmodified"
+    assert replica.engine.pool.size() == 3  # ty:ignore[unresolved-attribute]
+
+
+async def call_middleware(
+    middleware: ReadReplicaRoutingMiddleware, method: str, headers: dict[str, str]
+) -> bool | None:
+    """Sends a (fake) request through middleware - returns the value of _read_replica_enabled seen by the app"""
+    observed: list[bool] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        observed.append(_read_replica_enabled.get())
+
+    middleware.app = app
+    scope = {
+        "type": "http",
+        "method": method,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    await middleware(scope, None, None)  # ty:ignore[invalid-argument-type]
+    assert _read_replica_enabled.get() is False, "Should be reset after the request"
+    return observed[0] if observed else None
+
+
+@pytest.mark.anyio
+async def test_read_replica_routing_middleware():
+    status = ReadReplicaStatus(60)
+    middleware = ReadReplicaRoutingMiddleware(None, status, "x-client")  # ty:ignore[invalid-argument-type]
+
+    # Replica unavailable - nothing goes to replica
+    assert await call_middleware(middleware, "GET", {"x-client": "c1"}) is False
+
+    status.replica_lag_seconds = 1.0
+    assert await call_middleware(middleware, "GET", {"x-client": "c1"}) is True
+    assert await call_middleware(middleware, "HEAD", {}) is True
+    assert await call_middleware(middleware, "GET", {"x-client": "c1", READ_PRIMARY_HEADER: "1"}) is False
+
+    # Writes never go to the replica and force the client to read from the primary afterwards
+    assert await call_middleware(middleware, "POST", {"x-client": "c1"}) is False
+    assert await call_middleware(middleware, "GET", {"x-client": "c1"}) is False
+    assert await call_middleware(middleware, "GET", {"x-client": "c2"}) is True
+    assert await call_middleware(middleware, "DELETE", {}) is False
+
+    # Lagging replica
+    status.replica_lag_seconds = 61
+    assert await call_middleware(middleware, "GET", {"x-client": "c2"}) is False
+
+
+@pytest.mark.anyio
+async def test_fetch_replica_lag_seconds(pg_empty_config):
+    async with generate_async_session(pg_empty_config) as session:
+        assert await fetch_replica_lag_seconds(session) == 0.0  # Test database is not a replica
+
+
+@pytest.mark.anyio
+async def test_run_replica_lag_monitor(pg_empty_config):
+    status = ReadReplicaStatus(5)
+    stop_event = asyncio.Event()
+    engine_state = SingleAsyncEngineState(pg_empty_config)
+    try:
+        session_maker = async_sessionmaker(engine_state.engine)
+        task = asyncio.create_task(run_replica_lag_monitor(session_maker, status, 0.01, stop_event))
+        await asyncio.sleep(0.2)
+        assert status.replica_lag_seconds == 0.0
+        assert status.replica_available
+
+        stop_event.set()
+        await asyncio.wait_for(task, 2)
+    finally:
+        await engine_state.dispose()
+
+
+@pytest.mark.anyio
+async def test_run_replica_lag_monitor_unreachable():
+    status = ReadReplicaStatus(5)
+    status.replica_lag_seconds = 0.0
+    stop_event = asyncio.Event()
+    engine = create_async_engine("postgresql+asyncpg://u:p@127.0.0.1:1/db")
+    task = asyncio.create_task(run_replica_lag_monitor(async_sessionmaker(engine), status, 0.01, stop_event))
+    await asyncio.sleep(0.2)
+    assert status.replica_lag_seconds is None
+    assert not status.replica_available
+
+    stop_event.set()
+    await asyncio.wait_for(task, 2)
+    await engine.dispose()
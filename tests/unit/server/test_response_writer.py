@@ -0,0 +1,117 @@
+import asyncio
+import unittest.mock as mock
+
+import pytest
+from assertical.fixtures.postgres import SingleAsyncEngineState, generate_async_session
+from envoy_schema.server.schema.sep2.response import ResponseType
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from envoy.server.mapper.constants import PricingReadingType
+from envoy.server.model.response import DynamicOperatingEnvelopeResponse, TariffGeneratedRateResponse
+from envoy.server.response_writer import ResponseBatchWriter
+
+
+def doe_response(site_id: int) -> DynamicOperatingEnvelopeResponse:
+    return DynamicOperatingEnvelopeResponse(
+        dynamic_operating_envelope_id_snapshot=1, site_id=site_id, response_type=ResponseType.EVENT_RECEIVED
+    )
+
+
+def rate_response(site_id: int) -> TariffGeneratedRateResponse:
+    return TariffGeneratedRateResponse(
+        tariff_generated_rate_id_snapshot=1,
+        site_id=site_id,
+        response_type=ResponseType.EVENT_STARTED,
+        pricing_reading_type=PricingReadingType.IMPORT_ACTIVE_POWER_KWH,
+    )
+
+
+async def count_rows(pg_base_config, t: type) -> int:
+    async with generate_async_session(pg_base_config) as session:
+        return (await session.execute(select(func.count()).select_from(t))).scalar_one()
+
+
+@pytest.mark.anyio
+async def test_ResponseBatchWriter_batches_submissions(pg_base_config):
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    try:
+        writer = ResponseBatchWriter(async_sessionmaker(engine_state.engine), 100, 0.05, 100)
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(writer.run(stop_event))
+
+        responses = [doe_response(1), rate_response(1), doe_response(2), rate_response(2), doe_response(1)]
+        with mock.patch.object(writer, "_write", wraps=writer._write) as mock_write:
+            await asyncio.wait_for(asyncio.gather(*[writer.submit(r) for r in responses]), 5)
+
+        mock_write.assert_called_once()  # Everything should've been written in a single batch
+        doe_ids = [
+            r.dynamic_operating_envelope_response_id
+            for r in responses
+            if isinstance(r, DynamicOperatingEnvelopeResponse)
+        ]
+        rate_ids = [
+            r.tariff_generated_rate_response_id for r in responses if isinstance(r, TariffGeneratedRateResponse)
+        ]
+        assert all(doe_ids) and len(set(doe_ids)) == 3
+        assert all(rate_ids) and len(set(rate_ids)) == 2
+
+        assert await count_rows(pg_base_config, DynamicOperatingEnvelopeResponse) == 6
+        assert await count_rows(pg_base_config, TariffGeneratedRateResponse) == 5
+
+        stop_event.set()
+        await asyncio.wait_for(task, 5)
+    finally:
+        await engine_state.dispose()
+
+
+@pytest.mark.anyio
+async def test_ResponseBatchWriter_bad_response_isolated(pg_base_config):
+    """A single bad response (referencing a site that doesn't exist) shouldn't fail the rest of its batch"""
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    try:
+        writer = ResponseBatchWriter(async_sessionmaker(engine_state.engine), 100, 0.05, 100)
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(writer.run(stop_event))
+
+        good_responses = [doe_response(1), doe_response(2)]
+        bad_response = doe_response(9999)
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *[writer.submit(r) for r in [good_responses[0], bad_response, good_responses[1]]],
+                return_exceptions=True,
+            ),
+            5,
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], Exception)
+        assert results[2] is None
+        assert all(r.dynamic_operating_envelope_response_id for r in good_responses)
+        assert await count_rows(pg_base_config, DynamicOperatingEnvelopeResponse) == 5
+
+        stop_event.set()
+        await asyncio.wait_for(task, 5)
+    finally:
+        await engine_state.dispose()
+
+
+@pytest.mark.anyio
+async def test_ResponseBatchWriter_drains_on_stop(pg_base_config):
+    """Anything still queued when the writer is stopped should still be written"""
+    engine_state = SingleAsyncEngineState(pg_base_config)
+    try:
+        writer = ResponseBatchWriter(async_sessionmaker(engine_state.engine), 2, 0.05, 100)
+        responses = [doe_response(1) for _ in range(5)]
+        submit_tasks = [asyncio.create_task(writer.submit(r)) for r in responses]
+        await asyncio.sleep(0)  # Let everything enqueue
+
+        stop_event = asyncio.Event()
+        stop_event.set()
+        await asyncio.wait_for(writer.run(stop_event), 5)
+        await asyncio.wait_for(asyncio.gather(*submit_tasks), 5)
+
+        assert all(r.dynamic_operating_envelope_response_id for r in responses)
+        assert await count_rows(pg_base_config, DynamicOperatingEnvelopeResponse) == 8
+    finally:
+        await engine_state.dispose()
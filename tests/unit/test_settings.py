@@ -33,6 +33,7 @@ def test_settings_defaults(preserved_environment):
     assert settings.enable_notifications is None
     assert settings.sqlalchemy_engine_arguments is None
     assert settings.database_url == PostgresDsn(TEST_DATABASE_URL)
+    assert settings.read_database_url is None
     assert isinstance(settings.db_middleware_kwargs, dict)
 
 